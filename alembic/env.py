@@ -1,9 +1,13 @@
+import asyncio
 import os
 import sys
 from logging.config import fileConfig
 
 from alembic import context
+from dotenv import load_dotenv
 from sqlalchemy import engine_from_config, pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlmodel import SQLModel
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
@@ -25,6 +29,15 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+# 通过 alembic 命令行运行时，与 Bot 使用同一套 DATABASE_URL / DATABASE_NAME 配置；
+# 以编程方式调用（如测试）时保留调用方显式设置的 sqlalchemy.url
+if config.cmd_opts is not None:
+    load_dotenv()
+    if os.getenv("DATABASE_URL") or os.getenv("DATABASE_NAME"):
+        from StellariaPact.share.DatabaseHandler import resolve_database_url
+
+        config.set_main_option("sqlalchemy.url", resolve_database_url())
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -62,17 +75,41 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    section = config.get_section(config.config_ini_section, {})
+    driver = section.get("sqlalchemy.url", "").split("://", 1)[0]
+    if driver.endswith(("+asyncpg", "+aiosqlite")):
+        asyncio.run(_run_async_migrations(section))
+        return
+
     connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
+        section,
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        _run_migrations(connection)
+
+
+def _run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def _run_async_migrations(section: dict) -> None:
+    """异步驱动（asyncpg / aiosqlite）需要在异步引擎的连接上同步执行迁移。"""
+    connectable = async_engine_from_config(
+        section,
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(_run_migrations)
 
-        with context.begin_transaction():
-            context.run_migrations()
+    await connectable.dispose()
 
 
 if context.is_offline_mode():
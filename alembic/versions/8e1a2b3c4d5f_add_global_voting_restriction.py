@@ -61,6 +61,7 @@ def upgrade() -> None:
         ["target_user_id"],
         unique=True,
         sqlite_where=sa.text("lifted_at IS NULL"),
+        postgresql_where=sa.text("lifted_at IS NULL"),
     )
 
 
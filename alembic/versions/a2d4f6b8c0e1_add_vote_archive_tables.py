@@ -0,0 +1,131 @@
+"""新增投票归档表
+
+Revision ID: a2d4f6b8c0e1
+Revises: f1c3e5a7b9d2
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "a2d4f6b8c0e1"
+down_revision: Union[str, Sequence[str], None] = "f1c3e5a7b9d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _archived_at() -> sa.Column:
+    return sa.Column(
+        "archived_at",
+        sa.DateTime(),
+        server_default=sa.text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
+
+
+def upgrade() -> None:
+    """创建投票会话、投票记录、选项和镜像消息的归档表及其索引。"""
+    op.create_table(
+        "vote_session_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("session_type", sa.Integer(), nullable=False),
+        sa.Column("total_choices", sa.Integer(), nullable=False),
+        sa.Column("proposal_id", sa.Integer(), nullable=True),
+        sa.Column("objection_id", sa.Integer(), nullable=True),
+        sa.Column("intake_id", sa.Integer(), nullable=True),
+        sa.Column("guild_id", sa.Integer(), nullable=False),
+        sa.Column("context_thread_id", sa.Integer(), nullable=False),
+        sa.Column("context_message_id", sa.Integer(), nullable=True),
+        sa.Column("voting_channel_message_id", sa.Integer(), nullable=True),
+        sa.Column("anonymous_flag", sa.Boolean(), nullable=False),
+        sa.Column("realtime_flag", sa.Boolean(), nullable=False),
+        sa.Column("notify_flag", sa.Boolean(), nullable=False),
+        sa.Column("status", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("max_choices_per_user", sa.Integer(), nullable=False),
+        sa.Column("ui_style", sa.Integer(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_vote_session_archive_guild_id", "vote_session_archive", ["guild_id"], unique=False
+    )
+
+    op.create_table(
+        "user_vote_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("choice", sa.Integer(), nullable=False),
+        sa.Column("option_type", sa.Integer(), nullable=False),
+        sa.Column("choice_index", sa.Integer(), nullable=False),
+        sa.Column("voted_at", sa.DateTime(), nullable=False),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_user_vote_archive_session_id", "user_vote_archive", ["session_id"], unique=False
+    )
+
+    op.create_table(
+        "vote_option_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("option_type", sa.Integer(), nullable=False),
+        sa.Column("choice_index", sa.Integer(), nullable=False),
+        sa.Column("choice_text", sa.String(), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=True),
+        sa.Column("creator_name", sa.String(), nullable=True),
+        sa.Column("data_status", sa.Integer(), nullable=False),
+        sa.Column("voting_status", sa.Integer(), nullable=False),
+        sa.Column("closed_at", sa.DateTime(), nullable=True),
+        sa.Column("resolution_type", sa.Integer(), nullable=False),
+        sa.Column("resolution_description", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_vote_option_archive_session_id", "vote_option_archive", ["session_id"], unique=False
+    )
+    op.create_index(
+        "ix_vote_option_archive_creator_id", "vote_option_archive", ["creator_id"], unique=False
+    )
+
+    op.create_table(
+        "vote_message_mirror_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("guild_id", sa.Integer(), nullable=False),
+        sa.Column("channel_id", sa.Integer(), nullable=False),
+        sa.Column("message_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_vote_message_mirror_archive_session_id",
+        "vote_message_mirror_archive",
+        ["session_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """删除投票归档表。归档数据不会迁回热表。"""
+    op.drop_index(
+        "ix_vote_message_mirror_archive_session_id", table_name="vote_message_mirror_archive"
+    )
+    op.drop_table("vote_message_mirror_archive")
+    op.drop_index("ix_vote_option_archive_creator_id", table_name="vote_option_archive")
+    op.drop_index("ix_vote_option_archive_session_id", table_name="vote_option_archive")
+    op.drop_table("vote_option_archive")
+    op.drop_index("ix_user_vote_archive_session_id", table_name="user_vote_archive")
+    op.drop_table("user_vote_archive")
+    op.drop_index("ix_vote_session_archive_guild_id", table_name="vote_session_archive")
+    op.drop_table("vote_session_archive")
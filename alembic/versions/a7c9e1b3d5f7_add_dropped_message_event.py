@@ -0,0 +1,47 @@
+"""新增被丢弃消息事件表
+
+Revision ID: a7c9e1b3d5f7
+Revises: f4a6c8e0b2d4
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+from StellariaPact.share.database_types import DiscordId
+
+revision: str = "a7c9e1b3d5f7"
+down_revision: Union[str, Sequence[str], None] = "f4a6c8e0b2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建以 (message_id, event_type) 为主键的 WITHOUT ROWID 待重放事件表。"""
+    op.create_table(
+        "dropped_message_event",
+        sa.Column("message_id", DiscordId, autoincrement=False, nullable=False),
+        sa.Column("event_type", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column("guild_id", DiscordId, nullable=False),
+        sa.Column("forum_id", DiscordId, nullable=False),
+        sa.Column("thread_id", DiscordId, nullable=False),
+        sa.Column("user_id", DiscordId, nullable=False),
+        sa.Column("dropped_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("message_id", "event_type"),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_dropped_message_event_dropped_at",
+        "dropped_message_event",
+        ["dropped_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """删除被丢弃消息事件表。"""
+    op.drop_index("ix_dropped_message_event_dropped_at", table_name="dropped_message_event")
+    op.drop_table("dropped_message_event")
@@ -0,0 +1,41 @@
+"""新增已处理消息事件去重表
+
+Revision ID: b3e5f7a9c1d4
+Revises: a2d4f6b8c0e1
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+revision: str = "b3e5f7a9c1d4"
+down_revision: Union[str, Sequence[str], None] = "a2d4f6b8c0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建以 (message_id, event_type) 为主键的 WITHOUT ROWID 去重表。"""
+    op.create_table(
+        "processed_message_event",
+        sa.Column("message_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("event_type", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("message_id", "event_type"),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_processed_message_event_processed_at",
+        "processed_message_event",
+        ["processed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """删除已处理消息事件去重表。"""
+    op.drop_index("ix_processed_message_event_processed_at", table_name="processed_message_event")
+    op.drop_table("processed_message_event")
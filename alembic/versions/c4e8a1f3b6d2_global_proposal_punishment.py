@@ -60,6 +60,7 @@ def upgrade() -> None:
         ["target_user_id", "punishment_type"],
         unique=True,
         sqlite_where=sa.text("lifted_at IS NULL"),
+        postgresql_where=sa.text("lifted_at IS NULL"),
     )
 
 
@@ -110,4 +111,5 @@ def downgrade() -> None:
         ["target_user_id"],
         unique=True,
         sqlite_where=sa.text("lifted_at IS NULL"),
+        postgresql_where=sa.text("lifted_at IS NULL"),
     )
@@ -0,0 +1,35 @@
+"""新增已计数讨论消息索引表
+
+Revision ID: c4f6a8b0d2e3
+Revises: b3e5f7a9c1d4
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c4f6a8b0d2e3"
+down_revision: Union[str, Sequence[str], None] = "b3e5f7a9c1d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建以 Discord 消息 ID 为主键的消息索引表，并按帖子建立清理用索引。"""
+    op.create_table(
+        "counted_message",
+        sa.Column("message_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("thread_id", sa.Integer(), nullable=False),
+        sa.Column("counted", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("message_id"),
+    )
+    op.create_index("ix_counted_message_thread_id", "counted_message", ["thread_id"], unique=False)
+
+
+def downgrade() -> None:
+    """删除已计数讨论消息索引表。"""
+    op.drop_index("ix_counted_message_thread_id", table_name="counted_message")
+    op.drop_table("counted_message")
@@ -0,0 +1,39 @@
+"""新增发言计数回填断点表
+
+Revision ID: d5b7c9e1f3a5
+Revises: c4f6a8b0d2e3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from StellariaPact.share.database_types import JSON_TYPE, DiscordId
+
+revision: str = "d5b7c9e1f3a5"
+down_revision: Union[str, Sequence[str], None] = "c4f6a8b0d2e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建以帖子ID为主键的回填断点表。"""
+    op.create_table(
+        "activity_backfill_checkpoint",
+        sa.Column("thread_id", DiscordId, autoincrement=False, nullable=False),
+        sa.Column("boundary_message_id", DiscordId, nullable=False),
+        sa.Column("last_message_id", DiscordId, nullable=True),
+        sa.Column("snapshot_counts", JSON_TYPE, nullable=True),
+        sa.Column("scanned_counts", JSON_TYPE, nullable=True),
+        sa.Column("scanned_messages", sa.Integer(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("thread_id"),
+    )
+
+
+def downgrade() -> None:
+    """删除发言计数回填断点表。"""
+    op.drop_table("activity_backfill_checkpoint")
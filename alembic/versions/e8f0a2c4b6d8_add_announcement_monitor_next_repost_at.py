@@ -0,0 +1,65 @@
+"""为公示频道监控器新增可索引的下次播报时间
+
+Revision ID: e8f0a2c4b6d8
+Revises: d5b7c9e1f3a5
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from datetime import timedelta
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e8f0a2c4b6d8"
+down_revision: Union[str, Sequence[str], None] = "d5b7c9e1f3a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_monitor = sa.table(
+    "announcement_channel_monitor",
+    sa.column("id", sa.Integer()),
+    sa.column("time_interval_minutes", sa.Integer()),
+    sa.column("last_repost_at", sa.DateTime()),
+    sa.column("next_repost_at", sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    """新增 next_repost_at 列，按上次播报时间加时间间隔回填后设为非空并建立索引。"""
+    with op.batch_alter_table("announcement_channel_monitor", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("next_repost_at", sa.DateTime(), nullable=True))
+
+    # 在 Python 中计算时间，避免依赖各方言不同的日期运算函数
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(_monitor.c.id, _monitor.c.last_repost_at, _monitor.c.time_interval_minutes)
+    ).all()
+    if rows:
+        bind.execute(
+            _monitor.update()
+            .where(_monitor.c.id == sa.bindparam("monitor_id"))
+            .values(next_repost_at=sa.bindparam("next_repost_at")),
+            [
+                {
+                    "monitor_id": monitor_id,
+                    "next_repost_at": last_repost_at + timedelta(minutes=interval_minutes),
+                }
+                for monitor_id, last_repost_at, interval_minutes in rows
+            ],
+        )
+
+    with op.batch_alter_table("announcement_channel_monitor", schema=None) as batch_op:
+        batch_op.alter_column("next_repost_at", existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(
+            op.f("ix_announcement_channel_monitor_next_repost_at"),
+            ["next_repost_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """删除 next_repost_at 列及其索引。"""
+    with op.batch_alter_table("announcement_channel_monitor", schema=None) as batch_op:
+        batch_op.drop_index(op.f("ix_announcement_channel_monitor_next_repost_at"))
+        batch_op.drop_column("next_repost_at")
@@ -0,0 +1,61 @@
+"""新增查询计划审计建议的索引
+
+Revision ID: f1c3e5a7b9d2
+Revises: e6b8c1d4f2a0
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "f1c3e5a7b9d2"
+down_revision: Union[str, Sequence[str], None] = "e6b8c1d4f2a0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名, 表名, 列)
+INDEXES: tuple[tuple[str, str, list[str]], ...] = (
+    (
+        "ix_vote_session_status_type_end_time",
+        "vote_session",
+        ["status", "session_type", "end_time"],
+    ),
+    (
+        "ix_global_proposal_punishment_type_lifted",
+        "global_proposal_punishment",
+        ["punishment_type", "lifted_at"],
+    ),
+    (
+        "ix_announcement_discussion_thread_id",
+        "announcement",
+        ["discussion_thread_id"],
+    ),
+    (
+        "ix_proposal_intake_review_thread_id",
+        "proposal_intake",
+        ["review_thread_id"],
+    ),
+    (
+        "ix_proposal_intake_discussion_thread_id",
+        "proposal_intake",
+        ["discussion_thread_id"],
+    ),
+    (
+        "ix_proposal_intake_voting_message_id",
+        "proposal_intake",
+        ["voting_message_id"],
+    ),
+)
+
+
+def upgrade() -> None:
+    """为到期扫描、处罚类型查询及按帖子/消息查找公示和草案创建索引。"""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """删除本次新增的索引。"""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
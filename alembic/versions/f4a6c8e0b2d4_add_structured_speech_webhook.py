@@ -0,0 +1,54 @@
+"""新增论坛结构化发言 Webhook 表
+
+Revision ID: f4a6c8e0b2d4
+Revises: e8f0a2c4b6d8
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "f4a6c8e0b2d4"
+down_revision: Union[str, Sequence[str], None] = "e8f0a2c4b6d8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建按论坛唯一的 Webhook 表；令牌不落库，使用时按 ID 重新获取。"""
+    op.create_table(
+        "structured_speech_webhook",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("forum_id", sa.Integer(), nullable=False),
+        sa.Column("webhook_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_structured_speech_webhook_forum",
+        "structured_speech_webhook",
+        ["forum_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """删除论坛 Webhook 表。"""
+    op.drop_index(
+        "uq_structured_speech_webhook_forum",
+        table_name="structured_speech_webhook",
+    )
+    op.drop_table("structured_speech_webhook")
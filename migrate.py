@@ -1,3 +1,4 @@
+import os
 import shutil
 import sqlite3
 import subprocess
@@ -5,6 +6,8 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 # --- 配置 ---
 # 使用 pathlib 确保跨平台路径兼容性
 PROJECT_ROOT = Path(__file__).parent.resolve()
@@ -12,6 +15,10 @@ DATA_DIR = PROJECT_ROOT / "data"
 DB_PATH = DATA_DIR / "database.db"
 # --- 结束配置 ---
 
+load_dotenv()
+# 设置了非 SQLite 的 DATABASE_URL 时，迁移目标为外部数据库（如 PostgreSQL）
+USE_SQLITE = os.getenv("DATABASE_URL", "sqlite").startswith("sqlite")
+
 
 # 用于在终端输出彩色文本的辅助函数
 def print_color(text, color_code):
@@ -56,13 +63,8 @@ def get_current_database_version():
         sys.exit(1)
 
 
-def main():
-    """执行完整的数据库迁移流程"""
-    print_info("=" * 50)
-    print_info("=  数据库自动迁移脚本启动")
-    print_info("=" * 50)
-
-    # 备份数据库
+def backup_sqlite_database():
+    """迁移前复制一份 SQLite 数据库文件。"""
     print_info(f"正在备份数据库 '{DB_PATH.name}'...")
     if not DB_PATH.exists():
         print_error(f"错误：数据库文件未找到于 '{DB_PATH}'。请确保文件存在。")
@@ -79,6 +81,19 @@ def main():
         print_error(f"备份数据库时发生错误: {e}")
         sys.exit(1)
 
+
+def main():
+    """执行完整的数据库迁移流程"""
+    print_info("=" * 50)
+    print_info("=  数据库自动迁移脚本启动")
+    print_info("=" * 50)
+
+    # 备份数据库
+    if USE_SQLITE:
+        backup_sqlite_database()
+    else:
+        print_warning("当前使用外部数据库，脚本不会自动备份。请先使用 pg_dump 等工具完成备份。")
+
     # 迁移前校验并输出当前数据库版本
     current_version = get_current_database_version()
     if not current_version:
@@ -122,14 +137,15 @@ def main():
         print_error(f"执行迁移时发生未知错误: {e}")
         sys.exit(1)
 
-    try:
-        # 使用标准库 sqlite3 连接数据库
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("VACUUM;")
-        conn.close()
-    except Exception as e:
-        print_error(f"执行 VACUUM 时发生错误: {e}")
-        print_warning("数据库结构已更新，但优化步骤失败。机器人仍可正常运行。")
+    if USE_SQLITE:
+        try:
+            # 使用标准库 sqlite3 连接数据库
+            conn = sqlite3.connect(DB_PATH)
+            conn.execute("VACUUM;")
+            conn.close()
+        except Exception as e:
+            print_error(f"执行 VACUUM 时发生错误: {e}")
+            print_warning("数据库结构已更新，但优化步骤失败。机器人仍可正常运行。")
 
     print_info("=" * 50)
     print_success(" 所有操作已成功完成！现在可以启动机器人了。")
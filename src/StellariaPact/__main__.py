@@ -12,8 +12,11 @@ from dotenv import load_dotenv
 from StellariaPact.share.ApiScheduler import APIScheduler
 from StellariaPact.share.auth.MissingRole import MissingRole
 from StellariaPact.share.DatabaseHandler import get_db_handler, initialize_db_handler
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
 from StellariaPact.share.HttpClient import HttpClient
 from StellariaPact.share.LoggingConfigurator import LoggingConfigurator
+from StellariaPact.share.ProposalRegistry import ProposalRegistry
+from StellariaPact.share.PunishmentState import PunishmentState
 from StellariaPact.share.RemoteMessageEventsConfig import RemoteMessageEventsConfig
 from StellariaPact.share.StellariaPactBot import StellariaPactBot
 from StellariaPact.share.TimeUtils import TimeUtils
@@ -48,6 +51,8 @@ async def shutdown(loop):
     logger.info("收到关闭信号，正在关闭 Bot 资源...")
     if bot:
         await bot.close()
+        # 先停止到期回调，避免其在数据库关闭后继续访问
+        await bot.deadline_scheduler.stop()
 
     await HttpClient.close()
 
@@ -76,6 +81,9 @@ async def main_async():
     bot = StellariaPactBot(command_prefix="!", intents=intents, proxy=proxy)
 
     bot.api_scheduler = APIScheduler()
+    bot.deadline_scheduler = DeadlineScheduler.from_config(config)
+    bot.punishment_state = PunishmentState(bot)
+    bot.proposal_registry = ProposalRegistry(bot)
     bot.db_handler = None
     bot.config = config
     bot.remote_message_events = remote_message_events
@@ -104,10 +112,20 @@ async def main_async():
             # 如果数据库初始化失败，可能不应该继续，这里可以选择直接返回或抛出异常
             return
 
+        # 预热提案帖注册表；失败时由首次查询重试加载
+        try:
+            await bot.proposal_registry.load()
+        except Exception as e:
+            logger.exception(f"预热提案帖注册表失败: {e}")
+
+        # 各模块加载时登记自己的截止时间任务，调度器在数据库就绪后启动
+        bot.deadline_scheduler.start()
+
         logger.info("开始加载所有 Cogs 模块...")
         from StellariaPact.cogs import (
             Backup,
             Intake,
+            Maintenance,
             Moderation,
             Notification,
             Punishment,
@@ -126,6 +144,7 @@ async def main_async():
             Punishment.setup(bot),
             StructuredSpeech.setup(bot),
             Backup.setup(bot),
+            Maintenance.setup(bot),
         ]
         try:
             await asyncio.gather(*module_setups)
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 from discord.ext import commands, tasks
 import aioboto3
 
+from StellariaPact.share.DatabaseHandler import is_sqlite_url, resolve_database_url
 from StellariaPact.share.StellariaPactBot import StellariaPactBot
 
 logger = logging.getLogger(__name__)
@@ -28,10 +29,14 @@ class BackupCog(commands.Cog):
 
         self._cleanup_stale_temp_files()
 
-        if self.backup_config.get("enabled", False):
-            self.backup_task.start()
-        else:
+        if not self.backup_config.get("enabled", False):
             logger.warning("数据库备份功能未启用。")
+        elif not is_sqlite_url(resolve_database_url()):
+            logger.warning(
+                "当前使用的不是 SQLite 数据库，文件快照备份不可用，请使用数据库自身的备份工具。"
+            )
+        else:
+            self.backup_task.start()
 
     @staticmethod
     def _cleanup_stale_temp_files() -> None:
@@ -4,12 +4,11 @@ import logging
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from discord.ext import tasks
 from sqlalchemy import select
 
 from StellariaPact.models.ProposalIntake import ProposalIntake
 from StellariaPact.models.VoteSession import VoteSession
-from StellariaPact.share.enums import IntakeStatus, VoteSessionType
+from StellariaPact.share.enums import DeadlineKind, IntakeStatus, VoteSessionType
 from StellariaPact.share.UnitOfWork import UnitOfWork
 
 if TYPE_CHECKING:
@@ -20,19 +19,29 @@ logger = logging.getLogger(__name__)
 
 class IntakeCloser:
     """
-    Intake 模块清理器：每 5 分钟检查一次已超过 3 天且未达标的草案
+    Intake 模块清理器：在支持票收集期（3 天）结束时关闭未达标的草案
+
+    收集期的结束时间登记在截止时间调度器中，到期时才查询数据库。
     """
 
     def __init__(self, intake_cog: "IntakeCog"):
         self.intake_cog = intake_cog
         self.bot = intake_cog.bot
-        self.check_expired_intakes.start()
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.INTAKE_SUPPORT, self.check_expired_intakes, self.load_deadlines
+        )
 
     def stop(self):
-        self.check_expired_intakes.stop()
+        self.bot.deadline_scheduler.unregister(DeadlineKind.INTAKE_SUPPORT)
+
+    async def load_deadlines(self) -> list[tuple[int, datetime]]:
+        """读取全部仍在收集支持票的草案的截止时间。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.intake.get_support_deadlines()
 
-    @tasks.loop(minutes=5)
-    async def check_expired_intakes(self):
+    async def check_expired_intakes(self, intake_ids: list[int] | None = None):
+        """关闭全部已过期的草案；由截止时间调度器在任一草案到期时调用。"""
+        await self.bot.wait_until_ready()
         logger.debug("开始扫描过期草案...")
         async with UnitOfWork(self.bot.db_handler) as uow:
             # 查询：状态为"支持票收集中"且关联的投票会话结束时间早于当前时间的草案
@@ -53,7 +62,3 @@ class IntakeCloser:
                 await self.intake_cog.logic.close_expired_intake(intake_id)
             except Exception as e:
                 logger.error(f"关闭过期草案 {intake_id} 时出错: {e}", exc_info=True)
-
-    @check_expired_intakes.before_loop
-    async def before_check(self):
-        await self.bot.wait_until_ready()
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from StellariaPact.share.UnitOfWork import UnitOfWork
-
 from .services.IntakeDiscordHelper import IntakeDiscordHelper
 from .services.IntakeDraftService import IntakeDraftService
 from .services.IntakeReviewService import IntakeReviewService
@@ -55,10 +53,7 @@ class IntakeLogic:
 
     async def is_submission_restricted(self, user_id: int) -> bool:
         """检查用户是否受到全局提案违规处罚。"""
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            return await uow.global_proposal_punishment.is_proposal_violation_restricted(
-                user_id
-            )
+        return await self.bot.punishment_state.is_proposal_violation_restricted(user_id)
 
     # -------------------------
     # 草案提交流程路由 → IntakeDraftService
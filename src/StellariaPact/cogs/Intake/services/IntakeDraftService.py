@@ -116,11 +116,8 @@ class IntakeDraftService:
         """草案提交"""
         StringUtils.validate_proposal_title(dto.title)
 
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            if await uow.global_proposal_punishment.is_proposal_violation_restricted(
-                dto.author_id
-            ):
-                raise BusinessRuleError("你当前受到提案违规处罚，无法创建或提交提案草案。")
+        if await self.bot.punishment_state.is_proposal_violation_restricted(dto.author_id):
+            raise BusinessRuleError("你当前受到提案违规处罚，无法创建或提交提案草案。")
 
         allowed, message = await self.check_submission_limit(dto.guild_id)
         if not allowed:
@@ -13,7 +13,12 @@ from StellariaPact.cogs.Intake.views.IntakeSupportView import IntakeSupportView
 from StellariaPact.dto.ProposalIntakeDto import ProposalIntakeDto
 from StellariaPact.qo.vote_session import CreateVoteSessionQo
 from StellariaPact.share import DiscordUtils, StringUtils
-from StellariaPact.share.enums import IntakeStatus, LogOperationType, VoteSessionType
+from StellariaPact.share.enums import (
+    DeadlineKind,
+    IntakeStatus,
+    LogOperationType,
+    VoteSessionType,
+)
 from StellariaPact.share.UnitOfWork import UnitOfWork
 
 if TYPE_CHECKING:
@@ -171,17 +176,20 @@ class IntakeReviewService:
             if not intake_to_update.review_thread_id:
                 raise ValueError("草案缺少审核帖子ID，无法创建投票会话。")
 
-            now = datetime.now(timezone.utc)
+            support_end_time = datetime.now(timezone.utc) + timedelta(days=3)
             vote_qo = CreateVoteSessionQo(
                 guild_id=vote_msg.guild.id if vote_msg.guild else 0,
                 thread_id=intake_to_update.review_thread_id,
                 context_message_id=vote_msg.id,
                 intake_id=intake_to_update.id,
                 session_type=VoteSessionType.INTAKE_SUPPORT,
-                end_time=now + timedelta(days=3),
+                end_time=support_end_time,
             )
             await uow.vote_session.create_vote_session(vote_qo)
             await uow.commit()
+        self.bot.deadline_scheduler.schedule(
+            DeadlineKind.INTAKE_SUPPORT, intake_dto.id, support_end_time
+        )
 
         # 更新审核帖首楼内容和标签
         await self.discord_helper.update_review_thread_message(
@@ -179,7 +179,7 @@ class IntakeTransitionService:
                 content=proposal_content,
                 status=ProposalStatus.DISCUSSION,
             )
-            await uow.proposal.add_proposal(new_proposal)
+            created_proposal = await uow.proposal.add_proposal(new_proposal)
 
             intake_to_update = await uow.intake.get_intake_by_id(intake_id, for_update=True)
             if not intake_to_update:
@@ -187,7 +187,9 @@ class IntakeTransitionService:
             intake_to_update.discussion_thread_id = discussion_thread_id
             await uow.intake.update_intake(intake_to_update)
             intake_dto = ProposalIntakeDto.model_validate(intake_to_update)
+            proposal_dto = ProposalDto.model_validate(created_proposal)
             await uow.commit()
+        self.bot.proposal_registry.put(proposal_dto)
 
         # 创建转段确认会话，直接发送到刚刚建立的锁定的讨论帖中
         session_dto = await self._create_intake_transition_session(intake_dto)
@@ -378,6 +380,7 @@ class IntakeTransitionService:
 
             proposal_dto = ProposalDto.model_validate(created_proposal)
             await uow.commit()
+        self.bot.proposal_registry.put(proposal_dto)
 
         # 派发事件创建投票面板
         self.bot.dispatch(
@@ -166,7 +166,7 @@ class IntakeVoteService:
             await uow.session.delete(existing_vote)
             action = "withdrawn"
         else:
-            if await uow.global_proposal_punishment.is_restricted(user_id):
+            if await self.bot.punishment_state.is_restricted(user_id):
                 raise BusinessRuleError(
                     "你当前受到全局提案处罚，无法新增草案支持票；已有支持票仍可撤回。"
                 )
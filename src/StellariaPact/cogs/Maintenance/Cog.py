@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import traceback
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import time, timezone
+
+from discord.ext import commands, tasks
+
+from StellariaPact.share.DatabaseHandler import is_sqlite_url, resolve_database_url
+from StellariaPact.share.StellariaPactBot import StellariaPactBot
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = os.getenv("DATABASE_NAME", "data/database.db")
+
+AUTO_VACUUM_INCREMENTAL = 2
+"""PRAGMA auto_vacuum 返回值: 0-NONE, 1-FULL, 2-INCREMENTAL"""
+
+
+@dataclass(frozen=True)
+class DatabaseFileStats:
+    """数据库文件的体积快照"""
+
+    file_size: int
+    """主数据库文件字节数"""
+
+    wal_size: int
+    """WAL 文件字节数，不存在时为 0"""
+
+    freelist_pages: int
+    """空闲页数量"""
+
+    page_size: int
+    """页大小（字节）"""
+
+    def describe(self) -> str:
+        return (
+            f"文件 {self.file_size / 1024:.1f} KiB, WAL {self.wal_size / 1024:.1f} KiB, "
+            f"空闲页 {self.freelist_pages} ({self.freelist_pages * self.page_size / 1024:.1f} KiB)"
+        )
+
+
+class MaintenanceCog(commands.Cog):
+    """在低峰时段维护 SQLite 数据库：更新统计信息、回收空闲页并截断 WAL 文件"""
+
+    def __init__(self, bot: StellariaPactBot, config: dict, db_path: str = DB_NAME):
+        self.bot = bot
+        self.db_path = db_path
+        self.maintenance_config = config.get("maintenance", {})
+        self.vacuum_pages = int(self.maintenance_config.get("incremental_vacuum_pages", 0))
+        self.migrate_auto_vacuum = bool(self.maintenance_config.get("migrate_auto_vacuum", True))
+
+        if not self.maintenance_config.get("enabled", True):
+            logger.warning("数据库维护任务未启用。")
+        elif not is_sqlite_url(resolve_database_url()):
+            # PostgreSQL 由 autovacuum 自行维护统计信息与空间回收
+            logger.info("当前使用的不是 SQLite 数据库，跳过 SQLite 例行维护任务。")
+        else:
+            off_peak_hour = int(self.maintenance_config.get("off_peak_hour_utc", 20))
+            self.maintenance_task.change_interval(
+                time=time(hour=off_peak_hour, tzinfo=timezone.utc)
+            )
+            self.checkpoint_task.change_interval(
+                minutes=float(self.maintenance_config.get("checkpoint_interval_minutes", 30))
+            )
+            self.maintenance_task.start()
+            self.checkpoint_task.start()
+
+    def cog_unload(self) -> None:
+        for task in (self.maintenance_task, self.checkpoint_task):
+            if task.is_running():
+                task.cancel()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 自动提交模式，VACUUM 与 PRAGMA 不能在事务中执行
+        return sqlite3.connect(self.db_path, timeout=15, isolation_level=None)
+
+    def collect_stats_sync(self) -> DatabaseFileStats:
+        wal_path = f"{self.db_path}-wal"
+        with closing(self._connect()) as connection:
+            freelist_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        return DatabaseFileStats(
+            file_size=os.path.getsize(self.db_path),
+            wal_size=os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            freelist_pages=freelist_pages,
+            page_size=page_size,
+        )
+
+    def run_maintenance_sync(self) -> tuple[DatabaseFileStats, DatabaseFileStats]:
+        """执行一次完整维护，返回维护前后的文件体积快照。"""
+        before = self.collect_stats_sync()
+        with closing(self._connect()) as connection:
+            auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum != AUTO_VACUUM_INCREMENTAL and self.migrate_auto_vacuum:
+                # 切换 auto_vacuum 模式需要一次完整 VACUUM 重建文件，仅在首次维护时发生
+                logger.info("数据库尚未启用增量回收，正在切换 auto_vacuum=INCREMENTAL 并重建...")
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("VACUUM")
+                auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+            has_statistics = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+            if not has_statistics:
+                # 首次维护时全量收集统计信息，之后由 optimize 按需增量更新
+                connection.execute("ANALYZE")
+            connection.execute("PRAGMA optimize")
+
+            if auto_vacuum == AUTO_VACUUM_INCREMENTAL:
+                # 0 表示回收全部空闲页
+                if self.vacuum_pages > 0:
+                    connection.execute(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+                else:
+                    connection.execute("PRAGMA incremental_vacuum")
+
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return before, self.collect_stats_sync()
+
+    def checkpoint_sync(self) -> tuple[int, int, int]:
+        """执行 wal_checkpoint(TRUNCATE)，返回 (是否被阻塞, WAL 帧数, 已写回帧数)。"""
+        with closing(self._connect()) as connection:
+            busy, log_frames, checkpointed = connection.execute(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).fetchone()
+        return busy, log_frames, checkpointed
+
+    @tasks.loop(time=time(hour=20, tzinfo=timezone.utc))
+    async def maintenance_task(self) -> None:
+        logger.info("开始执行数据库例行维护...")
+        try:
+            before, after = await asyncio.to_thread(self.run_maintenance_sync)
+            logger.info(f"数据库维护完成。维护前: {before.describe()}；维护后: {after.describe()}")
+        except Exception as e:
+            logger.error(f"数据库维护失败: {e}\n{traceback.format_exc()}")
+
+    @tasks.loop(minutes=30)
+    async def checkpoint_task(self) -> None:
+        try:
+            busy, log_frames, checkpointed = await asyncio.to_thread(self.checkpoint_sync)
+            if busy:
+                logger.warning(
+                    f"WAL 检查点被活动读写阻塞，已写回 {checkpointed}/{log_frames} 帧，"
+                    "将在下个周期重试。"
+                )
+        except Exception as e:
+            logger.error(f"WAL 检查点执行失败: {e}")
+
+    @maintenance_task.before_loop
+    async def before_maintenance_task(self) -> None:
+        await self.bot.wait_until_ready()
+
+    @checkpoint_task.before_loop
+    async def before_checkpoint_task(self) -> None:
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: StellariaPactBot):
+    await bot.add_cog(MaintenanceCog(bot, bot.config))
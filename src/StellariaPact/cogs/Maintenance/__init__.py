@@ -0,0 +1,3 @@
+from .Cog import MaintenanceCog, setup
+
+__all__ = ["MaintenanceCog", "setup"]
@@ -390,6 +390,9 @@ class ModerationLogic:
                     status=ProposalStatus.EXECUTING,
                 )
                 await uow.commit()
+            self.bot.proposal_registry.set_status(
+                announcement.discussion_thread_id, ProposalStatus.EXECUTING
+            )
         except Exception as e:
             logger.error(
                 f"处理公示结束事件时发生错误 (帖子ID: {announcement.discussion_thread_id}): {e}",
@@ -487,6 +490,7 @@ class ModerationLogic:
             proposal.status = ProposalStatus.UNDER_OBJECTION
             uow.session.add(proposal)
             await uow.commit()
+        self.bot.proposal_registry.set_status(thread_id, ProposalStatus.UNDER_OBJECTION)
 
         try:
             thread = await DiscordUtils.fetch_thread(self.bot, thread_id)
@@ -569,6 +573,7 @@ class ModerationLogic:
             proposal.status = ProposalStatus.DISCUSSION
             uow.session.add(proposal)
             await uow.commit()
+        self.bot.proposal_registry.set_status(thread_id, ProposalStatus.DISCUSSION)
 
         try:
             thread = await DiscordUtils.fetch_thread(self.bot, thread_id)
@@ -636,6 +641,7 @@ class ModerationLogic:
             uow.session.add(proposal)
             await uow.commit()
 
+        self.bot.proposal_registry.put(result)
         await self._dispatch_vote_details_updates(session_message_ids_to_refresh)
         return result
 
@@ -688,6 +694,7 @@ class ModerationLogic:
             result = ProposalDto.model_validate(proposal)
             await uow.commit()
 
+        self.bot.proposal_registry.put(result)
         await self._dispatch_vote_details_updates(session_message_ids_to_refresh)
         return result, restored_discussion
 
@@ -1,22 +1,32 @@
 import asyncio
 import logging
-import random
+import time
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from StellariaPact.cogs.Notification.NotificationLogic import NotificationLogic
 from StellariaPact.dto import AnnouncementDto
 from StellariaPact.share import DiscordUtils, StellariaPactBot, UnitOfWork
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
 
 class BackgroundTasks(commands.Cog):
     """
-    负责处理与公示相关的后台定时任务，例如检查到期的公示。
+    负责处理与公示相关的到期任务，例如到期的公示与重复播报。
+
+    两类任务的截止时间都登记在截止时间调度器中，到期时才查询数据库。
+    到期项按频道分组并行处理，每轮的耗时与超时次数记录在 `tick_stats` 中。
     """
 
+    DEFAULT_MAX_CONCURRENCY = 4
+    DEFAULT_TICK_BUDGET_SECONDS = 60
+
     def __init__(self, bot: StellariaPactBot):
         self.bot = bot
         self.notification_logic = NotificationLogic(bot)
@@ -25,104 +35,195 @@ class BackgroundTasks(commands.Cog):
         self.executing_tag_id = self.bot.config["tags"]["executing"]
         self.stewards_role_id = self.bot.config["roles"]["stewards"]
 
+        tasks_config = self.bot.config.get("notification_tasks", {})
+        self.max_concurrency = max(
+            1, int(tasks_config.get("max_concurrency", self.DEFAULT_MAX_CONCURRENCY))
+        )
+        self.tick_budget_seconds = float(
+            tasks_config.get("tick_budget_seconds", self.DEFAULT_TICK_BUDGET_SECONDS)
+        )
+        self.tick_stats: dict[str, dict[str, Any]] = {
+            kind: {
+                "ticks": 0,
+                "overruns": 0,
+                "items_total": 0,
+                "last_items": 0,
+                "last_duration_seconds": 0.0,
+                "max_duration_seconds": 0.0,
+            }
+            for kind in (DeadlineKind.ANNOUNCEMENT, DeadlineKind.ANNOUNCEMENT_REPOST)
+        }
+
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.ANNOUNCEMENT, self.check_announcements, self.load_announcement_deadlines
+        )
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.ANNOUNCEMENT_REPOST, self.check_reposts, self.load_repost_deadlines
+        )
+
     def cog_unload(self):
-        self.check_announcements.cancel()
-        self.check_reposts.cancel()  # type: ignore
+        self.bot.deadline_scheduler.unregister(DeadlineKind.ANNOUNCEMENT)
+        self.bot.deadline_scheduler.unregister(DeadlineKind.ANNOUNCEMENT_REPOST)
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """
-        当 Cog 加载完毕且 Bot 准备就绪后，启动后台任务。
-        """
-        logger.info("后台任务模块已就绪，启动定时检查。")
-        self.check_announcements.start()
-        self.check_reposts.start()  # type: ignore
+    async def load_announcement_deadlines(self) -> list[tuple[int, datetime]]:
+        """读取全部进行中公示的结束时间。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.announcements.get_active_deadlines()
+
+    async def load_repost_deadlines(self) -> list[tuple[int, datetime]]:
+        """读取已达到消息数阈值的监控器可以重复播报的时间。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.announcement_monitors.get_repost_deadlines()
 
-    @tasks.loop(minutes=1)
-    async def check_reposts(self):
+    def stats(self) -> dict[str, Any]:
+        """返回两类到期任务最近一轮及累计的处理耗时、超时次数。"""
+        return {kind: dict(stats) for kind, stats in self.tick_stats.items()}
+
+    async def check_reposts(self, monitor_ids: list[int] | None = None):
         """
-        每分钟检查一次需要重复播报的公示。
+        处理需要重复播报的公示；由截止时间调度器在任一监控器可以播报时调用。
+
+        待播报的监控器按频道分组并行处理，同一频道内按顺序播报。
         """
-        # logger.debug("正在执行定时任务: 检查需要重复播报的公示...")
-        pending_monitor_ids = []
+        await self.bot.wait_until_ready()
+        started = time.monotonic()
+        pending_by_channel: dict[int, list[int]] = {}
         try:
             # 在一个简短的事务中安全地获取所有待处理的监控ID
             async with UnitOfWork(self.bot.db_handler) as uow:
                 pending_monitors = await uow.announcement_monitors.get_pending_reposts()
-                pending_monitor_ids = [m.id for m in pending_monitors if m.id is not None]
+                for monitor in pending_monitors:
+                    if monitor.id is not None:
+                        pending_by_channel.setdefault(monitor.channel_id, []).append(monitor.id)
 
-            if not pending_monitor_ids:
+            if not pending_by_channel:
                 # logger.debug("没有找到需要重复播报的公示。")
                 return
 
             logger.info(
-                f"发现 {len(pending_monitor_ids)} 个待处理的重复播报: {pending_monitor_ids}"
+                f"发现 {sum(map(len, pending_by_channel.values()))} 个待处理的重复播报，"
+                f"涉及 {len(pending_by_channel)} 个频道。"
             )
 
         except Exception as e:
             logger.error(f"获取待处理播报列表时发生严重错误: {e}", exc_info=True)
             return
 
-        # 遍历ID列表，为每个监控执行独立的原子操作
-        for monitor_id in pending_monitor_ids:
-            try:
-                await self.notification_logic.process_single_repost(monitor_id)
-                logger.debug(f"成功处理了监控器 ID: {monitor_id}")
-            except Exception as e:
-                logger.error(f"处理监控器 ID {monitor_id} 时发生错误: {e}", exc_info=True)
-                # 单个任务失败，记录日志并继续处理下一个
-
-    @tasks.loop(minutes=1)
-    async def check_announcements(self):
+        try:
+            await self._run_by_channel(
+                {
+                    channel_id: [partial(self._process_repost, monitor_id) for monitor_id in ids]
+                    for channel_id, ids in pending_by_channel.items()
+                }
+            )
+        finally:
+            self._record_tick(
+                DeadlineKind.ANNOUNCEMENT_REPOST,
+                started,
+                sum(map(len, pending_by_channel.values())),
+            )
+
+    async def _process_repost(self, monitor_id: int):
+        """处理单个监控器的重复播报；失败只记录日志，不影响其他监控器。"""
+        try:
+            await self.notification_logic.process_single_repost(monitor_id)
+            logger.debug(f"成功处理了监控器 ID: {monitor_id}")
+        except Exception as e:
+            logger.error(f"处理监控器 ID {monitor_id} 时发生错误: {e}", exc_info=True)
+
+    async def check_announcements(self, announcement_ids: list[int] | None = None):
         """
-        每分钟检查一次到期的公示。
+        处理到期的公示；由截止时间调度器在任一公示到期时调用，并一并补上错过的到期公示。
+
+        全部到期公示的状态变更在同一个事务中完成，随后按讨论帖分组并行发送通知。
         """
-        # logger.debug("正在执行定时任务: 检查到期公示...")
-        expired_announcement_dtos = []
+        await self.bot.wait_until_ready()
+        started = time.monotonic()
+        finished_dtos: list[AnnouncementDto] = []
         try:
-            # 获取所有过期的公示
             async with UnitOfWork(self.bot.db_handler) as uow:
                 expired_announcements = await uow.announcements.get_expired_announcements()
-                expired_announcement_dtos = [
+                expired_dtos = [
                     AnnouncementDto.model_validate(ann) for ann in expired_announcements
                 ]
+                if not expired_dtos:
+                    # logger.debug("没有找到需要处理的到期公示。")
+                    return
+
+                # 仅处理本次由进行中变为已结束的公示，避免重复通知
+                finished_ids = set(
+                    await uow.announcements.mark_announcements_as_finished(
+                        [dto.id for dto in expired_dtos]
+                    )
+                )
+                await uow.announcement_monitors.delete_monitors_for_announcements(
+                    list(finished_ids)
+                )
+                await uow.commit()
+            finished_dtos = [dto for dto in expired_dtos if dto.id in finished_ids]
 
-            if not expired_announcement_dtos:
-                # logger.debug("没有找到需要处理的到期公示。")
-                return
-
-            logger.info(f"发现 {len(expired_announcement_dtos)} 个到期公示，开始处理...")
+            logger.info(f"已将 {len(finished_dtos)} 个到期公示标记为已完成，开始发送通知...")
 
         except Exception as e:
-            logger.error(f"获取到期公示列表时发生严重错误: {e}", exc_info=True)
+            logger.error(f"处理到期公示列表时发生严重错误: {e}", exc_info=True)
             return
 
-        # 遍历 DTO 列表，为每个公示执行独立的原子操作和 API 调用
-        for announcement_dto in expired_announcement_dtos:
-            try:
-                # 在独立的事务中更新数据库
-                async with UnitOfWork(self.bot.db_handler) as uow_atomic:
-                    await uow_atomic.announcements.mark_announcement_as_finished(
-                        announcement_dto.id
-                    )
-                    await uow_atomic.announcement_monitors.delete_monitors_for_announcement(
-                        announcement_dto.id
-                    )
-                    await uow_atomic.commit()
+        for announcement_dto in finished_dtos:
+            self.bot.dispatch("announcement_monitors_changed", announcement_dto.id)
 
-                logger.debug(f"成功在数据库中将公示 {announcement_dto.id} 标记为已完成。")
+        jobs: dict[int, list[Callable[[], Awaitable[None]]]] = {}
+        for announcement_dto in finished_dtos:
+            jobs.setdefault(announcement_dto.discussion_thread_id, []).append(
+                partial(self._notify_announcement_finished_safely, announcement_dto)
+            )
+        try:
+            await self._run_by_channel(jobs)
+        finally:
+            self._record_tick(DeadlineKind.ANNOUNCEMENT, started, len(finished_dtos))
 
-                # 数据库操作成功后，执行 Discord API 调用
-                await self._notify_announcement_finished(announcement_dto)
+        logger.info("所有到期公示处理完毕。")
 
-            except Exception as e:
-                logger.error(
-                    f"处理公示 {announcement_dto.id} ({announcement_dto.title}) 时发生错误: {e}",
-                    exc_info=True,
-                )
-                # 单个公示处理失败，记录日志并继续处理下一个
+    async def _notify_announcement_finished_safely(self, announcement_dto: AnnouncementDto):
+        """发送单个公示的结束通知；失败只记录日志，不影响其他公示。"""
+        try:
+            await self._notify_announcement_finished(announcement_dto)
+        except Exception as e:
+            logger.error(
+                f"处理公示 {announcement_dto.id} ({announcement_dto.title}) 时发生错误: {e}",
+                exc_info=True,
+            )
 
-        logger.info("所有到期公示处理完毕。")
+    async def _run_by_channel(self, jobs: dict[int, list[Callable[[], Awaitable[None]]]]):
+        """
+        按频道并行执行任务：不同频道之间最多 `max_concurrency` 个同时进行，
+        同一频道内的任务按顺序执行，慢频道不会拖住其他频道。
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_channel(channel_jobs: list[Callable[[], Awaitable[None]]]):
+            async with semaphore:
+                for job in channel_jobs:
+                    await job()
+
+        await asyncio.gather(*(run_channel(channel_jobs) for channel_jobs in jobs.values()))
+
+    def _record_tick(self, kind: str, started: float, item_count: int):
+        """记录一轮处理的耗时；超过 `tick_budget_seconds` 视为超时并告警。"""
+        duration = time.monotonic() - started
+        stats = self.tick_stats[kind]
+        stats["ticks"] += 1
+        stats["items_total"] += item_count
+        stats["last_items"] = item_count
+        stats["last_duration_seconds"] = round(duration, 3)
+        stats["max_duration_seconds"] = max(stats["max_duration_seconds"], round(duration, 3))
+        if duration > self.tick_budget_seconds:
+            stats["overruns"] += 1
+            logger.warning(
+                f"{kind} 本轮处理 {item_count} 项耗时 {duration:.1f} 秒，"
+                f"超过预算 {self.tick_budget_seconds:.0f} 秒。"
+            )
+        else:
+            logger.debug(f"{kind} 本轮处理 {item_count} 项耗时 {duration:.2f} 秒。")
 
     async def _notify_announcement_finished(self, announcement_dto: AnnouncementDto):
         """为单个已完成的公示发送通知并更新标签"""
@@ -199,17 +300,5 @@ class BackgroundTasks(commands.Cog):
                 )
             )
         except Exception:
-            # 异常将在 gather 中被捕获和记录
+            # 异常由 _notify_announcement_finished_safely 记录
             raise
-
-    @check_announcements.before_loop
-    async def before_check_announcements(self):
-        await self.bot.wait_until_ready()
-        # 增加随机延迟以错开任务启动时间
-        await asyncio.sleep(random.randint(0, 30))
-
-    @check_reposts.before_loop
-    async def before_check_reposts(self):
-        await self.bot.wait_until_ready()
-        # 增加随机延迟以错开任务启动时间
-        await asyncio.sleep(random.randint(0, 15))
@@ -21,6 +21,7 @@ from StellariaPact.share import (
     safeDefer,
 )
 from StellariaPact.share.auth import MissingRole, RoleGuard
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
@@ -192,6 +193,12 @@ class Notification(commands.Cog):
                         time_interval_minutes=time_interval_minutes,
                     )
                 await uow.commit()
+            if announcement.id is not None:
+                self.bot.deadline_scheduler.schedule(
+                    DeadlineKind.ANNOUNCEMENT, announcement.id, end_time
+                )
+                if enable_reposting:
+                    self.bot.dispatch("announcement_monitors_changed", announcement.id)
 
             # --- 步骤 3: 广播 ---
             broadcast_embed = AnnouncementEmbedBuilder.create_announcement_embed(
@@ -361,6 +368,9 @@ class Notification(commands.Cog):
                 new_end_time=new_end_time_utc,
             )
             await uow.commit()
+            self.bot.deadline_scheduler.schedule(
+                DeadlineKind.ANNOUNCEMENT, announcement.id, new_end_time_utc
+            )
 
             return adjustTimeDto
 
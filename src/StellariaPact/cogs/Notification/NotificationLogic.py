@@ -1,5 +1,5 @@
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import discord
 
@@ -90,6 +90,9 @@ class NotificationLogic:
             logger.debug(f"正在更新监控器 {monitor.id} 的数据库状态...")
             monitor.message_count_since_last = 0
             monitor.last_repost_at = datetime.now(timezone.utc)
+            monitor.next_repost_at = monitor.last_repost_at + timedelta(
+                minutes=monitor.time_interval_minutes
+            )
             uow.session.add(monitor)
             logger.debug(f"成功在频道 {monitor.channel_id} 重播了公示 {monitor.announcement_id}。")
             await uow.commit()
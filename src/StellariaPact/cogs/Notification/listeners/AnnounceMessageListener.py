@@ -6,10 +6,9 @@ from typing import DefaultDict
 
 import discord
 from discord.ext import commands, tasks
-from sqlalchemy import func, select, update
 
-from StellariaPact.models import Announcement, AnnouncementChannelMonitor
 from StellariaPact.share import StellariaPactBot, UnitOfWork
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +16,15 @@ logger = logging.getLogger(__name__)
 class AnnounceMessageListener(commands.Cog):
     """
     通过内存缓存和后台批量更新，监听消息以更新重复公示的计数器。
+
+    进行中公示的监控器按频道索引在内存中，公示创建或结束时通过
+    `announcement_monitors_changed` 事件刷新；写库时以一条语句更新全部监控器。
     """
 
     def __init__(self, bot: StellariaPactBot):
         self.bot = bot
-        self.monitored_channels: set[int] | None = None
+        # 频道索引: {channel_id: [monitor_id, ...]}，仅包含进行中公示的监控器
+        self.monitor_index: dict[int, list[int]] | None = None
         # 内存缓存: {channel_id: message_count_increment}
         self.message_cache: DefaultDict[int, int] = defaultdict(int)
         self.cache_lock = asyncio.Lock()
@@ -40,8 +43,15 @@ class AnnounceMessageListener(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         """当 Cog 准备就绪时，加载监控频道并启动后台任务。"""
-        await self.load_monitored_channels()
-        self.update_cache_to_db.start()
+        await self.load_monitor_index()
+        if not self.update_cache_to_db.is_running():
+            self.update_cache_to_db.start()
+
+    @commands.Cog.listener()
+    async def on_announcement_monitors_changed(self, announcement_id: int):
+        """公示创建或结束后刷新频道索引。"""
+        logger.debug(f"公示 {announcement_id} 的监控器已变更，刷新频道索引。")
+        await self.load_monitor_index()
 
     @tasks.loop(seconds=60)
     async def update_cache_to_db(self):
@@ -59,36 +69,20 @@ class AnnounceMessageListener(commands.Cog):
             cache_to_flush = self.message_cache.copy()
             self.message_cache.clear()
 
+        # 按频道索引展开为 {monitor_id: 增量}；已结束公示的频道不在索引中，其计数直接丢弃
+        index = self.monitor_index or {}
+        increments = {
+            monitor_id: increment
+            for channel_id, increment in cache_to_flush.items()
+            for monitor_id in index.get(channel_id, ())
+        }
+        if not increments:
+            return
+
         logger.debug(f"正在将 {len(cache_to_flush)} 个频道的缓存消息计数写入数据库...")
         try:
             async with UnitOfWork(self.bot.db_handler) as uow:
-                for channel_id, increment in cache_to_flush.items():
-                    # 找到所有在该频道中处于活动状态的监控器
-                    active_monitors_stmt = (
-                        select(AnnouncementChannelMonitor.id)  # type: ignore
-                        .join(Announcement)
-                        .where(
-                            AnnouncementChannelMonitor.channel_id == channel_id,
-                            Announcement.status == 1,
-                        )
-                    )
-                    result = await uow.session.execute(active_monitors_stmt)
-                    monitor_ids = [row[0] for row in result.fetchall()]
-
-                    if not monitor_ids:
-                        continue
-
-                    # 为这些监控器批量增加计数值
-                    stmt = (
-                        update(AnnouncementChannelMonitor)
-                        .where(AnnouncementChannelMonitor.id.in_(monitor_ids))  # type: ignore
-                        .values(
-                            message_count_since_last=AnnouncementChannelMonitor.message_count_since_last
-                            + increment
-                        )
-                        .execution_options(synchronize_session=False)
-                    )
-                    await uow.session.execute(stmt)
+                crossed = await uow.announcement_monitors.increment_message_counts(increments)
                 await uow.commit()
             logger.debug("缓存消息计数成功写入数据库。")
         except Exception as e:
@@ -98,35 +92,35 @@ class AnnounceMessageListener(commands.Cog):
             async with self.cache_lock:
                 for channel_id, increment in cache_to_flush.items():
                     self.message_cache[channel_id] += increment
-
-    async def load_monitored_channels(self):
-        """从数据库加载所有当前被监控的频道ID。"""
-        logger.debug("正在从数据库加载被监控的频道列表...")
+        else:
+            # 只登记本次新达到阈值的监控器；全量加载留给启动和调度器的安全扫描
+            for monitor_id, next_repost_at in crossed:
+                self.bot.deadline_scheduler.schedule(
+                    DeadlineKind.ANNOUNCEMENT_REPOST, monitor_id, next_repost_at
+                )
+
+    async def load_monitor_index(self):
+        """从数据库加载进行中公示的监控器频道索引。"""
+        logger.debug("正在从数据库加载被监控的频道索引...")
         try:
             async with UnitOfWork(self.bot.db_handler) as uow:
-                stmt = select(func.distinct(AnnouncementChannelMonitor.channel_id))
-                result = await uow.session.execute(stmt)
-                self.monitored_channels = {row[0] for row in result.fetchall()}
-                logger.debug(f"加载了 {len(self.monitored_channels)} 个被监控的频道。")
+                self.monitor_index = await uow.announcement_monitors.get_active_monitor_index()
+                logger.debug(f"加载了 {len(self.monitor_index)} 个被监控的频道。")
         except Exception as e:
             logger.error(f"加载被监控频道时发生错误: {e}", exc_info=True)
-            if self.monitored_channels is None:
-                self.monitored_channels = set()
+            if self.monitor_index is None:
+                self.monitor_index = {}
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """
         当有新消息时，如果其所在频道是被监控的，则在内存缓存中增加其计数器。
         """
-        if self.monitored_channels is None:
+        if self.monitor_index is None:
             # 如果尚未加载，则不处理消息，等待 on_ready 完成加载
             return
 
-        if (
-            message.author.bot
-            or not self.monitored_channels
-            or message.channel.id not in self.monitored_channels
-        ):
+        if message.author.bot or message.channel.id not in self.monitor_index:
             return
 
         async with self.cache_lock:
@@ -192,6 +192,7 @@ class PunishmentCog(
             await interaction.followup.send("处理请求时发生错误，请联系技术人员。", ephemeral=True)
             return
 
+        self.bot.dispatch("permanent_punishment_updated", target_user.id, punishment_type, True)
         embed = PunishmentEmbedBuilder.create_permanent_restriction_embed(
             moderator=moderator,
             target_user=target_user,
@@ -282,6 +283,7 @@ class PunishmentCog(
             await interaction.followup.send("处理请求时发生错误，请联系技术人员。", ephemeral=True)
             return
 
+        self.bot.dispatch("permanent_punishment_updated", target_user.id, punishment_type, False)
         embed = PunishmentEmbedBuilder.create_permanent_restriction_lifted_embed(
             moderator=moderator,
             target_user=target_user,
@@ -1,14 +1,12 @@
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
-from discord.ext import commands, tasks
-from sqlalchemy import select
+from discord.ext import commands
 
-from StellariaPact.models.UserActivity import UserActivity
 from StellariaPact.share import StellariaPactBot, UnitOfWork
-from StellariaPact.share.enums import PunishmentType
+from StellariaPact.share.enums import DeadlineKind, PunishmentType
 
 from ..logic.PunishmentLogic import PunishmentLogic
 
@@ -16,101 +14,71 @@ logger = logging.getLogger(__name__)
 
 class PunishmentListener(commands.Cog):
     """
-    负责维护禁言缓存，并拦截被禁言用户的发言。
+    负责同步处罚状态，并拦截被禁言用户的发言。
     """
     def __init__(self, bot: StellariaPactBot):
         self.bot = bot
-        # 缓存结构: {thread_id: {user_id: mute_end_time (aware datetime)}}
-        self.active_mutes: Dict[int, Dict[int, datetime]] = {}
-        # 缓存结构: {user_id: expires_at}
-        self.active_proposal_violations: Dict[int, datetime] = {}
+        # 禁言与全局处罚统一保存在 bot.punishment_state 中，与投票、发言等路径共享
+        self.state = bot.punishment_state
         self.logic = PunishmentLogic(bot) # 初始化逻辑层
-        self.clear_expired_mutes.start()
+        # 到期时间登记在截止时间调度器中，到期后数秒内即解除
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.THREAD_MUTE, self.clear_expired_mutes, self._load_mute_deadlines
+        )
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.PROPOSAL_VIOLATION,
+            self.clear_expired_proposal_violations,
+            self._load_proposal_violation_deadlines,
+        )
 
     def cog_unload(self):
-        self.clear_expired_mutes.cancel()
+        self.bot.deadline_scheduler.unregister(DeadlineKind.THREAD_MUTE)
+        self.bot.deadline_scheduler.unregister(DeadlineKind.PROPOSAL_VIOLATION)
 
     @commands.Cog.listener()
     async def on_ready(self):
-        # 恢复各提案讨论帖内仍未到期的独立禁言处罚。
-        await self._load_active_mutes_into_cache()
-        # 恢复机器人全局范围内仍有效的限时提案违规处罚。
-        await self._load_active_proposal_violations_into_cache()
-
-    async def _load_active_mutes_into_cache(self):
-        """从数据库恢复各提案讨论帖内仍有效的禁言记录。"""
-        logger.info("Punishment: 正在加载有效的禁言记录到缓存...")
-        self.active_mutes.clear()
-        now = datetime.now(timezone.utc)
-
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            statement = select(UserActivity).where(
-                UserActivity.mute_end_time != None, # noqa: E711 # type: ignore
-            )
-            results = await uow.session.exec(statement) # type: ignore
-
-            for activity in results.all():
-                if not activity.mute_end_time:
-                    continue
-                mute_end = activity.mute_end_time
-                if mute_end > now:
-                    if activity.context_thread_id not in self.active_mutes:
-                        self.active_mutes[activity.context_thread_id] = {}
-                    self.active_mutes[activity.context_thread_id][activity.user_id] = mute_end
-
-        count = sum(len(users) for users in self.active_mutes.values())
-        logger.info(f"Punishment: 成功加载 {count} 条有效禁言记录。")
-
-    async def _load_active_proposal_violations_into_cache(self):
-        """从数据库恢复所有有效的限时提案违规处罚。"""
-        self.active_proposal_violations.clear()
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            punishments = await uow.global_proposal_punishment.get_active_by_type(
+        # 恢复仍未到期的帖子禁言和全局提案处罚；断线重连再次触发时不重复读取数据库。
+        await self.state.ensure_loaded()
+        await self.bot.deadline_scheduler.reload(DeadlineKind.THREAD_MUTE)
+        await self.bot.deadline_scheduler.reload(DeadlineKind.PROPOSAL_VIOLATION)
+
+    async def _load_mute_deadlines(self) -> list[tuple[tuple[int, int], datetime]]:
+        """从处罚状态读取全部禁言的到期时间。"""
+        return self.state.thread_mutes()
+
+    async def _load_proposal_violation_deadlines(self) -> list[tuple[int, datetime]]:
+        """从处罚状态读取全部限时提案处罚的到期时间。"""
+        return [
+            (user_id, expires_at)
+            for user_id, expires_at in self.state.global_punishments(
                 PunishmentType.PROPOSAL_VIOLATION
             )
-            active_punishments = [
-                (punishment.target_user_id, punishment.expires_at)
-                for punishment in punishments
-                if punishment.expires_at is not None
-            ]
-        for target_user_id, expires_at in active_punishments:
-            self.active_proposal_violations[target_user_id] = expires_at
-        logger.info(
-            "Punishment: 成功加载 %s 条有效全局提案违规处罚。",
-            len(self.active_proposal_violations),
-        )
+            if expires_at is not None
+        ]
 
-    @tasks.loop(minutes=5)
-    async def clear_expired_mutes(self):
-        """清理已过期的禁言记录"""
+    async def clear_expired_mutes(self, keys: list[tuple[int, int]]):
+        """清理到期的禁言记录；由截止时间调度器调用，键为 (帖子 ID, 用户 ID)。"""
         now = datetime.now(timezone.utc)
         expired = []
-        for thread_id, users in list(self.active_mutes.items()):
-            for user_id, end_time in list(users.items()):
-                if now >= end_time:
-                    del self.active_mutes[thread_id][user_id]
-                    expired.append((user_id, thread_id))
-            if not self.active_mutes[thread_id]:
-                del self.active_mutes[thread_id]
+        for thread_id, user_id in keys:
+            end_time = self.state.get_thread_mute_end(thread_id, user_id)
+            # 已被延长的禁言不在此处理，延长后的到期时间会另行登记
+            if end_time is not None and now < end_time:
+                continue
+            self.state.set_thread_mute(thread_id, user_id, None)
+            expired.append((user_id, thread_id))
 
         if expired:
             async with UnitOfWork(self.bot.db_handler) as uow:
-                await uow.user_activity.batch_clear_expired_mutes(expired)
+                await uow.user_activity.batch_clear_expired_mutes(expired, now=now)
                 await uow.commit()
             logger.info(f"Punishment: 已自动清理 {len(expired)} 条过期的禁言记录。")
 
-        expired_global = [
-            user_id
-            for user_id, expires_at in self.active_proposal_violations.items()
-            if now >= expires_at
-        ]
-        for user_id in expired_global:
-            del self.active_proposal_violations[user_id]
-        if expired_global:
-            logger.info(
-                "Punishment: 已从缓存清理 %s 条到期的全局提案处罚。",
-                len(expired_global),
-            )
+    async def clear_expired_proposal_violations(self, user_ids: list[int]):
+        """从处罚状态清理到期的全局提案处罚；由截止时间调度器调用。"""
+        removed = self.state.prune()
+        if removed:
+            logger.info("Punishment: 已从处罚状态清理 %s 条到期的处罚。", removed)
 
     @commands.Cog.listener()
     async def on_punishment_remove_request(
@@ -128,19 +96,19 @@ class PunishmentListener(commands.Cog):
         user_id: int,
         mute_end_time: Optional[datetime],
     ):
-        """监听配置更新，实时同步缓存"""
-        if thread_id not in self.active_mutes:
-            self.active_mutes[thread_id] = {}
-
+        """监听配置更新，实时同步处罚状态"""
+        self.state.set_thread_mute(thread_id, user_id, mute_end_time)
         if mute_end_time and mute_end_time > datetime.now(timezone.utc):
-            self.active_mutes[thread_id][user_id] = mute_end_time
+            self.bot.deadline_scheduler.schedule(
+                DeadlineKind.THREAD_MUTE, (thread_id, user_id), mute_end_time
+            )
             logger.debug(
-                f"Punishment: 缓存更新 -> 用户 {user_id} "
+                f"Punishment: 状态更新 -> 用户 {user_id} "
                 f"在帖子 {thread_id} 禁言至 {mute_end_time}"
             )
-        elif user_id in self.active_mutes[thread_id]:
-            del self.active_mutes[thread_id][user_id]
-            logger.debug(f"Punishment: 缓存更新 -> 用户 {user_id} 在帖子 {thread_id} 禁言已解除")
+        else:
+            self.bot.deadline_scheduler.cancel(DeadlineKind.THREAD_MUTE, (thread_id, user_id))
+            logger.debug(f"Punishment: 状态更新 -> 用户 {user_id} 在帖子 {thread_id} 禁言已解除")
 
     @commands.Cog.listener()
     async def on_proposal_violation_punishment_updated(
@@ -148,11 +116,27 @@ class PunishmentListener(commands.Cog):
         user_id: int,
         expires_at: Optional[datetime],
     ):
-        """在处罚创建、覆盖或解除后即时同步全局发言限制缓存。"""
-        if expires_at and expires_at > datetime.now(timezone.utc):
-            self.active_proposal_violations[user_id] = expires_at
+        """在处罚创建、覆盖或解除后即时同步全局发言限制。"""
+        active = expires_at is not None and expires_at > datetime.now(timezone.utc)
+        self.state.set_global_punishment(
+            user_id, PunishmentType.PROPOSAL_VIOLATION, active, expires_at
+        )
+        if active:
+            self.bot.deadline_scheduler.schedule(
+                DeadlineKind.PROPOSAL_VIOLATION, user_id, expires_at
+            )
         else:
-            self.active_proposal_violations.pop(user_id, None)
+            self.bot.deadline_scheduler.cancel(DeadlineKind.PROPOSAL_VIOLATION, user_id)
+
+    @commands.Cog.listener()
+    async def on_permanent_punishment_updated(
+        self,
+        user_id: int,
+        punishment_type: PunishmentType,
+        active: bool,
+    ):
+        """在永久专项限制施加或解除后即时同步处罚状态。"""
+        self.state.set_global_punishment(user_id, punishment_type, active)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -164,16 +148,14 @@ class PunishmentListener(commands.Cog):
         ):
             return
 
-        now = datetime.now(timezone.utc)
-        thread_mutes = self.active_mutes.get(message.channel.id, {})
-        mute_end_time = thread_mutes.get(message.author.id)
-        should_delete = mute_end_time is not None and now < mute_end_time
-
-        global_end_time = self.active_proposal_violations.get(message.author.id)
-        if not should_delete and global_end_time is not None and now < global_end_time:
-            async with UnitOfWork(self.bot.db_handler) as uow:
-                proposal = await uow.proposal.get_proposal_by_thread_id(message.channel.id)
-            should_delete = proposal is not None
+        should_delete = await self.state.is_thread_muted(message.channel.id, message.author.id)
+        if not should_delete and await self.state.is_proposal_violation_restricted(
+            message.author.id
+        ):
+            # 全局处罚只限制正式提案讨论帖内的发言
+            should_delete = await self.bot.proposal_registry.is_proposal_thread(
+                message.channel.id
+            )
 
         if should_delete:
             try:
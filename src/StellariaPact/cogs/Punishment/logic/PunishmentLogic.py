@@ -375,7 +375,7 @@ class PunishmentLogic:
                 await uow.user_activity.clear_punishment(target_user.id, thread.id)
                 await uow.commit()
 
-            # 内存缓存同步（通知监听器更新 active_mutes）
+            # 内存缓存同步（通知监听器更新共享处罚状态）
             self.bot.dispatch("thread_mute_updated", thread.id, target_user.id, None)
 
             # 发送公示
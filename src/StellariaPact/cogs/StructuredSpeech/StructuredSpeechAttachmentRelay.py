@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Sequence
+
+import aiohttp
+import discord
+
+from StellariaPact.share import HttpClient
+
+from .constants import (
+    STRUCTURED_SPEECH_ATTACHMENT_CHUNK_BYTES,
+    STRUCTURED_SPEECH_ATTACHMENT_MAX_ATTEMPTS,
+    STRUCTURED_SPEECH_ATTACHMENT_MAX_CONCURRENCY,
+    STRUCTURED_SPEECH_ATTACHMENT_MESSAGE_MAX_BYTES,
+    STRUCTURED_SPEECH_ATTACHMENT_SPOOL_BYTES,
+    STRUCTURED_SPEECH_ATTACHMENT_TIMEOUT_SECONDS,
+    STRUCTURED_SPEECH_ATTACHMENT_TOTAL_MAX_BYTES,
+)
+from .StructuredSpeechUserError import StructuredSpeechUserError
+
+logger = logging.getLogger(__name__)
+
+
+class StructuredSpeechAttachmentRelay:
+    """
+    以有界内存转发结构化发言附件。
+
+    附件通过共享的 `HttpClient` 会话分块下载到 `SpooledTemporaryFile`，超过阈值后
+    落盘；下载前按 Discord 声明的大小预留字节预算，单条消息超出预算直接拒绝，
+    全部进行中的转发超出全局预算时排队等待。下载并发数受信号量限制，网络错误和
+    服务端错误按指数退避重试。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_message_bytes: int = STRUCTURED_SPEECH_ATTACHMENT_MESSAGE_MAX_BYTES,
+        max_total_bytes: int = STRUCTURED_SPEECH_ATTACHMENT_TOTAL_MAX_BYTES,
+        max_concurrency: int = STRUCTURED_SPEECH_ATTACHMENT_MAX_CONCURRENCY,
+        max_attempts: int = STRUCTURED_SPEECH_ATTACHMENT_MAX_ATTEMPTS,
+        spool_bytes: int = STRUCTURED_SPEECH_ATTACHMENT_SPOOL_BYTES,
+        retry_delay_seconds: float = 1.0,
+    ):
+        """保存预算与并发参数；单条消息预算不会超过全局预算。"""
+        self.max_total_bytes = max_total_bytes
+        self.max_message_bytes = min(max_message_bytes, max_total_bytes)
+        self.max_attempts = max(1, max_attempts)
+        self.spool_bytes = spool_bytes
+        self.retry_delay_seconds = retry_delay_seconds
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._budget = asyncio.Condition()
+        self.reserved_bytes = 0
+        """全部进行中的转发已预留的字节数"""
+        self.peak_reserved_bytes = 0
+        self.retries_total = 0
+
+    def stats(self) -> dict[str, Any]:
+        """返回当前与峰值预留字节数和累计重试次数。"""
+        return {
+            "reserved_bytes": self.reserved_bytes,
+            "peak_reserved_bytes": self.peak_reserved_bytes,
+            "retries_total": self.retries_total,
+        }
+
+    @asynccontextmanager
+    async def download(
+        self, attachments: Sequence[discord.Attachment]
+    ) -> AsyncIterator[list[discord.File]]:
+        """
+        下载全部附件并产出可直接发送的文件列表。
+
+        任一附件失败时关闭已下载的文件并抛出异常，不会产生部分文件列表；
+        退出上下文时关闭全部文件并归还字节预算。
+        """
+        size = sum(attachment.size for attachment in attachments)
+        if size > self.max_message_bytes:
+            raise StructuredSpeechUserError(
+                f"附件总大小不能超过 {self.max_message_bytes // (1024 * 1024)} MB。"
+            )
+        await self._reserve(size)
+        files: list[discord.File] = []
+        try:
+            results = await asyncio.gather(
+                *(self.fetch_file(attachment) for attachment in attachments),
+                return_exceptions=True,
+            )
+            files = [item for item in results if isinstance(item, discord.File)]
+            errors = [item for item in results if isinstance(item, BaseException)]
+            if errors:
+                raise errors[0]
+            yield files
+        finally:
+            for file in files:
+                # discord.File 不会关闭外部传入的缓冲区，需要显式关闭以删除临时文件
+                file.close()
+                file.fp.close()
+            await self._release(size)
+
+    async def fetch_file(self, attachment: discord.Attachment) -> discord.File:
+        """在并发限制内下载单个附件，可重试的错误按指数退避重试。"""
+        attempt = 1
+        async with self._semaphore:
+            while True:
+                try:
+                    return await self._fetch_once(attachment)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    if attempt >= self.max_attempts or not self._is_retryable(error):
+                        raise
+                    self.retries_total += 1
+                    logger.warning(
+                        "下载附件 %s 失败（第 %s 次），稍后重试: %s", attachment.id, attempt, error
+                    )
+                    await asyncio.sleep(self.retry_delay_seconds * 2 ** (attempt - 1))
+                    attempt += 1
+
+    async def _fetch_once(self, attachment: discord.Attachment) -> discord.File:
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        try:
+            response = await HttpClient.get(
+                attachment.url,
+                timeout=aiohttp.ClientTimeout(total=STRUCTURED_SPEECH_ATTACHMENT_TIMEOUT_SECONDS),
+            )
+            async with response:
+                response.raise_for_status()
+                received = 0
+                async for chunk in response.content.iter_chunked(
+                    STRUCTURED_SPEECH_ATTACHMENT_CHUNK_BYTES
+                ):
+                    received += len(chunk)
+                    # 实际内容不得超过预留的大小，否则预算失去意义
+                    if received > attachment.size:
+                        raise StructuredSpeechUserError("附件内容与声明的大小不一致。")
+                    buffer.write(chunk)
+            buffer.seek(0)
+            return discord.File(
+                buffer,  # type: ignore[arg-type]
+                filename=attachment.filename,
+                spoiler=attachment.is_spoiler(),
+                description=attachment.description,
+            )
+        except BaseException:
+            buffer.close()
+            raise
+
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        # 客户端错误（如附件已被删除）重试也不会成功
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status == 429
+        return True
+
+    async def _reserve(self, size: int) -> None:
+        async with self._budget:
+            await self._budget.wait_for(lambda: self.reserved_bytes + size <= self.max_total_bytes)
+            self.reserved_bytes += size
+            self.peak_reserved_bytes = max(self.peak_reserved_bytes, self.reserved_bytes)
+
+    async def _release(self, size: int) -> None:
+        # 先归还预算，即使等待条件锁时被取消也不会泄漏
+        self.reserved_bytes -= size
+        async with self._budget:
+            self._budget.notify_all()
@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+LastSentLoader = Callable[[int, int], Awaitable[datetime | None]]
+"""从数据库读取用户在帖子中最近一次结构化发言的时间"""
+
+
+class StructuredSpeechCooldownTracker:
+    """
+    进程内的 (帖子, 用户) → 最近一次结构化发言时间 缓存。
+
+    首次查询某个用户时从数据库读取并缓存（包括“从未发言”），之后成功发言时由服务
+    直接更新，冷却判断不再访问数据库。条目在缓存 `ttl_seconds` 后过期，下次查询时
+    重新读取；过期条目在写入新条目时顺带清理，缓存大小只与近期活跃用户数有关。
+    """
+
+    def __init__(self, loader: LastSentLoader, ttl_seconds: float):
+        """保存数据库读取函数和缓存有效期。"""
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        # {(thread_id, user_id): (最近发言时间, 过期时的单调时钟读数)}
+        self._entries: dict[tuple[int, int], tuple[datetime | None, float]] = {}
+        self._next_prune = time.monotonic() + ttl_seconds
+
+    def __len__(self) -> int:
+        """当前缓存的条目数，包括尚未清理的过期条目。"""
+        return len(self._entries)
+
+    async def get_last_sent_at(self, thread_id: int, user_id: int) -> datetime | None:
+        """返回最近一次发言时间；未命中或已过期时从数据库读取。"""
+        entry = self._entries.get((thread_id, user_id))
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        last_sent_at = await self._loader(thread_id, user_id)
+        # 读取期间可能已有新的发言写入缓存，以较新的时间为准
+        current = self._entries.get((thread_id, user_id))
+        if current is not None and current[0] is not None:
+            if last_sent_at is None or current[0] > last_sent_at:
+                last_sent_at = current[0]
+        self._store(thread_id, user_id, last_sent_at)
+        return last_sent_at
+
+    def record(self, thread_id: int, user_id: int, sent_at: datetime) -> None:
+        """记录一次成功持久化的发言。"""
+        self._store(thread_id, user_id, sent_at)
+
+    def forget_thread(self, thread_id: int) -> None:
+        """移除指定帖子的全部条目。"""
+        for key in [key for key in self._entries if key[0] == thread_id]:
+            del self._entries[key]
+
+    def _store(self, thread_id: int, user_id: int, last_sent_at: datetime | None) -> None:
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._entries = {key: entry for key, entry in self._entries.items() if entry[1] > now}
+            self._next_prune = now + self.ttl_seconds
+        self._entries[(thread_id, user_id)] = (last_sent_at, now + self.ttl_seconds)
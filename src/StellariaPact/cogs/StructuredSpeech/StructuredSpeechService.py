@@ -5,11 +5,12 @@ import logging
 import math
 from collections import Counter
 from datetime import datetime, timezone
-from typing import Sequence
+from typing import AsyncContextManager, Sequence
 
 import discord
 
 from StellariaPact.cogs.Voting.EligibilityService import EligibilityService
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
 from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
 from StellariaPact.dto import UserActivityDto
 from StellariaPact.dto.structured_speech import (
@@ -26,10 +27,12 @@ from StellariaPact.qo.structured_speech import (
     ResolveStructuredSpeechReferenceQo,
 )
 from StellariaPact.qo.user_activity import UpdateUserActivityQo
-from StellariaPact.share import DiscordUtils, StellariaPactBot, UnitOfWork
+from StellariaPact.share import DiscordUtils, KeyedLock, StellariaPactBot, UnitOfWork
 
 from .constants import (
+    STRUCTURED_SPEECH_COOLDOWN_CACHE_TTL_SECONDS,
     STRUCTURED_SPEECH_DEFAULT_INTERVAL_SECONDS,
+    STRUCTURED_SPEECH_INVALID_WEBHOOK_ERROR_CODES,
     STRUCTURED_SPEECH_MAX_ATTACHMENTS,
     STRUCTURED_SPEECH_SLOWMODE_SECONDS,
     STRUCTURED_SPEECH_STATUS_ACTIVE,
@@ -38,6 +41,8 @@ from .constants import (
     STRUCTURED_SPEECH_STATUS_INACTIVE,
     STRUCTURED_SPEECH_WEBHOOK_NAME,
 )
+from .StructuredSpeechAttachmentRelay import StructuredSpeechAttachmentRelay
+from .StructuredSpeechCooldownTracker import StructuredSpeechCooldownTracker
 from .StructuredSpeechMessageTargetResolver import StructuredSpeechMessageTargetResolver
 from .StructuredSpeechUserError import StructuredSpeechUserError
 
@@ -51,23 +56,35 @@ class StructuredSpeechService:
         """初始化服务及单进程并发锁。"""
         self.bot = bot
         self.active_modes: dict[int, StructuredSpeechModeDto] = {}
-        self._mode_locks: dict[int, asyncio.Lock] = {}
-        self._user_locks: dict[tuple[int, int], asyncio.Lock] = {}
+        # 按帖子、按 (帖子, 用户) 分配的锁，空闲后自动回收
+        self._mode_locks = KeyedLock()
+        self._user_locks = KeyedLock()
         self._webhooks: dict[int, discord.Webhook] = {}
+        # {forum_id: webhook_id}，启动时从数据库加载，首次使用时才按 ID 取回 Webhook
+        self._webhook_ids: dict[int, int] = {}
         self._structured_webhook_ids: set[int] = set()
         self._webhook_lock = asyncio.Lock()
         self._deletion_lock = asyncio.Lock()
         self._load_lock = asyncio.Lock()
         self._loaded = False
         self.message_target_resolver = StructuredSpeechMessageTargetResolver(bot)
+        self.attachment_relay = StructuredSpeechAttachmentRelay()
+        self.cooldowns = StructuredSpeechCooldownTracker(
+            self._load_last_sent_at,
+            ttl_seconds=STRUCTURED_SPEECH_COOLDOWN_CACHE_TTL_SECONDS,
+        )
 
-    def mode_lock(self, thread_id: int) -> asyncio.Lock:
+    def mode_lock(self, thread_id: int) -> AsyncContextManager[None]:
         """取得指定帖子的模式切换锁。"""
-        return self._mode_locks.setdefault(thread_id, asyncio.Lock())
+        return self._mode_locks(thread_id)
 
-    def user_lock(self, thread_id: int, user_id: int) -> asyncio.Lock:
+    def user_lock(self, thread_id: int, user_id: int) -> AsyncContextManager[None]:
         """取得指定用户在指定帖子中的发言锁。"""
-        return self._user_locks.setdefault((thread_id, user_id), asyncio.Lock())
+        return self._user_locks((thread_id, user_id))
+
+    def lock_stats(self) -> dict[str, dict]:
+        """返回模式切换锁与发言锁的存活数量和争用次数。"""
+        return {"mode": self._mode_locks.stats(), "user": self._user_locks.stats()}
 
     def get_active_mode(self, thread_id: int) -> StructuredSpeechModeDto | None:
         """读取指定帖子的活动模式快照。"""
@@ -103,9 +120,14 @@ class StructuredSpeechService:
                     for mode in modes
                 ]
                 webhook_ids = await uow.structured_speech_message.get_webhook_ids()
+                forum_webhook_ids = await uow.structured_speech_webhook.get_all()
 
             # 启动时一次加载 Webhook ID，远端事件入口无需逐消息查询数据库。
             self._structured_webhook_ids.update(webhook_ids)
+            # 已持久化的论坛 Webhook 无需在首次发言前重新列出论坛 Webhook。
+            for forum_id, webhook_id in forum_webhook_ids.items():
+                self._webhook_ids.setdefault(forum_id, webhook_id)
+                self._structured_webhook_ids.add(webhook_id)
 
             for thread_id, forum_id, status, interval, previous_slowmode in records:
                 if status == STRUCTURED_SPEECH_STATUS_ACTIVE:
@@ -253,6 +275,7 @@ class StructuredSpeechService:
 
             await self._set_mode_status(thread.id, STRUCTURED_SPEECH_STATUS_INACTIVE)
             self.active_modes.pop(thread.id, None)
+            self.cooldowns.forget_thread(thread.id)
             return ModeChangeResultDto(action="disabled")
 
     async def ensure_webhook(self, forum: discord.ForumChannel) -> discord.Webhook:
@@ -266,6 +289,15 @@ class StructuredSpeechService:
             cached = self._webhooks.get(forum.id)
             if cached is not None:
                 return cached
+            # 其次按持久化的 ID 取回 Webhook 及其令牌，只需一次单个 Webhook 的请求；
+            # 发送时令牌失效由发送方调用 invalidate_webhook 后重新查找。
+            webhook_id = self._webhook_ids.get(forum.id)
+            if webhook_id is not None:
+                webhook = await self._fetch_persisted_webhook(forum.id, webhook_id)
+                if webhook is not None:
+                    self._webhooks[forum.id] = webhook
+                    return webhook
+
             webhooks = await self.bot.api_scheduler.submit(forum.webhooks(), priority=2)
             bot_user_id = self.bot.user.id if self.bot.user else None
             # 只复用当前 Bot 创建且仍带令牌的同名 Webhook。
@@ -288,36 +320,74 @@ class StructuredSpeechService:
                     ),
                     priority=2,
                 )
+            if webhook.token is not None:
+                async with UnitOfWork(self.bot.db_handler) as uow:
+                    await uow.structured_speech_webhook.upsert(
+                        forum_id=forum.id, webhook_id=webhook.id
+                    )
+                self._webhook_ids[forum.id] = webhook.id
             self._webhooks[forum.id] = webhook
             self._structured_webhook_ids.add(webhook.id)
             return webhook
 
+    async def _fetch_persisted_webhook(
+        self, forum_id: int, webhook_id: int
+    ) -> discord.Webhook | None:
+        """按持久化的 ID 取回 Webhook；已被删除或无法取得令牌时丢弃记录并返回 None。"""
+        try:
+            webhook = await self.bot.api_scheduler.submit(
+                self.bot.fetch_webhook(webhook_id), priority=2
+            )
+        except (discord.NotFound, discord.Forbidden):
+            webhook = None
+        if webhook is not None and webhook.token is not None:
+            return webhook
+        logger.info(f"论坛 {forum_id} 持久化的 Webhook {webhook_id} 已不可用，将重新查找或创建。")
+        await self._forget_webhook(forum_id, webhook_id)
+        return None
+
+    async def invalidate_webhook(self, forum_id: int, webhook_id: int) -> None:
+        """丢弃论坛中已失效的 Webhook 缓存与持久化记录，下次使用时重新查找或创建。"""
+        async with self._webhook_lock:
+            await self._forget_webhook(forum_id, webhook_id)
+
+    async def _forget_webhook(self, forum_id: int, webhook_id: int) -> None:
+        """在持有 Webhook 锁时丢弃指定 Webhook 的缓存与持久化记录。"""
+        cached = self._webhooks.get(forum_id)
+        if cached is not None and cached.id == webhook_id:
+            del self._webhooks[forum_id]
+        if self._webhook_ids.get(forum_id) == webhook_id:
+            del self._webhook_ids[forum_id]
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            await uow.structured_speech_webhook.delete(forum_id=forum_id, webhook_id=webhook_id)
+
     async def get_cooldown_remaining(self, *, thread_id: int, user_id: int) -> int:
         """计算用户在帖子中的剩余 Bot 发言冷却秒数。"""
         mode = self.active_modes.get(thread_id)
         if mode is None:
             return 0
         # 冷却以最近一次成功持久化的结构化发言为准，删除消息不会重置冷却。
+        last_sent_at = await self.cooldowns.get_last_sent_at(thread_id, user_id)
+        if last_sent_at is None:
+            return 0
+        elapsed = (datetime.now(timezone.utc) - last_sent_at).total_seconds()
+        return max(0, math.ceil(mode.interval_seconds - elapsed))
+
+    async def _load_last_sent_at(self, thread_id: int, user_id: int) -> datetime | None:
+        """从数据库读取用户在帖子中最近一次结构化发言的时间，供冷却缓存未命中时使用。"""
         async with UnitOfWork(self.bot.db_handler) as uow:
             last_message = await uow.structured_speech_message.get_last(
                 thread_id=thread_id,
                 user_id=user_id,
             )
-            if last_message is None:
-                return 0
-            created_at = last_message.created_at
-        elapsed = (datetime.now(timezone.utc) - created_at).total_seconds()
-        return max(0, math.ceil(mode.interval_seconds - elapsed))
+            return None if last_message is None else last_message.created_at
 
     async def is_user_punished(self, *, thread_id: int, user_id: int) -> bool:
         """按现有帖子禁言和全局提案处罚规则判断用户是否可发言。"""
-        now = datetime.now(timezone.utc)
-        # 在一个工作单元中读取帖子活动、提案和全局处罚，避免跨会话对象传播。
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            activity = await uow.user_activity.get_user_activity(user_id, thread_id)
-            if activity and activity.mute_end_time and activity.mute_end_time > now:
-                return True
-            return await uow.global_proposal_punishment.is_proposal_violation_restricted(user_id)
+        state = self.bot.punishment_state
+        return await state.is_thread_muted(
+            thread_id, user_id
+        ) or await state.is_proposal_violation_restricted(user_id)
 
     async def resolve_reference_user_id(
         self,
@@ -362,17 +432,7 @@ class StructuredSpeechService:
                 webhook = await self.ensure_webhook(parent)
 
                 # 先完整下载全部附件，任一失败都不会产生部分 Webhook 消息。
-                file_results = await asyncio.gather(
-                    *(item.to_file() for item in attachments),
-                    return_exceptions=True,
-                )
-                files = [item for item in file_results if isinstance(item, discord.File)]
-                file_errors = [item for item in file_results if isinstance(item, BaseException)]
-                if file_errors:
-                    for file in files:
-                        file.close()
-                    raise file_errors[0]
-                try:
+                async with self.attachment_relay.download(attachments) as files:
                     kwargs = {
                         "username": member.display_name,
                         "avatar_url": member.display_avatar.url,
@@ -387,13 +447,28 @@ class StructuredSpeechService:
                     }
                     if files:
                         kwargs["files"] = files
-                    sent = await self.bot.api_scheduler.submit(
-                        webhook.send(qo.content, **kwargs),  # type: ignore[arg-type]
-                        priority=1,
-                    )
-                finally:
-                    for file in files:
-                        file.close()
+                    try:
+                        sent = await self.bot.api_scheduler.submit(
+                            webhook.send(qo.content, **kwargs),  # type: ignore[arg-type]
+                            priority=1,
+                        )
+                    except discord.HTTPException as error:
+                        if error.code not in STRUCTURED_SPEECH_INVALID_WEBHOOK_ERROR_CODES:
+                            raise
+                        # 持久化的 Webhook 已被删除或令牌失效，重新查找或创建后重试一次。
+                        logger.warning(
+                            "论坛 %s 的结构化发言 Webhook %s 已失效，重新获取。",
+                            parent.id,
+                            webhook.id,
+                        )
+                        await self.invalidate_webhook(parent.id, webhook.id)
+                        webhook = await self.ensure_webhook(parent)
+                        for file in files:
+                            file.reset()
+                        sent = await self.bot.api_scheduler.submit(
+                            webhook.send(qo.content, **kwargs),  # type: ignore[arg-type]
+                            priority=1,
+                        )
 
                 if not isinstance(sent, discord.WebhookMessage):
                     raise RuntimeError("Webhook 未返回已创建的消息。")
@@ -422,6 +497,7 @@ class StructuredSpeechService:
                     except Exception:
                         logger.exception("删除未成功记账的结构化消息 %s 失败。", sent.id)
                     raise
+                self.cooldowns.record(qo.thread_id, qo.user_id, sent.created_at)
                 return sent
 
     async def handle_message_deletions(
@@ -437,6 +513,11 @@ class StructuredSpeechService:
                     deleted_at=datetime.now(timezone.utc),
                 )
                 changes = Counter((record.thread_id, record.user_id) for record in records)
+                # 计数在缓冲区之外被扣减，令其已知计数失效以免误判资格阈值。
+                activity_buffer = getattr(self.bot.get_cog("Voting"), "activity_buffer", None)
+                if isinstance(activity_buffer, UserActivityBuffer):
+                    for thread_id, user_id in changes:
+                        activity_buffer.forget(user_id, thread_id)
                 updates: list[StructuredSpeechDeletionResultDto] = []
                 for (thread_id, user_id), count in changes.items():
                     # 相同用户和帖子中的删除量先聚合，再一次更新活动记录以避免 N+1。
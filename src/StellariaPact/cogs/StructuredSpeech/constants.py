@@ -4,15 +4,28 @@ STRUCTURED_SPEECH_MAX_ATTACHMENTS = 5
 STRUCTURED_SPEECH_FIELD_MAX_LENGTH = 1800
 STRUCTURED_SPEECH_MESSAGE_MAX_LENGTH = 2000
 
+# 附件转发以流式写入临时文件，单条消息和全部进行中的转发分别受字节预算限制。
+STRUCTURED_SPEECH_ATTACHMENT_MESSAGE_MAX_BYTES = 25 * 1024 * 1024
+STRUCTURED_SPEECH_ATTACHMENT_TOTAL_MAX_BYTES = 100 * 1024 * 1024
+STRUCTURED_SPEECH_ATTACHMENT_SPOOL_BYTES = 1024 * 1024
+STRUCTURED_SPEECH_ATTACHMENT_CHUNK_BYTES = 64 * 1024
+STRUCTURED_SPEECH_ATTACHMENT_MAX_CONCURRENCY = 4
+STRUCTURED_SPEECH_ATTACHMENT_MAX_ATTEMPTS = 3
+STRUCTURED_SPEECH_ATTACHMENT_TIMEOUT_SECONDS = 60
+
 # Discord 帖子慢速模式和 Bot 内部用户冷却的默认规则。
 STRUCTURED_SPEECH_SLOWMODE_SECONDS = 10 * 60
 STRUCTURED_SPEECH_DEFAULT_INTERVAL_SECONDS = 2 * 60
 STRUCTURED_SPEECH_MIN_INTERVAL_MINUTES = 1
 STRUCTURED_SPEECH_MAX_INTERVAL_MINUTES = 60
+# 冷却缓存条目的有效期；超过最长冷却间隔的发言记录不再影响冷却判断。
+STRUCTURED_SPEECH_COOLDOWN_CACHE_TTL_SECONDS = STRUCTURED_SPEECH_MAX_INTERVAL_MINUTES * 60
 
 # 论坛级 Webhook 使用固定名称，以便重启后安全复用。
 STRUCTURED_SPEECH_WEBHOOK_NAME = "StellariaPact 结构化发言"
 STRUCTURED_SPEECH_REPLY_CONTEXT_MENU_NAME = "提案发言(回复)"
+# Webhook 被删除 (Unknown Webhook) 或令牌失效 (Invalid Webhook Token) 时的 Discord 错误码。
+STRUCTURED_SPEECH_INVALID_WEBHOOK_ERROR_CODES = frozenset({10015, 50027})
 
 # 持久化状态包含过渡态，用于在进程意外退出后恢复未完成的切换。
 STRUCTURED_SPEECH_STATUS_INACTIVE = "inactive"
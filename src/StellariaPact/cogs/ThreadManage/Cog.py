@@ -119,6 +119,7 @@ class ThreadManageCog(commands.Cog):
 
             proposal.is_special = True
             await uow.proposal.update_proposal(proposal)
+            proposal_dto = ProposalDto.model_validate(proposal)
 
             await uow.operation_log.log_operation(
                 operator_id=interaction.user.id,
@@ -131,6 +132,7 @@ class ThreadManageCog(commands.Cog):
                 guild_id=interaction.guild_id,
             )
             await uow.commit()
+        self.bot.proposal_registry.put(proposal_dto)
 
         await interaction.followup.send(
             "✅ 已将该提案标记为**特殊提案**，不再计入讨论槽位数。", ephemeral=True
@@ -169,6 +171,7 @@ class ThreadManageCog(commands.Cog):
 
             proposal.is_special = False
             await uow.proposal.update_proposal(proposal)
+            proposal_dto = ProposalDto.model_validate(proposal)
 
             await uow.operation_log.log_operation(
                 operator_id=interaction.user.id,
@@ -181,6 +184,7 @@ class ThreadManageCog(commands.Cog):
                 guild_id=interaction.guild_id,
             )
             await uow.commit()
+        self.bot.proposal_registry.put(proposal_dto)
 
         await interaction.followup.send(
             "✅ 已取消该提案的特殊标记，恢复正常计入讨论槽位。", ephemeral=True
@@ -302,10 +306,12 @@ class ThreadManageCog(commands.Cog):
 
             # 检测变更字段
             changed_fields = self._detect_changed_fields(old_values, new_values)
+            proposal_dto = ProposalDto.model_validate(proposal)
 
-            logger.info(f"数据库更新完成：提案 {dto.proposal_id} 的内容已更新")
+        self.bot.proposal_registry.put(proposal_dto)
+        logger.info(f"数据库更新完成：提案 {dto.proposal_id} 的内容已更新")
 
-            return old_values, changed_fields
+        return old_values, changed_fields
 
     def _detect_changed_fields(
         self, old_values: dict[str, str | None], new_values: dict[str, str]
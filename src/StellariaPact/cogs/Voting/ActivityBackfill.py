@@ -0,0 +1,325 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import discord
+
+from StellariaPact.cogs.Voting.EligibilityService import EligibilityService
+from StellariaPact.cogs.Voting.MessageValidity import MessageValidity
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
+from StellariaPact.models.ActivityBackfillCheckpoint import ActivityBackfillCheckpoint
+from StellariaPact.share import StellariaPactBot, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ActivityBackfillReport:
+    """单个帖子的回填结果。"""
+
+    thread_id: int
+    scanned_messages: int
+    """本帖已扫描的历史消息总数（含断点前的部分）"""
+    valid_messages: int
+    """历史中统计出的有效发言总数"""
+    resumed: bool
+    """是否从未完成的断点继续扫描"""
+    applied: bool
+    """计数是否已写入数据库；预览模式下为 False"""
+    changes: list[tuple[int, int, int]] = field(default_factory=list)
+    """计数发生变化的用户: (user_id, 当前计数, 回填后计数)，按用户 ID 排序"""
+
+    @property
+    def eligibility_changes(self) -> list[tuple[int, int, int]]:
+        """回填后投票资格随之变化的用户。"""
+        required = EligibilityService.REQUIRED_MESSAGES
+        return [
+            change for change in self.changes if (change[1] >= required) != (change[2] >= required)
+        ]
+
+
+@dataclass
+class _ActiveScan:
+    """正在扫描的帖子的内存状态，供扫描期间的删除事件修正统计结果。"""
+
+    checkpoint: ActivityBackfillCheckpoint
+    counts: Counter
+    """已扫描历史中每个用户的有效发言数"""
+    after: int
+    """已扫描到的最后一条消息 ID"""
+    unsaved: dict[int, int] = field(default_factory=dict)
+    """已统计、尚未写入消息索引的有效消息: {message_id: user_id}"""
+    deleted: set[int] = field(default_factory=set)
+    """扫描期间被删除、尚未扫描到的截止前消息，之后拉取到的页面中跳过它们"""
+
+
+class ActivityBackfill:
+    """
+    从帖子历史重建有效发言计数。
+
+    回填开始时先写入缓冲区中的计数，再记录帖子当前的计数快照，并以当前时间生成截止
+    消息 ID：截止前的历史由本工具逐页扫描统计，截止后的新消息仍由实时监听计数。
+    扫描完成后按 `历史统计 - 快照` 的差值更新计数，因此扫描期间实时产生的增减量不会被覆盖。
+
+    截止前的消息在扫描期间被删除时，由 `record_deletions` 修正统计：尚未扫描到的消息
+    之后会被跳过，其实时扣减量从快照中减去；已统计但还未写入索引、因而未能实时扣减的
+    消息从统计结果中移除。这些修正保存在断点中，与扫描进度一同写库。
+
+    每页历史都作为一次低优先级请求提交给 `APIScheduler`，不会挤占交互请求；
+    统计结果与消息索引定期写入断点，中断后再次执行即从断点继续。
+    """
+
+    DEFAULT_PAGE_SIZE = 100
+    DEFAULT_PRIORITY = 10
+    DEFAULT_CHECKPOINT_EVERY_PAGES = 10
+    DEFAULT_PAGE_DELAY_SECONDS = 0.5
+
+    def __init__(
+        self,
+        bot: StellariaPactBot,
+        activity_buffer: Optional[UserActivityBuffer] = None,
+        *,
+        is_valid_message: Optional[Callable[[discord.Message], bool]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        priority: int = DEFAULT_PRIORITY,
+        checkpoint_every_pages: int = DEFAULT_CHECKPOINT_EVERY_PAGES,
+        page_delay_seconds: float = DEFAULT_PAGE_DELAY_SECONDS,
+    ):
+        self.bot = bot
+        self.activity_buffer = activity_buffer
+        self.is_valid_message = is_valid_message or MessageValidity.is_valid_message
+        self.page_size = max(1, min(100, page_size))
+        self.priority = priority
+        self.checkpoint_every_pages = max(1, checkpoint_every_pages)
+        self.page_delay_seconds = page_delay_seconds
+        # 正在回填的帖子，同一帖子不允许并发回填
+        self.running: set[int] = set()
+        # 正在扫描的帖子的统计状态: {thread_id: _ActiveScan}
+        self.scans: dict[int, _ActiveScan] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        bot: StellariaPactBot,
+        activity_buffer: Optional[UserActivityBuffer],
+        config: dict[str, Any],
+    ) -> "ActivityBackfill":
+        """根据 `config.json` 中的 `activity_backfill` 配置创建回填工具。"""
+        backfill_config = config.get("activity_backfill", {})
+        return cls(
+            bot,
+            activity_buffer,
+            page_size=int(backfill_config.get("page_size", cls.DEFAULT_PAGE_SIZE)),
+            priority=int(backfill_config.get("priority", cls.DEFAULT_PRIORITY)),
+            checkpoint_every_pages=int(
+                backfill_config.get("checkpoint_every_pages", cls.DEFAULT_CHECKPOINT_EVERY_PAGES)
+            ),
+            page_delay_seconds=float(
+                backfill_config.get("page_delay_seconds", cls.DEFAULT_PAGE_DELAY_SECONDS)
+            ),
+        )
+
+    async def run(
+        self, thread: discord.Thread, *, apply: bool = True, restart: bool = False
+    ) -> ActivityBackfillReport:
+        """
+        回填一个帖子的有效发言计数。
+
+        Args:
+            thread: 要回填的讨论帖。
+            apply: 为 False 时只统计并报告差异，不修改计数；断点仍会保存，
+                之后正式执行时无需重新扫描。
+            restart: 丢弃未完成的断点，从头扫描。
+
+        Raises:
+            RuntimeError: 该帖子已有回填正在进行。
+        """
+        if thread.id in self.running:
+            raise RuntimeError(f"帖子 {thread.id} 的回填正在进行中。")
+        self.running.add(thread.id)
+        try:
+            checkpoint, resumed = await self._load_or_start(thread.id, restart)
+            await self._scan(thread, checkpoint)
+            return await self._finish(checkpoint, apply=apply, resumed=resumed)
+        finally:
+            self.scans.pop(thread.id, None)
+            self.running.discard(thread.id)
+
+    def record_deletions(
+        self, message_ids: Iterable[int], debited: Mapping[int, tuple[int, int]]
+    ) -> None:
+        """
+        记录已处理完的消息删除，修正正在扫描的帖子的统计结果。
+
+        Args:
+            message_ids: 被删除的消息 ID。
+            debited: 其中已实时扣减计数的消息: {message_id: (user_id, thread_id)}。
+        """
+        if not self.scans:
+            return
+        for scan in self.scans.values():
+            checkpoint = scan.checkpoint
+            snapshot = dict(checkpoint.snapshot_counts)
+            counts_changed = False
+            for message_id in message_ids:
+                # 截止后的消息只由实时监听计数，与回填无关
+                if message_id >= checkpoint.boundary_message_id:
+                    continue
+                user_id, thread_id = debited.get(message_id, (None, None))
+                debited_user = user_id if thread_id == checkpoint.thread_id else None
+                scanned_user = scan.unsaved.pop(message_id, None)
+                if message_id > scan.after:
+                    # 扫描不会再统计这条消息，实时扣减的部分改由快照抵消
+                    scan.deleted.add(message_id)
+                    if debited_user is not None:
+                        snapshot[str(debited_user)] = snapshot.get(str(debited_user), 0) - 1
+                elif scanned_user is not None and debited_user is None:
+                    # 已统计但尚未写入索引，实时删除无法扣减，从统计结果中移除
+                    scan.counts[scanned_user] -= 1
+                    counts_changed = True
+            checkpoint.snapshot_counts = snapshot
+            if counts_changed:
+                checkpoint.scanned_counts = {
+                    str(user_id): count for user_id, count in scan.counts.items()
+                }
+
+    async def _load_or_start(
+        self, thread_id: int, restart: bool
+    ) -> tuple[ActivityBackfillCheckpoint, bool]:
+        """读取未完成的断点；没有可用断点时记录快照并开始新的回填。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            checkpoint = await uow.activity_backfill.get_checkpoint(thread_id)
+            if checkpoint is not None and checkpoint.completed_at is None and not restart:
+                uow.session.expunge(checkpoint)
+                return checkpoint, True
+
+        # 先写入缓冲计数，使快照与截止时刻的数据库计数一致
+        if self.activity_buffer is not None:
+            await self.activity_buffer.flush()
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            snapshot = await uow.user_activity.get_thread_message_counts(thread_id)
+            checkpoint = await uow.activity_backfill.save_checkpoint(
+                ActivityBackfillCheckpoint(
+                    thread_id=thread_id,
+                    boundary_message_id=discord.utils.time_snowflake(datetime.now(timezone.utc)),
+                    snapshot_counts={str(user_id): count for user_id, count in snapshot.items()},
+                    scanned_counts={},
+                )
+            )
+            uow.session.expunge(checkpoint)
+        return checkpoint, False
+
+    async def _fetch_page(
+        self, thread: discord.Thread, after: int, before: int
+    ) -> list[discord.Message]:
+        return [
+            message
+            async for message in thread.history(
+                limit=self.page_size,
+                after=discord.Object(id=after),
+                before=discord.Object(id=before),
+                oldest_first=True,
+            )
+        ]
+
+    async def _scan(self, thread: discord.Thread, checkpoint: ActivityBackfillCheckpoint) -> None:
+        """从断点开始逐页扫描截止消息之前的历史。"""
+        scan = _ActiveScan(
+            checkpoint=checkpoint,
+            counts=Counter({int(user_id): n for user_id, n in checkpoint.scanned_counts.items()}),
+            # 论坛帖的首条消息 ID 与帖子 ID 相同，从其前一个 ID 开始以包含首条消息
+            after=checkpoint.last_message_id or thread.id - 1,
+        )
+        self.scans[thread.id] = scan
+        pages = 0
+        while True:
+            page = await self.bot.api_scheduler.submit(
+                self._fetch_page(thread, scan.after, checkpoint.boundary_message_id),
+                priority=self.priority,
+            )
+            for message in page:
+                if message.id not in scan.deleted and self.is_valid_message(message):
+                    scan.counts[message.author.id] += 1
+                    scan.unsaved[message.id] = message.author.id
+            if page:
+                scan.after = page[-1].id
+                checkpoint.scanned_messages += len(page)
+            pages += 1
+
+            finished = len(page) < self.page_size
+            if finished or pages % self.checkpoint_every_pages == 0:
+                checkpoint.last_message_id = scan.after
+                checkpoint.scanned_counts = {
+                    str(user_id): count for user_id, count in scan.counts.items()
+                }
+                # 写入期间被删除的消息仍留在 unsaved 中，按实时扣减的结果修正
+                indexed = dict(scan.unsaved)
+                await self._save_progress(
+                    checkpoint,
+                    [(message_id, user_id, thread.id) for message_id, user_id in indexed.items()],
+                )
+                for message_id in indexed:
+                    scan.unsaved.pop(message_id, None)
+            if finished:
+                return
+            if self.page_delay_seconds > 0:
+                await asyncio.sleep(self.page_delay_seconds)
+
+    async def _save_progress(
+        self, checkpoint: ActivityBackfillCheckpoint, indexed: list[tuple[int, int, int]]
+    ) -> None:
+        """保存断点，并把已扫描的有效消息补入消息索引，使之后的删除也能精确扣减。"""
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            await uow.counted_message.record_messages(indexed)
+            await uow.activity_backfill.save_checkpoint(checkpoint)
+        logger.debug(
+            f"帖子 {checkpoint.thread_id} 回填进度: 已扫描 {checkpoint.scanned_messages} 条消息。"
+        )
+
+    async def _finish(
+        self, checkpoint: ActivityBackfillCheckpoint, *, apply: bool, resumed: bool
+    ) -> ActivityBackfillReport:
+        """计算差异，并在正式执行时批量写入计数、标记断点完成。"""
+        thread_id = checkpoint.thread_id
+        scanned = {int(user_id): n for user_id, n in checkpoint.scanned_counts.items()}
+        snapshot = {int(user_id): n for user_id, n in checkpoint.snapshot_counts.items()}
+        deltas = {
+            (user_id, thread_id): scanned.get(user_id, 0) - snapshot.get(user_id, 0)
+            for user_id in scanned.keys() | snapshot.keys()
+        }
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            current = await uow.user_activity.get_thread_message_counts(thread_id)
+            if apply:
+                updated = await uow.user_activity.batch_apply_activity_changes(deltas)
+                checkpoint.completed_at = datetime.now(timezone.utc)
+                checkpoint.updated_at = checkpoint.completed_at
+                await uow.activity_backfill.save_checkpoint(checkpoint)
+            else:
+                updated = {
+                    key: max(0, current.get(key[0], 0) + delta) for key, delta in deltas.items()
+                }
+
+        if apply and self.activity_buffer is not None:
+            # 计数在缓冲区之外被修改，令其已知计数失效以免误判资格阈值
+            for user_id, _ in deltas:
+                self.activity_buffer.forget(user_id, thread_id)
+
+        changes = sorted(
+            (user_id, current.get(user_id, 0), count)
+            for (user_id, _), count in updated.items()
+            if count != current.get(user_id, 0)
+        )
+        return ActivityBackfillReport(
+            thread_id=thread_id,
+            scanned_messages=checkpoint.scanned_messages,
+            valid_messages=sum(scanned.values()),
+            resumed=resumed,
+            applied=apply,
+            changes=changes,
+        )
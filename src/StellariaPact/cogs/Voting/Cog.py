@@ -5,6 +5,8 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from StellariaPact.cogs.Voting.ActivityBackfill import ActivityBackfill, ActivityBackfillReport
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
 from StellariaPact.cogs.Voting.views import VoteEmbedBuilder, VotingChannelView
 from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
 from StellariaPact.dto import ProposalDto
@@ -28,7 +30,24 @@ class Voting(commands.Cog):
 
     def __init__(self, bot: StellariaPactBot):
         self.bot = bot
-        self.logic = VotingLogic(bot)
+        self.activity_buffer = UserActivityBuffer.from_config(bot, bot.config)
+        self.activity_backfill = ActivityBackfill.from_config(
+            bot, self.activity_buffer, bot.config
+        )
+        self.logic = VotingLogic(
+            bot, activity_buffer=self.activity_buffer, activity_backfill=self.activity_backfill
+        )
+
+    async def cog_load(self) -> None:
+        """加载 Cog 时启动发言计数缓冲区的定时写库任务。"""
+        self.activity_buffer.start()
+
+    async def cog_unload(self) -> None:
+        """卸载 Cog 时停止定时任务，并写入剩余的缓冲计数。"""
+        try:
+            await self.activity_buffer.stop()
+        except Exception as e:
+            logger.error(f"在 cog_unload 期间写入发言计数缓冲失败: {e}", exc_info=True)
 
     @staticmethod
     def _parse_discord_message_link(message_link: str) -> tuple[int, int, int] | None:
@@ -328,8 +347,10 @@ class Voting(commands.Cog):
                 logger.info(f"根据首楼解析为帖子 {thread.id} 补全了 Proposal。")
 
             if proposal:
+                proposal_dto = ProposalDto.model_validate(proposal)
                 await uow.commit()
-                return ProposalDto.model_validate(proposal)
+                self.bot.proposal_registry.put(proposal_dto)
+                return proposal_dto
             return None
 
     @app_commands.command(
@@ -411,3 +432,97 @@ class Voting(commands.Cog):
             interaction.followup.send("✅ 投票镜像复制成功！该面板的数据与原贴同步更新。"),
             priority=1,
         )
+
+    @app_commands.command(
+        name="回填发言计数",
+        description="[管理组] 从帖子历史重建有效发言计数并报告差异，每个帖子可能需要数分钟",
+    )
+    @app_commands.rename(thread_ids="帖子id", apply="写入计数", restart="重新扫描")
+    @app_commands.describe(
+        thread_ids="要回填的帖子 ID，多个用空格或逗号分隔；留空则回填当前帖子",
+        apply="关闭时只预览差异，不修改计数；扫描进度仍会保存",
+        restart="丢弃未完成的断点，从头扫描帖子历史",
+    )
+    @app_commands.guild_only()
+    @RoleGuard.requireRoles("stewards")
+    async def backfill_activity(
+        self,
+        interaction: discord.Interaction,
+        thread_ids: str | None = None,
+        apply: bool = True,
+        restart: bool = False,
+    ) -> None:
+        """
+        逐个回填选定帖子的有效发言计数，每个帖子完成后发送一份差异报告。
+
+        扫描按页限速，多个帖子可能超过交互令牌的 15 分钟有效期，报告的发送失败不会中断回填。
+        """
+        await safeDefer(interaction, ephemeral=True)
+
+        if thread_ids:
+            parts = thread_ids.replace(",", " ").split()
+            if not all(part.isdecimal() for part in parts):
+                await self.bot.api_scheduler.submit(
+                    interaction.followup.send("帖子 ID 只能包含数字，多个 ID 用空格或逗号分隔。"),
+                    priority=1,
+                )
+                return
+            targets = list(dict.fromkeys(int(part) for part in parts))
+        elif isinstance(interaction.channel, discord.Thread):
+            targets = [interaction.channel.id]
+        else:
+            await self.bot.api_scheduler.submit(
+                interaction.followup.send("请在讨论帖内使用此命令，或填写要回填的帖子 ID。"),
+                priority=1,
+            )
+            return
+
+        for thread_id in targets:
+            thread = await DiscordUtils.fetch_thread(self.bot, thread_id)
+            if thread is None:
+                content = f"找不到帖子 {thread_id}，已跳过。"
+            else:
+                try:
+                    report = await self.activity_backfill.run(thread, apply=apply, restart=restart)
+                    content = self._format_backfill_report(report)
+                except Exception as e:
+                    logger.error(f"回填帖子 {thread_id} 的发言计数时出错: {e}", exc_info=True)
+                    content = f"回填帖子 <#{thread_id}> 时出错: {e}\n再次执行将从断点继续。"
+            await self._send_backfill_report(interaction, content)
+
+    async def _send_backfill_report(self, interaction: discord.Interaction, content: str) -> None:
+        """
+        发送一份回填报告；交互令牌过期导致 followup 失败时改发到命令所在频道。
+
+        发送失败只记录日志，不向调用方抛出，以免中断其余帖子的回填。
+        """
+        try:
+            await self.bot.api_scheduler.submit(interaction.followup.send(content), priority=1)
+            return
+        except Exception as e:
+            logger.warning(f"回填报告的 followup 发送失败，改发到频道: {e}")
+        channel = interaction.channel
+        if not isinstance(channel, discord.abc.Messageable):
+            logger.error(f"无法发送回填报告，命令所在频道不可用: {content}")
+            return
+        try:
+            await self.bot.api_scheduler.submit(channel.send(content), priority=1)
+        except Exception as e:
+            logger.error(f"发送回填报告失败: {e}\n{content}", exc_info=True)
+
+    @staticmethod
+    def _format_backfill_report(report: ActivityBackfillReport, max_lines: int = 20) -> str:
+        """将回填结果格式化为不超过 Discord 消息长度的文本。"""
+        mode = "已写入" if report.applied else "预览（未写入）"
+        resumed = "，从断点继续" if report.resumed else ""
+        lines = [
+            f"帖子 <#{report.thread_id}> 回填{mode}: "
+            f"扫描 {report.scanned_messages} 条消息{resumed}，"
+            f"有效发言 {report.valid_messages} 条，计数变化 {len(report.changes)} 人，"
+            f"资格变化 {len(report.eligibility_changes)} 人。"
+        ]
+        for user_id, before, after in report.changes[:max_lines]:
+            lines.append(f"- <@{user_id}>: {before} → {after}")
+        if len(report.changes) > max_lines:
+            lines.append(f"……其余 {len(report.changes) - max_lines} 人未列出。")
+        return "\n".join(lines)[:2000]
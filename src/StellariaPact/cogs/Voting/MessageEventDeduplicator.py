@@ -0,0 +1,158 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Sequence
+
+from discord.ext import tasks
+
+from StellariaPact.share import StellariaPactBot, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+MessageEventKey = tuple[int, str]
+"""去重键: (message_id, event_type)"""
+
+
+class MessageEventDeduplicator:
+    """
+    远端消息事件的幂等去重器。
+
+    内存中按最近使用顺序保存保留期内已处理的事件键，命中即判定为重复，无需访问数据库；
+    事件键同时持久化到 `processed_message_event` 表，启动时据此预热，使转发端在 Bot
+    重启后重试同一事件也不会重复计数。
+
+    事件键总是与其计数在同一事务中写库：直接写库的事件随计数所在的事务记录，进入发言
+    计数缓冲区的事件随缓冲量在同一刷新事务中写入。崩溃时未写库的事件键与缓冲计数一同
+    丢失，不会出现事件键已落库而计数丢失、重试又被判定为重复的情况。
+    内存表容量不足以覆盖整个保留期时，未命中的事件键会回退到数据库查询。
+    """
+
+    DEFAULT_TTL_HOURS = 48
+    DEFAULT_MAX_MEMORY_KEYS = 100000
+    DEFAULT_CLEANUP_INTERVAL_MINUTES = 60
+
+    def __init__(
+        self,
+        bot: StellariaPactBot,
+        *,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        max_memory_keys: int = DEFAULT_MAX_MEMORY_KEYS,
+        cleanup_interval_minutes: float = DEFAULT_CLEANUP_INTERVAL_MINUTES,
+    ):
+        self.bot = bot
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_memory_keys = max_memory_keys
+        # 保留期内已处理或正在处理的事件键: {key: processed_at}，按最近使用顺序淘汰
+        self.seen: OrderedDict[MessageEventKey, datetime] = OrderedDict()
+        # 被淘汰出内存的最新事件时间；仍在保留期内时，内存未命中需回退查库
+        self.evicted_until: Optional[datetime] = None
+        self.cleanup_task.change_interval(minutes=cleanup_interval_minutes)
+
+    @classmethod
+    def from_config(
+        cls, bot: StellariaPactBot, config: dict[str, Any]
+    ) -> "MessageEventDeduplicator":
+        """根据 `config.json` 中的 `message_event_dedupe` 配置创建去重器。"""
+        dedupe_config = config.get("message_event_dedupe", {})
+        return cls(
+            bot,
+            ttl_hours=float(dedupe_config.get("ttl_hours", cls.DEFAULT_TTL_HOURS)),
+            max_memory_keys=int(dedupe_config.get("max_memory_keys", cls.DEFAULT_MAX_MEMORY_KEYS)),
+            cleanup_interval_minutes=float(
+                dedupe_config.get("cleanup_interval_minutes", cls.DEFAULT_CLEANUP_INTERVAL_MINUTES)
+            ),
+        )
+
+    async def start(self) -> None:
+        """从数据库预热内存去重表，并启动定时清理任务。"""
+        await self.load()
+        if not self.cleanup_task.is_running():
+            self.cleanup_task.start()
+
+    def stop(self) -> None:
+        """停止定时清理任务。"""
+        self.cleanup_task.cancel()
+
+    async def load(self) -> None:
+        """读取保留期内最近处理的事件键，填充内存去重表。"""
+        since = datetime.now(timezone.utc) - self.ttl
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            rows = await uow.processed_message_event.get_recent_events(
+                since, self.max_memory_keys + 1
+            )
+        if len(rows) > self.max_memory_keys:
+            # 更早的事件无法全部载入内存，未命中时需要回退查库
+            self.evicted_until = rows.pop()[2]
+        # 结果按时间倒序，逆序插入使最新的事件位于淘汰队列末尾
+        for message_id, event_type, processed_at in reversed(rows):
+            self.seen[(message_id, event_type)] = processed_at
+        logger.info(f"已从数据库预热 {len(rows)} 条消息事件去重记录。")
+
+    def _is_recent(self, processed_at: Optional[datetime], now: datetime) -> bool:
+        return processed_at is not None and now - processed_at < self.ttl
+
+    def _mark(self, key: MessageEventKey, now: datetime) -> None:
+        self.seen[key] = now
+        self.seen.move_to_end(key)
+        while len(self.seen) > self.max_memory_keys:
+            _, evicted_at = self.seen.popitem(last=False)
+            if self.evicted_until is None or evicted_at > self.evicted_until:
+                self.evicted_until = evicted_at
+
+    async def reserve(self, keys: Sequence[MessageEventKey]) -> list[bool]:
+        """
+        为待处理的事件预留去重键。
+
+        新事件会立即被标记，并发到达或同批出现的相同事件随即被判定为重复。
+        处理失败时调用方须通过 `release` 撤销预留，以便转发端重试。
+
+        Returns:
+            与 keys 一一对应，True 表示新事件，False 表示重复事件。
+        """
+        now = datetime.now(timezone.utc)
+        reserved: list[bool] = []
+        for key in keys:
+            if self._is_recent(self.seen.get(key), now):
+                self.seen.move_to_end(key)
+                reserved.append(False)
+                continue
+            self._mark(key, now)
+            reserved.append(True)
+
+        # 有保留期内的事件键被淘汰出内存时，新键需要再与数据库核对
+        new_keys = [key for key, is_new in zip(keys, reserved) if is_new]
+        if not new_keys or not self._is_recent(self.evicted_until, now):
+            return reserved
+        try:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                existing = await uow.processed_message_event.get_existing_keys(new_keys)
+        except Exception:
+            self.release(new_keys)
+            raise
+        return [is_new and key not in existing for key, is_new in zip(keys, reserved)]
+
+    def release(self, keys: Sequence[MessageEventKey]) -> None:
+        """撤销处理失败的事件的预留，使转发端重试时重新处理。"""
+        for key in keys:
+            self.seen.pop(key, None)
+
+    @tasks.loop(minutes=DEFAULT_CLEANUP_INTERVAL_MINUTES)
+    async def cleanup_task(self) -> None:
+        """定时删除超过保留期的去重记录。"""
+        try:
+            deleted = await self.purge_expired()
+            if deleted:
+                logger.info(f"已清理 {deleted} 条过期的消息事件去重记录。")
+        except Exception as e:
+            logger.error(f"清理过期的消息事件去重记录时发生错误: {e}", exc_info=True)
+
+    async def purge_expired(self) -> int:
+        """删除数据库中超过保留期的记录，并同步清理内存中的过期键。"""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        # 淘汰队列按最近使用排序，过期键可能夹在中间，因此整体过滤一遍
+        for key in [key for key, processed_at in self.seen.items() if processed_at < cutoff]:
+            del self.seen[key]
+        if self.evicted_until is not None and self.evicted_until < cutoff:
+            self.evicted_until = None
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.processed_message_event.delete_expired(cutoff)
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from StellariaPact.cogs.Voting.listeners.MessageEvent import MessageEvent
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[MessageEvent]], Awaitable[None]]
+"""处理一批事件的回调，抛出异常表示本批需要重试"""
+
+DroppedHandler = Callable[[list[MessageEvent]], Awaitable[None]]
+"""接收重试耗尽或停止时未处理完的事件的回调"""
+
+
+@dataclass(frozen=True)
+class _QueuedEvent:
+    event: MessageEvent
+    enqueued_at: float
+    """入队时的单调时钟读数"""
+
+
+class MessageEventQueue:
+    """
+    远端消息事件的进程内接收队列。
+
+    HTTP 入口只负责校验和入队，由固定数量的工作协程异步写库。事件按 `thread_id`
+    分片到工作协程，同一帖子的事件始终由同一协程按到达顺序处理，不同帖子之间并行；
+    每个协程一次取出分片内积压的多条事件，交给批量处理回调在单个事务中写库。
+
+    处理失败的批次会在原协程内退避重试，期间阻塞该分片以保持顺序；重试耗尽的批次，
+    以及停止时仍在排队或处理中的事件，都会交给丢弃回调。队列总深度达到上限时拒绝入队，
+    由 HTTP 入口返回 429。
+    """
+
+    DEFAULT_WORKER_COUNT = 4
+    DEFAULT_MAX_DEPTH = 10000
+    DEFAULT_MAX_BATCH_SIZE = 200
+    DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_RETRY_DELAY_SECONDS = 1.0
+    DEFAULT_DRAIN_TIMEOUT_SECONDS = 10.0
+    MAX_RETRY_AFTER_SECONDS = 60
+
+    def __init__(
+        self,
+        process_batch: BatchHandler,
+        on_dropped: DroppedHandler,
+        *,
+        worker_count: int = DEFAULT_WORKER_COUNT,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay_seconds: float = DEFAULT_RETRY_DELAY_SECONDS,
+        drain_timeout_seconds: float = DEFAULT_DRAIN_TIMEOUT_SECONDS,
+    ):
+        self.process_batch = process_batch
+        self.on_dropped = on_dropped
+        self.worker_count = max(1, worker_count)
+        self.max_depth = max_depth
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_seconds = retry_delay_seconds
+        self.drain_timeout_seconds = drain_timeout_seconds
+
+        self._shards: list[deque[_QueuedEvent]] = [deque() for _ in range(self.worker_count)]
+        self._wakeups = [asyncio.Event() for _ in range(self.worker_count)]
+        # 各协程正在处理的批次中最早的入队时间，用于计算处理延迟
+        self._in_flight_since: list[Optional[float]] = [None] * self.worker_count
+        # 各协程正在处理的批次，停止时被取消的批次从这里交给丢弃回调
+        self._in_flight: list[Optional[list[MessageEvent]]] = [None] * self.worker_count
+        self._workers: list[asyncio.Task] = []
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.processed_total = 0
+        self.dropped_total = 0
+        self.rejected_total = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        process_batch: BatchHandler,
+        on_dropped: DroppedHandler,
+        config: dict[str, Any],
+    ) -> "MessageEventQueue":
+        """根据 `config.json` 中的 `message_event_queue` 配置创建队列。"""
+        queue_config = config.get("message_event_queue", {})
+        return cls(
+            process_batch,
+            on_dropped,
+            worker_count=int(queue_config.get("worker_count", cls.DEFAULT_WORKER_COUNT)),
+            max_depth=int(queue_config.get("max_depth", cls.DEFAULT_MAX_DEPTH)),
+            max_batch_size=int(queue_config.get("max_batch_size", cls.DEFAULT_MAX_BATCH_SIZE)),
+            max_attempts=int(queue_config.get("max_attempts", cls.DEFAULT_MAX_ATTEMPTS)),
+            retry_delay_seconds=float(
+                queue_config.get("retry_delay_seconds", cls.DEFAULT_RETRY_DELAY_SECONDS)
+            ),
+            drain_timeout_seconds=float(
+                queue_config.get("drain_timeout_seconds", cls.DEFAULT_DRAIN_TIMEOUT_SECONDS)
+            ),
+        )
+
+    @property
+    def depth(self) -> int:
+        """尚未处理完成的事件数，包括正在处理的批次。"""
+        return self._unfinished
+
+    @property
+    def lag_seconds(self) -> float:
+        """最早一条未处理完成的事件已等待的秒数，队列为空时为 0。"""
+        oldest = [shard[0].enqueued_at for shard in self._shards if shard]
+        oldest.extend(since for since in self._in_flight_since if since is not None)
+        if not oldest:
+            return 0.0
+        return max(0.0, time.monotonic() - min(oldest))
+
+    def retry_after_seconds(self) -> int:
+        """队列饱和时建议转发端等待的秒数，按当前处理延迟估算。"""
+        return max(1, min(self.MAX_RETRY_AFTER_SECONDS, math.ceil(self.lag_seconds)))
+
+    def stats(self) -> dict[str, Any]:
+        """返回队列深度、处理延迟和累计计数。"""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "lag_seconds": round(self.lag_seconds, 3),
+            "shard_depths": [len(shard) for shard in self._shards],
+            "processed_total": self.processed_total,
+            "dropped_total": self.dropped_total,
+            "rejected_total": self.rejected_total,
+        }
+
+    def offer(self, events: Sequence[MessageEvent]) -> bool:
+        """
+        将一组事件整体入队。
+
+        Returns:
+            False 表示队列剩余容量不足，事件均未入队。
+        """
+        if self._unfinished + len(events) > self.max_depth:
+            self.rejected_total += len(events)
+            return False
+
+        now = time.monotonic()
+        for event in events:
+            index = event.thread_id % self.worker_count
+            self._shards[index].append(_QueuedEvent(event, now))
+            self._wakeups[index].set()
+        self._unfinished += len(events)
+        if self._unfinished:
+            self._idle.clear()
+        return True
+
+    def start(self) -> None:
+        """启动工作协程。"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._run_worker(index), name=f"message-event-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+
+    async def join(self) -> None:
+        """等待所有已入队的事件处理完成。"""
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        """在限定时间内处理完剩余事件，然后停止工作协程。"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout=self.drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"停止时仍有 {self.depth} 条消息事件未处理完成，将交给丢弃回调。")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # 被取消的批次和仍在排队的事件交给丢弃回调，避免已确认接收的事件丢失
+        remaining = [event for batch in self._in_flight if batch for event in batch]
+        remaining.extend(queued.event for shard in self._shards for queued in shard)
+        self._in_flight = [None] * self.worker_count
+        self._in_flight_since = [None] * self.worker_count
+        for shard in self._shards:
+            shard.clear()
+        if remaining:
+            await self._drop(remaining)
+
+    async def _run_worker(self, index: int) -> None:
+        shard = self._shards[index]
+        wakeup = self._wakeups[index]
+        while True:
+            if not shard:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            batch = [shard.popleft() for _ in range(min(len(shard), self.max_batch_size))]
+            self._in_flight_since[index] = batch[0].enqueued_at
+            events = [queued.event for queued in batch]
+            self._in_flight[index] = events
+            # 停止超时被取消时批次保留在 _in_flight 中，由 stop 统一交给丢弃回调
+            succeeded = await self._process_with_retry(events)
+            self._in_flight_since[index] = None
+            if succeeded:
+                self.processed_total += len(events)
+                self._finish(events)
+            else:
+                await self._drop(events)
+            self._in_flight[index] = None
+
+    async def _process_with_retry(self, events: list[MessageEvent]) -> bool:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.process_batch(events)
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    "Failed to process %s queued message events (attempt %s/%s).",
+                    len(events),
+                    attempt,
+                    self.max_attempts,
+                )
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay_seconds * attempt)
+        return False
+
+    async def _drop(self, events: list[MessageEvent]) -> None:
+        try:
+            await self.on_dropped(events)
+        except Exception:
+            logger.exception("Failed to handle %s dropped message events.", len(events))
+        self.dropped_total += len(events)
+        self._finish(events)
+
+    def _finish(self, events: list[MessageEvent]) -> None:
+        self._unfinished -= len(events)
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
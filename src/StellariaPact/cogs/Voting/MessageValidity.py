@@ -0,0 +1,104 @@
+"""
+讨论帖有效发言的判定规则。
+
+本地监听、历史回填与远端转发器必须使用同一套规则，否则两种监听模式下的投票资格会不一致。
+本模块只依赖标准库与 `regex`，不引用 Bot 的其他模块：转发器可以直接复制本文件，
+或读取 `MESSAGE_VALIDITY_SPEC` 中的参数与正则表达式自行实现。
+修改规则时需要同步提升 `SPEC_VERSION`，并更新黄金语料
+（`StellariaPact.devtools.MessageValidityBenchmark.GOLDEN_CORPUS`）。
+"""
+
+from typing import Any, Iterable, Protocol
+
+import regex
+
+SPEC_VERSION = 1
+"""规则版本；转发器可据此确认两端规则一致"""
+
+MIN_CONTENT_LENGTH = 5
+"""有效发言至少包含的非空白字符数"""
+
+CUSTOM_EMOJI_PATTERN = r"<a?:\w+:\d+>"
+"""Discord 自定义表情（含动态表情）的文本形式"""
+
+EMOJI_CHARACTER_CLASS = (
+    r"[\p{Emoji_Presentation}\p{Emoji_Modifier_Base}\p{Emoji_Component}\p{So}\p{Cn}]"
+)
+"""视为表情的单个字符；注意 Emoji_Component 包含数字与 `#`、`*`，纯数字消息同样无效"""
+
+# 规则的原始表述是“去除全部空白后，若整段内容由表情组成，或长度不足则无效”。
+# 下面的单条正则在不构造去空白副本的前提下完成同样的判定：
+# 自定义表情的各字符之间允许出现空白，与先去空白再匹配等价；
+# 第一个前瞻只扫描到第五个非空白字符为止，第二个前瞻遇到第一个非表情字符即失败返回，
+# 占有量词保证没有回溯。
+_SPACED_CUSTOM_EMOJI = r"<\s*(?:a\s*)?:\s*\w(?:\s*\w)*\s*:\s*\d(?:\s*\d)*\s*>"
+
+VALID_CONTENT_PATTERN = (
+    rf"(?=(?:\s*\S){{{MIN_CONTENT_LENGTH}}})"
+    rf"(?!(?:\s|{_SPACED_CUSTOM_EMOJI}|{EMOJI_CHARACTER_CLASS})*+\Z)"
+)
+"""对去除首尾空白后的内容执行 `match`，命中即为有效发言"""
+
+MESSAGE_VALIDITY_SPEC: dict[str, Any] = {
+    "version": SPEC_VERSION,
+    "ignore_bot_authors": True,
+    "strip": "去除首尾空白（Python str.strip 语义）",
+    "min_content_length": MIN_CONTENT_LENGTH,
+    "custom_emoji_pattern": CUSTOM_EMOJI_PATTERN,
+    "emoji_character_class": EMOJI_CHARACTER_CLASS,
+    "valid_content_pattern": VALID_CONTENT_PATTERN,
+    "regex_dialect": "Python regex 模块（支持 \\p{...} 与占有量词）",
+}
+"""可序列化为 JSON 的规则描述，供远端转发器共享"""
+
+_VALID_CONTENT = regex.compile(VALID_CONTENT_PATTERN)
+
+
+class _MessageLike(Protocol):
+    content: str
+
+    @property
+    def author(self) -> Any: ...
+
+
+class MessageValidity:
+    """
+    判断讨论消息是否为计入投票资格的有效发言。
+    """
+
+    @staticmethod
+    def is_valid_content(content: str) -> bool:
+        """
+        判断消息文本是否为有效发言。
+
+        有效发言去除空白后至少包含 `MIN_CONTENT_LENGTH` 个字符，且不能只由表情组成。
+        """
+        # 去除空白只会让内容变短，原始长度不足时无需进入正则
+        if len(content) < MIN_CONTENT_LENGTH:
+            return False
+        return _VALID_CONTENT.match(content.strip()) is not None
+
+    @staticmethod
+    def is_valid_message(message: _MessageLike) -> bool:
+        """判断 Discord 消息是否为有效发言；机器人消息一律无效。"""
+        return not message.author.bot and MessageValidity.is_valid_content(message.content)
+
+    @staticmethod
+    def validate_contents(contents: Iterable[str]) -> list[bool]:
+        """批量判断消息文本，结果与输入一一对应。"""
+        match = _VALID_CONTENT.match
+        return [
+            len(content) >= MIN_CONTENT_LENGTH and match(content.strip()) is not None
+            for content in contents
+        ]
+
+    @staticmethod
+    def validate_messages(messages: Iterable[_MessageLike]) -> list[bool]:
+        """批量判断 Discord 消息，结果与输入一一对应。"""
+        match = _VALID_CONTENT.match
+        return [
+            not message.author.bot
+            and len(message.content) >= MIN_CONTENT_LENGTH
+            and match(message.content.strip()) is not None
+            for message in messages
+        ]
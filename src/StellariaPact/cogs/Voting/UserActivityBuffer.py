@@ -0,0 +1,281 @@
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, DefaultDict, Iterable, Optional, Sequence
+
+from discord.ext import tasks
+
+from StellariaPact.cogs.Voting.EligibilityService import EligibilityService
+from StellariaPact.cogs.Voting.MessageEventDeduplicator import MessageEventKey
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.share import StellariaPactBot, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+ActivityKey = tuple[int, int]
+"""缓冲区键: (user_id, thread_id)"""
+
+
+class UserActivityBuffer:
+    """
+    有效发言计数的写后缓冲区。
+
+    投票资格只取决于发言数是否达到 `EligibilityService.REQUIRED_MESSAGES`，
+    因此只有已确认达标的用户的增减量会在内存中按 (用户, 帖子) 聚合，并由定时任务批量写库；
+    可能跨越资格阈值的变化（未达标用户的新增发言、可能跌破阈值的删除）始终同步写库。
+
+    崩溃安全性：进程异常退出时，最多丢失一个刷新周期内缓冲的增减量。
+    由于被缓冲的增量只属于已达标用户，丢失它们不会让任何人失去或获得投票资格，
+    只会让展示用的发言总数偏低。对计数精度有更高要求时，可在 `config.json` 的
+    `activity_buffer` 中关闭缓冲（每条消息直接写库）或缩短刷新周期。
+
+    被缓冲的消息写入消息索引的时机与其计数一致：写库前被删除的消息直接从缓冲区中取出，
+    按普通删除扣减，不依赖索引。远端事件的去重键同样随计数在同一刷新事务中写入，
+    崩溃时两者一同丢失，不会出现去重记录已落库而计数未落库的情况。
+    """
+
+    DEFAULT_FLUSH_INTERVAL_SECONDS = 30
+    DEFAULT_MAX_PENDING_KEYS = 5000
+    DEFAULT_MAX_TRACKED_KEYS = 50000
+
+    def __init__(
+        self,
+        bot: StellariaPactBot,
+        *,
+        enabled: bool = True,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_pending_keys: int = DEFAULT_MAX_PENDING_KEYS,
+        max_tracked_keys: int = DEFAULT_MAX_TRACKED_KEYS,
+    ):
+        self.bot = bot
+        self.enabled = enabled
+        self.max_pending_keys = max_pending_keys
+        self.max_tracked_keys = max_tracked_keys
+        # 待写库的增减量: {(user_id, thread_id): delta}
+        self.pending: DefaultDict[ActivityKey, int] = defaultdict(int)
+        # 最近一次写库后确认的计数，仅保留达标用户，按最近使用顺序淘汰
+        self.known_counts: OrderedDict[ActivityKey, int] = OrderedDict()
+        # 计数已缓冲、尚未写入消息索引的消息: {message_id: (user_id, thread_id)}
+        self.pending_messages: dict[int, ActivityKey] = {}
+        # 正在写库的消息索引；写库期间被删除的消息在索引中尚不可见，仍从这里取出
+        self.flushing_messages: dict[int, ActivityKey] = {}
+        # 计数已缓冲、尚未写库的远端事件去重键
+        self.pending_event_keys: set[MessageEventKey] = set()
+        self.lock = asyncio.Lock()
+        self.flush_pending.change_interval(seconds=flush_interval_seconds)
+
+    @classmethod
+    def from_config(cls, bot: StellariaPactBot, config: dict[str, Any]) -> "UserActivityBuffer":
+        """根据 `config.json` 中的 `activity_buffer` 配置创建缓冲区。"""
+        buffer_config = config.get("activity_buffer", {})
+        return cls(
+            bot,
+            enabled=bool(buffer_config.get("enabled", True)),
+            flush_interval_seconds=float(
+                buffer_config.get("flush_interval_seconds", cls.DEFAULT_FLUSH_INTERVAL_SECONDS)
+            ),
+            max_pending_keys=int(
+                buffer_config.get("max_pending_keys", cls.DEFAULT_MAX_PENDING_KEYS)
+            ),
+            max_tracked_keys=int(
+                buffer_config.get("max_tracked_keys", cls.DEFAULT_MAX_TRACKED_KEYS)
+            ),
+        )
+
+    def start(self) -> None:
+        """启动定时写库任务。"""
+        if self.enabled and not self.flush_pending.is_running():
+            self.flush_pending.start()
+
+    async def stop(self) -> None:
+        """停止定时任务，并把剩余的缓冲量写入数据库。"""
+        self.flush_pending.cancel()
+        await self.flush()
+
+    async def try_buffer(
+        self,
+        qo: UpdateUserActivityQo,
+        message_id: Optional[int] = None,
+        event_keys: Sequence[MessageEventKey] = (),
+    ) -> bool:
+        """
+        尝试将一次计数变化放入缓冲区。
+
+        Args:
+            qo: 计数变化。
+            message_id: 被计数的消息 ID，缓冲成功时随计数一同写入消息索引。
+            event_keys: 产生该变化的远端事件去重键，缓冲成功时随计数一同写库。
+
+        Returns:
+            True 表示变化已缓冲；False 表示调用方必须同步写库。
+        """
+        if not self.enabled:
+            return False
+
+        key = (qo.user_id, qo.thread_id)
+        async with self.lock:
+            known_count = self.known_counts.get(key)
+            # 未知计数或未达标的用户可能跨越阈值，必须同步写库
+            if known_count is None or known_count < EligibilityService.REQUIRED_MESSAGES:
+                return False
+
+            # 删除后可能跌破阈值时同步写库，以便立即撤销投票
+            projected = known_count + self.pending.get(key, 0) + qo.change
+            if projected < EligibilityService.REQUIRED_MESSAGES:
+                return False
+
+            # 待写库的键过多时退化为同步写库，限制内存占用
+            if key not in self.pending and len(self.pending) >= self.max_pending_keys:
+                return False
+
+            self.pending[key] += qo.change
+            if message_id is not None:
+                self.pending_messages[message_id] = key
+            self.pending_event_keys.update(event_keys)
+            self.known_counts.move_to_end(key)
+            return True
+
+    async def unbuffer(
+        self,
+        qos: Iterable[UpdateUserActivityQo],
+        event_keys: Iterable[MessageEventKey] = (),
+    ) -> None:
+        """
+        撤销 `try_buffer` 已放入缓冲区的变化，供所在事务失败的调用方在重新抛出前调用。
+
+        直接从待写量中减去原变化：即使期间定时任务已把这部分写入数据库，
+        减去的量也会在下一次刷新时抵消，最终计数与变化从未发生时一致。
+        """
+        async with self.lock:
+            for qo in qos:
+                key = (qo.user_id, qo.thread_id)
+                self.pending[key] -= qo.change
+                if not self.pending[key]:
+                    del self.pending[key]
+            self.pending_event_keys.difference_update(event_keys)
+
+    async def take_pending_messages(self, message_ids: Iterable[int]) -> dict[int, ActivityKey]:
+        """
+        取出计数仍在缓冲区中、尚未写入消息索引的消息。
+
+        Returns:
+            {message_id: (user_id, thread_id)}；不在缓冲区中的消息应改查消息索引。
+        """
+        taken: dict[int, ActivityKey] = {}
+        async with self.lock:
+            for message_id in message_ids:
+                key = self.pending_messages.pop(message_id, None)
+                if key is None:
+                    # 正在写库的索引行会照常写入，但计数扣减由调用方按缓冲量处理
+                    key = self.flushing_messages.pop(message_id, None)
+                if key is not None:
+                    taken[message_id] = key
+        return taken
+
+    async def restore_pending_messages(self, taken: dict[int, ActivityKey]) -> None:
+        """将 `take_pending_messages` 取出的消息放回缓冲区，使其随下一次刷新写入消息索引。"""
+        if not taken:
+            return
+        async with self.lock:
+            self.pending_messages.update(taken)
+
+    @asynccontextmanager
+    async def claim(self, qo: UpdateUserActivityQo) -> AsyncIterator[UpdateUserActivityQo]:
+        """
+        同步写库前取出同一键下尚未写库的缓冲量，与本次变化合并。
+        写库失败时，取出的缓冲量会被放回缓冲区。
+        """
+        key = (qo.user_id, qo.thread_id)
+        taken = await self.take_pending([key])
+        try:
+            yield UpdateUserActivityQo(
+                user_id=qo.user_id,
+                thread_id=qo.thread_id,
+                change=qo.change + taken.get(key, 0),
+            )
+        except BaseException:
+            await self.restore_pending(taken)
+            raise
+
+    async def take_pending(self, keys: Iterable[ActivityKey]) -> dict[ActivityKey, int]:
+        """
+        取出指定键下尚未写库的缓冲量，供调用方与同步写库的变化合并。
+        写库失败时调用方须通过 `restore_pending` 放回。
+        """
+        async with self.lock:
+            taken = {key: self.pending.pop(key, 0) for key in keys}
+        return {key: delta for key, delta in taken.items() if delta}
+
+    async def restore_pending(self, taken: dict[ActivityKey, int]) -> None:
+        """将 `take_pending` 取出的缓冲量放回缓冲区。"""
+        if not taken:
+            return
+        async with self.lock:
+            for key, delta in taken.items():
+                self.pending[key] += delta
+
+    def remember(self, user_id: int, thread_id: int, message_count: int) -> None:
+        """记录写库后确认的计数，供后续判断是否可以缓冲。"""
+        key = (user_id, thread_id)
+        if message_count < EligibilityService.REQUIRED_MESSAGES:
+            self.known_counts.pop(key, None)
+            return
+        self.known_counts[key] = message_count
+        self.known_counts.move_to_end(key)
+        while len(self.known_counts) > self.max_tracked_keys:
+            self.known_counts.popitem(last=False)
+
+    def forget(self, user_id: int, thread_id: int) -> None:
+        """在计数被其他途径修改后丢弃已知计数，使下一次变化重新同步写库。"""
+        self.known_counts.pop((user_id, thread_id), None)
+
+    @tasks.loop(seconds=DEFAULT_FLUSH_INTERVAL_SECONDS)
+    async def flush_pending(self) -> None:
+        """定时将缓冲的增减量批量写入数据库。"""
+        await self.flush()
+
+    async def flush(self) -> None:
+        """在单个事务中写入全部缓冲量及对应的消息索引和事件去重键。"""
+        async with self.lock:
+            if not self.pending and not self.pending_messages and not self.pending_event_keys:
+                return
+            to_flush = {key: delta for key, delta in self.pending.items() if delta}
+            self.pending.clear()
+            self.flushing_messages = self.pending_messages
+            self.pending_messages = {}
+            event_keys = self.pending_event_keys
+            self.pending_event_keys = set()
+        if not to_flush and not self.flushing_messages and not event_keys:
+            return
+
+        logger.debug(f"正在将 {len(to_flush)} 条缓冲的发言计数写入数据库...")
+        try:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                counts = await uow.user_activity.batch_apply_activity_changes(to_flush)
+                await uow.counted_message.record_messages(
+                    [
+                        (message_id, user_id, thread_id)
+                        for message_id, (user_id, thread_id) in self.flushing_messages.items()
+                    ]
+                )
+                if event_keys:
+                    await uow.processed_message_event.record_events(
+                        list(event_keys), datetime.now(timezone.utc)
+                    )
+                await uow.commit()
+        except Exception as e:
+            logger.error(f"写入缓冲的发言计数时发生错误: {e}", exc_info=True)
+            # 放回缓冲区，等待下一个周期重试
+            async with self.lock:
+                for key, delta in to_flush.items():
+                    self.pending[key] += delta
+                self.pending_messages.update(self.flushing_messages)
+                self.pending_event_keys.update(event_keys)
+            return
+        finally:
+            self.flushing_messages = {}
+
+        for (user_id, thread_id), message_count in counts.items():
+            self.remember(user_id, thread_id, message_count)
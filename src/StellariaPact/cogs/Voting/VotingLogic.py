@@ -1,14 +1,20 @@
 import asyncio
 import logging
+from collections import Counter, defaultdict
+from contextlib import AsyncExitStack, nullcontext
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Iterable, List, Mapping, Optional, Sequence
 
 import discord
 
+from StellariaPact.cogs.Voting.ActivityBackfill import ActivityBackfill
 from StellariaPact.cogs.Voting.EligibilityService import EligibilityService
+from StellariaPact.cogs.Voting.MessageEventDeduplicator import MessageEventKey
 from StellariaPact.cogs.Voting.qo import DeleteVoteQo
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
 from StellariaPact.dto import ConfirmationSessionDto, UserActivityDto, VoteSessionDto
 from StellariaPact.dto.vote_session import VoteDetailDto
+from StellariaPact.models.DroppedMessageEvent import DroppedMessageEvent
 from StellariaPact.models.VoteOption import VoteOption
 from StellariaPact.models.VoteSession import VoteSession
 from StellariaPact.qo.user_activity import UpdateUserActivityQo
@@ -17,6 +23,7 @@ from StellariaPact.qo.vote_session import AdjustVoteTimeQo
 from StellariaPact.repository.VoteSessionRepository import VoteSessionRepository
 from StellariaPact.share import BusinessRuleError, StellariaPactBot, TimeUtils, UnitOfWork
 from StellariaPact.share.auth import RoleGuard
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +33,17 @@ class VotingLogic:
     处理与投票相关的业务逻辑。
     """
 
-    def __init__(self, bot: StellariaPactBot):
+    def __init__(
+        self,
+        bot: StellariaPactBot,
+        activity_buffer: Optional[UserActivityBuffer] = None,
+        activity_backfill: Optional[ActivityBackfill] = None,
+    ):
         self.bot = bot
+        # 仅负责消息计数的实例持有写后缓冲区，其余实例直接写库
+        self.activity_buffer = activity_buffer
+        # 同一实例在删除消息时通知回填工具，修正正在扫描的帖子
+        self.activity_backfill = activity_backfill
 
     async def update_vote_session_message_id(self, session_id: int, message_id: int):
         """
@@ -61,7 +77,7 @@ class VotingLogic:
             if not vote_session:
                 raise ValueError(f"找不到与消息 ID {qo.message_id} 关联的投票会话。")
 
-            if await uow.global_proposal_punishment.is_restricted(qo.user_id):
+            if await self.bot.punishment_state.is_restricted(qo.user_id):
                 raise BusinessRuleError(
                     "你当前受到全局提案处罚，无法新增或修改投票；已有投票仍可撤回。"
                 )
@@ -277,11 +293,44 @@ class VotingLogic:
                 vote_options = await uow.vote_option.get_vote_options(updated_session.id)
             return VoteSessionRepository.get_vote_details_dto(updated_session, vote_options)
 
-    async def handle_message_creation(self, qo: UpdateUserActivityQo) -> None:
-        """处理消息创建事件，增加用户活跃度。"""
+    async def _record_event_keys(
+        self, uow: UnitOfWork, event_keys: Sequence[MessageEventKey]
+    ) -> None:
+        """在计数所在的事务中记录远端事件键，保证计数与去重记录同时提交。"""
+        if event_keys:
+            await uow.processed_message_event.record_events(event_keys, datetime.now(timezone.utc))
+
+    async def handle_message_creation(
+        self,
+        qo: UpdateUserActivityQo,
+        event_keys: Sequence[MessageEventKey] = (),
+        message_id: Optional[int] = None,
+    ) -> None:
+        """
+        处理消息创建事件，增加用户活跃度。
+
+        Args:
+            qo: 计数变化。
+            event_keys: 远端事件的去重键，与计数在同一事务中记录（缓冲时随缓冲量一同写库）。
+            message_id: 被计数的消息 ID，提供时随计数写入消息索引，供删除事件反查。
+        """
+        # 已达标用户的增量只写入缓冲区，由定时任务批量写库。
+        buffer = self.activity_buffer
+        if buffer is not None and await buffer.try_buffer(qo, message_id, event_keys):
+            return
+
         # 单表活动计数更新交由用户活动 Repository 完成。
-        async with UnitOfWork(self.bot.db_handler) as uow:
-            await uow.user_activity.update_user_activity(qo)
+        async with buffer.claim(qo) if buffer else nullcontext(qo) as merged_qo:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                user_activity_orm = await uow.user_activity.update_user_activity(merged_qo)
+                message_count = user_activity_orm.message_count
+                await self._record_event_keys(uow, event_keys)
+                if message_id is not None:
+                    await uow.counted_message.record_messages(
+                        [(message_id, qo.user_id, qo.thread_id)]
+                    )
+        if buffer is not None:
+            buffer.remember(qo.user_id, qo.thread_id, message_count)
 
     @staticmethod
     async def remove_active_user_votes_in_thread(
@@ -338,25 +387,273 @@ class VotingLogic:
         return details_to_update
 
     async def handle_message_deletion(
-        self, qo: UpdateUserActivityQo
+        self, qo: UpdateUserActivityQo, event_keys: Sequence[MessageEventKey] = ()
     ) -> Optional[List[VoteDetailDto]]:
-        """减少活动计数并在资格失效时撤销帖子内的进行中投票。"""
+        """
+        减少活动计数并在资格失效时撤销帖子内的进行中投票。
+
+        Args:
+            qo: 计数变化。
+            event_keys: 远端事件的去重键，与计数在同一事务中记录（缓冲时随缓冲量一同写库）。
+        """
+        # 删除后仍确定达标时只写入缓冲区，资格不会因此变化。
+        buffer = self.activity_buffer
+        if buffer is not None and await buffer.try_buffer(qo, event_keys=event_keys):
+            return None
+
         # 活动计数和跨表撤票共享同一工作单元以保证事务一致性。
+        async with buffer.claim(qo) if buffer else nullcontext(qo) as merged_qo:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                user_activity_orm = await uow.user_activity.update_user_activity(merged_qo)
+                user_activity_dto = UserActivityDto.model_validate(user_activity_orm)
+                await self._record_event_keys(uow, event_keys)
+
+                # 用户仍满足资格时无需访问投票相关表。
+                details_to_update = None
+                if not EligibilityService.is_eligible(user_activity_dto):
+                    # 资格失效后由服务层编排会话、选项和用户投票 Repository。
+                    details_to_update = await self.remove_active_user_votes_in_thread(
+                        uow=uow,
+                        user_id=qo.user_id,
+                        thread_id=qo.thread_id,
+                    )
+        if buffer is not None:
+            buffer.remember(qo.user_id, qo.thread_id, user_activity_dto.message_count)
+        return details_to_update or None
+
+    async def handle_indexed_message_deletions(
+        self,
+        message_ids: Iterable[int],
+        cached_messages: Optional[Mapping[int, tuple[int, int]]] = None,
+    ) -> dict[int, List[VoteDetailDto]]:
+        """
+        按消息索引处理一批删除事件，无需消息缓存即可扣减计数。
+
+        与 `StructuredSpeechService.handle_message_deletions` 一致，被删除的消息先按
+        (用户, 帖子) 聚合，每个用户只更新一次计数、至多撤票一次；索引标记、计数扣减与
+        跨表撤票在同一事务中完成。不在索引中（未被计数或已处理过）的消息被忽略，
+        重复的删除事件不会重复扣减。
+
+        消息索引上线前计数的消息没有索引记录，调用方可通过 cached_messages 传入仍在
+        Discord 缓存中、按有效发言规则计数过的消息。这些消息在索引中完全没有记录时，
+        写入已扣减标记后照常扣减；已有记录的消息仍以索引为准。
+
+        Args:
+            message_ids: 被删除的消息 ID。
+            cached_messages: {message_id: (user_id, thread_id)}，缓存中的有效发言。
+
+        Returns:
+            {thread_id: 需要刷新的投票面板详情}，仅包含发生撤票的帖子。
+        """
+        ids = list(dict.fromkeys(message_ids))
+        buffer = self.activity_buffer
+        # 计数尚在缓冲区中、未写入索引的消息直接按缓冲键扣减。
+        buffered_messages = await buffer.take_pending_messages(ids) if buffer else {}
+        changes = Counter(buffered_messages.values())
+        # 本次实际扣减了计数的消息: {message_id: (user_id, thread_id)}
+        debited = dict(buffered_messages)
+
+        details_by_thread: dict[int, List[VoteDetailDto]] = {}
+        counts: dict[tuple[int, int], int] = {}
+        taken: dict[tuple[int, int], int] = {}
+        buffered: list[UpdateUserActivityQo] = []
+        try:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                claimed = await uow.counted_message.uncount_messages(
+                    message_id for message_id in ids if message_id not in buffered_messages
+                )
+                debited.update(
+                    (message_id, (user_id, thread_id))
+                    for message_id, user_id, thread_id in claimed
+                )
+
+                # 索引与缓冲区都没有的缓存消息按索引上线前的计数扣减。
+                unindexed = [
+                    (message_id, user_id, thread_id)
+                    for message_id, (user_id, thread_id) in (cached_messages or {}).items()
+                    if message_id not in debited
+                ]
+                if unindexed:
+                    claimed = await uow.counted_message.uncount_unindexed_messages(unindexed)
+                    debited.update(
+                        (message_id, (user_id, thread_id))
+                        for message_id, user_id, thread_id in claimed
+                    )
+                changes.update(
+                    key
+                    for message_id, key in debited.items()
+                    if message_id not in buffered_messages
+                )
+
+                # 删除后仍确定达标的用户只缓冲扣减量，索引标记随本事务提交。
+                to_write: dict[tuple[int, int], int] = {}
+                for (user_id, thread_id), count in changes.items():
+                    qo = UpdateUserActivityQo(user_id=user_id, thread_id=thread_id, change=-count)
+                    if buffer is not None and await buffer.try_buffer(qo):
+                        buffered.append(qo)
+                    else:
+                        to_write[(user_id, thread_id)] = -count
+
+                # 同键下尚未写库的缓冲量一并写入，避免扣减先触及计数下限 0。
+                if to_write and buffer is not None:
+                    taken = await buffer.take_pending(to_write)
+                    for key, delta in taken.items():
+                        to_write[key] += delta
+                if to_write:
+                    counts = await uow.user_activity.batch_apply_activity_changes(to_write)
+
+                # 每个跌破阈值的用户只撤票一次。
+                for (user_id, thread_id), message_count in counts.items():
+                    if message_count >= EligibilityService.REQUIRED_MESSAGES:
+                        continue
+                    details = await self.remove_active_user_votes_in_thread(
+                        uow=uow,
+                        user_id=user_id,
+                        thread_id=thread_id,
+                    )
+                    # 同一帖子后一次撤票返回的详情已包含之前的删除，保留最新一份即可。
+                    if details:
+                        details_by_thread[thread_id] = details
+        except BaseException:
+            # 事务失败时撤销本次缓冲的扣减，放回取出的缓冲量和消息，恢复到删除前的状态。
+            if buffer is not None:
+                await buffer.unbuffer(buffered)
+                await buffer.restore_pending(taken)
+                await buffer.restore_pending_messages(buffered_messages)
+            raise
+
+        if buffer is not None:
+            for (user_id, thread_id), message_count in counts.items():
+                buffer.remember(user_id, thread_id, message_count)
+        if self.activity_backfill is not None:
+            self.activity_backfill.record_deletions(ids, debited)
+        return details_by_thread
+
+    async def handle_message_event_batch(
+        self,
+        qos: List[UpdateUserActivityQo],
+        event_keys: Sequence[MessageEventKey] = (),
+    ) -> dict[int, List[VoteDetailDto]]:
+        """
+        批量处理消息事件：按 (用户, 帖子) 合并计数变化，在单个事务中写库并撤销失效投票。
+
+        同一用户在批次内的创建与删除会先相互抵消，只依据合并后的最终计数判断资格，
+        因此批次中途短暂跌破阈值但最终仍达标的用户不会被撤票。
+
+        Args:
+            qos: 逐条事件的计数变化。
+            event_keys: 与 qos 一一对应的远端事件去重键。每个键与其所属 (用户, 帖子) 的
+                计数在同一事务中记录；计数进入缓冲区的，随缓冲量一同写库。
+
+        Returns:
+            {thread_id: 需要刷新的投票面板详情}，仅包含发生撤票的帖子。
+        """
+        changes: defaultdict[tuple[int, int], int] = defaultdict(int)
+        keys_by_activity: defaultdict[tuple[int, int], List[MessageEventKey]] = defaultdict(list)
+        for qo in qos:
+            changes[(qo.user_id, qo.thread_id)] += qo.change
+        for qo, event_key in zip(qos, event_keys):
+            keys_by_activity[(qo.user_id, qo.thread_id)].append(event_key)
+        grouped = [
+            UpdateUserActivityQo(user_id=user_id, thread_id=thread_id, change=change)
+            for (user_id, thread_id), change in changes.items()
+            if change
+        ]
+
+        # 与单条事件一致：确定不会跨越资格阈值的合并增减量只写入缓冲区。
+        buffer = self.activity_buffer
+        to_write: List[UpdateUserActivityQo] = []
+        buffered: List[UpdateUserActivityQo] = []
+        buffered_keys: List[MessageEventKey] = []
+        written_keys: List[MessageEventKey] = []
+        for qo in grouped:
+            keys = keys_by_activity.pop((qo.user_id, qo.thread_id), [])
+            if buffer is not None and await buffer.try_buffer(qo, event_keys=keys):
+                buffered.append(qo)
+                buffered_keys.extend(keys)
+            else:
+                to_write.append(qo)
+                written_keys.extend(keys)
+        # 剩余的是批次内相互抵消的事件，计数不变，事件键随本批的事务记录。
+        for keys in keys_by_activity.values():
+            written_keys.extend(keys)
+        # 远端删除事件总会扣减作者的计数，供回填工具修正正在扫描的帖子。
+        deleted = {
+            message_id: (qo.user_id, qo.thread_id)
+            for qo, (message_id, _) in zip(qos, event_keys)
+            if qo.change < 0
+        }
+        if not to_write and not written_keys:
+            if self.activity_backfill is not None:
+                self.activity_backfill.record_deletions(deleted, deleted)
+            return {}
+
+        details_by_thread: dict[int, List[VoteDetailDto]] = {}
+        try:
+            async with AsyncExitStack() as stack:
+                if buffer is not None:
+                    # 取出同键下尚未写库的缓冲量一并写入，事务失败时自动放回。
+                    to_write = [
+                        await stack.enter_async_context(buffer.claim(qo)) for qo in to_write
+                    ]
+
+                async with UnitOfWork(self.bot.db_handler) as uow:
+                    counts = await uow.user_activity.batch_apply_activity_changes(
+                        {(qo.user_id, qo.thread_id): qo.change for qo in to_write}
+                    )
+                    await self._record_event_keys(uow, written_keys)
+
+                    # 只有净减少且最终未达标的用户需要撤销帖子内的进行中投票。
+                    for qo in to_write:
+                        key = (qo.user_id, qo.thread_id)
+                        if (
+                            qo.change >= 0
+                            or key not in counts
+                            or counts[key] >= EligibilityService.REQUIRED_MESSAGES
+                        ):
+                            continue
+                        details = await self.remove_active_user_votes_in_thread(
+                            uow=uow,
+                            user_id=qo.user_id,
+                            thread_id=qo.thread_id,
+                        )
+                        # 同一帖子后一次撤票返回的详情已包含之前的删除，保留最新一份即可。
+                        if details:
+                            details_by_thread[qo.thread_id] = details
+        except BaseException:
+            # 整批作为一个整体重试，事务失败时撤销本批已缓冲的部分，避免重试时重复计数。
+            if buffer is not None:
+                await buffer.unbuffer(buffered, buffered_keys)
+            raise
+
+        if buffer is not None:
+            for (user_id, thread_id), message_count in counts.items():
+                buffer.remember(user_id, thread_id, message_count)
+        if self.activity_backfill is not None:
+            self.activity_backfill.record_deletions(deleted, deleted)
+        return details_by_thread
+
+    async def save_dropped_message_events(self, events: Sequence[DroppedMessageEvent]) -> None:
+        """保存处理失败被丢弃的远端消息事件，供下次启动时重新处理。"""
         async with UnitOfWork(self.bot.db_handler) as uow:
-            user_activity_orm = await uow.user_activity.update_user_activity(qo)
+            await uow.dropped_message_event.add_events(events)
+            await uow.commit()
 
-            # 用户仍满足资格时无需访问投票相关表。
-            user_activity_dto = UserActivityDto.model_validate(user_activity_orm)
-            if EligibilityService.is_eligible(user_activity_dto):
-                return None
+    async def get_dropped_message_events(self, limit: int) -> list[DroppedMessageEvent]:
+        """按丢弃时间从早到晚读取至多 limit 条待重新处理的远端消息事件。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.dropped_message_event.get_events(limit)
 
-            # 资格失效后由服务层编排会话、选项和用户投票 Repository。
-            details_to_update = await self.remove_active_user_votes_in_thread(
-                uow=uow,
-                user_id=qo.user_id,
-                thread_id=qo.thread_id,
-            )
-            return details_to_update or None
+    async def delete_dropped_message_events(self, event_keys: Sequence[MessageEventKey]) -> None:
+        """删除已重新处理的被丢弃事件。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            await uow.dropped_message_event.delete_events(event_keys)
+            await uow.commit()
+
+    def _schedule_deadline(self, session_id: Optional[int], end_time: Optional[datetime]):
+        """将投票会话的新结束时间登记到截止时间调度器。"""
+        if session_id is not None and end_time is not None:
+            self.bot.deadline_scheduler.schedule(DeadlineKind.VOTE_SESSION, session_id, end_time)
 
     async def reopen_vote(
         self,
@@ -388,6 +685,7 @@ class VotingLogic:
             final_session = await uow.vote_session.get_vote_session_with_details(message_id)
             if not final_session:
                 raise RuntimeError("重新获取会话失败。")
+            self._schedule_deadline(final_session.id, final_session.end_time)
 
             vote_options = None
             if final_session.id:
@@ -425,6 +723,7 @@ class VotingLogic:
             final_session = await uow.vote_session.get_vote_session_with_details(message_id)
             if not final_session:
                 raise RuntimeError("重新获取会话失败。")
+            self._schedule_deadline(final_session.id, final_session.end_time)
             vote_options = None
             if final_session.id:
                 vote_options = await uow.vote_option.get_vote_options(final_session.id)
@@ -445,9 +744,11 @@ class VotingLogic:
                 result_dto.old_end_time,
             )
 
-    async def tally_and_close_session(self, vote_session: VoteSessionDto) -> VoteDetailDto:
+    async def tally_closing_session(self, vote_session: VoteSessionDto) -> VoteDetailDto:
         """
-        计票并关闭一个投票会话。
+        为一个结算中的投票会话计票，返回按已结束状态构建的投票详情。
+
+        只读取数据库；会话状态由调用方在结算完成后批量写回。
         """
         async with UnitOfWork(self.bot.db_handler) as uow:
             if not vote_session.context_message_id:
@@ -459,16 +760,14 @@ class VotingLogic:
             if not vote_session_model:
                 raise ValueError(f"找不到ID为 {vote_session.id} 的投票会话")
 
-            # 更新会话状态为已结束
-            vote_session_model.status = 0
-            await uow.flush()
-
             # 获取选项以构建 DTO
             vote_options = None
             if vote_session_model.id:
                 vote_options = await uow.vote_option.get_vote_options(vote_session_model.id)
 
-            return uow.vote_session.get_vote_details_dto(vote_session_model, vote_options)
+            # 结算中的会话 (status=2) 已不接受投票，选项均按已结束构建
+            details = uow.vote_session.get_vote_details_dto(vote_session_model, vote_options)
+            return details.model_copy(update={"status": 0})
 
     async def delete_vote_option(self, message_id: int, option_id: int) -> VoteDetailDto:
         """
@@ -605,7 +904,7 @@ class VotingLogic:
 
             # ======= 根据 action 分流处理 =======
             if action == "support":
-                if await uow.global_proposal_punishment.is_objection_support_restricted(user_id):
+                if await self.bot.punishment_state.is_objection_support_restricted(user_id):
                     raise BusinessRuleError(
                         "你当前受到全局提案处罚，无法参与异议附议；已有附议仍可撤回。"
                     )
@@ -10,7 +10,12 @@ from .listeners.DiscussionMessageListener import DiscussionMessageListener
 from .listeners.InnerEventListener import InnerEventListener
 from .listeners.MessageEventApiCog import MessageEventApiCog
 from .listeners.ModerationEventListener import ModerationEventListener
+from .MessageEventDeduplicator import MessageEventDeduplicator
+from .MessageEventQueue import MessageEventQueue
+from .MessageValidity import MessageValidity
+from .tasks.VoteArchiver import VoteArchiver
 from .tasks.VoteCloser import VoteCloser
+from .UserActivityBuffer import UserActivityBuffer
 from .views.VoteView import VoteView
 from .views.VotingChannelView import VotingChannelView
 from .VotingLogic import VotingLogic
@@ -19,11 +24,16 @@ __all__ = [
     "Voting",
     "EligibilityService",
     "VotingLogic",
+    "UserActivityBuffer",
+    "MessageEventDeduplicator",
+    "MessageEventQueue",
+    "MessageValidity",
     "ModerationEventListener",
     "InnerEventListener",
     "DiscussionMessageListener",
     "MessageEventApiCog",
     "VoteCloser",
+    "VoteArchiver",
     "VoteView",
     "VotingChannelView",
 ]
@@ -64,6 +74,7 @@ async def setup(bot: StellariaPactBot) -> None:
     cogs_to_load = [
         voting_cog,
         VoteCloser(bot),
+        VoteArchiver(bot),
         ModerationEventListener(bot),
         message_listener,
         InnerEventListener(bot),
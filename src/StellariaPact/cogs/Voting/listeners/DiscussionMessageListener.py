@@ -1,15 +1,16 @@
 import asyncio
 import logging
+from typing import Iterable
 
 import discord
-import regex as re
 from discord.ext import commands
 
 from StellariaPact.cogs.Voting.Cog import Voting
+from StellariaPact.cogs.Voting.MessageValidity import MessageValidity
 from StellariaPact.cogs.Voting.views import VoteEmbedBuilder
 from StellariaPact.dto.vote_session import VoteDetailDto
 from StellariaPact.qo.user_activity import UpdateUserActivityQo
-from StellariaPact.share import StellariaPactBot
+from StellariaPact.share import DiscordUtils, StellariaPactBot
 
 logger = logging.getLogger(__name__)
 
@@ -23,26 +24,10 @@ class DiscussionMessageListener(commands.Cog):
         self.bot = bot
         self.voting_cog = voting_cog
 
-        # 编译与远端转发器一致的纯表情识别规则。
-        self.emoji_pattern = re.compile(
-            r"^(<a?:\w+:\d+>|\p{Emoji_Presentation}|\p{Emoji_Modifier_Base}|"
-            r"\p{Emoji_Component}|\p{So}|\p{Cn})+$"
-        )
-
-    def is_valid_message(self, message: discord.Message) -> bool:
-        """判断消息是否满足投票资格的有效发言规则。"""
-        # 忽略空消息和机器人消息。
-        content = message.content.strip()
-        if not content or message.author.bot:
-            return False
-
-        # 移除空白后排除纯表情内容。
-        content_without_whitespace = re.sub(r"\s", "", content)
-        if self.emoji_pattern.match(content_without_whitespace):
-            return False
-
-        # 有效发言必须超过四个非空白字符。
-        return len(content_without_whitespace) > 4
+    @staticmethod
+    def is_valid_message(message: discord.Message) -> bool:
+        """判断消息是否满足投票资格的有效发言规则（与远端转发器共享同一规则）。"""
+        return MessageValidity.is_valid_message(message)
 
     def _is_target_message(self, message: discord.Message) -> bool:
         """判断消息是否来自配置的讨论论坛帖子。"""
@@ -73,7 +58,7 @@ class DiscussionMessageListener(commands.Cog):
                 thread_id=thread.id,
                 change=1,
             )
-            await self.voting_cog.logic.handle_message_creation(qo)
+            await self.voting_cog.logic.handle_message_creation(qo, message_id=message.id)
         except Exception:
             # 单条消息失败只记录异常，不中断 Discord 事件循环。
             logger.exception(
@@ -82,39 +67,89 @@ class DiscussionMessageListener(commands.Cog):
                 message.channel.id,
             )
 
+    def _may_be_target_channel(self, channel_id: int) -> bool:
+        """根据缓存粗略排除非目标论坛的删除事件；未缓存的频道交由消息索引判断。"""
+        channel = self.bot.get_channel(channel_id)
+        if not isinstance(channel, discord.Thread):
+            return channel is None
+
+        discussion_channel_id = self.bot.config.get("channels", {}).get("discussion")
+        try:
+            return channel.parent_id == int(discussion_channel_id)
+        except (TypeError, ValueError):
+            return False
+
+    def _counted_cached_messages(
+        self, messages: Iterable[discord.Message]
+    ) -> dict[int, tuple[int, int]]:
+        """从删除事件携带的缓存消息中挑出按有效发言规则计数过的消息。"""
+        return {
+            message.id: (message.author.id, message.channel.id)
+            for message in messages
+            if self._is_target_message(message) and self.is_valid_message(message)
+        }
+
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message) -> None:
-        """监听缓存内消息删除并减少有效发言计数。"""
-        # 仅处理目标论坛内仍能从缓存校验正文的有效消息。
-        if not self._is_target_message(message) or not self.is_valid_message(message):
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        """监听消息删除并按消息索引减少有效发言计数，不依赖消息缓存。"""
+        if not self._may_be_target_channel(payload.channel_id):
             return
+        cached = [payload.cached_message] if payload.cached_message else []
+        await self._handle_deleted_messages(
+            payload.channel_id, [payload.message_id], self._counted_cached_messages(cached)
+        )
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:
+        """监听批量删除，将整批消息合并为一次计数扣减与撤票。"""
+        if not self._may_be_target_channel(payload.channel_id):
+            return
+        await self._handle_deleted_messages(
+            payload.channel_id,
+            payload.message_ids,
+            self._counted_cached_messages(payload.cached_messages),
+        )
 
+    async def _handle_deleted_messages(
+        self,
+        thread_id: int,
+        message_ids: Iterable[int],
+        cached_messages: dict[int, tuple[int, int]],
+    ) -> None:
+        """按消息索引扣减已删除消息的计数，并将受撤票影响的投票面板各刷新一次。"""
         try:
-            # 删除事件交由服务层处理计数、资格失效与跨表撤票。
-            thread = message.channel
-            assert isinstance(thread, discord.Thread)
-            qo = UpdateUserActivityQo(
-                user_id=message.author.id,
-                thread_id=thread.id,
-                change=-1,
+            # 索引中没有的消息只有在缓存中可见时才按索引上线前的计数扣减，其余直接忽略。
+            details_by_thread = await self.voting_cog.logic.handle_indexed_message_deletions(
+                message_ids, cached_messages
             )
-            details_to_update = await self.voting_cog.logic.handle_message_deletion(qo)
 
-            # 没有撤票详情时无需刷新 Discord 面板。
-            if not details_to_update:
+            # 没有撤票详情时无需访问 Discord。
+            if not details_by_thread:
                 return
-
-            # 并发刷新彼此独立的投票面板，避免串行外部请求形成 N+1 延迟。
             await asyncio.gather(
-                *(self._refresh_vote_panel(thread, details) for details in details_to_update)
+                *(
+                    self._refresh_vote_panels(details_thread_id, details_list)
+                    for details_thread_id, details_list in details_by_thread.items()
+                )
             )
         except Exception:
             # 保留完整堆栈便于排查计数或面板刷新失败。
-            logger.exception(
-                "处理用户 %s 在帖子 %s 的消息删除事件时出错。",
-                message.author.id,
-                message.channel.id,
-            )
+            logger.exception("处理帖子 %s 中的消息删除事件时出错。", thread_id)
+
+    async def _refresh_vote_panels(
+        self,
+        thread_id: int,
+        details_list: list[VoteDetailDto],
+    ) -> None:
+        """并发刷新指定帖子中受资格变化影响的投票面板。"""
+        thread = await DiscordUtils.fetch_thread(self.bot, thread_id)
+        if thread is None:
+            return
+
+        # 并发刷新彼此独立的投票面板，避免串行外部请求形成 N+1 延迟。
+        await asyncio.gather(
+            *(self._refresh_vote_panel(thread, details) for details in details_list)
+        )
 
     async def _refresh_vote_panel(
         self,
@@ -19,7 +19,6 @@ from StellariaPact.cogs.Voting.views import (
 from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
 from StellariaPact.dto import (
     ConfirmationSessionDto,
-    ProposalDto,
     VoteMessageMirrorDto,
     VoteSessionDto,
 )
@@ -314,15 +313,13 @@ class InnerEventListener(commands.Cog):
             # 异议 (option_type == 1) 分支：发送附议支持面板
             if option_type == 1:
                 # 校验提案状态是否允许
+                if await self.bot.punishment_state.is_objection_creation_restricted(creator_id):
+                    await interaction.followup.send(
+                        "❌ 你当前受到异议权限限制或提案违规处罚，无法创建异议。",
+                        ephemeral=True,
+                    )
+                    return
                 async with UnitOfWork(self.bot.db_handler) as uow:
-                    if await uow.global_proposal_punishment.is_objection_creation_restricted(
-                        creator_id
-                    ):
-                        await interaction.followup.send(
-                            "❌ 你当前受到异议权限限制或提案违规处罚，无法创建异议。",
-                            ephemeral=True,
-                        )
-                        return
                     proposal = await uow.proposal.get_proposal_by_thread_id(thread_id)
                     status = proposal.status if proposal else None
 
@@ -837,16 +834,15 @@ class InnerEventListener(commands.Cog):
 
         # --- 限制讨论帖创建满 2 小时后才能创建异议 ---
         if option_type == 1:
-            async with UnitOfWork(self.bot.db_handler) as uow:
-                if await uow.global_proposal_punishment.is_objection_creation_restricted(
-                    interaction.user.id
-                ):
-                    error_msg = "你当前受到异议权限限制或提案违规处罚，无法创建异议。"
-                    if not interaction.response.is_done():
-                        await interaction.response.send_message(error_msg, ephemeral=True)
-                    else:
-                        await interaction.followup.send(error_msg, ephemeral=True)
-                    return
+            if await self.bot.punishment_state.is_objection_creation_restricted(
+                interaction.user.id
+            ):
+                error_msg = "你当前受到异议权限限制或提案违规处罚，无法创建异议。"
+                if not interaction.response.is_done():
+                    await interaction.response.send_message(error_msg, ephemeral=True)
+                else:
+                    await interaction.followup.send(error_msg, ephemeral=True)
+                return
             thread = await DiscordUtils.fetch_thread(self.bot, thread_id)
             if thread and thread.created_at:
                 now_utc = discord.utils.utcnow()
@@ -1108,15 +1104,12 @@ class InnerEventListener(commands.Cog):
         try:
             message = await channel.fetch_message(vote_details.voting_channel_message_id)
 
-            async with UnitOfWork(self.bot.db_handler) as uow:
-                proposal = await uow.proposal.get_proposal_by_thread_id(
-                    vote_details.context_thread_id
+            new_embeds = None
+            proposal_dto = await self.bot.proposal_registry.get(vote_details.context_thread_id)
+            if proposal_dto and thread:
+                new_embeds = VoteEmbedBuilder.build_voting_channel_embed(
+                    proposal_dto, vote_details, thread.jump_url
                 )
-                if proposal and thread:
-                    proposal_dto = ProposalDto.model_validate(proposal)
-                    new_embeds = VoteEmbedBuilder.build_voting_channel_embed(
-                        proposal_dto, vote_details, thread.jump_url
-                    )
 
             view = VotingChannelView(self.bot, vote_details=vote_details)
 
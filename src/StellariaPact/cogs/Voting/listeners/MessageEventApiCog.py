@@ -5,15 +5,19 @@ from __future__ import annotations
 import asyncio
 import hmac
 import logging
+from typing import cast
 
 import discord
 from aiohttp import web
 from discord.ext import commands
 
 from StellariaPact.cogs.Voting.Cog import Voting
-from StellariaPact.cogs.Voting.listeners.MessageEvent import MessageEvent
+from StellariaPact.cogs.Voting.listeners.MessageEvent import MessageEvent, MessageEventType
+from StellariaPact.cogs.Voting.MessageEventDeduplicator import MessageEventDeduplicator
+from StellariaPact.cogs.Voting.MessageEventQueue import MessageEventQueue
 from StellariaPact.cogs.Voting.views import VoteEmbedBuilder
 from StellariaPact.dto.vote_session import VoteDetailDto
+from StellariaPact.models.DroppedMessageEvent import DroppedMessageEvent
 from StellariaPact.qo.user_activity import UpdateUserActivityQo
 from StellariaPact.share import DiscordUtils, StellariaPactBot
 from StellariaPact.share.RemoteMessageEventsConfig import RemoteMessageEventsConfig
@@ -21,12 +25,16 @@ from StellariaPact.share.RemoteMessageEventsConfig import RemoteMessageEventsCon
 logger = logging.getLogger(__name__)
 
 MESSAGE_EVENT_PATH = "/api/v1/message-events"
+MESSAGE_EVENT_BATCH_PATH = "/api/v1/message-events:batch"
+MESSAGE_EVENT_QUEUE_PATH = "/api/v1/message-events/queue"
 HEALTH_PATH = "/healthz"
 MAX_REQUEST_SIZE = 16 * 1024
+MAX_BATCH_EVENTS = 500
+MAX_BATCH_REQUEST_SIZE = MAX_BATCH_EVENTS * 512
 
 
 class MessageEventApiCog(commands.Cog):
-    """接收并处理下载 Bot 转发的消息资格事件。"""
+    """接收下载 Bot 转发的消息资格事件，入队后由后台工作协程异步处理。"""
 
     def __init__(
         self,
@@ -40,6 +48,14 @@ class MessageEventApiCog(commands.Cog):
         self.voting_cog = voting_cog
         self.config = config
 
+        # 转发端超时重试时按 (message_id, event_type) 去重，避免重复计数。
+        self.deduplicator = MessageEventDeduplicator.from_config(bot, bot.config)
+
+        # 入口只校验并入队，写库与面板刷新由按帖子分片的工作协程异步完成。
+        self.ingest_queue = MessageEventQueue.from_config(
+            self._process_event_batch, self._save_dropped_events, bot.config
+        )
+
         # 初始化 aiohttp 服务生命周期对象。
         self._runner: web.AppRunner | None = None
         self._site: web.TCPSite | None = None
@@ -47,16 +63,38 @@ class MessageEventApiCog(commands.Cog):
 
     def _build_application(self) -> web.Application:
         """创建带请求体限制和固定路由的 aiohttp 应用。"""
-        # 限制请求体大小，避免无关大请求占用内存。
-        application = web.Application(client_max_size=MAX_REQUEST_SIZE)
+        # 限制请求体大小，避免无关大请求占用内存；单条入口另行校验更小的上限。
+        application = web.Application(client_max_size=MAX_BATCH_REQUEST_SIZE)
 
-        # 注册健康检查和消息事件入口。
+        # 注册健康检查、队列状态、单条和批量消息事件入口。
         application.router.add_get(HEALTH_PATH, self._health)
+        application.router.add_get(MESSAGE_EVENT_QUEUE_PATH, self._queue_stats)
         application.router.add_post(MESSAGE_EVENT_PATH, self._handle_message_event)
+        application.router.add_post(MESSAGE_EVENT_BATCH_PATH, self._handle_message_event_batch)
+
+        # 工作协程随 HTTP 服务启停，停止时先处理完已入队的事件。
+        application.on_startup.append(self._start_ingest_queue)
+        application.on_cleanup.append(self._stop_ingest_queue)
         return application
 
+    async def _start_ingest_queue(self, application: web.Application) -> None:
+        """HTTP 服务启动时启动队列工作协程。"""
+        del application
+        self.ingest_queue.start()
+
+    async def _stop_ingest_queue(self, application: web.Application) -> None:
+        """HTTP 服务停止时排空队列并停止工作协程。"""
+        del application
+        await self.ingest_queue.stop()
+
     async def cog_load(self) -> None:
         """加载 Cog 时启动内部 HTTP 服务。"""
+        # 先从数据库预热去重表，确保重启前已处理的事件不会被重复计数。
+        await self.deduplicator.start()
+
+        # 在接收新事件前重新处理上次运行中被丢弃的事件，保持同一帖子内的先后顺序。
+        await self._replay_dropped_events()
+
         # 创建并绑定 aiohttp 服务，失败时完整清理已分配资源。
         runner = web.AppRunner(self.application)
         try:
@@ -85,12 +123,29 @@ class MessageEventApiCog(commands.Cog):
         self._site = None
         self._runner = None
 
+        # 去重记录已随计数写库，这里只需停止清理任务。
+        self.deduplicator.stop()
+
     async def _health(self, request: web.Request) -> web.Response:
         """返回不包含敏感配置的健康状态。"""
         # 保留请求参数以符合 aiohttp 处理器签名。
         del request
         return web.json_response({"status": "ok"})
 
+    async def _queue_stats(self, request: web.Request) -> web.Response:
+        """返回接收队列的深度与处理延迟。"""
+        if not self._is_authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return web.json_response(self.ingest_queue.stats())
+
+    def _queue_full_response(self, body: dict[str, object]) -> web.Response:
+        """队列饱和时返回 429，并按当前处理延迟给出 Retry-After。"""
+        return web.json_response(
+            body,
+            status=429,
+            headers={"Retry-After": str(self.ingest_queue.retry_after_seconds())},
+        )
+
     def _is_authorized(self, request: web.Request) -> bool:
         """使用常量时间比较验证 Bearer Token。"""
         # 从请求头提取完整 Bearer 凭据。
@@ -113,6 +168,13 @@ class MessageEventApiCog(commands.Cog):
             # 本地配置无效时拒绝所有外部事件。
             return False
 
+    def _is_structured_webhook(self, user_id: int) -> bool:
+        """判断事件作者是否为结构化发言服务使用的 Webhook。"""
+        # 结构化 Webhook 发言由专用服务记账，避免远端事件重复增减活动计数。
+        structured_speech_cog = self.bot.get_cog("StructuredSpeechCog")
+        webhook_checker = getattr(structured_speech_cog, "is_structured_webhook_id", None)
+        return callable(webhook_checker) and webhook_checker(user_id) is True
+
     async def _handle_message_event(self, request: web.Request) -> web.Response:
         """验证并处理单个跨 Bot 消息事件。"""
         # 在解析请求体前完成身份验证。
@@ -120,6 +182,8 @@ class MessageEventApiCog(commands.Cog):
             return web.json_response({"error": "unauthorized"}, status=401)
         if request.content_type != "application/json":
             return web.json_response({"error": "content type must be JSON"}, status=400)
+        if request.content_length is not None and request.content_length > MAX_REQUEST_SIZE:
+            return web.json_response({"error": "request body too large"}, status=413)
 
         # 使用独立事件类型严格校验 HTTP 数据契约。
         try:
@@ -136,44 +200,214 @@ class MessageEventApiCog(commands.Cog):
             )
 
         # Cog 只组装单次业务请求，不直接访问数据库或 Repository。
-        # 结构化 Webhook 发言由专用服务记账，避免远端事件重复增减活动计数。
-        structured_speech_cog = self.bot.get_cog("StructuredSpeechCog")
-        webhook_checker = getattr(structured_speech_cog, "is_structured_webhook_id", None)
-        if callable(webhook_checker) and webhook_checker(event.user_id) is True:
+        if self._is_structured_webhook(event.user_id):
             return web.json_response({"status": "ignored_structured_webhook"})
 
-        qo = UpdateUserActivityQo(
-            user_id=event.user_id,
-            thread_id=event.thread_id,
-            change=1 if event.event_type == "message_created" else -1,
-        )
+        # 已处理过的事件直接确认，转发端重试不会重复增减计数。
+        event_key = (event.message_id, event.event_type)
         try:
-            if event.event_type == "message_created":
-                # 创建事件交由服务层增加用户活动计数。
-                await self.voting_cog.logic.handle_message_creation(qo)
+            (is_new,) = await self.deduplicator.reserve([event_key])
+        except Exception:
+            logger.exception("Failed to check message %s for duplicates.", event.message_id)
+            return web.json_response({"error": "event processing failed"}, status=500)
+        if not is_new:
+            return web.json_response({"status": "duplicate"})
+
+        # 队列饱和时撤销预留，转发端按 Retry-After 重试。
+        if not self.ingest_queue.offer([event]):
+            self.deduplicator.release([event_key])
+            return self._queue_full_response({"error": "ingestion queue is full"})
+        return web.json_response({"status": "accepted"}, status=202)
+
+    async def _handle_message_event_batch(self, request: web.Request) -> web.Response:
+        """验证一批跨 Bot 消息事件并整体入队，逐条返回接收状态。"""
+        # 在解析请求体前完成身份验证。
+        if not self._is_authorized(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        if request.content_type != "application/json":
+            return web.json_response({"error": "content type must be JSON"}, status=400)
+
+        # 请求体必须是非空且不超过批量上限的事件数组。
+        try:
+            payload = await request.json()
+        except (ValueError, web.HTTPException) as exc:
+            return web.json_response({"error": str(exc)}, status=400)
+        if not isinstance(payload, list) or not payload:
+            return web.json_response(
+                {"error": "request body must be a non-empty JSON array"}, status=400
+            )
+        if len(payload) > MAX_BATCH_EVENTS:
+            return web.json_response(
+                {"error": f"batch must not exceed {MAX_BATCH_EVENTS} events"}, status=413
+            )
+
+        # 逐条校验事件，单条无效不影响同批其他事件。
+        results: list[dict[str, object]] = []
+        accepted: list[tuple[dict[str, object], MessageEvent]] = []
+        for index, item in enumerate(payload):
+            result: dict[str, object] = {"index": index}
+            results.append(result)
+            try:
+                event = MessageEvent.from_payload(item)
+            except (ValueError, TypeError) as exc:
+                result.update(status="invalid", error=str(exc))
+                continue
+            result["message_id"] = str(event.message_id)
+            if not self._matches_config(event):
+                result.update(
+                    status="rejected",
+                    error="guild_id or forum_id does not match configuration",
+                )
+            elif self._is_structured_webhook(event.user_id):
+                result["status"] = "ignored_structured_webhook"
             else:
-                # 删除事件由服务层统一处理计数、资格和跨表撤票。
-                details_to_update = await self.voting_cog.logic.handle_message_deletion(qo)
-                try:
-                    await self._refresh_vote_panels(event.thread_id, details_to_update)
-                except Exception:
-                    # 数据事务已经成功时，面板刷新失败不改变接口结果。
-                    logger.exception(
-                        "Message %s was processed, but vote panel refresh failed.",
-                        event.message_id,
+                accepted.append((result, event))
+
+        # 已处理过的事件（包括同批内重复出现的事件）直接确认为重复。
+        if accepted:
+            try:
+                reserved = await self.deduplicator.reserve(
+                    [(event.message_id, event.event_type) for _, event in accepted]
+                )
+            except Exception:
+                logger.exception("Failed to check a batch of message events for duplicates.")
+                for result, _ in accepted:
+                    result["status"] = "failed"
+                return web.json_response(
+                    {"error": "event processing failed", "results": results}, status=500
+                )
+            for (result, _), is_new in zip(accepted, reserved):
+                if not is_new:
+                    result["status"] = "duplicate"
+            accepted = [item for item, is_new in zip(accepted, reserved) if is_new]
+        if not accepted:
+            return web.json_response({"results": results})
+
+        # 整批入队，队列剩余容量不足时整批拒绝，避免转发端逐条拆分重试。
+        event_keys = [(event.message_id, event.event_type) for _, event in accepted]
+        if not self.ingest_queue.offer([event for _, event in accepted]):
+            self.deduplicator.release(event_keys)
+            for result, _ in accepted:
+                result["status"] = "queue_full"
+            return self._queue_full_response(
+                {"error": "ingestion queue is full", "results": results}
+            )
+        for result, _ in accepted:
+            result["status"] = "accepted"
+        return web.json_response({"results": results}, status=202)
+
+    async def _process_event_batch(self, events: list[MessageEvent]) -> None:
+        """由队列工作协程调用：在单个事务中写入一批事件，并按帖子刷新受影响的面板。"""
+        # 全部计数变化由服务层按 (用户, 帖子) 合并后在同一事务中写库，失败时由队列重试。
+        qos = [
+            UpdateUserActivityQo(
+                user_id=event.user_id,
+                thread_id=event.thread_id,
+                change=1 if event.event_type == "message_created" else -1,
+            )
+            for event in events
+        ]
+        event_keys = [(event.message_id, event.event_type) for event in events]
+        details_by_thread = await self.voting_cog.logic.handle_message_event_batch(qos, event_keys)
+
+        # 每个受影响的帖子只刷新一次面板，刷新失败不会触发重试以免重复计数。
+        refresh_results = await asyncio.gather(
+            *(
+                self._refresh_vote_panels(thread_id, details)
+                for thread_id, details in details_by_thread.items()
+            ),
+            return_exceptions=True,
+        )
+        for thread_id, refresh_result in zip(details_by_thread, refresh_results):
+            if isinstance(refresh_result, BaseException):
+                logger.error(
+                    "Events in thread %s were processed, but vote panel refresh failed.",
+                    thread_id,
+                    exc_info=(type(refresh_result), refresh_result, refresh_result.__traceback__),
+                )
+
+    async def _save_dropped_events(self, events: list[MessageEvent]) -> None:
+        """
+        保存重试耗尽或停止时未处理完的事件，下次启动时重新处理。
+
+        这些事件已向转发端返回 202，转发端不会重发；保存失败（通常是数据库本身不可用）时
+        事件只能写入日志，并撤销去重预留，使转发端或人工重发时能被重新处理。
+        """
+        event_keys = [(event.message_id, event.event_type) for event in events]
+        try:
+            await self.voting_cog.logic.save_dropped_message_events(
+                [
+                    DroppedMessageEvent(
+                        message_id=event.message_id,
+                        event_type=event.event_type,
+                        guild_id=event.guild_id,
+                        forum_id=event.forum_id,
+                        thread_id=event.thread_id,
+                        user_id=event.user_id,
                     )
+                    for event in events
+                ]
+            )
         except Exception:
-            # 业务处理失败时返回明确错误，但不在接收端自动重试。
             logger.exception(
-                "Failed to process %s for message %s in thread %s.",
-                event.event_type,
-                event.message_id,
-                event.thread_id,
+                "Failed to save %s dropped message events; they are lost: %s",
+                len(events),
+                events,
             )
-            return web.json_response({"error": "event processing failed"}, status=500)
+            self.deduplicator.release(event_keys)
+            return
+        logger.warning(
+            "Saved %s unprocessed message events; they will be replayed on the next startup.",
+            len(events),
+        )
 
-        # 所有数据库逻辑完成后确认事件已处理。
-        return web.json_response({"status": "processed"})
+    async def _replay_dropped_events(self) -> None:
+        """按丢弃顺序重新处理已保存的事件，处理成功后删除；已处理过的事件只删除不计数。"""
+        while True:
+            try:
+                dropped = await self.voting_cog.logic.get_dropped_message_events(MAX_BATCH_EVENTS)
+            except Exception:
+                logger.exception("Failed to load dropped message events for replay.")
+                return
+            if not dropped:
+                return
+
+            events = [
+                MessageEvent(
+                    event_type=cast(MessageEventType, row.event_type),
+                    message_id=row.message_id,
+                    guild_id=row.guild_id,
+                    forum_id=row.forum_id,
+                    thread_id=row.thread_id,
+                    user_id=row.user_id,
+                )
+                for row in dropped
+            ]
+            event_keys = [(event.message_id, event.event_type) for event in events]
+            try:
+                # 停止时被取消的批次可能已在取消前提交，去重检查避免重复计数。
+                reserved = await self.deduplicator.reserve(event_keys)
+            except Exception:
+                logger.exception("Failed to check dropped message events for duplicates.")
+                return
+            new_events = [event for event, is_new in zip(events, reserved) if is_new]
+            try:
+                if new_events:
+                    await self._process_event_batch(new_events)
+            except Exception:
+                # 保留这些事件，下次启动时再重放。
+                self.deduplicator.release(
+                    [(event.message_id, event.event_type) for event in new_events]
+                )
+                logger.exception("Failed to replay %s dropped message events.", len(events))
+                return
+            try:
+                await self.voting_cog.logic.delete_dropped_message_events(event_keys)
+            except Exception:
+                # 已处理的事件保留了去重记录，下次重放时只会被删除。
+                logger.exception("Failed to delete %s replayed message events.", len(events))
+                return
+            logger.info("Replayed %s dropped message events.", len(new_events))
 
     async def _refresh_vote_panel(
         self,
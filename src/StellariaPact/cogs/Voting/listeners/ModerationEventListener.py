@@ -10,6 +10,7 @@ from StellariaPact.cogs.Voting.views import VoteEmbedBuilder, VoteView, VotingCh
 from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
 from StellariaPact.dto import ProposalDto
 from StellariaPact.share import DiscordUtils, StellariaPactBot, TimeUtils, UnitOfWork
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
@@ -219,6 +220,7 @@ class ModerationEventListener(commands.Cog):
                 session_dto.id, message.id
             )
             await uow.commit()
+        self.bot.deadline_scheduler.schedule(DeadlineKind.VOTE_SESSION, session_dto.id, end_time)
 
         initial_vote_details.context_message_id = message.id
         logger.debug(f"成功为提案 {proposal_dto.id} 创建了核心投票会话 {session_dto.id}")
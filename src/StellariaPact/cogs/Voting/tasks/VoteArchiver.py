@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from discord.ext import commands, tasks
+
+from StellariaPact.share import StellariaPactBot, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+
+class VoteArchiver(commands.Cog):
+    """
+    定期把结束超过宽限期的投票会话及其投票、选项、镜像消息移入归档表，
+    让热表只保留进行中和近期结束的投票；随后清理已结束提案帖中不再需要的消息索引。
+    """
+
+    def __init__(self, bot: StellariaPactBot):
+        self.bot = bot
+        archive_config = bot.config.get("vote_archive", {})
+        self.enabled: bool = archive_config.get("enabled", True)
+        self.grace_period = timedelta(days=float(archive_config.get("grace_period_days", 30)))
+        self.batch_size = max(1, int(archive_config.get("batch_size", 200)))
+
+        if self.enabled:
+            self.archive_closed_votes.change_interval(
+                hours=float(archive_config.get("interval_hours", 6))
+            )
+            self.archive_closed_votes.start()
+        else:
+            logger.warning("投票归档功能未启用。")
+
+    def cog_unload(self):
+        if self.archive_closed_votes.is_running():
+            self.archive_closed_votes.cancel()
+
+    @tasks.loop(hours=6)
+    async def archive_closed_votes(self):
+        """
+        按批归档已过宽限期的投票会话，每批在独立事务中提交。
+        """
+        try:
+            total = await self.run_once()
+            if total:
+                logger.info(f"本轮共归档 {total} 个已结束的投票会话。")
+        except Exception as e:
+            logger.error(f"归档已结束的投票会话时出错: {e}", exc_info=True)
+
+        try:
+            pruned = await self.prune_message_index()
+            if pruned:
+                logger.info(f"本轮共清理 {pruned} 条已结束帖子的消息索引。")
+        except Exception as e:
+            logger.error(f"清理已结束帖子的消息索引时出错: {e}", exc_info=True)
+
+    async def run_once(self) -> int:
+        """执行一轮归档，返回归档的会话数量。"""
+        now = datetime.now(timezone.utc)
+        cutoff = now - self.grace_period
+        total = 0
+        while True:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                session_ids = await uow.vote_archive.get_archivable_session_ids(
+                    cutoff, self.batch_size
+                )
+                if not session_ids:
+                    break
+                total += await uow.vote_archive.archive_sessions(session_ids, now)
+            if len(session_ids) < self.batch_size:
+                break
+            # 批次之间让出事件循环，避免长时间占用数据库写锁
+            await asyncio.sleep(0)
+        return total
+
+    async def prune_message_index(self) -> int:
+        """
+        删除已结束提案帖中的消息索引，返回删除的行数。
+
+        帖子内仍有未归档的投票会话时，会话可能被重新开启，索引需要继续保留。
+        """
+        total = 0
+        while True:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                thread_ids = await uow.counted_message.get_prunable_thread_ids(self.batch_size)
+                if not thread_ids:
+                    break
+                total += await uow.counted_message.delete_threads(thread_ids)
+            if len(thread_ids) < self.batch_size:
+                break
+            await asyncio.sleep(0)
+        return total
+
+    @archive_closed_votes.before_loop
+    async def before_archive_closed_votes(self):
+        await self.bot.wait_until_ready()
+        # 增加随机延迟以错开任务启动时间
+        await asyncio.sleep(random.randint(0, 60))
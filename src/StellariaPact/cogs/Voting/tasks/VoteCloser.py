@@ -1,63 +1,119 @@
 import asyncio
 import logging
-import random
+from datetime import datetime
 
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from StellariaPact.dto.vote_session import VoteDetailDto
 from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
 from StellariaPact.dto import VoteSessionDto
 from StellariaPact.share import StellariaPactBot, UnitOfWork
+from StellariaPact.share.enums import DeadlineKind
 
 logger = logging.getLogger(__name__)
 
 
 class VoteCloser(commands.Cog):
+    """
+    投票到期结算。
+
+    投票的结束时间登记在截止时间调度器中，到期时才查询并结算，空闲时不访问数据库。
+
+    结算分两步进行：先以一条 `UPDATE ... RETURNING` 将全部到期会话认领为 2-结算中，
+    再以有限并发计票，计票成功的会话批量写回 0-已结束后分派事件。
+    认领条件保证每个会话只被结算一次；重启前未写回结果的会话会在下次结算时重新计票。
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
     def __init__(self, bot: StellariaPactBot):
         self.bot = bot
         self.logic = VotingLogic(bot)
-        self.close_expired_votes.start()
+        closer_config = getattr(bot, "config", {}).get("vote_closer", {})
+        self.max_concurrency = max(
+            1, int(closer_config.get("max_concurrency", self.DEFAULT_MAX_CONCURRENCY))
+        )
+        self._lock = asyncio.Lock()
+        self.bot.deadline_scheduler.register(
+            DeadlineKind.VOTE_SESSION, self.close_expired_votes, self.load_deadlines
+        )
 
     def cog_unload(self):
-        self.close_expired_votes.cancel()
+        self.bot.deadline_scheduler.unregister(DeadlineKind.VOTE_SESSION)
+
+    async def load_deadlines(self) -> list[tuple[int, datetime]]:
+        """读取全部尚未结算完成的投票的结束时间。"""
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            return await uow.vote_session.get_pending_deadlines()
 
-    @tasks.loop(minutes=1)
-    async def close_expired_votes(self):
+    async def close_expired_votes(self, session_ids: list[int] | None = None):
         """
-        每分钟运行一次, 获取并处理已到期且未处理的投票会话
+        认领并结算全部已到期的投票会话。
+
+        由截止时间调度器在任一投票到期时调用；为同时补上错过的到期投票，
+        会处理全部已到期的会话，而不仅是 `session_ids` 中的会话。
         """
-        # logger.debug("开始检查已到期的投票...")
-        try:
-            # 获取所有过期且未处理的会话
-            async with UnitOfWork(self.bot.db_handler) as uow:
-                expired_sessions = await uow.vote_session.get_expired_sessions()
+        await self.bot.wait_until_ready()
+        # 同一时间只允许一轮结算，遗留的结算中会话才能安全地视为中断
+        async with self._lock:
+            try:
+                async with UnitOfWork(self.bot.db_handler) as uow:
+                    interrupted = await uow.vote_session.get_closing_sessions()
+                    claimed = await uow.vote_session.claim_expired_sessions()
+            except Exception as e:
+                logger.error(f"认领到期投票时发生严重错误: {e}", exc_info=True)
+                return
 
-            if not expired_sessions:
-                # logger.debug("没有发现已到期的投票。")
+            if interrupted:
+                logger.warning(f"重新结算 {len(interrupted)} 个上次中断的投票会话。")
+            sessions = [*interrupted, *claimed]
+            if not sessions:
                 return
 
-            for session_dto in expired_sessions:
-                await self._process_session(session_dto)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        except Exception as e:
-            logger.error(f"获取到期投票列表时发生严重错误: {e}", exc_info=True)
+            async def tally(session_dto: VoteSessionDto) -> VoteDetailDto | None:
+                async with semaphore:
+                    return await self._tally_session(session_dto)
+
+            results = await asyncio.gather(*(tally(s) for s in sessions))
+            finished = [(s, r) for s, r in zip(sessions, results) if r is not None]
+            failed_ids = [s.id for s, r in zip(sessions, results) if r is None]
+
+            try:
+                async with UnitOfWork(self.bot.db_handler) as uow:
+                    finished_ids = set(
+                        await uow.vote_session.finish_closing_sessions([s.id for s, _ in finished])
+                    )
+                    # 计票失败的会话恢复为进行中，由调度器的安全扫描重新触发
+                    await uow.vote_session.release_closing_sessions(failed_ids)
+            except Exception as e:
+                logger.error(f"写回投票结算结果时发生严重错误: {e}", exc_info=True)
+                return
 
-    async def _process_session(self, session_dto: VoteSessionDto):
+            # 只为本轮实际改为已结束的会话分派事件，期间被其他途径改变状态的会话跳过
+            skipped = len(finished) - len(finished_ids)
+            if skipped:
+                logger.warning(f"{skipped} 个投票会话在结算期间状态已改变，不分派结束事件。")
+            for session_dto, result_dto in finished:
+                if session_dto.id in finished_ids:
+                    self._dispatch_vote_event(
+                        session_dto.model_copy(update={"status": 0}), result_dto
+                    )
+            logger.info(f"已结算 {len(finished_ids)} 个到期投票，{len(failed_ids)} 个失败。")
+
+    async def _tally_session(self, session_dto: VoteSessionDto) -> VoteDetailDto | None:
         """
-        处理单个投票会话
+        为单个结算中的投票会话计票，失败时返回 None
         """
         try:
-            logger.debug(f"正在处理已到期的投票会话: {session_dto.id}")
-            # 计票并关闭
-            result_dto = await self.logic.tally_and_close_session(session_dto)
-
-            if result_dto:
-                # 根据会话类型和状态分派事件
-                await self._dispatch_vote_event(session_dto, result_dto)
+            logger.debug(f"正在结算已到期的投票会话: {session_dto.id}")
+            return await self.logic.tally_closing_session(session_dto)
         except Exception as e:
             logger.error(f"处理投票会话 {session_dto.id} 时出错: {e}", exc_info=True)
+            return None
 
-    async def _dispatch_vote_event(self, session_dto: VoteSessionDto, result_dto: VoteDetailDto):
+    def _dispatch_vote_event(self, session_dto: VoteSessionDto, result_dto: VoteDetailDto):
         """
         根据投票会话的类型和状态分派相应的事件
         """
@@ -68,9 +124,3 @@ class VoteCloser(commands.Cog):
 
         # 派发更新事件使投票面板（帖子内、频道镜像等）同步其已结束的状态并禁用按钮
         self.bot.dispatch("vote_details_updated", result_dto)
-
-    @close_expired_votes.before_loop
-    async def before_close_expired_votes(self):
-        await self.bot.wait_until_ready()
-        # 增加随机延迟以错开任务启动时间
-        await asyncio.sleep(random.randint(0, 30))
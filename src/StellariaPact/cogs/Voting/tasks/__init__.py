@@ -1,5 +1,7 @@
+from .VoteArchiver import VoteArchiver
 from .VoteCloser import VoteCloser
 
 __all__ = [
     "VoteCloser",
+    "VoteArchiver",
 ]
@@ -0,0 +1,145 @@
+"""
+有效发言判定的黄金语料与性能基准。
+
+先用 `GOLDEN_CORPUS` 校验 `MessageValidity` 的判定结果，再按语料类别对比
+逐条正则替换的旧实现与当前单次匹配实现的耗时。
+
+用法:
+    uv run python -m StellariaPact.devtools.MessageValidityBenchmark [--rounds N]
+
+修改有效发言规则时，需要同步更新语料中的期望结果，并提升 `SPEC_VERSION`。
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable
+
+import regex
+
+from StellariaPact.cogs.Voting.MessageValidity import SPEC_VERSION, MessageValidity
+
+GOLDEN_CORPUS: dict[str, list[tuple[str, bool]]] = {
+    "cjk": [
+        ("支持这个提案", True),
+        ("我觉得可以", True),
+        ("同意同意", False),
+        ("  同 意 同 意  ", False),
+        ("同 意 同 意 ！", True),
+        ("这是一条比较长的讨论发言，用来说明理由和补充细节。" * 4, True),
+        ("ありがとうございます", True),
+        ("좋은 제안입니다", True),
+    ],
+    "emoji": [
+        ("😀😀😀😀😀", False),
+        ("👍🏻👍🏼👍🏽👍🏾👍🏿", False),
+        ("❤️❤️❤️❤️❤️", False),
+        ("<:stellaria:123456789012345678>", False),
+        ("<a:dance:123456789012345678> <:ok:1>", False),
+        ("🇨🇳🇺🇸🇯🇵", False),
+        ("★☆★☆★", False),
+        ("👨‍👩‍👧‍👦👨‍👩‍👧‍👦", False),
+    ],
+    "mixed": [
+        ("同意👍👍👍", True),
+        ("+1 😀😀😀", True),
+        ("<:ok:123> 支持支持", True),
+        ("hello", True),
+        ("ok 👍", False),
+        ("12345", False),
+        ("1234a", True),
+        ("#*#*#", False),
+        ("<:not closed:12", True),
+    ],
+    "short": [
+        ("", False),
+        ("    ", False),
+        ("好", False),
+        ("支持！", False),
+        ("abcd", False),
+        ("\n\t好的\n\t", False),
+    ],
+}
+"""按类别分组的 (消息文本, 是否有效发言) 语料"""
+
+_LEGACY_EMOJI_PATTERN = regex.compile(
+    r"^(<a?:\w+:\d+>|\p{Emoji_Presentation}|\p{Emoji_Modifier_Base}|"
+    r"\p{Emoji_Component}|\p{So}|\p{Cn})+$"
+)
+
+
+def legacy_is_valid_content(content: str) -> bool:
+    """旧实现：先替换掉全部空白，再匹配纯表情并判断长度。作为基准对照与等价性参照。"""
+    content = content.strip()
+    if not content:
+        return False
+    content_without_whitespace = regex.sub(r"\s", "", content)
+    if _LEGACY_EMOJI_PATTERN.match(content_without_whitespace):
+        return False
+    return len(content_without_whitespace) > 4
+
+
+def verify_corpus() -> list[str]:
+    """返回与期望不符的语料描述；全部通过时为空列表。"""
+    failures = []
+    for category, samples in GOLDEN_CORPUS.items():
+        contents = [content for content, _ in samples]
+        batch = MessageValidity.validate_contents(contents)
+        for (content, expected), batch_result in zip(samples, batch):
+            single = MessageValidity.is_valid_content(content)
+            if single != expected or batch_result != expected:
+                failures.append(f"[{category}] {content!r}: 期望 {expected}, 实际 {single}")
+    return failures
+
+
+def _time_per_message(validator: Callable[[str], bool], contents: list[str], rounds: int) -> float:
+    """返回每条消息的平均耗时（微秒）。"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for content in contents:
+            validator(content)
+    return (time.perf_counter() - start) / (rounds * len(contents)) * 1_000_000
+
+
+def _time_batch(contents: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        MessageValidity.validate_contents(contents)
+    return (time.perf_counter() - start) / (rounds * len(contents)) * 1_000_000
+
+
+def run_benchmark(rounds: int) -> list[tuple[str, float, float, float]]:
+    """按类别返回 (类别, 旧实现, 单条判定, 批量判定) 的每条平均耗时（微秒）。"""
+    results = []
+    for category, samples in GOLDEN_CORPUS.items():
+        contents = [content for content, _ in samples]
+        results.append(
+            (
+                category,
+                _time_per_message(legacy_is_valid_content, contents, rounds),
+                _time_per_message(MessageValidity.is_valid_content, contents, rounds),
+                _time_batch(contents, rounds),
+            )
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="校验并基准测试有效发言判定。")
+    parser.add_argument("--rounds", type=int, default=2000, help="每个类别重复执行的轮数")
+    args = parser.parse_args()
+
+    failures = verify_corpus()
+    for failure in failures:
+        print(f"[不符] {failure}")
+    if failures:
+        sys.exit(1)
+
+    print(f"规则版本 {SPEC_VERSION}，黄金语料全部通过。每条消息平均耗时（微秒）:")
+    print(f"{'类别':<8}{'旧实现':>10}{'单条':>10}{'批量':>10}")
+    for category, legacy, single, batch in run_benchmark(args.rounds):
+        print(f"{category:<8}{legacy:>10.2f}{single:>10.2f}{batch:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
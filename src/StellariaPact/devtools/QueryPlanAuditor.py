@@ -0,0 +1,1102 @@
+"""
+仓储层查询计划审计工具。
+
+在填充了种子数据的内存数据库上逐个执行 `repository/` 中所有仓储类的公开方法，
+捕获它们实际发出的 SQL，再用 `EXPLAIN QUERY PLAN` 检查是否存在全表扫描。
+
+用法:
+    uv run python -m StellariaPact.devtools.QueryPlanAuditor [--verbose]
+
+新增仓储方法时，需要在 `SCENARIOS` 中登记一个调用场景；
+确实无法避免的扫描需要连同原因登记到 `ALLOWED_SCANS`。
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import pkgutil
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import StellariaPact.repository as repository_package
+from StellariaPact.models import (
+    ActivityBackfillCheckpoint,
+    Announcement,
+    AnnouncementChannelMonitor,
+    ConfirmationSession,
+    CountedMessage,
+    DroppedMessageEvent,
+    GlobalProposalPunishment,
+    Objection,
+    OperationLog,
+    Proposal,
+    ProposalIntake,
+    PunishmentRecord,
+    StructuredSpeechMessage,
+    StructuredSpeechMode,
+    StructuredSpeechWebhook,
+    UserActivity,
+    UserVote,
+    VoteMessageMirror,
+    VoteOption,
+    VoteSession,
+)
+from StellariaPact.qo.announcement import CreateAnnouncementQo
+from StellariaPact.qo.confirmation_session import CreateConfirmationSessionQo
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.qo.user_vote import RecordVoteQo
+from StellariaPact.qo.vote_session import AdjustVoteTimeQo, CreateVoteSessionQo
+from StellariaPact.repository import (
+    ActivityBackfillRepository,
+    AnnouncementMonitorRepository,
+    AnnouncementRepository,
+    ConfirmationSessionRepository,
+    CountedMessageRepository,
+    DroppedMessageEventRepository,
+    GlobalProposalPunishmentRepository,
+    IntakeRepository,
+    OperationLogRepository,
+    ProcessedMessageEventRepository,
+    ProposalRepository,
+    UserActivityRepository,
+    UserVoteRepository,
+    VoteArchiveRepository,
+    VoteOptionRepository,
+    VoteSessionRepository,
+)
+from StellariaPact.repository.PunishmentRecordRepository import PunishmentRecordRepository
+from StellariaPact.repository.StructuredSpeechMessageRepository import (
+    StructuredSpeechMessageRepository,
+)
+from StellariaPact.repository.StructuredSpeechModeRepository import (
+    StructuredSpeechModeRepository,
+)
+from StellariaPact.repository.StructuredSpeechWebhookRepository import (
+    StructuredSpeechWebhookRepository,
+)
+from StellariaPact.share.enums import (
+    IntakeStatus,
+    ObjectionResolutionType,
+    PunishmentType,
+    VoteOptionStatus,
+    VoteSessionType,
+)
+
+Scenario = Callable[[AsyncSession], Awaitable[Any]]
+"""调用一个仓储方法的场景，接收独立的数据库会话"""
+
+# --- 种子数据中使用的固定 ID ---
+GUILD_ID = 1
+THREAD_ID = 100
+REVIEW_THREAD_ID = 110
+SECOND_REVIEW_THREAD_ID = 111
+USER_ID = 200
+MODERATOR_ID = 300
+CHANNEL_ID = 500
+CONFIRMATION_MESSAGE_ID = 600
+SUPPORT_MESSAGE_ID = 601
+INTAKE_VOTING_MESSAGE_ID = 610
+VOTE_MESSAGE_ID = 620
+VOTING_CHANNEL_MESSAGE_ID = 621
+CLOSED_VOTE_MESSAGE_ID = 623
+MIRROR_MESSAGE_ID = 630
+SPEECH_MESSAGE_ID = 640
+REMOTE_EVENT_MESSAGE_ID = 650
+COUNTED_MESSAGE_ID = 660
+
+ALLOWED_SCANS: dict[tuple[str, str], str] = {
+    (
+        "StructuredSpeechMessageRepository.get_webhook_ids",
+        "structured_speech_message",
+    ): "启动时一次性读取全部 Webhook ID，按覆盖索引顺序扫描",
+    (
+        "StructuredSpeechWebhookRepository.get_all",
+        "structured_speech_webhook",
+    ): "启动时一次性读取全部论坛的 Webhook ID，每个论坛仅一行",
+    (
+        "DroppedMessageEventRepository.get_events",
+        "dropped_message_event",
+    ): "启动时按丢弃时间索引顺序读取待重放事件，读完即删除，表通常为空",
+    (
+        "ProposalRepository.get_all_proposals",
+        "proposal",
+    ): "启动时一次性预热提案帖注册表，之后由提案变更保持同步",
+    (
+        "UserActivityRepository.get_active_mutes",
+        "user_activity",
+    ): "启动时一次性加载全部有效禁言到处罚状态，之后由事件保持同步",
+}
+"""已知且可接受的扫描: {(仓储方法, 表名): 原因}"""
+
+_SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+
+
+@dataclass
+class QueryPlanFinding:
+    """一条被判定为全表扫描的查询计划。"""
+
+    method: str
+    table: str
+    detail: str
+    sql: str
+    allowed_reason: str | None = None
+
+
+@dataclass
+class QueryPlanReport:
+    """一次审计的结果。"""
+
+    findings: list[QueryPlanFinding] = field(default_factory=list)
+    uncovered_methods: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+    plans: dict[str, list[tuple[str, list[str]]]] = field(default_factory=dict)
+
+    @property
+    def unexpected_findings(self) -> list[QueryPlanFinding]:
+        """未登记在 `ALLOWED_SCANS` 中的扫描。"""
+        return [finding for finding in self.findings if finding.allowed_reason is None]
+
+    @property
+    def ok(self) -> bool:
+        return not (self.unexpected_findings or self.uncovered_methods or self.errors)
+
+
+async def _record_vote(session: AsyncSession) -> Any:
+    vote_session = await VoteSessionRepository(session).get_vote_session_with_details(
+        VOTE_MESSAGE_ID
+    )
+    assert vote_session is not None
+    qo = RecordVoteQo(
+        user_id=USER_ID + 1,
+        message_id=VOTE_MESSAGE_ID,
+        thread_id=THREAD_ID,
+        choice=1,
+    )
+    await UserVoteRepository(session).record_vote(qo, vote_session)
+    await session.flush()
+
+
+async def _delete_vote(session: AsyncSession) -> Any:
+    vote_session = await VoteSessionRepository(session).get_vote_session_with_details(
+        VOTE_MESSAGE_ID
+    )
+    assert vote_session is not None
+    await UserVoteRepository(session).delete_vote(USER_ID, 0, 1, vote_session)
+    await session.flush()
+
+
+async def _load_confirmation(session: AsyncSession, message_id: int) -> ConfirmationSession:
+    confirmation = await ConfirmationSessionRepository(
+        session
+    ).get_confirmation_session_by_message_id(message_id)
+    assert confirmation is not None
+    return confirmation
+
+
+async def _add_confirmation(session: AsyncSession) -> Any:
+    confirmation = await _load_confirmation(session, CONFIRMATION_MESSAGE_ID)
+    await ConfirmationSessionRepository(session).add_confirmation(
+        confirmation, "council", MODERATOR_ID
+    )
+
+
+async def _cancel_confirmation(session: AsyncSession) -> Any:
+    confirmation = await _load_confirmation(session, CONFIRMATION_MESSAGE_ID)
+    await ConfirmationSessionRepository(session).cancel_confirmation_session(
+        confirmation, MODERATOR_ID
+    )
+
+
+async def _add_objection_supporter(session: AsyncSession) -> Any:
+    confirmation = await _load_confirmation(session, SUPPORT_MESSAGE_ID)
+    await ConfirmationSessionRepository(session).add_objection_supporter(
+        confirmation, MODERATOR_ID
+    )
+    await session.flush()
+
+
+async def _cancel_objection_support(session: AsyncSession) -> Any:
+    confirmation = await _load_confirmation(session, SUPPORT_MESSAGE_ID)
+    await ConfirmationSessionRepository(session).cancel_objection_support(confirmation)
+    await session.flush()
+
+
+async def _remove_objection_supporter(session: AsyncSession) -> Any:
+    confirmation = await _load_confirmation(session, SUPPORT_MESSAGE_ID)
+    await ConfirmationSessionRepository(session).remove_objection_supporter(confirmation, USER_ID)
+    await session.flush()
+
+
+async def _update_intake(session: AsyncSession) -> Any:
+    repository = IntakeRepository(session)
+    intake = await repository.get_intake_by_id(1)
+    assert intake is not None
+    intake.required_votes += 1
+    await repository.update_intake(intake)
+
+
+async def _add_proposal(session: AsyncSession) -> Any:
+    await ProposalRepository(session).add_proposal(
+        Proposal(discussion_thread_id=THREAD_ID + 2, proposer_id=USER_ID, title="新增提案")
+    )
+
+
+async def _update_proposal(session: AsyncSession) -> Any:
+    repository = ProposalRepository(session)
+    proposal = await repository.get_proposal_by_id(1)
+    assert proposal is not None
+    proposal.title = "修改后的标题"
+    await repository.update_proposal(proposal)
+
+
+async def _save_speech_mode(session: AsyncSession) -> Any:
+    repository = StructuredSpeechModeRepository(session)
+    mode = await repository.get(THREAD_ID)
+    assert mode is not None
+    mode.interval_seconds += 1
+    await repository.save(mode)
+
+
+async def _save_backfill_checkpoint(session: AsyncSession) -> Any:
+    repository = ActivityBackfillRepository(session)
+    checkpoint = await repository.get_checkpoint(THREAD_ID)
+    assert checkpoint is not None
+    checkpoint.scanned_messages += 1
+    await repository.save_checkpoint(checkpoint)
+
+
+async def _adjust_vote_time(session: AsyncSession) -> Any:
+    await VoteSessionRepository(session).adjust_vote_time(
+        AdjustVoteTimeQo(message_id=VOTE_MESSAGE_ID, hours_to_adjust=1)
+    )
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    # --- ActivityBackfillRepository ---
+    "ActivityBackfillRepository.get_checkpoint": lambda s: ActivityBackfillRepository(
+        s
+    ).get_checkpoint(THREAD_ID),
+    "ActivityBackfillRepository.save_checkpoint": _save_backfill_checkpoint,
+    # --- AnnouncementMonitorRepository ---
+    "AnnouncementMonitorRepository.get_pending_reposts": lambda s: AnnouncementMonitorRepository(
+        s
+    ).get_pending_reposts(),
+    "AnnouncementMonitorRepository.get_repost_deadlines": lambda s: AnnouncementMonitorRepository(
+        s
+    ).get_repost_deadlines(),
+    "AnnouncementMonitorRepository.get_active_monitor_index": lambda s: (
+        AnnouncementMonitorRepository(s).get_active_monitor_index()
+    ),
+    "AnnouncementMonitorRepository.increment_message_counts": lambda s: (
+        AnnouncementMonitorRepository(s).increment_message_counts({1: 3, 2: 1})
+    ),
+    "AnnouncementMonitorRepository.create_monitors_for_announcement": lambda s: (
+        AnnouncementMonitorRepository(s).create_monitors_for_announcement(
+            1, [CHANNEL_ID + 1], 5, 60
+        )
+    ),
+    "AnnouncementMonitorRepository.delete_monitors_for_announcements": lambda s: (
+        AnnouncementMonitorRepository(s).delete_monitors_for_announcements([1, 2])
+    ),
+    # --- AnnouncementRepository ---
+    "AnnouncementRepository.create_announcement": lambda s: AnnouncementRepository(
+        s
+    ).create_announcement(
+        CreateAnnouncementQo(
+            discussion_thread_id=THREAD_ID + 1,
+            announcer_id=USER_ID,
+            title="公示",
+            content="内容",
+            end_time=_now() + timedelta(days=1),
+            auto_execute=False,
+        )
+    ),
+    "AnnouncementRepository.get_by_thread_id": lambda s: AnnouncementRepository(
+        s
+    ).get_by_thread_id(THREAD_ID),
+    "AnnouncementRepository.get_expired_announcements": lambda s: AnnouncementRepository(
+        s
+    ).get_expired_announcements(),
+    "AnnouncementRepository.get_active_deadlines": lambda s: AnnouncementRepository(
+        s
+    ).get_active_deadlines(),
+    "AnnouncementRepository.update_end_time": lambda s: AnnouncementRepository(s).update_end_time(
+        1, _now()
+    ),
+    "AnnouncementRepository.mark_announcements_as_finished": lambda s: AnnouncementRepository(
+        s
+    ).mark_announcements_as_finished([1, 2]),
+    # --- ConfirmationSessionRepository ---
+    "ConfirmationSessionRepository.create_confirmation_session": lambda s: (
+        ConfirmationSessionRepository(s).create_confirmation_session(
+            CreateConfirmationSessionQo(
+                context="proposal_execution",
+                target_id=2,
+                required_roles=["council"],
+                initiator_id=USER_ID,
+                initiator_role_keys=["council"],
+            )
+        )
+    ),
+    "ConfirmationSessionRepository.update_confirmation_session_message_id": lambda s: (
+        ConfirmationSessionRepository(s).update_confirmation_session_message_id(1, 699)
+    ),
+    "ConfirmationSessionRepository.get_confirmation_session_by_message_id": lambda s: (
+        ConfirmationSessionRepository(s).get_confirmation_session_by_message_id(
+            CONFIRMATION_MESSAGE_ID
+        )
+    ),
+    "ConfirmationSessionRepository.add_confirmation": _add_confirmation,
+    "ConfirmationSessionRepository.cancel_confirmation_session": _cancel_confirmation,
+    "ConfirmationSessionRepository.create_objection_support_session": lambda s: (
+        ConfirmationSessionRepository(s).create_objection_support_session(696, USER_ID, "理由")
+    ),
+    "ConfirmationSessionRepository.add_objection_supporter": _add_objection_supporter,
+    "ConfirmationSessionRepository.cancel_objection_support": _cancel_objection_support,
+    "ConfirmationSessionRepository.remove_objection_supporter": _remove_objection_supporter,
+    # --- CountedMessageRepository ---
+    "CountedMessageRepository.record_messages": lambda s: CountedMessageRepository(
+        s
+    ).record_messages([(COUNTED_MESSAGE_ID + 1, USER_ID, THREAD_ID)]),
+    "CountedMessageRepository.uncount_messages": lambda s: CountedMessageRepository(
+        s
+    ).uncount_messages([COUNTED_MESSAGE_ID]),
+    "CountedMessageRepository.uncount_unindexed_messages": lambda s: CountedMessageRepository(
+        s
+    ).uncount_unindexed_messages([(COUNTED_MESSAGE_ID + 2, USER_ID, THREAD_ID)]),
+    "CountedMessageRepository.get_prunable_thread_ids": lambda s: CountedMessageRepository(
+        s
+    ).get_prunable_thread_ids(200),
+    "CountedMessageRepository.delete_threads": lambda s: CountedMessageRepository(
+        s
+    ).delete_threads([THREAD_ID]),
+    # --- DroppedMessageEventRepository ---
+    "DroppedMessageEventRepository.add_events": lambda s: DroppedMessageEventRepository(
+        s
+    ).add_events(
+        [
+            DroppedMessageEvent(
+                message_id=REMOTE_EVENT_MESSAGE_ID + 1,
+                event_type="message_created",
+                guild_id=GUILD_ID,
+                forum_id=CHANNEL_ID,
+                thread_id=THREAD_ID,
+                user_id=USER_ID,
+            )
+        ]
+    ),
+    "DroppedMessageEventRepository.get_events": lambda s: DroppedMessageEventRepository(
+        s
+    ).get_events(500),
+    "DroppedMessageEventRepository.delete_events": lambda s: DroppedMessageEventRepository(
+        s
+    ).delete_events([(REMOTE_EVENT_MESSAGE_ID, "message_created")]),
+    # --- GlobalProposalPunishmentRepository ---
+    "GlobalProposalPunishmentRepository.get_active": lambda s: GlobalProposalPunishmentRepository(
+        s
+    ).get_active(USER_ID, PunishmentType.PERMANENT_VOTING),
+    "GlobalProposalPunishmentRepository.get_unresolved": lambda s: (
+        GlobalProposalPunishmentRepository(s).get_unresolved(
+            USER_ID, PunishmentType.PERMANENT_VOTING
+        )
+    ),
+    "GlobalProposalPunishmentRepository.is_restricted": lambda s: (
+        GlobalProposalPunishmentRepository(s).is_restricted(USER_ID + 1)
+    ),
+    "GlobalProposalPunishmentRepository.is_proposal_violation_restricted": lambda s: (
+        GlobalProposalPunishmentRepository(s).is_proposal_violation_restricted(USER_ID)
+    ),
+    "GlobalProposalPunishmentRepository.is_objection_creation_restricted": lambda s: (
+        GlobalProposalPunishmentRepository(s).is_objection_creation_restricted(USER_ID)
+    ),
+    "GlobalProposalPunishmentRepository.is_objection_support_restricted": lambda s: (
+        GlobalProposalPunishmentRepository(s).is_objection_support_restricted(USER_ID + 1)
+    ),
+    "GlobalProposalPunishmentRepository.create_punishment": lambda s: (
+        GlobalProposalPunishmentRepository(s).create_punishment(
+            target_user_id=USER_ID,
+            moderator_id=MODERATOR_ID,
+            origin_guild_id=GUILD_ID,
+            origin_channel_id=CHANNEL_ID,
+            punishment_type=PunishmentType.PROPOSAL_VIOLATION,
+            reason="理由",
+            expires_at=_now() + timedelta(days=1),
+        )
+    ),
+    "GlobalProposalPunishmentRepository.lift_punishment": lambda s: (
+        GlobalProposalPunishmentRepository(s).lift_punishment(
+            target_user_id=USER_ID,
+            punishment_type=PunishmentType.PERMANENT_VOTING,
+            lifted_by_id=MODERATOR_ID,
+            lift_reason="理由",
+        )
+    ),
+    "GlobalProposalPunishmentRepository.set_punishment_message_id": lambda s: (
+        GlobalProposalPunishmentRepository(s).set_punishment_message_id(1, 690)
+    ),
+    "GlobalProposalPunishmentRepository.set_resolution_message": lambda s: (
+        GlobalProposalPunishmentRepository(s).set_resolution_message(
+            1, guild_id=GUILD_ID, channel_id=CHANNEL_ID, message_id=691
+        )
+    ),
+    "GlobalProposalPunishmentRepository.get_all_active": lambda s: (
+        GlobalProposalPunishmentRepository(s).get_all_active()
+    ),
+    "GlobalProposalPunishmentRepository.get_active_by_type": lambda s: (
+        GlobalProposalPunishmentRepository(s).get_active_by_type(PunishmentType.PERMANENT_VOTING)
+    ),
+    "GlobalProposalPunishmentRepository.get_history": lambda s: GlobalProposalPunishmentRepository(
+        s
+    ).get_history(USER_ID),
+    "GlobalProposalPunishmentRepository.get_summary": lambda s: GlobalProposalPunishmentRepository(
+        s
+    ).get_summary(USER_ID),
+    # --- IntakeRepository ---
+    "IntakeRepository.create_intake": lambda s: IntakeRepository(s).create_intake(
+        ProposalIntake(
+            guild_id=GUILD_ID,
+            author_id=USER_ID,
+            title="草案",
+            reason="原因",
+            motion="动议",
+            implementation="方案",
+            executor="执行人",
+        )
+    ),
+    "IntakeRepository.get_intake_by_id": lambda s: IntakeRepository(s).get_intake_by_id(1),
+    "IntakeRepository.update_intake": _update_intake,
+    "IntakeRepository.get_all_pending_intakes": lambda s: IntakeRepository(
+        s
+    ).get_all_pending_intakes(),
+    "IntakeRepository.get_support_deadlines": lambda s: IntakeRepository(
+        s
+    ).get_support_deadlines(),
+    "IntakeRepository.get_intake_by_review_thread_id": lambda s: IntakeRepository(
+        s
+    ).get_intake_by_review_thread_id(REVIEW_THREAD_ID),
+    "IntakeRepository.get_intake_by_discussion_thread_id": lambda s: IntakeRepository(
+        s
+    ).get_intake_by_discussion_thread_id(THREAD_ID),
+    "IntakeRepository.mark_first_reviewed": lambda s: IntakeRepository(s).mark_first_reviewed(
+        REVIEW_THREAD_ID, MODERATOR_ID, "意见"
+    ),
+    "IntakeRepository.mark_second_reviewed": lambda s: IntakeRepository(s).mark_second_reviewed(
+        SECOND_REVIEW_THREAD_ID, MODERATOR_ID + 1, "意见", IntakeStatus.SUPPORT_COLLECTING
+    ),
+    "IntakeRepository.mark_reviewed": lambda s: IntakeRepository(s).mark_reviewed(
+        REVIEW_THREAD_ID, MODERATOR_ID, "意见", IntakeStatus.REJECTED
+    ),
+    "IntakeRepository.get_intake_by_voting_message_id": lambda s: IntakeRepository(
+        s
+    ).get_intake_by_voting_message_id(INTAKE_VOTING_MESSAGE_ID),
+    # --- OperationLogRepository ---
+    "OperationLogRepository.log_operation": lambda s: OperationLogRepository(s).log_operation(
+        MODERATOR_ID, "moderator", "管理员", 1, "edit", "proposal", 1, GUILD_ID
+    ),
+    "OperationLogRepository.query_by_target": lambda s: OperationLogRepository(s).query_by_target(
+        "proposal", 1
+    ),
+    # --- ProcessedMessageEventRepository ---
+    "ProcessedMessageEventRepository.record_events": lambda s: ProcessedMessageEventRepository(
+        s
+    ).record_events(
+        [
+            (REMOTE_EVENT_MESSAGE_ID, "message_created"),
+            (REMOTE_EVENT_MESSAGE_ID, "message_deleted"),
+        ],
+        _now(),
+    ),
+    "ProcessedMessageEventRepository.get_existing_keys": lambda s: ProcessedMessageEventRepository(
+        s
+    ).get_existing_keys([(REMOTE_EVENT_MESSAGE_ID, "message_created")]),
+    "ProcessedMessageEventRepository.get_recent_events": lambda s: ProcessedMessageEventRepository(
+        s
+    ).get_recent_events(_now() - timedelta(days=2), 1000),
+    "ProcessedMessageEventRepository.delete_expired": lambda s: ProcessedMessageEventRepository(
+        s
+    ).delete_expired(_now() - timedelta(days=2)),
+    # --- ProposalRepository ---
+    "ProposalRepository.create_proposal": lambda s: ProposalRepository(s).create_proposal(
+        THREAD_ID + 1, USER_ID, "提案"
+    ),
+    "ProposalRepository.add_proposal": _add_proposal,
+    "ProposalRepository.update_proposal": _update_proposal,
+    "ProposalRepository.update_proposal_status_by_thread_id": lambda s: ProposalRepository(
+        s
+    ).update_proposal_status_by_thread_id(THREAD_ID, 2),
+    "ProposalRepository.get_proposals_by_status": lambda s: ProposalRepository(
+        s
+    ).get_proposals_by_status(1),
+    "ProposalRepository.get_all_proposals": lambda s: ProposalRepository(s).get_all_proposals(),
+    "ProposalRepository.get_proposal_by_thread_id": lambda s: ProposalRepository(
+        s
+    ).get_proposal_by_thread_id(THREAD_ID),
+    "ProposalRepository.get_proposal_by_id": lambda s: ProposalRepository(s).get_proposal_by_id(1),
+    # --- PunishmentRecordRepository ---
+    "PunishmentRecordRepository.create_record": lambda s: PunishmentRecordRepository(
+        s
+    ).create_record(
+        guild_id=GUILD_ID,
+        thread_id=THREAD_ID,
+        target_user_id=USER_ID,
+        moderator_id=MODERATOR_ID,
+        reason="理由",
+        source_message_url=None,
+        voting_allowed=True,
+        mute_end_time=None,
+    ),
+    "PunishmentRecordRepository.get_summary": lambda s: PunishmentRecordRepository(s).get_summary(
+        thread_id=THREAD_ID, target_user_id=USER_ID
+    ),
+    # --- StructuredSpeechMessageRepository ---
+    "StructuredSpeechMessageRepository.get_webhook_ids": lambda s: (
+        StructuredSpeechMessageRepository(s).get_webhook_ids()
+    ),
+    "StructuredSpeechMessageRepository.get_original_user_id": lambda s: (
+        StructuredSpeechMessageRepository(s).get_original_user_id(SPEECH_MESSAGE_ID)
+    ),
+    "StructuredSpeechMessageRepository.get_last": lambda s: StructuredSpeechMessageRepository(
+        s
+    ).get_last(thread_id=THREAD_ID, user_id=USER_ID),
+    "StructuredSpeechMessageRepository.create": lambda s: StructuredSpeechMessageRepository(
+        s
+    ).create(
+        message_id=SPEECH_MESSAGE_ID + 1,
+        webhook_id=1,
+        guild_id=GUILD_ID,
+        thread_id=THREAD_ID,
+        user_id=USER_ID,
+        created_at=_now(),
+    ),
+    "StructuredSpeechMessageRepository.claim_deletions": lambda s: (
+        StructuredSpeechMessageRepository(s).claim_deletions(
+            message_ids=[SPEECH_MESSAGE_ID], deleted_at=_now()
+        )
+    ),
+    # --- StructuredSpeechModeRepository ---
+    "StructuredSpeechModeRepository.get": lambda s: StructuredSpeechModeRepository(s).get(
+        THREAD_ID
+    ),
+    "StructuredSpeechModeRepository.get_by_statuses": lambda s: StructuredSpeechModeRepository(
+        s
+    ).get_by_statuses("active", "paused"),
+    "StructuredSpeechModeRepository.save": _save_speech_mode,
+    # --- StructuredSpeechWebhookRepository ---
+    "StructuredSpeechWebhookRepository.get_all": lambda s: StructuredSpeechWebhookRepository(
+        s
+    ).get_all(),
+    "StructuredSpeechWebhookRepository.upsert": lambda s: StructuredSpeechWebhookRepository(
+        s
+    ).upsert(forum_id=CHANNEL_ID, webhook_id=651),
+    "StructuredSpeechWebhookRepository.delete": lambda s: StructuredSpeechWebhookRepository(
+        s
+    ).delete(forum_id=CHANNEL_ID, webhook_id=650),
+    # --- UserActivityRepository ---
+    "UserActivityRepository.get_user_activity": lambda s: UserActivityRepository(
+        s
+    ).get_user_activity(USER_ID, THREAD_ID),
+    "UserActivityRepository.get_active_mutes": lambda s: UserActivityRepository(
+        s
+    ).get_active_mutes(_now()),
+    "UserActivityRepository.get_thread_message_counts": lambda s: UserActivityRepository(
+        s
+    ).get_thread_message_counts(THREAD_ID),
+    "UserActivityRepository.update_user_activity": lambda s: UserActivityRepository(
+        s
+    ).update_user_activity(UpdateUserActivityQo(user_id=USER_ID, thread_id=THREAD_ID, change=-1)),
+    "UserActivityRepository.batch_apply_activity_changes": lambda s: UserActivityRepository(
+        s
+    ).batch_apply_activity_changes({(USER_ID, THREAD_ID): 2, (USER_ID + 1, THREAD_ID): -1}),
+    "UserActivityRepository.update_user_validation_status": lambda s: UserActivityRepository(
+        s
+    ).update_user_validation_status(USER_ID, THREAD_ID, False),
+    "UserActivityRepository.clear_punishment": lambda s: UserActivityRepository(
+        s
+    ).clear_punishment(USER_ID, THREAD_ID),
+    "UserActivityRepository.batch_clear_expired_mutes": lambda s: UserActivityRepository(
+        s
+    ).batch_clear_expired_mutes([(USER_ID, THREAD_ID)]),
+    # --- UserVoteRepository ---
+    "UserVoteRepository.get_by_session_id": lambda s: UserVoteRepository(s).get_by_session_id(
+        MODERATOR_ID, 1
+    ),
+    "UserVoteRepository.record_vote": _record_vote,
+    "UserVoteRepository.delete_vote": _delete_vote,
+    "UserVoteRepository.delete_all_user_votes_in_thread": lambda s: UserVoteRepository(
+        s
+    ).delete_all_user_votes_in_thread(USER_ID, [1, 2]),
+    "UserVoteRepository.get_voter_by_session_id": lambda s: UserVoteRepository(
+        s
+    ).get_voter_by_session_id(1),
+    "UserVoteRepository.get_vote_count_by_session_id": lambda s: UserVoteRepository(
+        s
+    ).get_vote_count_by_session_id(1),
+    # --- VoteArchiveRepository ---
+    "VoteArchiveRepository.get_archivable_session_ids": lambda s: VoteArchiveRepository(
+        s
+    ).get_archivable_session_ids(_now(), 200),
+    "VoteArchiveRepository.archive_sessions": lambda s: VoteArchiveRepository(s).archive_sessions(
+        [2], _now()
+    ),
+    # --- VoteOptionRepository ---
+    "VoteOptionRepository.create_vote_options": lambda s: VoteOptionRepository(
+        s
+    ).create_vote_options(3, ["赞成", "反对"]),
+    "VoteOptionRepository.add_option": lambda s: VoteOptionRepository(s).add_option(
+        1, 1, "异议", USER_ID, "user"
+    ),
+    "VoteOptionRepository.get_vote_options": lambda s: VoteOptionRepository(s).get_vote_options(1),
+    "VoteOptionRepository.get_vote_options_by_session_ids": lambda s: VoteOptionRepository(
+        s
+    ).get_vote_options_by_session_ids([1, 2]),
+    "VoteOptionRepository.get_options_by_type": lambda s: VoteOptionRepository(
+        s
+    ).get_options_by_type(1, 1),
+    "VoteOptionRepository.get_active_options_by_type": lambda s: VoteOptionRepository(
+        s
+    ).get_active_options_by_type(1, 1),
+    "VoteOptionRepository.get_active_option": lambda s: VoteOptionRepository(s).get_active_option(
+        1, 1, 1
+    ),
+    "VoteOptionRepository.get_option_by_id": lambda s: VoteOptionRepository(s).get_option_by_id(1),
+    "VoteOptionRepository.get_options_by_session_ids": lambda s: VoteOptionRepository(
+        s
+    ).get_options_by_session_ids([1, 2], 1),
+    "VoteOptionRepository.get_active_options_by_session_ids": lambda s: VoteOptionRepository(
+        s
+    ).get_active_options_by_session_ids([1, 2], 1),
+    "VoteOptionRepository.get_latest_active_objections_in_thread": lambda s: VoteOptionRepository(
+        s
+    ).get_latest_active_objections_in_thread(THREAD_ID),
+    "VoteOptionRepository.get_active_objections_by_ids_in_thread": lambda s: VoteOptionRepository(
+        s
+    ).get_active_objections_by_ids_in_thread(THREAD_ID, [2]),
+    "VoteOptionRepository.close_active_options": lambda s: VoteOptionRepository(
+        s
+    ).close_active_options([1], 1),
+    "VoteOptionRepository.close_active_objections_by_ids": lambda s: VoteOptionRepository(
+        s
+    ).close_active_objections_by_ids([1], [2], ObjectionResolutionType.NORMAL, None),
+    "VoteOptionRepository.get_malicious_objection_summary": lambda s: VoteOptionRepository(
+        s
+    ).get_malicious_objection_summary(guild_id=GUILD_ID, creator_id=USER_ID),
+    "VoteOptionRepository.delete_option": lambda s: VoteOptionRepository(s).delete_option(2),
+    # --- VoteSessionRepository ---
+    "VoteSessionRepository.update_vote_session_message_id": lambda s: VoteSessionRepository(
+        s
+    ).update_vote_session_message_id(1, 698),
+    "VoteSessionRepository.update_voting_channel_message_id": lambda s: VoteSessionRepository(
+        s
+    ).update_voting_channel_message_id(1, 697),
+    "VoteSessionRepository.get_vote_session_by_context_message_id": lambda s: (
+        VoteSessionRepository(s).get_vote_session_by_context_message_id(VOTE_MESSAGE_ID)
+    ),
+    "VoteSessionRepository.get_vote_session_by_voting_channel_message_id": lambda s: (
+        VoteSessionRepository(s).get_vote_session_by_voting_channel_message_id(
+            VOTING_CHANNEL_MESSAGE_ID
+        )
+    ),
+    "VoteSessionRepository.get_details_by_voting_channel_message_id": lambda s: (
+        VoteSessionRepository(s).get_details_by_voting_channel_message_id(
+            VOTING_CHANNEL_MESSAGE_ID
+        )
+    ),
+    "VoteSessionRepository.get_details_by_mirror_message_id": lambda s: VoteSessionRepository(
+        s
+    ).get_details_by_mirror_message_id(MIRROR_MESSAGE_ID),
+    "VoteSessionRepository.get_vote_session_with_details": lambda s: VoteSessionRepository(
+        s
+    ).get_vote_session_with_details(VOTE_MESSAGE_ID),
+    "VoteSessionRepository.get_all_sessions_in_thread_with_details": lambda s: (
+        VoteSessionRepository(s).get_all_sessions_in_thread_with_details(THREAD_ID)
+    ),
+    "VoteSessionRepository.create_vote_session": lambda s: VoteSessionRepository(
+        s
+    ).create_vote_session(
+        CreateVoteSessionQo(guild_id=GUILD_ID, thread_id=THREAD_ID, context_message_id=696)
+    ),
+    "VoteSessionRepository.update_vote_session_total_choices": lambda s: VoteSessionRepository(
+        s
+    ).update_vote_session_total_choices(1, 2),
+    "VoteSessionRepository.get_vote_sessions_by_intake_id": lambda s: VoteSessionRepository(
+        s
+    ).get_vote_sessions_by_intake_id(1),
+    "VoteSessionRepository.claim_expired_sessions": lambda s: VoteSessionRepository(
+        s
+    ).claim_expired_sessions(),
+    "VoteSessionRepository.get_closing_sessions": lambda s: VoteSessionRepository(
+        s
+    ).get_closing_sessions(),
+    "VoteSessionRepository.finish_closing_sessions": lambda s: VoteSessionRepository(
+        s
+    ).finish_closing_sessions([1, 2]),
+    "VoteSessionRepository.release_closing_sessions": lambda s: VoteSessionRepository(
+        s
+    ).release_closing_sessions([1, 2]),
+    "VoteSessionRepository.get_pending_deadlines": lambda s: VoteSessionRepository(
+        s
+    ).get_pending_deadlines(),
+    "VoteSessionRepository.adjust_vote_time": _adjust_vote_time,
+    "VoteSessionRepository.toggle_anonymous": lambda s: VoteSessionRepository(s).toggle_anonymous(
+        VOTE_MESSAGE_ID
+    ),
+    "VoteSessionRepository.toggle_realtime": lambda s: VoteSessionRepository(s).toggle_realtime(
+        VOTE_MESSAGE_ID
+    ),
+    "VoteSessionRepository.toggle_notify": lambda s: VoteSessionRepository(s).toggle_notify(
+        VOTE_MESSAGE_ID
+    ),
+    "VoteSessionRepository.reopen_vote_session": lambda s: VoteSessionRepository(
+        s
+    ).reopen_vote_session(CLOSED_VOTE_MESSAGE_ID, _now() + timedelta(days=1)),
+    "VoteSessionRepository.get_proposal_thread_id_by_objection_id": lambda s: (
+        VoteSessionRepository(s).get_proposal_thread_id_by_objection_id(1)
+    ),
+    "VoteSessionRepository.add_mirror_message": lambda s: VoteSessionRepository(
+        s
+    ).add_mirror_message(1, GUILD_ID, CHANNEL_ID, 695),
+    "VoteSessionRepository.get_mirrors_by_session_id": lambda s: VoteSessionRepository(
+        s
+    ).get_mirrors_by_session_id(1),
+    "VoteSessionRepository.get_vote_session_by_mirror_message_id": lambda s: VoteSessionRepository(
+        s
+    ).get_vote_session_by_mirror_message_id(MIRROR_MESSAGE_ID),
+}
+"""{仓储类名.方法名: 调用场景}"""
+
+
+def discover_repository_methods() -> list[str]:
+    """导入 `repository/` 下的全部模块，列出所有仓储类的公开异步方法。"""
+    methods: list[str] = []
+    for module_info in pkgutil.iter_modules(repository_package.__path__):
+        module = importlib.import_module(f"{repository_package.__name__}.{module_info.name}")
+        repository_class = getattr(module, module_info.name, None)
+        if not inspect.isclass(repository_class) or not module_info.name.endswith("Repository"):
+            continue
+        for name, member in inspect.getmembers(repository_class, inspect.iscoroutinefunction):
+            if not name.startswith("_"):
+                methods.append(f"{repository_class.__name__}.{name}")
+    return sorted(methods)
+
+
+def _seed_rows() -> list[SQLModel]:
+    """构造覆盖所有场景所需的最小种子数据。"""
+    now = _now()
+    past = now - timedelta(hours=1)
+    return [
+        Proposal(id=1, discussion_thread_id=THREAD_ID, proposer_id=USER_ID, title="提案"),
+        Objection(id=1, proposal_id=1, objector_id=USER_ID, reason="理由", required_votes=5),
+        Announcement(
+            id=1,
+            discussion_thread_id=THREAD_ID,
+            announcer_id=USER_ID,
+            title="公示",
+            content="内容",
+            end_time=past,
+        ),
+        AnnouncementChannelMonitor(
+            announcement_id=1,
+            channel_id=CHANNEL_ID,
+            message_threshold=0,
+            time_interval_minutes=0,
+            last_repost_at=past,
+        ),
+        ConfirmationSession(
+            id=1,
+            context="proposal_execution",
+            target_id=1,
+            message_id=CONFIRMATION_MESSAGE_ID,
+            required_roles=["council", "moderator"],
+            confirmed_parties={"moderator": MODERATOR_ID},
+        ),
+        ConfirmationSession(
+            id=2,
+            context="objection_support",
+            target_id=VOTE_MESSAGE_ID,
+            message_id=SUPPORT_MESSAGE_ID,
+            required_roles=[],
+            confirmed_parties={"发起人": MODERATOR_ID, "支持者 1": USER_ID},
+        ),
+        ProposalIntake(
+            id=1,
+            guild_id=GUILD_ID,
+            author_id=USER_ID,
+            title="草案",
+            reason="原因",
+            motion="动议",
+            implementation="方案",
+            executor="执行人",
+            review_thread_id=REVIEW_THREAD_ID,
+            discussion_thread_id=THREAD_ID,
+            voting_message_id=INTAKE_VOTING_MESSAGE_ID,
+        ),
+        ProposalIntake(
+            id=2,
+            guild_id=GUILD_ID,
+            author_id=USER_ID,
+            title="草案二",
+            reason="原因",
+            motion="动议",
+            implementation="方案",
+            executor="执行人",
+            review_thread_id=SECOND_REVIEW_THREAD_ID,
+            reviewer_id=MODERATOR_ID,
+        ),
+        VoteSession(
+            id=1,
+            guild_id=GUILD_ID,
+            context_thread_id=THREAD_ID,
+            context_message_id=VOTE_MESSAGE_ID,
+            voting_channel_message_id=VOTING_CHANNEL_MESSAGE_ID,
+            total_choices=1,
+            end_time=past,
+        ),
+        VoteSession(
+            id=2,
+            guild_id=GUILD_ID,
+            context_thread_id=THREAD_ID,
+            intake_id=1,
+            session_type=VoteSessionType.INTAKE_SUPPORT,
+            context_message_id=622,
+        ),
+        VoteSession(
+            id=3,
+            guild_id=GUILD_ID,
+            context_thread_id=THREAD_ID,
+            context_message_id=CLOSED_VOTE_MESSAGE_ID,
+            status=0,
+            end_time=past,
+        ),
+        VoteOption(id=1, session_id=1, option_type=0, choice_index=1, choice_text="选项"),
+        VoteOption(
+            id=2,
+            session_id=1,
+            option_type=1,
+            choice_index=1,
+            choice_text="异议",
+            creator_id=USER_ID,
+        ),
+        VoteOption(
+            id=3,
+            session_id=1,
+            option_type=1,
+            choice_index=2,
+            choice_text="恶意异议",
+            creator_id=USER_ID,
+            voting_status=VoteOptionStatus.CLOSED,
+            closed_at=past,
+            resolution_type=ObjectionResolutionType.MALICIOUS,
+        ),
+        UserVote(session_id=1, user_id=USER_ID, choice=1, option_type=0, choice_index=1),
+        UserVote(session_id=1, user_id=USER_ID, choice=1, option_type=1, choice_index=1),
+        VoteMessageMirror(
+            session_id=1,
+            guild_id=GUILD_ID,
+            channel_id=CHANNEL_ID,
+            message_id=MIRROR_MESSAGE_ID,
+        ),
+        UserActivity(
+            user_id=USER_ID,
+            context_thread_id=THREAD_ID,
+            message_count=3,
+            mute_end_time=past,
+        ),
+        GlobalProposalPunishment(
+            id=1,
+            target_user_id=USER_ID,
+            moderator_id=MODERATOR_ID,
+            origin_guild_id=GUILD_ID,
+            origin_channel_id=CHANNEL_ID,
+            punishment_type=PunishmentType.PERMANENT_VOTING.value,
+            reason="理由",
+        ),
+        PunishmentRecord(
+            guild_id=GUILD_ID,
+            thread_id=THREAD_ID,
+            target_user_id=USER_ID,
+            moderator_id=MODERATOR_ID,
+            reason="理由",
+            voting_allowed=True,
+        ),
+        OperationLog(
+            operator_id=MODERATOR_ID,
+            operator_name="moderator",
+            operator_display_name="管理员",
+            op_type=1,
+            action="edit",
+            target_type="proposal",
+            target_id=1,
+            guild_id=GUILD_ID,
+        ),
+        StructuredSpeechMode(
+            guild_id=GUILD_ID,
+            forum_id=CHANNEL_ID,
+            thread_id=THREAD_ID,
+            status="active",
+            enabled_by_id=MODERATOR_ID,
+        ),
+        StructuredSpeechMessage(
+            message_id=SPEECH_MESSAGE_ID,
+            webhook_id=650,
+            guild_id=GUILD_ID,
+            thread_id=THREAD_ID,
+            user_id=USER_ID,
+            created_at=past,
+        ),
+        StructuredSpeechWebhook(forum_id=CHANNEL_ID, webhook_id=650),
+        CountedMessage(message_id=COUNTED_MESSAGE_ID, user_id=USER_ID, thread_id=THREAD_ID),
+        DroppedMessageEvent(
+            message_id=REMOTE_EVENT_MESSAGE_ID,
+            event_type="message_created",
+            guild_id=GUILD_ID,
+            forum_id=CHANNEL_ID,
+            thread_id=THREAD_ID,
+            user_id=USER_ID,
+        ),
+        ActivityBackfillCheckpoint(
+            thread_id=THREAD_ID,
+            boundary_message_id=COUNTED_MESSAGE_ID + 10,
+            snapshot_counts={str(USER_ID): 1},
+            scanned_counts={},
+        ),
+    ]
+
+
+class QueryPlanAuditor:
+    """
+    在种子数据库上运行全部仓储方法，并对其发出的每条 SQL 执行 `EXPLAIN QUERY PLAN`。
+    """
+
+    def __init__(self, engine: AsyncEngine, scenarios: dict[str, Scenario] | None = None):
+        self.engine = engine
+        self.scenarios = SCENARIOS if scenarios is None else scenarios
+        self._current_method: str | None = None
+        self._captured: dict[str, list[tuple[str, Any]]] = {}
+
+    async def seed(self) -> None:
+        """创建全部表结构并写入种子数据。"""
+        async with self.engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(self.engine) as session:
+            session.add_all(_seed_rows())
+            await session.commit()
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """记录当前场景发出的 SQL。"""
+        if self._current_method is None:
+            return
+        keyword = statement.lstrip().split(None, 1)[0].upper()
+        if keyword not in {"SELECT", "UPDATE", "DELETE", "INSERT", "WITH"}:
+            return
+        if executemany and parameters and isinstance(parameters[0], (list, tuple)):
+            parameters = parameters[0]
+        captured = self._captured.setdefault(self._current_method, [])
+        if all(existing != statement for existing, _ in captured):
+            captured.append((statement, parameters))
+
+    async def run(self) -> QueryPlanReport:
+        """执行全部场景并返回审计结果。"""
+        report = QueryPlanReport()
+        methods = discover_repository_methods()
+        report.uncovered_methods = [method for method in methods if method not in self.scenarios]
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._capture)
+        try:
+            for method in methods:
+                scenario = self.scenarios.get(method)
+                if scenario is None:
+                    continue
+                self._current_method = method
+                try:
+                    # 每个场景使用独立会话，退出时回滚，互不影响
+                    async with AsyncSession(self.engine) as session:
+                        await scenario(session)
+                        await session.flush()
+                except Exception as e:
+                    report.errors[method] = f"{type(e).__name__}: {e}"
+                finally:
+                    self._current_method = None
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", self._capture)
+
+        async with self.engine.connect() as connection:
+            for method, statements in self._captured.items():
+                for statement, parameters in statements:
+                    result = await connection.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+                    )
+                    details = [row[3] for row in result.all()]
+                    report.plans.setdefault(method, []).append((statement, details))
+                    for detail in details:
+                        match = _SCAN_PATTERN.match(detail)
+                        if match is None or match.group(1) not in SQLModel.metadata.tables:
+                            continue
+                        table = match.group(1)
+                        report.findings.append(
+                            QueryPlanFinding(
+                                method=method,
+                                table=table,
+                                detail=detail,
+                                sql=statement,
+                                allowed_reason=ALLOWED_SCANS.get((method, table)),
+                            )
+                        )
+        return report
+
+
+async def audit(verbose: bool = False) -> QueryPlanReport:
+    """在新的内存数据库上完成一次审计并打印结果。"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        auditor = QueryPlanAuditor(engine)
+        await auditor.seed()
+        report = await auditor.run()
+    finally:
+        await engine.dispose()
+
+    if verbose:
+        for method, plans in sorted(report.plans.items()):
+            print(f"== {method}")
+            for statement, details in plans:
+                print(f"   {' '.join(statement.split())}")
+                for detail in details:
+                    print(f"     -> {detail}")
+
+    for finding in report.findings:
+        marker = "允许" if finding.allowed_reason else "扫描"
+        reason = f" ({finding.allowed_reason})" if finding.allowed_reason else ""
+        print(f"[{marker}] {finding.method}: {finding.detail}{reason}")
+    for method in report.uncovered_methods:
+        print(f"[未覆盖] {method}: 请在 SCENARIOS 中登记调用场景")
+    for method, error in report.errors.items():
+        print(f"[错误] {method}: {error}")
+    print(
+        f"共检查 {len(report.plans)} 个仓储方法，"
+        f"发现 {len(report.unexpected_findings)} 处未登记的全表扫描。"
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="审计仓储层 SQL 的查询计划。")
+    parser.add_argument("--verbose", action="store_true", help="打印每条语句的完整查询计划")
+    args = parser.parse_args()
+    report = asyncio.run(audit(verbose=args.verbose))
+    sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import Column, Field, SQLModel
+
+from StellariaPact.share.database_types import JSON_TYPE, DiscordId, UTCDateTime
+
+
+class ActivityBackfillCheckpoint(SQLModel, table=True):
+    """
+    发言计数回填的断点表模型，每个帖子一行。
+
+    回填开始时记录帖子当时的计数快照和历史扫描的截止消息，扫描过程中定期保存已统计的
+    计数和最后处理的消息 ID，中断后可从断点继续扫描而无需从头读取历史。
+    """
+
+    __tablename__ = "activity_backfill_checkpoint"  # type: ignore
+
+    thread_id: int = Field(
+        sa_type=DiscordId,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": False},
+        description="回填的讨论帖子ID",
+    )
+    """回填的讨论帖子ID"""
+
+    boundary_message_id: int = Field(sa_type=DiscordId, description="历史扫描的截止消息ID（不含）")
+    """历史扫描的截止消息ID（不含），之后的消息由实时监听计数"""
+
+    last_message_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, description="最后处理的历史消息ID"
+    )
+    """最后处理的历史消息ID"""
+
+    snapshot_counts: dict[str, int] = Field(
+        default={},
+        sa_column=Column(JSON_TYPE),
+        description="回填开始时数据库中的计数快照: {user_id: message_count}",
+    )
+    """回填开始时数据库中的计数快照: {user_id: message_count}"""
+
+    scanned_counts: dict[str, int] = Field(
+        default={},
+        sa_column=Column(JSON_TYPE),
+        description="已扫描历史中统计出的有效发言数: {user_id: message_count}",
+    )
+    """已扫描历史中统计出的有效发言数: {user_id: message_count}"""
+
+    scanned_messages: int = Field(default=0, description="已扫描的历史消息总数")
+    """已扫描的历史消息总数"""
+
+    completed_at: Optional[datetime] = Field(
+        default=None, sa_type=UTCDateTime, description="计数写入完成的UTC时间"
+    )
+    """计数写入完成的UTC时间，为空表示回填尚未完成"""
+
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=UTCDateTime,
+        description="断点最后保存的UTC时间",
+    )
+    """断点最后保存的UTC时间"""
@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
-from sqlmodel import Field, Relationship, text
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from StellariaPact.models.AnnouncementChannelMonitor import AnnouncementChannelMonitor
@@ -17,10 +17,12 @@ class Announcement(BaseModel, table=True):
 
     __tablename__ = "announcement"  # type: ignore
 
-    discussion_thread_id: int = Field(description="关联的Discord讨论帖ID")
+    discussion_thread_id: int = Field(
+        sa_type=DiscordId, index=True, description="关联的Discord讨论帖ID"
+    )
     """关联的Discord讨论帖ID"""
 
-    announcer_id: int = Field(description="公示发起人的Discord ID")
+    announcer_id: int = Field(sa_type=DiscordId, description="公示发起人的Discord ID")
     """公示发起人的Discord ID"""
 
     title: str = Field(description="公示标题")
@@ -41,7 +43,7 @@ class Announcement(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
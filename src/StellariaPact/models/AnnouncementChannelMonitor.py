@@ -1,17 +1,23 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import UniqueConstraint
 from sqlalchemy.ext.declarative import declared_attr
-from sqlmodel import Field, Relationship, text
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from StellariaPact.models.Announcement import Announcement
 
 
+def _initial_next_repost_at(context) -> datetime:
+    """插入时未指定下次播报时间，则按上次播报时间加时间间隔计算。"""
+    parameters = context.get_current_parameters()
+    return parameters["last_repost_at"] + timedelta(minutes=parameters["time_interval_minutes"])
+
+
 class AnnouncementChannelMonitor(BaseModel, table=True):
     """
     公示在特定频道中的周期性重复发布监控表
@@ -24,7 +30,7 @@ class AnnouncementChannelMonitor(BaseModel, table=True):
     )
     """关联的公示ID"""
 
-    channel_id: int = Field(index=True, description="被监控的Discord频道ID")
+    channel_id: int = Field(sa_type=DiscordId, index=True, description="被监控的Discord频道ID")
     """被监控的Discord频道ID"""
 
     message_threshold: int = Field(description="触发重复公示所需的消息数量阈值")
@@ -39,11 +45,19 @@ class AnnouncementChannelMonitor(BaseModel, table=True):
     last_repost_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="上次执行重复公示的时间",
     )
     """上次执行重复公示的时间"""
 
+    next_repost_at: datetime = Field(
+        sa_type=UTCDateTime,
+        sa_column_kwargs={"default": _initial_next_repost_at},
+        index=True,
+        description="最早可以再次重复公示的时间，即上次公示时间加时间间隔",
+    )
+    """最早可以再次重复公示的时间，即上次公示时间加时间间隔"""
+
     # --- 关系定义 ---
     announcement: Optional["Announcement"] = Relationship(back_populates="channel_monitors")
 
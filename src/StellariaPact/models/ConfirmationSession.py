@@ -5,7 +5,7 @@ from sqlalchemy import Column, Index, text
 from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import JSON_TYPE, UTCDateTime
+from StellariaPact.share.database_types import JSON_TYPE, DiscordId, UTCDateTime, utc_now
 from StellariaPact.share.enums.ConfirmationStatus import ConfirmationStatus
 
 
@@ -22,7 +22,9 @@ class ConfirmationSession(BaseModel, table=True):
     target_id: int = Field(index=True, description="关联的业务对象ID，如 Proposal.id")
     """关联的业务对象ID，如 Proposal.id"""
 
-    message_id: int | None = Field(default=None, unique=True, description="机器人发送的确认消息ID")
+    message_id: int | None = Field(
+        sa_type=DiscordId, default=None, unique=True, description="机器人发送的确认消息ID"
+    )
     """机器人发送的确认消息ID"""
 
     status: int = Field(
@@ -42,7 +44,9 @@ class ConfirmationSession(BaseModel, table=True):
     )
     """已确认的角色及用户ID"""
 
-    canceler_id: int | None = Field(default=None, description="取消该会话的用户ID")
+    canceler_id: int | None = Field(
+        sa_type=DiscordId, default=None, description="取消该会话的用户ID"
+    )
     """取消该会话的用户ID"""
 
     reason: str | None = Field(default=None, description="执行此操作的原因")
@@ -58,7 +62,7 @@ class ConfirmationSession(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
@@ -67,8 +71,8 @@ class ConfirmationSession(BaseModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
         sa_column_kwargs={
-            "server_default": text("CURRENT_TIMESTAMP"),
-            "onupdate": text("CURRENT_TIMESTAMP"),
+            "server_default": utc_now(),
+            "onupdate": utc_now(),
         },
         description="最后更新时间",
     )
@@ -81,5 +85,6 @@ class ConfirmationSession(BaseModel, table=True):
             "target_id",
             unique=True,
             sqlite_where=text(f"status = {ConfirmationStatus.PENDING}"),
+            postgresql_where=text(f"status = {ConfirmationStatus.PENDING}"),
         ),
     )
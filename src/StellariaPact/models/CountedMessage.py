@@ -0,0 +1,31 @@
+from sqlmodel import Field, SQLModel
+
+from StellariaPact.share.database_types import DiscordId
+
+
+class CountedMessage(SQLModel, table=True):
+    """
+    已计入发言数的讨论消息索引，使删除事件无需消息缓存也能精确扣减计数。
+
+    以 Discord 消息 ID 作为整数主键（即 SQLite 的 rowid），每条记录只保存定位计数所需的
+    三个 ID 和一个计数标记；所属提案结束后由归档任务按帖子清理。
+    """
+
+    __tablename__ = "counted_message"  # type: ignore
+
+    message_id: int = Field(
+        sa_type=DiscordId,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": False},
+        description="已计数消息的Discord消息ID",
+    )
+    """已计数消息的Discord消息ID"""
+
+    user_id: int = Field(sa_type=DiscordId, description="消息作者的Discord ID")
+    """消息作者的Discord ID"""
+
+    thread_id: int = Field(sa_type=DiscordId, index=True, description="消息所在的讨论帖子ID")
+    """消息所在的讨论帖子ID"""
+
+    counted: bool = Field(default=True, description="消息当前是否仍计入发言数")
+    """消息当前是否仍计入发言数，删除事件被处理后置为 False"""
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from sqlmodel import Field, SQLModel
+
+from StellariaPact.share.database_types import DiscordId, UTCDateTime
+
+
+class DroppedMessageEvent(SQLModel, table=True):
+    """
+    处理失败被丢弃的远端消息事件表模型。
+
+    接收接口返回 202 后转发端不会重发事件，重试耗尽或停止服务时未处理完的事件
+    保存在这里，下次启动时重新处理，处理成功后删除。
+    """
+
+    __tablename__ = "dropped_message_event"  # type: ignore
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    message_id: int = Field(
+        sa_type=DiscordId,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": False},
+        description="事件对应的Discord消息ID",
+    )
+    """事件对应的Discord消息ID"""
+
+    event_type: str = Field(
+        primary_key=True,
+        max_length=32,
+        description="事件类型: message_created / message_deleted",
+    )
+    """事件类型: message_created / message_deleted"""
+
+    guild_id: int = Field(sa_type=DiscordId, description="事件所在的服务器ID")
+    """事件所在的服务器ID"""
+
+    forum_id: int = Field(sa_type=DiscordId, description="事件所在的论坛频道ID")
+    """事件所在的论坛频道ID"""
+
+    thread_id: int = Field(sa_type=DiscordId, description="事件所在的帖子ID")
+    """事件所在的帖子ID"""
+
+    user_id: int = Field(sa_type=DiscordId, description="消息作者的Discord ID")
+    """消息作者的Discord ID"""
+
+    dropped_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=UTCDateTime,
+        index=True,
+        description="事件被丢弃的UTC时间",
+    )
+    """事件被丢弃的UTC时间"""
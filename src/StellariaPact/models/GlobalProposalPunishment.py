@@ -4,7 +4,7 @@ from sqlalchemy import Index, text
 from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 from StellariaPact.share.enums import PunishmentType
 
 
@@ -24,13 +24,21 @@ class GlobalProposalPunishment(BaseModel, table=True):
             "punishment_type",
             unique=True,
             sqlite_where=text("lifted_at IS NULL"),
+            postgresql_where=text("lifted_at IS NULL"),
+        ),
+        Index(
+            "ix_global_proposal_punishment_type_lifted",
+            "punishment_type",
+            "lifted_at",
         ),
     )
 
-    target_user_id: int = Field(description="被处罚用户的 Discord ID")
-    moderator_id: int = Field(index=True, description="执行处罚的管理员 Discord ID")
-    origin_guild_id: int = Field(description="执行指令的服务器 Discord ID")
-    origin_channel_id: int = Field(description="执行指令的频道 Discord ID")
+    target_user_id: int = Field(sa_type=DiscordId, description="被处罚用户的 Discord ID")
+    moderator_id: int = Field(
+        sa_type=DiscordId, index=True, description="执行处罚的管理员 Discord ID"
+    )
+    origin_guild_id: int = Field(sa_type=DiscordId, description="执行指令的服务器 Discord ID")
+    origin_channel_id: int = Field(sa_type=DiscordId, description="执行指令的频道 Discord ID")
     punishment_type: str = Field(
         default=PunishmentType.PERMANENT_VOTING.value,
         description="处罚类型",
@@ -39,25 +47,29 @@ class GlobalProposalPunishment(BaseModel, table=True):
     evidence_url: str | None = Field(default=None, description="处罚依据图片 URL")
     evidence_filename: str | None = Field(default=None, description="处罚依据图片文件名")
     punishment_message_id: int | None = Field(
+        sa_type=DiscordId,
         default=None,
         description="原始处罚公示消息 Discord ID",
     )
     resolution_guild_id: int | None = Field(
+        sa_type=DiscordId,
         default=None,
         description="解除公示所在服务器 Discord ID",
     )
     resolution_channel_id: int | None = Field(
+        sa_type=DiscordId,
         default=None,
         description="解除公示所在频道 Discord ID",
     )
     resolution_message_id: int | None = Field(
+        sa_type=DiscordId,
         default=None,
         description="解除公示消息 Discord ID",
     )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="处罚生效时间",
     )
     expires_at: datetime | None = Field(
@@ -65,7 +77,9 @@ class GlobalProposalPunishment(BaseModel, table=True):
         sa_type=UTCDateTime,
         description="处罚截止时间；为空表示永久",
     )
-    lifted_by_id: int | None = Field(default=None, description="执行解除的管理员 Discord ID")
+    lifted_by_id: int | None = Field(
+        sa_type=DiscordId, default=None, description="执行解除的管理员 Discord ID"
+    )
     lift_reason: str | None = Field(default=None, description="解除或覆盖理由")
     lifted_at: datetime | None = Field(
         default=None,
@@ -1,11 +1,11 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
 
-from sqlmodel import Field, Relationship, text
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
 from StellariaPact.models.Proposal import Proposal
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 from StellariaPact.share.enums.ObjectionStatus import ObjectionStatus
 
 if TYPE_CHECKING:
@@ -22,19 +22,19 @@ class Objection(BaseModel, table=True):
     proposal_id: int = Field(foreign_key="proposal.id", index=True, description="关联的提案ID")
     """关联的提案ID"""
 
-    objector_id: int = Field(index=True, description="异议发起人的Discord ID")
+    objector_id: int = Field(sa_type=DiscordId, index=True, description="异议发起人的Discord ID")
     """异议发起人的Discord ID"""
 
     reason: str = Field(description="反对理由")
     """反对理由"""
 
     objection_thread_id: Optional[int] = Field(
-        index=True, default=None, description="异议讨论帖的ID"
+        sa_type=DiscordId, index=True, default=None, description="异议讨论帖的ID"
     )
     """异议讨论帖的ID"""
 
     review_thread_id: Optional[int] = Field(
-        index=True, default=None, description="管理员审核帖的ID"
+        sa_type=DiscordId, index=True, default=None, description="管理员审核帖的ID"
     )
     """管理员审核帖的ID"""
 
@@ -52,7 +52,7 @@ class Objection(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
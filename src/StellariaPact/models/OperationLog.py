@@ -1,9 +1,9 @@
 from datetime import datetime, timezone
 
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class OperationLog(BaseModel, table=True):
@@ -11,7 +11,7 @@ class OperationLog(BaseModel, table=True):
 
     __tablename__ = "operation_log"  # type: ignore
 
-    operator_id: int = Field(index=True, description="操作者 Discord ID")
+    operator_id: int = Field(sa_type=DiscordId, index=True, description="操作者 Discord ID")
     """操作者 Discord ID"""
 
     operator_name: str = Field(description="操作者用户名")
@@ -32,7 +32,7 @@ class OperationLog(BaseModel, table=True):
     target_id: int = Field(index=True, description="目标 ID")
     """目标 ID"""
 
-    guild_id: int = Field(index=True, description="服务器 ID")
+    guild_id: int = Field(sa_type=DiscordId, index=True, description="服务器 ID")
     """服务器 ID"""
 
     detail: str | None = Field(default=None, description="补充说明")
@@ -41,7 +41,7 @@ class OperationLog(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="操作时间",
     )
     """操作时间"""
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from sqlmodel import Field, SQLModel
+
+from StellariaPact.share.database_types import DiscordId, UTCDateTime
+
+
+class ProcessedMessageEvent(SQLModel, table=True):
+    """
+    已处理的远端消息事件表模型，用于按 (message_id, event_type) 幂等去重。
+
+    以复合主键代替自增ID，SQLite 上建为 WITHOUT ROWID 表，每条记录只占一份 B-Tree 空间；
+    超过保留期的记录由定时任务清理。
+    """
+
+    __tablename__ = "processed_message_event"  # type: ignore
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    message_id: int = Field(
+        sa_type=DiscordId,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": False},
+        description="事件对应的Discord消息ID",
+    )
+    """事件对应的Discord消息ID"""
+
+    event_type: str = Field(
+        primary_key=True,
+        max_length=32,
+        description="事件类型: message_created / message_deleted",
+    )
+    """事件类型: message_created / message_deleted"""
+
+    processed_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=UTCDateTime,
+        index=True,
+        description="事件被处理的UTC时间",
+    )
+    """事件被处理的UTC时间"""
@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
-from sqlmodel import Field, Relationship, text
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 from StellariaPact.share.enums.ProposalStatus import ProposalStatus
 
 if TYPE_CHECKING:
@@ -18,7 +18,9 @@ class Proposal(BaseModel, table=True):
 
     __tablename__ = "proposal"  # type: ignore
 
-    discussion_thread_id: int = Field(unique=True, description="Discord讨论帖的ID")
+    discussion_thread_id: int = Field(
+        sa_type=DiscordId, unique=True, description="Discord讨论帖的ID"
+    )
     """Discord讨论帖的ID"""
 
     title: str = Field(description="提案标题")
@@ -27,7 +29,7 @@ class Proposal(BaseModel, table=True):
     content: str = Field(default="", description="提案内容")
     """提案内容"""
 
-    proposer_id: int = Field(index=True, description="提案发起人的Discord ID")
+    proposer_id: int = Field(sa_type=DiscordId, index=True, description="提案发起人的Discord ID")
     """提案发起人的Discord ID"""
 
     is_special: bool = Field(default=False, description="是否为特殊提案，不计入讨论槽位")
@@ -46,7 +48,7 @@ class Proposal(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
@@ -55,8 +57,8 @@ class Proposal(BaseModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
         sa_column_kwargs={
-            "server_default": text("CURRENT_TIMESTAMP"),
-            "onupdate": text("CURRENT_TIMESTAMP"),
+            "server_default": utc_now(),
+            "onupdate": utc_now(),
         },
         description="最后更新时间",
     )
@@ -4,7 +4,7 @@ from typing import Optional
 from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime
 from StellariaPact.share.enums import IntakeStatus
 
 
@@ -15,9 +15,9 @@ class ProposalIntake(BaseModel, table=True):
 
     __tablename__ = "proposal_intake"  # type: ignore
 
-    guild_id: int = Field(index=True, description="服务器ID")
+    guild_id: int = Field(sa_type=DiscordId, index=True, description="服务器ID")
     """服务器ID"""
-    author_id: int = Field(index=True, description="提案提出者的用户ID")
+    author_id: int = Field(sa_type=DiscordId, index=True, description="提案提出者的用户ID")
     """提案提出者的用户ID"""
 
     # 提案核心字段
@@ -35,17 +35,25 @@ class ProposalIntake(BaseModel, table=True):
     status: int = Field(default=IntakeStatus.PENDING_REVIEW, index=True)
     """审核状态，0=待审核，1=批准，2=拒绝，3=需要修改"""
 
-    review_thread_id: Optional[int] = Field(default=None, description="审核贴ID")
+    review_thread_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, index=True, description="审核贴ID"
+    )
     """审核贴ID"""
-    discussion_thread_id: Optional[int] = Field(default=None, description="讨论帖ID")
+    discussion_thread_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, index=True, description="讨论帖ID"
+    )
     """讨论帖ID"""
-    voting_message_id: Optional[int] = Field(default=None, description="投票频道消息ID")
+    voting_message_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, index=True, description="投票频道消息ID"
+    )
     """投票频道消息ID"""
     required_votes: int = Field(default=20, description="需多少票才能正式发布")
     """需多少票才能正式发布"""
 
     # 审核相关字段（双管理审核）
-    reviewer_id: Optional[int] = Field(default=None, description="第一位审核人用户ID")
+    reviewer_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, description="第一位审核人用户ID"
+    )
     """第一位审核人用户ID"""
     reviewed_at: Optional[datetime] = Field(
         default=None, sa_type=UTCDateTime, description="第一位审核时间"
@@ -54,7 +62,9 @@ class ProposalIntake(BaseModel, table=True):
     review_comment: Optional[str] = Field(default=None, description="第一位审核意见")
     """第一位审核意见"""
 
-    reviewer_id_2: Optional[int] = Field(default=None, description="第二位审核人用户ID")
+    reviewer_id_2: Optional[int] = Field(
+        sa_type=DiscordId, default=None, description="第二位审核人用户ID"
+    )
     """第二位审核人用户ID"""
     reviewed_at_2: Optional[datetime] = Field(
         default=None, sa_type=UTCDateTime, description="第二位审核时间"
@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import Index
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class PunishmentRecord(BaseModel, table=True):
@@ -20,10 +20,12 @@ class PunishmentRecord(BaseModel, table=True):
         ),
     )
 
-    guild_id: int = Field(index=True, description="服务器 Discord ID")
-    thread_id: int = Field(description="处罚发生的帖子 ID")
-    target_user_id: int = Field(description="被处罚用户 Discord ID")
-    moderator_id: int = Field(index=True, description="执行处罚的管理员 Discord ID")
+    guild_id: int = Field(sa_type=DiscordId, index=True, description="服务器 Discord ID")
+    thread_id: int = Field(sa_type=DiscordId, description="处罚发生的帖子 ID")
+    target_user_id: int = Field(sa_type=DiscordId, description="被处罚用户 Discord ID")
+    moderator_id: int = Field(
+        sa_type=DiscordId, index=True, description="执行处罚的管理员 Discord ID"
+    )
     reason: str = Field(description="处罚原因")
     source_message_url: str | None = Field(default=None, description="违规触发消息链接")
     voting_allowed: bool = Field(description="处罚后是否保留本帖投票权")
@@ -35,6 +37,6 @@ class PunishmentRecord(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="处罚时间",
     )
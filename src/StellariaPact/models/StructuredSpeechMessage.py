@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import Index
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class StructuredSpeechMessage(BaseModel, table=True):
@@ -22,25 +22,25 @@ class StructuredSpeechMessage(BaseModel, table=True):
         ),
     )
 
-    message_id: int = Field(description="Discord 消息 ID")
+    message_id: int = Field(sa_type=DiscordId, description="Discord 消息 ID")
     """表示结构化 Webhook 消息的 Discord 消息 ID。"""
 
-    webhook_id: int = Field(description="发送消息的 Discord Webhook ID")
+    webhook_id: int = Field(sa_type=DiscordId, description="发送消息的 Discord Webhook ID")
     """表示发送结构化消息的 Discord Webhook ID。"""
 
-    guild_id: int = Field(description="Discord 服务器 ID")
+    guild_id: int = Field(sa_type=DiscordId, description="Discord 服务器 ID")
     """表示消息所属的 Discord 服务器 ID。"""
 
-    thread_id: int = Field(description="讨论帖子 ID")
+    thread_id: int = Field(sa_type=DiscordId, description="讨论帖子 ID")
     """表示消息所在的讨论帖子 ID。"""
 
-    user_id: int = Field(description="原发言用户 Discord ID")
+    user_id: int = Field(sa_type=DiscordId, description="原发言用户 Discord ID")
     """表示通过 Bot 提交发言的原用户 Discord ID。"""
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
     )
     """表示结构化消息成功创建的时间。"""
 
@@ -1,10 +1,10 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import Index
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class StructuredSpeechMode(BaseModel, table=True):
@@ -16,13 +16,13 @@ class StructuredSpeechMode(BaseModel, table=True):
         Index("ix_structured_speech_mode_status", "status"),
     )
 
-    guild_id: int = Field(description="Discord 服务器 ID")
+    guild_id: int = Field(sa_type=DiscordId, description="Discord 服务器 ID")
     """表示模式所属的 Discord 服务器 ID。"""
 
-    forum_id: int = Field(description="父讨论论坛 ID")
+    forum_id: int = Field(sa_type=DiscordId, description="父讨论论坛 ID")
     """表示讨论帖子所属的父论坛频道 ID。"""
 
-    thread_id: int = Field(description="讨论帖子 ID")
+    thread_id: int = Field(sa_type=DiscordId, description="讨论帖子 ID")
     """表示启用模板发言模式的讨论帖子 ID。"""
 
     status: str = Field(default="inactive", max_length=16)
@@ -34,13 +34,13 @@ class StructuredSpeechMode(BaseModel, table=True):
     previous_slowmode_delay: int = Field(default=0)
     """表示开启模式前保存的帖子慢速模式秒数。"""
 
-    enabled_by_id: int = Field(description="最近一次操作人的 Discord ID")
+    enabled_by_id: int = Field(sa_type=DiscordId, description="最近一次操作人的 Discord ID")
     """表示最近一次切换或更新模式的操作人 Discord ID。"""
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
     )
     """表示模式记录的创建时间。"""
 
@@ -48,8 +48,8 @@ class StructuredSpeechMode(BaseModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
         sa_column_kwargs={
-            "server_default": text("CURRENT_TIMESTAMP"),
-            "onupdate": text("CURRENT_TIMESTAMP"),
+            "server_default": utc_now(),
+            "onupdate": utc_now(),
         },
     )
     """表示模式记录最近一次更新的时间。"""
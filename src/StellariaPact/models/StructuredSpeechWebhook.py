@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Index
+from sqlmodel import Field
+
+from StellariaPact.models.BaseModel import BaseModel
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
+
+
+class StructuredSpeechWebhook(BaseModel, table=True):
+    """
+    保存每个论坛用于结构化发言的 Webhook。
+
+    只保存 Webhook ID：令牌本身即可向论坛发帖，写入数据库会随备份一同外泄，
+    因此每个进程首次使用时按 ID 向 Discord 重新获取令牌。
+    """
+
+    __tablename__ = "structured_speech_webhook"  # type: ignore
+    __table_args__ = (Index("uq_structured_speech_webhook_forum", "forum_id", unique=True),)
+
+    forum_id: int = Field(sa_type=DiscordId, description="父讨论论坛 ID")
+    """表示 Webhook 所属的论坛频道 ID。"""
+
+    webhook_id: int = Field(sa_type=DiscordId, description="Webhook ID")
+    """表示 Bot 在该论坛中创建的结构化发言 Webhook ID。"""
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=UTCDateTime,
+        sa_column_kwargs={"server_default": utc_now()},
+    )
+    """表示记录的创建时间。"""
+
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=UTCDateTime,
+        sa_column_kwargs={
+            "server_default": utc_now(),
+            "onupdate": utc_now(),
+        },
+    )
+    """表示 Webhook 最近一次被替换的时间。"""
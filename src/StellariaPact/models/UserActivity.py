@@ -3,10 +3,10 @@ from typing import Optional
 
 from sqlalchemy import UniqueConstraint
 from sqlalchemy.ext.declarative import declared_attr
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class UserActivity(BaseModel, table=True):
@@ -16,10 +16,10 @@ class UserActivity(BaseModel, table=True):
 
     __tablename__ = "user_activity"  # type: ignore
 
-    user_id: int = Field(index=True, description="用户的Discord ID")
+    user_id: int = Field(sa_type=DiscordId, index=True, description="用户的Discord ID")
     """用户的Discord ID"""
 
-    context_thread_id: int = Field(index=True, description="上下文的帖子ID")
+    context_thread_id: int = Field(sa_type=DiscordId, index=True, description="上下文的帖子ID")
     """上下文的帖子ID"""
 
     message_count: int = Field(default=0, description="该用户在帖子中的有效发言次数")
@@ -39,8 +39,8 @@ class UserActivity(BaseModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
         sa_column_kwargs={
-            "server_default": text("CURRENT_TIMESTAMP"),
-            "onupdate": text("CURRENT_TIMESTAMP"),
+            "server_default": utc_now(),
+            "onupdate": utc_now(),
         },
         description="最后更新时间",
     )
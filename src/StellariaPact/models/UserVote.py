@@ -3,10 +3,10 @@ from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import UniqueConstraint
 from sqlalchemy.ext.declarative import declared_attr
-from sqlmodel import Field, Relationship, text
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from StellariaPact.models.VoteSession import VoteSession
@@ -24,7 +24,7 @@ class UserVote(BaseModel, table=True):
     )
     """关联的投票会话ID"""
 
-    user_id: int = Field(index=True, description="投票用户的Discord ID")
+    user_id: int = Field(sa_type=DiscordId, index=True, description="投票用户的Discord ID")
     """投票用户的Discord ID"""
 
     choice: int = Field(description="用户的选项: 0-反对, 1-赞成")
@@ -39,7 +39,7 @@ class UserVote(BaseModel, table=True):
     voted_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="投票时间",
     )
     """投票时间"""
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Index, Table
+from sqlmodel import SQLModel
+
+from StellariaPact.models.UserVote import UserVote
+from StellariaPact.models.VoteMessageMirror import VoteMessageMirror
+from StellariaPact.models.VoteOption import VoteOption
+from StellariaPact.models.VoteSession import VoteSession
+from StellariaPact.share.database_types import UTCDateTime, utc_now
+
+
+def _archive_table(source: Table, *indexed_columns: str) -> Table:
+    """
+    按热表的列定义生成归档表。
+
+    归档表保留原主键，但不带热表的默认值、唯一约束和业务索引，
+    只为历史查询所需的列建立索引，并额外记录归档时间。
+    """
+    name = f"{source.name}_archive"
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+            autoincrement=False,
+        )
+        for column in source.columns
+    ]
+    columns.append(
+        Column(
+            "archived_at",
+            UTCDateTime,
+            nullable=False,
+            server_default=utc_now(),
+        )
+    )
+    indexes = [Index(f"ix_{name}_{column}", column) for column in indexed_columns]
+    return Table(name, SQLModel.metadata, *columns, *indexes)
+
+
+vote_session_archive = _archive_table(VoteSession.__table__, "guild_id")  # type: ignore[arg-type]
+"""已归档的投票会话"""
+
+user_vote_archive = _archive_table(UserVote.__table__, "session_id")  # type: ignore[arg-type]
+"""已归档会话的投票记录"""
+
+vote_option_archive = _archive_table(
+    VoteOption.__table__,  # type: ignore[arg-type]
+    "session_id",
+    "creator_id",
+)
+"""已归档会话的投票选项"""
+
+vote_message_mirror_archive = _archive_table(
+    VoteMessageMirror.__table__,  # type: ignore[arg-type]
+    "session_id",
+)
+"""已归档会话的镜像消息"""
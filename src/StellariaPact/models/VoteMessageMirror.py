@@ -1,9 +1,9 @@
 from datetime import datetime, timezone
 
-from sqlmodel import Field, text
+from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 
 class VoteMessageMirror(BaseModel, table=True):
@@ -16,19 +16,19 @@ class VoteMessageMirror(BaseModel, table=True):
     session_id: int = Field(index=True, description="关联的投票会话ID")
     """关联的投票会话ID"""
 
-    guild_id: int = Field(index=True, description="服务器ID")
+    guild_id: int = Field(sa_type=DiscordId, index=True, description="服务器ID")
     """服务器ID"""
 
-    channel_id: int = Field(index=True, description="镜像所在的频道或帖子ID")
+    channel_id: int = Field(sa_type=DiscordId, index=True, description="镜像所在的频道或帖子ID")
     """镜像所在的频道或帖子ID"""
 
-    message_id: int = Field(index=True, description="镜像消息的ID")
+    message_id: int = Field(sa_type=DiscordId, index=True, description="镜像消息的ID")
     """镜像消息的ID"""
 
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
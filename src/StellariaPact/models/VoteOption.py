@@ -1,11 +1,11 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import UniqueConstraint, text
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field
 
 from StellariaPact.models.BaseModel import BaseModel
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 from StellariaPact.share.enums import ObjectionResolutionType, VoteOptionStatus
 
 
@@ -41,7 +41,9 @@ class VoteOption(BaseModel, table=True):
     choice_text: str = Field(description="选项文本")
     """选项文本"""
 
-    creator_id: Optional[int] = Field(default=None, description="选项创建人的 Discord ID")
+    creator_id: Optional[int] = Field(
+        sa_type=DiscordId, default=None, description="选项创建人的 Discord ID"
+    )
     """选项创建人的 Discord ID"""
 
     creator_name: Optional[str] = Field(default=None, description="选项创建人的 Discord 昵称")
@@ -79,7 +81,7 @@ class VoteOption(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
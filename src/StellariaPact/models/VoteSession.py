@@ -1,11 +1,12 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlmodel import Field, Relationship, text
+from sqlalchemy import Index
+from sqlmodel import Field, Relationship
 
 from StellariaPact.models.BaseModel import BaseModel
 from StellariaPact.models.Objection import Objection
-from StellariaPact.share.database_types import UTCDateTime
+from StellariaPact.share.database_types import DiscordId, UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from StellariaPact.models.UserVote import UserVote
@@ -18,6 +19,16 @@ class VoteSession(BaseModel, table=True):
 
     __tablename__ = "vote_session"  # type: ignore
 
+    # 到期认领: status = 1 AND session_type = ? AND end_time <= now
+    __table_args__ = (
+        Index(
+            "ix_vote_session_status_type_end_time",
+            "status",
+            "session_type",
+            "end_time",
+        ),
+    )
+
     session_type: int = Field(
         default=1, index=True, description="投票类型, 1-提案, 2-异议支持, 3-异议, 4-草案"
     )
@@ -35,19 +46,19 @@ class VoteSession(BaseModel, table=True):
     intake_id: Optional[int] = Field(default=None, description="关联的草案ID")
     """关联的草案ID"""
 
-    guild_id: int = Field(index=True, description="服务器ID")
+    guild_id: int = Field(sa_type=DiscordId, index=True, description="服务器ID")
     """服务器ID"""
 
-    context_thread_id: int = Field(index=True, description="投票发生的频道ID")
+    context_thread_id: int = Field(sa_type=DiscordId, index=True, description="投票发生的频道ID")
     """投票发生的频道ID"""
 
     context_message_id: Optional[int] = Field(
-        default=None, index=True, description="投票面板消息的ID"
+        sa_type=DiscordId, default=None, index=True, description="投票面板消息的ID"
     )
     """投票面板消息的ID"""
 
     voting_channel_message_id: Optional[int] = Field(
-        default=None, index=True, description="投票频道中镜像投票消息的ID"
+        sa_type=DiscordId, default=None, index=True, description="投票频道中镜像投票消息的ID"
     )
     """投票频道中镜像投票消息的ID"""
 
@@ -60,13 +71,15 @@ class VoteSession(BaseModel, table=True):
     notify_flag: bool = Field(default=True, description="投票结束时是否通知相关方")
     """投票结束时是否通知相关方"""
 
-    status: int = Field(default=1, index=True, description="投票状态: 0-已结束, 1-进行中")
-    """投票状态: 0-已结束, 1-进行中"""
+    status: int = Field(
+        default=1, index=True, description="投票状态: 0-已结束, 1-进行中, 2-结算中"
+    )
+    """投票状态: 0-已结束, 1-进行中, 2-结算中"""
 
     start_time: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="投票开始时间",
     )
     """投票开始时间"""
@@ -81,7 +94,7 @@ class VoteSession(BaseModel, table=True):
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_type=UTCDateTime,
-        sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")},
+        sa_column_kwargs={"server_default": utc_now()},
         description="创建时间",
     )
     """创建时间"""
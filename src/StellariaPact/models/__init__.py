@@ -1,37 +1,57 @@
+from .ActivityBackfillCheckpoint import ActivityBackfillCheckpoint
 from .Announcement import Announcement
 from .AnnouncementChannelMonitor import AnnouncementChannelMonitor
 from .BaseModel import BaseModel
 from .ConfirmationSession import ConfirmationSession
+from .CountedMessage import CountedMessage
+from .DroppedMessageEvent import DroppedMessageEvent
 from .GlobalProposalPunishment import GlobalProposalPunishment
 from .Objection import Objection
 from .OperationLog import OperationLog
+from .ProcessedMessageEvent import ProcessedMessageEvent
 from .Proposal import Proposal
 from .ProposalIntake import ProposalIntake
 from .PunishmentRecord import PunishmentRecord
 from .StructuredSpeechMessage import StructuredSpeechMessage
 from .StructuredSpeechMode import StructuredSpeechMode
+from .StructuredSpeechWebhook import StructuredSpeechWebhook
 from .UserActivity import UserActivity
 from .UserVote import UserVote
+from .VoteArchive import (
+    user_vote_archive,
+    vote_message_mirror_archive,
+    vote_option_archive,
+    vote_session_archive,
+)
 from .VoteMessageMirror import VoteMessageMirror
 from .VoteOption import VoteOption
 from .VoteSession import VoteSession
 
 __all__ = [
+    "ActivityBackfillCheckpoint",
     "Announcement",
     "AnnouncementChannelMonitor",
     "BaseModel",
     "ConfirmationSession",
+    "CountedMessage",
+    "DroppedMessageEvent",
     "GlobalProposalPunishment",
     "Objection",
     "OperationLog",
+    "ProcessedMessageEvent",
     "Proposal",
     "PunishmentRecord",
     "StructuredSpeechMessage",
     "StructuredSpeechMode",
+    "StructuredSpeechWebhook",
     "UserActivity",
     "UserVote",
     "VoteMessageMirror",
     "VoteOption",
     "VoteSession",
     "ProposalIntake",
+    "vote_session_archive",
+    "user_vote_archive",
+    "vote_option_archive",
+    "vote_message_mirror_archive",
 ]
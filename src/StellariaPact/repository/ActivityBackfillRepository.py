@@ -0,0 +1,26 @@
+from typing import Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.ActivityBackfillCheckpoint import ActivityBackfillCheckpoint
+
+
+class ActivityBackfillRepository:
+    """
+    提供发言计数回填断点表的数据库操作。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_checkpoint(self, thread_id: int) -> Optional[ActivityBackfillCheckpoint]:
+        """按帖子ID获取回填断点。"""
+        return await self.session.get(ActivityBackfillCheckpoint, thread_id)
+
+    async def save_checkpoint(
+        self, checkpoint: ActivityBackfillCheckpoint
+    ) -> ActivityBackfillCheckpoint:
+        """保存回填断点；同一帖子已有断点时整体覆盖。"""
+        merged = await self.session.merge(checkpoint)
+        await self.session.flush()
+        return merged
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import and_, case, delete, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.models.Announcement import Announcement
@@ -18,32 +18,92 @@ class AnnouncementMonitorRepository:
     async def get_pending_reposts(self) -> list[AnnouncementChannelMonitor]:
         """
         获取所有满足重复播报条件的监控器。
+
+        按 `next_repost_at` 索引做范围查询，只读取已到时间的监控器，再筛选消息数阈值。
         """
         now_utc = datetime.now(timezone.utc)
-
-        # 使用特定于数据库的函数将时间转换为 Unix 时间戳（整数秒）进行比较，
-        # 以绕过 SQLAlchemy 对 timedelta 和列进行复杂运算时的翻译问题
-
-        current_timestamp = func.strftime("%s", now_utc)
-        last_repost_timestamp = func.strftime("%s", AnnouncementChannelMonitor.last_repost_at)
-        required_seconds_interval = AnnouncementChannelMonitor.time_interval_minutes * 60
-
-        time_check_clause = current_timestamp - last_repost_timestamp >= required_seconds_interval
-
         stmt = (
             select(AnnouncementChannelMonitor)
             .join(Announcement, Announcement.id == AnnouncementChannelMonitor.announcement_id)  # type: ignore
             .where(
                 and_(
+                    AnnouncementChannelMonitor.next_repost_at <= now_utc,  # type: ignore
                     Announcement.status == 1,  # type: ignore
                     AnnouncementChannelMonitor.message_count_since_last
                     >= AnnouncementChannelMonitor.message_threshold,  # type: ignore
-                    time_check_clause,  # type: ignore
                 )
             )
         )
-        result = await self.session.scalars(stmt)
-        return list(result.all())
+        result = await self.session.exec(stmt)  # type: ignore[call-overload]
+        return list(result.scalars().all())
+
+    async def get_repost_deadlines(self) -> list[tuple[int, datetime]]:
+        """
+        获取已达到消息数阈值的监控器及其可以重复播报的时间，供截止时间调度器加载。
+
+        阈值与计数是列之间的比较，无法使用索引，因此只在启动和安全扫描时全量加载；
+        平时由 `increment_message_counts` 返回本次新达到阈值的监控器。
+        """
+        stmt = (
+            select(AnnouncementChannelMonitor.id, AnnouncementChannelMonitor.next_repost_at)
+            .join(Announcement, Announcement.id == AnnouncementChannelMonitor.announcement_id)  # type: ignore
+            .where(
+                Announcement.status == 1,  # type: ignore
+                AnnouncementChannelMonitor.message_count_since_last
+                >= AnnouncementChannelMonitor.message_threshold,  # type: ignore
+            )
+        )
+        result = await self.session.exec(stmt)  # type: ignore[call-overload]
+        return [(monitor_id, next_repost_at) for monitor_id, next_repost_at in result.all()]
+
+    async def get_active_monitor_index(self) -> dict[int, list[int]]:
+        """
+        获取进行中公示的监控器，按频道分组: {channel_id: [monitor_id, ...]}。
+        """
+        stmt = (
+            select(AnnouncementChannelMonitor.id, AnnouncementChannelMonitor.channel_id)
+            .join(Announcement, Announcement.id == AnnouncementChannelMonitor.announcement_id)  # type: ignore
+            .where(Announcement.status == 1)  # type: ignore
+        )
+        result = await self.session.exec(stmt)  # type: ignore[call-overload]
+        index: dict[int, list[int]] = {}
+        for monitor_id, channel_id in result.all():
+            index.setdefault(channel_id, []).append(monitor_id)
+        return index
+
+    async def increment_message_counts(
+        self, increments: dict[int, int]
+    ) -> list[tuple[int, datetime]]:
+        """
+        以一条 `UPDATE ... CASE ... RETURNING` 语句为多个监控器累加消息计数: {monitor_id: 增量}。
+
+        Returns:
+            本次累加后新达到消息数阈值的监控器及其可以重复播报的时间:
+            [(monitor_id, next_repost_at)]。此前已达到阈值的监控器早已登记，不再返回。
+        """
+        if not increments:
+            return []
+        stmt = (
+            update(AnnouncementChannelMonitor)
+            .where(AnnouncementChannelMonitor.id.in_(increments))  # type: ignore
+            .values(
+                message_count_since_last=AnnouncementChannelMonitor.message_count_since_last
+                + case(increments, value=AnnouncementChannelMonitor.id, else_=0)
+            )
+            .returning(
+                AnnouncementChannelMonitor.id,  # type: ignore
+                AnnouncementChannelMonitor.next_repost_at,  # type: ignore
+                AnnouncementChannelMonitor.message_count_since_last,  # type: ignore
+                AnnouncementChannelMonitor.message_threshold,  # type: ignore
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.exec(stmt)  # type: ignore[call-overload]
+        return [
+            (monitor_id, next_repost_at)
+            for monitor_id, next_repost_at, count, threshold in result.all()
+            if count >= threshold > count - increments[monitor_id]
+        ]
 
     async def create_monitors_for_announcement(
         self,
@@ -64,11 +124,13 @@ class AnnouncementMonitorRepository:
             )
             self.session.add(monitor)
 
-    async def delete_monitors_for_announcement(self, announcement_id: int):
+    async def delete_monitors_for_announcements(self, announcement_ids: list[int]):
         """
-        批量删除与特定公示相关的所有监控器记录。
+        批量删除与一批公示相关的所有监控器记录。
         """
+        if not announcement_ids:
+            return
         stmt = delete(AnnouncementChannelMonitor).where(
-            AnnouncementChannelMonitor.announcement_id == announcement_id  # type: ignore
+            AnnouncementChannelMonitor.announcement_id.in_(announcement_ids)  # type: ignore
         )
-        await self.session.execute(stmt)
+        await self.session.exec(stmt)  # type: ignore[call-overload]
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 
+from sqlalchemy import update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -69,6 +70,15 @@ class AnnouncementRepository:
         )
         return list(result.all())
 
+    async def get_active_deadlines(self) -> list[tuple[int, datetime]]:
+        """
+        获取所有进行中公示的 ID 与结束时间，供截止时间调度器加载。
+        """
+        result = await self.session.exec(
+            select(Announcement.id, Announcement.end_time).where(Announcement.status == 1)
+        )
+        return [(announcement_id, end_time) for announcement_id, end_time in result.all()]
+
     async def update_end_time(self, announcement_id: int, new_end_time: datetime):
         """
         更新特定公示的结束时间。
@@ -82,14 +92,24 @@ class AnnouncementRepository:
             announcement.end_time = new_end_time
             self.session.add(announcement)
 
-    async def mark_announcement_as_finished(self, announcement_id: int):
+    async def mark_announcements_as_finished(self, announcement_ids: list[int]) -> list[int]:
         """
-        将单个公示标记为已结束。
+        将一批进行中的公示标记为已结束。
 
         Args:
-            announcement_id: 要标记的公示的 ID。
+            announcement_ids: 要标记的公示的 ID。
+
+        Returns:
+            本次实际由进行中变为已结束的公示 ID。
         """
-        announcement = await self.session.get(Announcement, announcement_id)
-        if announcement:
-            announcement.status = 0  # 已结束
-            self.session.add(announcement)
+        if not announcement_ids:
+            return []
+        statement = (
+            update(Announcement)
+            .where(Announcement.id.in_(announcement_ids))  # type: ignore
+            .where(Announcement.status == 1)  # type: ignore
+            .values(status=0)  # 已结束
+            .returning(Announcement.id)  # type: ignore
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return [announcement_id for (announcement_id,) in result.all()]
@@ -0,0 +1,168 @@
+from typing import Iterable, Sequence
+
+from sqlalchemy import delete, update
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.CountedMessage import CountedMessage
+from StellariaPact.models.Proposal import Proposal
+from StellariaPact.models.VoteSession import VoteSession
+from StellariaPact.share.database_types import upsert_insert
+from StellariaPact.share.enums.ProposalStatus import ProposalStatus
+
+CLOSED_PROPOSAL_STATUSES = (
+    ProposalStatus.ABANDONED,
+    ProposalStatus.REJECTED,
+    ProposalStatus.FINISHED,
+)
+"""提案进入这些状态后，其讨论帖中的消息索引不再被需要"""
+
+
+class CountedMessageRepository:
+    """
+    提供已计数讨论消息索引表的数据库操作。
+    """
+
+    BATCH_CHUNK_SIZE = 500
+    """单条语句处理的消息数量上限，避免超出 SQLite 绑定参数上限"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record_messages(self, messages: Sequence[tuple[int, int, int]]) -> None:
+        """
+        记录已计入发言数的消息；已存在的记录保持不变。
+
+        Args:
+            messages: (message_id, user_id, thread_id) 形式的消息索引。
+        """
+        rows = list({message_id: (message_id, *rest) for message_id, *rest in messages}.values())
+        for start in range(0, len(rows), self.BATCH_CHUNK_SIZE):
+            chunk = rows[start : start + self.BATCH_CHUNK_SIZE]
+            statement = (
+                upsert_insert(self.session, CountedMessage)
+                .values(
+                    [
+                        {
+                            "message_id": message_id,
+                            "user_id": user_id,
+                            "thread_id": thread_id,
+                            "counted": True,
+                        }
+                        for message_id, user_id, thread_id in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[CountedMessage.message_id])
+            )
+            await self.session.exec(statement)  # type: ignore[call-overload]
+
+    async def uncount_messages(self, message_ids: Iterable[int]) -> list[tuple[int, int, int]]:
+        """
+        将仍计入发言数的消息标记为已扣减，并返回被标记的消息。
+
+        标记与读取在同一条 UPDATE ... RETURNING 中完成，重复的删除事件不会重复扣减。
+
+        Returns:
+            (message_id, user_id, thread_id) 列表；不在索引中或已扣减的消息不会出现。
+        """
+        ids = list(dict.fromkeys(message_ids))
+        claimed: list[tuple[int, int, int]] = []
+        for start in range(0, len(ids), self.BATCH_CHUNK_SIZE):
+            statement = (
+                update(CountedMessage)
+                .where(
+                    col(CountedMessage.message_id).in_(ids[start : start + self.BATCH_CHUNK_SIZE]),
+                    col(CountedMessage.counted).is_(True),
+                )
+                .values(counted=False)
+                .returning(
+                    CountedMessage.message_id,  # type: ignore[arg-type]
+                    CountedMessage.user_id,  # type: ignore[arg-type]
+                    CountedMessage.thread_id,  # type: ignore[arg-type]
+                )
+            )
+            result = await self.session.exec(statement)  # type: ignore[call-overload]
+            claimed.extend(
+                (message_id, user_id, thread_id) for message_id, user_id, thread_id in result.all()
+            )
+        return claimed
+
+    async def uncount_unindexed_messages(
+        self, messages: Sequence[tuple[int, int, int]]
+    ) -> list[tuple[int, int, int]]:
+        """
+        为不在索引中的已删除消息写入已扣减标记，并返回实际写入的消息。
+
+        用于索引建立前已计数的消息：已有索引记录（包括已扣减）的消息保持不变，
+        写入与读取在同一条 INSERT ... RETURNING 中完成，重复的删除事件不会重复扣减。
+
+        Args:
+            messages: (message_id, user_id, thread_id) 形式的消息。
+        """
+        rows = list({message_id: (message_id, *rest) for message_id, *rest in messages}.values())
+        inserted: list[tuple[int, int, int]] = []
+        for start in range(0, len(rows), self.BATCH_CHUNK_SIZE):
+            chunk = rows[start : start + self.BATCH_CHUNK_SIZE]
+            statement = (
+                upsert_insert(self.session, CountedMessage)
+                .values(
+                    [
+                        {
+                            "message_id": message_id,
+                            "user_id": user_id,
+                            "thread_id": thread_id,
+                            "counted": False,
+                        }
+                        for message_id, user_id, thread_id in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[CountedMessage.message_id])
+                .returning(
+                    CountedMessage.message_id,  # type: ignore[arg-type]
+                    CountedMessage.user_id,  # type: ignore[arg-type]
+                    CountedMessage.thread_id,  # type: ignore[arg-type]
+                )
+            )
+            result = await self.session.exec(statement)  # type: ignore[call-overload]
+            inserted.extend(
+                (message_id, user_id, thread_id) for message_id, user_id, thread_id in result.all()
+            )
+        return inserted
+
+    async def get_prunable_thread_ids(self, limit: int) -> list[int]:
+        """
+        获取可以清理消息索引的帖子ID，至多 limit 个。
+
+        帖子对应的提案已结束，且帖子内的投票会话均已归档（不再能重新开启）时，
+        其中的消息计数不会再影响任何投票资格。
+        """
+        has_hot_session = (
+            select(VoteSession.id)
+            .where(VoteSession.context_thread_id == Proposal.discussion_thread_id)
+            .exists()
+        )
+        statement = (
+            select(Proposal.discussion_thread_id)
+            .where(
+                col(Proposal.status).in_(CLOSED_PROPOSAL_STATUSES),
+                ~has_hot_session,
+                select(CountedMessage.message_id)
+                .where(CountedMessage.thread_id == Proposal.discussion_thread_id)
+                .exists(),
+            )
+            .order_by(Proposal.discussion_thread_id)
+            .limit(limit)
+        )
+        return list((await self.session.exec(statement)).all())
+
+    async def delete_threads(self, thread_ids: Sequence[int]) -> int:
+        """删除指定帖子中的全部消息索引，返回删除的行数。"""
+        deleted = 0
+        ids = list(dict.fromkeys(thread_ids))
+        for start in range(0, len(ids), self.BATCH_CHUNK_SIZE):
+            statement = delete(CountedMessage).where(
+                col(CountedMessage.thread_id).in_(ids[start : start + self.BATCH_CHUNK_SIZE])
+            )
+            result = await self.session.exec(statement)  # type: ignore[call-overload]
+            deleted += result.rowcount or 0  # type: ignore[attr-defined]
+        return deleted
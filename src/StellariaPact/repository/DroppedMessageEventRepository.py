@@ -0,0 +1,67 @@
+from typing import Sequence
+
+from sqlalchemy import delete, tuple_
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.DroppedMessageEvent import DroppedMessageEvent
+from StellariaPact.share.database_types import upsert_insert
+
+
+class DroppedMessageEventRepository:
+    """
+    提供被丢弃远端消息事件表的数据库操作，用于在重启后重新处理这些事件。
+    """
+
+    BATCH_CHUNK_SIZE = 500
+    """单条语句处理的事件数量上限，避免超出 SQLite 绑定参数上限"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_events(self, events: Sequence[DroppedMessageEvent]) -> None:
+        """保存被丢弃的事件；已保存的事件保持不变。"""
+        for start in range(0, len(events), self.BATCH_CHUNK_SIZE):
+            chunk = events[start : start + self.BATCH_CHUNK_SIZE]
+            statement = (
+                upsert_insert(self.session, DroppedMessageEvent)
+                .values(
+                    [
+                        {
+                            "message_id": event.message_id,
+                            "event_type": event.event_type,
+                            "guild_id": event.guild_id,
+                            "forum_id": event.forum_id,
+                            "thread_id": event.thread_id,
+                            "user_id": event.user_id,
+                            "dropped_at": event.dropped_at,
+                        }
+                        for event in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        DroppedMessageEvent.message_id,
+                        DroppedMessageEvent.event_type,
+                    ]
+                )
+            )
+            await self.session.exec(statement)  # type: ignore[call-overload]
+
+    async def get_events(self, limit: int) -> list[DroppedMessageEvent]:
+        """按丢弃时间从早到晚返回至多 limit 条待重新处理的事件。"""
+        statement = (
+            select(DroppedMessageEvent).order_by(col(DroppedMessageEvent.dropped_at)).limit(limit)
+        )
+        return list((await self.session.exec(statement)).all())
+
+    async def delete_events(self, event_keys: Sequence[tuple[int, str]]) -> None:
+        """删除已重新处理的事件，event_keys 为 (message_id, event_type)。"""
+        keys = list(dict.fromkeys(event_keys))
+        for start in range(0, len(keys), self.BATCH_CHUNK_SIZE):
+            statement = delete(DroppedMessageEvent).where(
+                tuple_(DroppedMessageEvent.message_id, DroppedMessageEvent.event_type).in_(
+                    keys[start : start + self.BATCH_CHUNK_SIZE]
+                )
+            )
+            await self.session.exec(statement)  # type: ignore[call-overload]
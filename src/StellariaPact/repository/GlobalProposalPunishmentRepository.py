@@ -3,7 +3,7 @@ from typing import Iterable
 
 from sqlalchemy import func, or_
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import select
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.models.GlobalProposalPunishment import GlobalProposalPunishment
@@ -215,6 +215,28 @@ class GlobalProposalPunishmentRepository:
         )
         return list((await self.session.exec(statement)).all())
 
+    async def get_all_active(
+        self,
+        *,
+        now: datetime | None = None,
+    ) -> list[tuple[int, str, datetime | None]]:
+        """一次查询全部类型的有效处罚: [(target_user_id, punishment_type, expires_at)]。"""
+        current_time = now or datetime.now(timezone.utc)
+        statement = select(
+            GlobalProposalPunishment.target_user_id,
+            GlobalProposalPunishment.punishment_type,
+            GlobalProposalPunishment.expires_at,
+        ).where(
+            # 列出全部类型以使用 (punishment_type, lifted_at) 索引
+            col(GlobalProposalPunishment.punishment_type).in_([str(t) for t in PunishmentType]),
+            GlobalProposalPunishment.lifted_at.is_(None),  # type: ignore[union-attr]
+            or_(
+                GlobalProposalPunishment.expires_at.is_(None),  # type: ignore[union-attr]
+                GlobalProposalPunishment.expires_at > current_time,
+            ),
+        )
+        return [tuple(row) for row in (await self.session.exec(statement)).all()]  # type: ignore[misc]
+
     async def get_history(self, target_user_id: int) -> list[GlobalProposalPunishment]:
         statement = (
             select(GlobalProposalPunishment)
@@ -4,8 +4,8 @@ from typing import Optional, Sequence
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from StellariaPact.models import ProposalIntake
-from StellariaPact.share.enums import IntakeStatus
+from StellariaPact.models import ProposalIntake, VoteSession
+from StellariaPact.share.enums import IntakeStatus, VoteSessionType
 
 
 class IntakeRepository:
@@ -41,6 +41,18 @@ class IntakeRepository:
         result = await self.session.exec(statement)
         return result.all()
 
+    async def get_support_deadlines(self) -> list[tuple[int, datetime]]:
+        """获取仍在收集支持票的草案及其支持票收集的结束时间，供截止时间调度器加载。"""
+        statement = (
+            select(ProposalIntake.id, VoteSession.end_time)
+            .join(VoteSession, VoteSession.intake_id == ProposalIntake.id)  # type: ignore
+            .where(ProposalIntake.status == IntakeStatus.SUPPORT_COLLECTING)
+            .where(VoteSession.session_type == VoteSessionType.INTAKE_SUPPORT)
+            .where(VoteSession.end_time != None)  # noqa: E711
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return [(intake_id, end_time) for intake_id, end_time in result.all()]
+
     async def get_intake_by_review_thread_id(self, thread_id: int) -> Optional[ProposalIntake]:
         """
         通过审核帖子 ID 获取 ProposalIntake。
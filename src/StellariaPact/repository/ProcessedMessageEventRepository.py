@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import delete
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.ProcessedMessageEvent import ProcessedMessageEvent
+from StellariaPact.share.database_types import upsert_insert
+
+
+class ProcessedMessageEventRepository:
+    """
+    提供已处理远端消息事件表的数据库操作，用于消息事件的幂等去重。
+    """
+
+    BATCH_CHUNK_SIZE = 500
+    """单条语句处理的事件数量上限，避免超出 SQLite 绑定参数上限"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record_events(
+        self, event_keys: Sequence[tuple[int, str]], processed_at: datetime
+    ) -> None:
+        """
+        记录已处理的事件；已存在的记录保持不变。
+
+        Args:
+            event_keys: (message_id, event_type) 形式的事件键。
+            processed_at: 事件被处理的时间。
+        """
+        keys = list(dict.fromkeys(event_keys))
+        for start in range(0, len(keys), self.BATCH_CHUNK_SIZE):
+            chunk = keys[start : start + self.BATCH_CHUNK_SIZE]
+            statement = (
+                upsert_insert(self.session, ProcessedMessageEvent)
+                .values(
+                    [
+                        {
+                            "message_id": message_id,
+                            "event_type": event_type,
+                            "processed_at": processed_at,
+                        }
+                        for message_id, event_type in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        ProcessedMessageEvent.message_id,
+                        ProcessedMessageEvent.event_type,
+                    ]
+                )
+            )
+            await self.session.exec(statement)  # type: ignore[call-overload]
+
+    async def get_existing_keys(
+        self, event_keys: Sequence[tuple[int, str]]
+    ) -> set[tuple[int, str]]:
+        """返回给定事件键中已被记录为处理过的部分。"""
+        message_ids = list({message_id for message_id, _ in event_keys})
+        existing: set[tuple[int, str]] = set()
+        for start in range(0, len(message_ids), self.BATCH_CHUNK_SIZE):
+            # 按主键前缀 message_id 查询，再在内存中匹配事件类型
+            statement = select(
+                ProcessedMessageEvent.message_id, ProcessedMessageEvent.event_type
+            ).where(
+                col(ProcessedMessageEvent.message_id).in_(
+                    message_ids[start : start + self.BATCH_CHUNK_SIZE]
+                )
+            )
+            for message_id, event_type in (await self.session.exec(statement)).all():
+                existing.add((message_id, event_type))
+        return existing.intersection(event_keys)
+
+    async def get_recent_events(
+        self, since: datetime, limit: int
+    ) -> list[tuple[int, str, datetime]]:
+        """
+        获取 since 之后处理的事件，按处理时间从新到旧返回至多 limit 条，用于预热内存去重表。
+        """
+        statement = (
+            select(
+                ProcessedMessageEvent.message_id,
+                ProcessedMessageEvent.event_type,
+                ProcessedMessageEvent.processed_at,
+            )
+            .where(ProcessedMessageEvent.processed_at >= since)
+            .order_by(col(ProcessedMessageEvent.processed_at).desc())
+            .limit(limit)
+        )
+        rows = (await self.session.exec(statement)).all()
+        return [
+            (message_id, event_type, processed_at) for message_id, event_type, processed_at in rows
+        ]
+
+    async def delete_expired(self, cutoff: datetime) -> int:
+        """删除 cutoff 之前处理的事件记录，返回删除的行数。"""
+        statement = delete(ProcessedMessageEvent).where(
+            col(ProcessedMessageEvent.processed_at) < cutoff
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return result.rowcount or 0  # type: ignore[attr-defined]
@@ -106,6 +106,13 @@ class ProposalRepository:
         result = await self.session.exec(statement)
         return list(result.all())
 
+    async def get_all_proposals(self) -> list[Proposal]:
+        """
+        获取全部提案，供启动时预热提案帖注册表。
+        """
+        result = await self.session.exec(select(Proposal))
+        return list(result.all())
+
     async def get_proposal_by_thread_id(self, thread_id: int) -> Optional[Proposal]:
         """
         根据帖子ID获取提案 ORM 对象。
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.StructuredSpeechWebhook import StructuredSpeechWebhook
+from StellariaPact.share.database_types import upsert_insert
+
+
+class StructuredSpeechWebhookRepository:
+    """封装论坛结构化发言 Webhook 表的数据库操作。"""
+
+    def __init__(self, session: AsyncSession):
+        """绑定当前工作单元的数据库会话。"""
+        self.session = session
+
+    async def get_all(self) -> dict[int, int]:
+        """一次查询全部论坛的 Webhook: {forum_id: webhook_id}。"""
+        result = await self.session.exec(
+            select(StructuredSpeechWebhook.forum_id, StructuredSpeechWebhook.webhook_id)
+        )
+        return {forum_id: webhook_id for forum_id, webhook_id in result.all()}
+
+    async def upsert(self, *, forum_id: int, webhook_id: int) -> None:
+        """写入论坛的 Webhook ID，已有记录时替换。"""
+        statement = (
+            upsert_insert(self.session, StructuredSpeechWebhook)
+            .values(forum_id=forum_id, webhook_id=webhook_id)
+            .on_conflict_do_update(
+                index_elements=[StructuredSpeechWebhook.forum_id],
+                set_={
+                    "webhook_id": webhook_id,
+                    "updated_at": datetime.now(timezone.utc),
+                },
+            )
+        )
+        await self.session.exec(statement)  # type: ignore[call-overload]
+
+    async def delete(self, *, forum_id: int, webhook_id: int) -> None:
+        """删除论坛中指定 Webhook 的记录；记录已被替换时不做任何事。"""
+        statement = delete(StructuredSpeechWebhook).where(
+            col(StructuredSpeechWebhook.forum_id) == forum_id,
+            col(StructuredSpeechWebhook.webhook_id) == webhook_id,
+        )
+        await self.session.exec(statement)  # type: ignore[call-overload]
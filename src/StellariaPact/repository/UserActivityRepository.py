@@ -1,11 +1,13 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
+from sqlalchemy import tuple_, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from StellariaPact.qo.user_activity import UpdateUserActivityQo
 from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.share.database_types import greatest, upsert_insert, utc_now
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,9 @@ class UserActivityRepository:
     提供处理用户活动表相关数据库操作
     """
 
+    BATCH_UPSERT_CHUNK_SIZE = 500
+    """多行 UPSERT 每批的行数，避免超出 SQLite 绑定参数上限"""
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -30,44 +35,134 @@ class UserActivityRepository:
         activity = result.one_or_none()
         return activity
 
-    async def update_user_activity(self, qo: UpdateUserActivityQo) -> UserActivity:
+    async def get_active_mutes(self, now: datetime) -> list[tuple[int, int, datetime]]:
         """
-        更新用户在特定帖子中的有效发言计数。
-        如果用户活动记录不存在，则会创建一个。
+        一次查询全部尚未到期的帖子禁言: [(thread_id, user_id, mute_end_time)]。
         """
-        statement = select(UserActivity).where(
-            UserActivity.user_id == qo.user_id,
-            UserActivity.context_thread_id == qo.thread_id,
+        statement = select(
+            UserActivity.context_thread_id, UserActivity.user_id, UserActivity.mute_end_time
+        ).where(UserActivity.mute_end_time > now)  # type: ignore[operator]
+        result = await self.session.exec(statement)
+        return [(thread_id, user_id, end_time) for thread_id, user_id, end_time in result.all()]
+
+    async def get_thread_message_counts(self, thread_id: int) -> dict[int, int]:
+        """
+        获取帖子内全部用户的有效发言计数: {user_id: message_count}。
+        """
+        statement = select(UserActivity.user_id, UserActivity.message_count).where(
+            UserActivity.context_thread_id == thread_id
         )
         result = await self.session.exec(statement)
-        user_activity = result.one_or_none()
+        return {user_id: message_count for user_id, message_count in result.all()}
 
-        if user_activity:
-            # 确保计数不会变为负数
-            new_count = user_activity.message_count + qo.change
-            user_activity.message_count = max(0, new_count)
-        else:
-            # 如果是减少操作，但记录不存在，则无需创建
-            if qo.change < 0:
-                # 返回一个临时的、未保存的实例，表示没有变化
-                return UserActivity(
-                    id=-1,  # Placeholder ID
+    async def update_user_activity(self, qo: UpdateUserActivityQo) -> UserActivity:
+        """
+        更新用户在特定帖子中的有效发言计数。
+        增加计数时通过单条 UPSERT 语句创建或累加记录；
+        减少计数时只更新已存在的记录，计数不会小于 0。
+        """
+        if qo.change > 0:
+            # 依赖 uk_user_activity_per_thread 唯一约束，一次往返完成创建或累加。
+            statement = (
+                upsert_insert(self.session, UserActivity)
+                .values(
                     user_id=qo.user_id,
                     context_thread_id=qo.thread_id,
-                    message_count=0,
-                    validation=True,
+                    message_count=qo.change,
+                )
+                .on_conflict_do_update(
+                    index_elements=[UserActivity.user_id, UserActivity.context_thread_id],
+                    set_={
+                        "message_count": greatest(0, UserActivity.message_count + qo.change),
+                        "last_updated": utc_now(),
+                    },
+                )
+                .returning(UserActivity)
+            )
+        else:
+            # 减少操作不为不存在的用户创建记录。
+            statement = (
+                update(UserActivity)
+                .where(
+                    UserActivity.user_id == qo.user_id,  # type: ignore
+                    UserActivity.context_thread_id == qo.thread_id,  # type: ignore
                 )
-            # 仅在增加时创建新记录
-            user_activity = UserActivity(
+                .values(message_count=greatest(0, UserActivity.message_count + qo.change))
+                .returning(UserActivity)
+            )
+
+        result = await self.session.scalars(
+            statement, execution_options={"populate_existing": True}
+        )
+        user_activity = result.one_or_none()
+        if user_activity is None:
+            # 返回一个临时的、未保存的实例，表示没有变化
+            return UserActivity(
+                id=-1,  # Placeholder ID
                 user_id=qo.user_id,
                 context_thread_id=qo.thread_id,
-                message_count=1,
+                message_count=0,
+                validation=True,
             )
-
-        self.session.add(user_activity)
-        await self.session.flush()
         return user_activity
 
+    async def batch_apply_activity_changes(
+        self, changes: dict[tuple[int, int], int]
+    ) -> dict[tuple[int, int], int]:
+        """
+        批量应用多个用户在多个帖子中的发言计数变化（供写后缓冲区调用）。
+
+        Args:
+            changes: {(user_id, thread_id): change} 形式的计数变化。
+
+        Returns:
+            {(user_id, thread_id): message_count} 形式的写入后计数。
+        """
+        counts: dict[tuple[int, int], int] = {}
+        increments = [(key, change) for key, change in changes.items() if change > 0]
+
+        # 增加量以多行 UPSERT 分块写入，excluded.message_count 即为本次增量
+        for start in range(0, len(increments), self.BATCH_UPSERT_CHUNK_SIZE):
+            chunk = increments[start : start + self.BATCH_UPSERT_CHUNK_SIZE]
+            insert_statement = upsert_insert(self.session, UserActivity).values(
+                [
+                    {
+                        "user_id": user_id,
+                        "context_thread_id": thread_id,
+                        "message_count": change,
+                    }
+                    for (user_id, thread_id), change in chunk
+                ]
+            )
+            statement = insert_statement.on_conflict_do_update(
+                index_elements=[UserActivity.user_id, UserActivity.context_thread_id],
+                set_={
+                    "message_count": greatest(
+                        0, UserActivity.message_count + insert_statement.excluded.message_count
+                    ),
+                    "last_updated": utc_now(),
+                },
+            ).returning(
+                UserActivity.user_id,  # type: ignore
+                UserActivity.context_thread_id,  # type: ignore
+                UserActivity.message_count,  # type: ignore
+            )
+            result = await self.session.execute(statement)
+            for user_id, thread_id, message_count in result.all():
+                counts[(user_id, thread_id)] = message_count
+
+        # 净减少量很少见，逐条更新即可
+        for (user_id, thread_id), change in changes.items():
+            if change >= 0:
+                continue
+            activity = await self.update_user_activity(
+                UpdateUserActivityQo(user_id=user_id, thread_id=thread_id, change=change)
+            )
+            if activity.id != -1:
+                counts[(user_id, thread_id)] = activity.message_count
+
+        return counts
+
     async def update_user_validation_status(
         self,
         user_id: int,
@@ -77,7 +172,7 @@ class UserActivityRepository:
     ) -> UserActivity:
         """
         更新用户在特定帖子中的投票有效性和禁言状态。
-        如果记录不存在，则会创建一条新记录。
+        如果记录不存在，则会创建一条新记录（单条 UPSERT 语句）。
 
         Args:
             user_id: 用户的Discord ID。
@@ -88,50 +183,68 @@ class UserActivityRepository:
         Returns:
             返回被创建或更新的 UserActivity 对象。
         """
-        # 尝试获取现有的活动记录
-        user_activity = await self.get_user_activity(user_id, thread_id)
-
-        if user_activity:
-            # 如果记录存在，则更新其状态
-            user_activity.validation = 1 if is_valid else 0
-            user_activity.mute_end_time = mute_end_time
-        else:
-            # 如果记录不存在，则创建一条新记录
-            user_activity = UserActivity(
+        validation = 1 if is_valid else 0
+        statement = (
+            upsert_insert(self.session, UserActivity)
+            .values(
                 user_id=user_id,
                 context_thread_id=thread_id,
-                validation=1 if is_valid else 0,
+                validation=validation,
                 mute_end_time=mute_end_time,
             )
-
-        self.session.add(user_activity)
-        await self.session.flush()
-        return user_activity
+            .on_conflict_do_update(
+                index_elements=[UserActivity.user_id, UserActivity.context_thread_id],
+                set_={
+                    "validation": validation,
+                    "mute_end_time": mute_end_time,
+                    "last_updated": utc_now(),
+                },
+            )
+            .returning(UserActivity)
+        )
+        result = await self.session.scalars(
+            statement, execution_options={"populate_existing": True}
+        )
+        return result.one()
 
     async def clear_punishment(self, user_id: int, thread_id: int) -> UserActivity | None:
         """
         解除用户在特定帖子中的处罚（恢复投票权并清除禁言时间）
         """
-        user_activity = await self.get_user_activity(user_id, thread_id)
-        if user_activity:
-            user_activity.validation = 1        # 恢复投票权
-            user_activity.mute_end_time = None  # 解除禁言
-            self.session.add(user_activity)
-            await self.session.flush()
-        return user_activity
+        statement = (
+            update(UserActivity)
+            .where(
+                UserActivity.user_id == user_id,  # type: ignore
+                UserActivity.context_thread_id == thread_id,  # type: ignore
+            )
+            .values(validation=1, mute_end_time=None)  # 恢复投票权并解除禁言
+            .returning(UserActivity)
+        )
+        result = await self.session.scalars(
+            statement, execution_options={"populate_existing": True}
+        )
+        return result.one_or_none()
 
-    async def batch_clear_expired_mutes(self, expired_list: list[tuple[int, int]]):
+    async def batch_clear_expired_mutes(
+        self,
+        expired_list: list[tuple[int, int]],
+        *,
+        now: datetime | None = None,
+    ) -> None:
         """
-        批量清理过期的禁言记录（供 Task 调用）。
+        用一条 UPDATE 批量清理过期的禁言记录；expired_list 为 [(user_id, thread_id)]。
+
+        只清理截止时间已过的行，清理前刚被延长的禁言保持不变。
         """
-        from sqlalchemy import update
-        for user_id, thread_id in expired_list:
-            stmt = (
-                update(UserActivity)
-                .where(
-                    UserActivity.user_id == user_id, # type: ignore
-                    UserActivity.context_thread_id == thread_id, # type: ignore
-                )
-                .values(mute_end_time=None)
+        if not expired_list:
+            return
+        current_time = now or datetime.now(timezone.utc)
+        statement = (
+            update(UserActivity)
+            .where(
+                tuple_(UserActivity.user_id, UserActivity.context_thread_id).in_(expired_list),
+                UserActivity.mute_end_time <= current_time,  # type: ignore[operator]
             )
-            await self.session.execute(stmt)
+            .values(mute_end_time=None)
+        )
+        await self.session.exec(statement)  # type: ignore[call-overload]
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import Table, delete, func, insert, literal
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.UserVote import UserVote
+from StellariaPact.models.VoteArchive import (
+    user_vote_archive,
+    vote_message_mirror_archive,
+    vote_option_archive,
+    vote_session_archive,
+)
+from StellariaPact.models.VoteMessageMirror import VoteMessageMirror
+from StellariaPact.models.VoteOption import VoteOption
+from StellariaPact.models.VoteSession import VoteSession
+
+_VOTE_SESSION_TABLE: Table = VoteSession.__table__  # type: ignore[assignment]
+
+# (热表, 归档表)，均以 session_id 关联投票会话
+_CHILD_ARCHIVE_TABLES: tuple[tuple[Table, Table], ...] = (
+    (UserVote.__table__, user_vote_archive),  # type: ignore[misc]
+    (VoteOption.__table__, vote_option_archive),  # type: ignore[misc]
+    (VoteMessageMirror.__table__, vote_message_mirror_archive),  # type: ignore[misc]
+)
+
+
+class VoteArchiveRepository:
+    """
+    负责把已结束的投票会话及其投票、选项、镜像消息从热表搬入归档表。
+    """
+
+    ARCHIVE_CHUNK_SIZE = 500
+    """单条语句内 IN 子句的会话数量上限，避免超出 SQLite 绑定参数上限"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_archivable_session_ids(self, cutoff: datetime, limit: int) -> list[int]:
+        """
+        获取结束时间早于 cutoff 的已结束投票会话ID，按ID升序返回至多 limit 个。
+        """
+        statement = (
+            select(VoteSession.id)
+            .where(
+                VoteSession.status == 0,
+                func.coalesce(VoteSession.end_time, VoteSession.created_at) < cutoff,
+            )
+            .order_by(VoteSession.id)  # type: ignore[arg-type]
+            .limit(limit)
+        )
+        return list((await self.session.exec(statement)).all())
+
+    async def archive_sessions(self, session_ids: Sequence[int], archived_at: datetime) -> int:
+        """
+        将指定会话及其子记录复制到归档表后从热表删除，返回归档的会话数量。
+
+        子表先于会话表处理，复制与删除在调用方的同一事务内完成。
+        """
+        archived = 0
+        ids = list(dict.fromkeys(session_ids))
+        for start in range(0, len(ids), self.ARCHIVE_CHUNK_SIZE):
+            chunk = ids[start : start + self.ARCHIVE_CHUNK_SIZE]
+            for source, target in _CHILD_ARCHIVE_TABLES:
+                await self._move(source, target, chunk, archived_at)
+            archived += await self._move(
+                _VOTE_SESSION_TABLE, vote_session_archive, chunk, archived_at, key="id"
+            )
+        return archived
+
+    async def _move(
+        self,
+        source: Table,
+        target: Table,
+        session_ids: list[int],
+        archived_at: datetime,
+        *,
+        key: str = "session_id",
+    ) -> int:
+        """把 source 中 key 属于 session_ids 的行复制到 target 并删除，返回复制的行数。"""
+        condition = source.c[key].in_(session_ids)
+        column_names = [column.name for column in source.columns]
+        copy_statement = insert(target).from_select(
+            [*column_names, "archived_at"],
+            select(*source.columns, literal(archived_at, target.c.archived_at.type)).where(
+                condition
+            ),
+        )
+        copied = await self.session.exec(copy_statement)
+        await self.session.exec(delete(source).where(condition))
+        return copied.rowcount or 0  # type: ignore[attr-defined]
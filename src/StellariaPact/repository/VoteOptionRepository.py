@@ -1,11 +1,12 @@
 from datetime import datetime, timezone
 from typing import List, Optional, Sequence
 
-from sqlalchemy import func
+from sqlalchemy import func, union_all
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.dto import ObjectionViolationRecordDto
+from StellariaPact.models.VoteArchive import vote_option_archive, vote_session_archive
 from StellariaPact.models.VoteOption import VoteOption
 from StellariaPact.models.VoteSession import VoteSession
 from StellariaPact.share.enums import ObjectionResolutionType, VoteOptionStatus
@@ -297,43 +298,62 @@ class VoteOptionRepository:
         creator_id: int,
         limit: int = 4,
     ) -> tuple[int, list[ObjectionViolationRecordDto]]:
-        """查询服务器内某用户被认定为恶意违规的异议。"""
-        filters = (
-            VoteSession.guild_id == guild_id,
-            VoteOption.creator_id == creator_id,
-            VoteOption.option_type == 1,
-            VoteOption.data_status == 1,
-            VoteOption.voting_status == VoteOptionStatus.CLOSED,
-            VoteOption.resolution_type == ObjectionResolutionType.MALICIOUS,
-            VoteOption.closed_at.is_not(None),  # type: ignore[union-attr]
-        )
-        count_statement = (
-            select(func.count(VoteOption.id))
-            .join(VoteSession, VoteSession.id == VoteOption.session_id)  # type: ignore[arg-type]
-            .where(*filters)
-        )
+        """
+        查询服务器内某用户被认定为恶意违规的异议。
+
+        已归档会话的选项同样计入，结果合并热表与归档表后排序。
+        """
+
+        def _select(option_table, session_table):
+            return (
+                select(
+                    option_table.c.id.label("option_id"),
+                    option_table.c.choice_text,
+                    option_table.c.resolution_description,
+                    option_table.c.created_at,
+                    option_table.c.closed_at,
+                    session_table.c.guild_id,
+                    session_table.c.context_thread_id,
+                    session_table.c.context_message_id,
+                )
+                .join(session_table, session_table.c.id == option_table.c.session_id)
+                .where(
+                    session_table.c.guild_id == guild_id,
+                    option_table.c.creator_id == creator_id,
+                    option_table.c.option_type == 1,
+                    option_table.c.data_status == 1,
+                    option_table.c.voting_status == VoteOptionStatus.CLOSED,
+                    option_table.c.resolution_type == ObjectionResolutionType.MALICIOUS,
+                    option_table.c.closed_at.is_not(None),
+                )
+            )
+
+        combined = union_all(
+            _select(VoteOption.__table__, VoteSession.__table__),
+            _select(vote_option_archive, vote_session_archive),
+        ).subquery()
+
+        count_statement = select(func.count()).select_from(combined)
         total = (await self.session.exec(count_statement)).one()
 
         details_statement = (
-            select(VoteOption, VoteSession)
-            .join(VoteSession, VoteSession.id == VoteOption.session_id)  # type: ignore[arg-type]
-            .where(*filters)
-            .order_by(VoteOption.closed_at.desc(), VoteOption.id.desc())  # type: ignore
+            select(*combined.c)
+            .order_by(combined.c.closed_at.desc(), combined.c.option_id.desc())
             .limit(limit)
         )
         rows = (await self.session.exec(details_statement)).all()
         records = [
             ObjectionViolationRecordDto(
-                option_id=option.id,  # type: ignore[arg-type]
-                choice_text=option.choice_text,
-                resolution_description=option.resolution_description,
-                created_at=option.created_at,
-                closed_at=option.closed_at,  # type: ignore[arg-type]
-                guild_id=session.guild_id,
-                thread_id=session.context_thread_id,
-                context_message_id=session.context_message_id,
+                option_id=row.option_id,
+                choice_text=row.choice_text,
+                resolution_description=row.resolution_description,
+                created_at=row.created_at,
+                closed_at=row.closed_at,
+                guild_id=row.guild_id,
+                thread_id=row.context_thread_id,
+                context_message_id=row.context_message_id,
             )
-            for option, session in rows
+            for row in rows
         ]
         return total, records
 
@@ -180,22 +180,92 @@ class VoteSessionRepository:
         sessions = result.all()
         return sessions
 
-    async def get_expired_sessions(self) -> Sequence[VoteSessionDto]:
+    async def claim_expired_sessions(self) -> list[VoteSessionDto]:
         """
-        获取所有已到期的投票会话 (暂时仅获取1-普通投票)。
+        以一条 `UPDATE ... RETURNING` 将全部已到期的进行中投票 (暂时仅1-普通投票)
+        标记为 2-结算中，并返回被本次调用认领的会话。
+
+        `status = 1` 条件保证同一会话只会被认领一次；结算完成后由
+        `finish_closing_sessions` 统一改为 0-已结束。
         """
         # TODO: 后续可以根据需要扩展到其他类型的投票
         now_utc = datetime.now(timezone.utc)
-        statement = (
-            select(VoteSession)
-            .where(VoteSession.end_time != None)  # noqa: E711
+        due_ids = (
+            select(VoteSession.id)
             .where(VoteSession.status == 1)  # 1 表示 "进行中"
             .where(VoteSession.session_type == 1)  # 1-"普通投票"
             .where(VoteSession.end_time <= now_utc)  # type: ignore
         )
+        statement = (
+            update(VoteSession)
+            .where(VoteSession.id.in_(due_ids))  # type: ignore
+            .where(VoteSession.status == 1)  # type: ignore
+            .values(status=2)
+            .returning(VoteSession)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return [VoteSessionDto.model_validate(s) for s in result.scalars().all()]
+
+    async def get_closing_sessions(self) -> list[VoteSessionDto]:
+        """
+        获取处于 2-结算中 的投票会话。
+
+        正常情况下结算在一次调用内完成，遗留的会话说明上次结算在写回结果前中断，
+        需要重新结算。
+        """
+        statement = (
+            select(VoteSession).where(VoteSession.status == 2).where(VoteSession.session_type == 1)
+        )
         result = await self.session.exec(statement)
-        sessions = result.all()
-        return [VoteSessionDto.model_validate(s) for s in sessions]
+        return [VoteSessionDto.model_validate(s) for s in result.all()]
+
+    async def finish_closing_sessions(self, session_ids: Sequence[int]) -> list[int]:
+        """
+        将一批结算中的投票会话标记为 0-已结束。
+
+        Returns:
+            本次调用实际从 2-结算中 改为 0-已结束 的会话 ID；
+            期间已被其他途径改变状态的会话不在其中。
+        """
+        if not session_ids:
+            return []
+        statement = (
+            update(VoteSession)
+            .where(VoteSession.id.in_(session_ids))  # type: ignore
+            .where(VoteSession.status == 2)  # type: ignore
+            .values(status=0)
+            .returning(VoteSession.id)  # type: ignore
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return list(result.scalars().all())
+
+    async def release_closing_sessions(self, session_ids: Sequence[int]) -> int:
+        """将结算失败的投票会话恢复为 1-进行中，以便之后重新认领，返回实际更新的数量。"""
+        if not session_ids:
+            return 0
+        statement = (
+            update(VoteSession)
+            .where(VoteSession.id.in_(session_ids))  # type: ignore
+            .where(VoteSession.status == 2)  # type: ignore
+            .values(status=1)
+            .returning(VoteSession.id)  # type: ignore
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return len(result.all())
+
+    async def get_pending_deadlines(self) -> list[tuple[int, datetime]]:
+        """
+        获取尚未结算完成的投票会话 (进行中或结算中) 及其结束时间，供截止时间调度器加载。
+        """
+        statement = (
+            select(VoteSession.id, VoteSession.end_time)
+            .where(VoteSession.end_time != None)  # noqa: E711
+            .where(VoteSession.status.in_((1, 2)))  # type: ignore
+            .where(VoteSession.session_type == 1)
+        )
+        result = await self.session.exec(statement)  # type: ignore[call-overload]
+        return [(session_id, end_time) for session_id, end_time in result.all()]
 
     async def adjust_vote_time(self, qo: AdjustVoteTimeQo) -> AdjustVoteTimeDto:
         """
@@ -208,7 +278,7 @@ class VoteSessionRepository:
             一个包含操作结果的 DTO。
 
         Raises:
-            ValueError: 如果找不到投票或投票已结束。
+            ValueError: 如果找不到投票、投票已结束或正在结算。
         """
         logger.info(f"尝试调整投票时间: message_id={qo.message_id}, hours={qo.hours_to_adjust}")
         statement = select(VoteSession).where(VoteSession.context_message_id == qo.message_id)
@@ -221,6 +291,9 @@ class VoteSessionRepository:
         if vote_session.status == 0:
             raise ValueError("投票已经结束，无法调整时间。")
 
+        if vote_session.status == 2:
+            raise ValueError("投票正在结算中，无法调整时间。")
+
         # 如果当前没有结束时间，则以当前时间为基准
         base_time = vote_session.end_time or datetime.now(timezone.utc)
         if base_time.tzinfo is None:
@@ -280,6 +353,9 @@ class VoteSessionRepository:
         if vote_session.status == 1:
             raise ValueError("投票仍在进行中，无法重新开启。请使用“调整时间”功能。")
 
+        if vote_session.status == 2:
+            raise ValueError("投票正在结算中，请在结算完成后再重新开启。")
+
         # 更新状态和结束时间
         vote_session.status = 1  # 1-进行中
         vote_session.end_time = new_end_time
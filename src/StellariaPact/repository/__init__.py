@@ -1,25 +1,35 @@
+from .ActivityBackfillRepository import ActivityBackfillRepository
 from .AnnouncementMonitorRepository import AnnouncementMonitorRepository
 from .AnnouncementRepository import AnnouncementRepository
 from .ConfirmationSessionRepository import ConfirmationSessionRepository
+from .CountedMessageRepository import CountedMessageRepository
+from .DroppedMessageEventRepository import DroppedMessageEventRepository
 from .GlobalProposalPunishmentRepository import GlobalProposalPunishmentRepository
 from .IntakeRepository import IntakeRepository
 from .OperationLogRepository import OperationLogRepository
+from .ProcessedMessageEventRepository import ProcessedMessageEventRepository
 from .ProposalRepository import ProposalRepository
 from .UserActivityRepository import UserActivityRepository
 from .UserVoteRepository import UserVoteRepository
+from .VoteArchiveRepository import VoteArchiveRepository
 from .VoteOptionRepository import VoteOptionRepository
 from .VoteSessionRepository import VoteSessionRepository
 
 __all__ = [
+    "ActivityBackfillRepository",
     "AnnouncementMonitorRepository",
     "AnnouncementRepository",
     "ConfirmationSessionRepository",
+    "CountedMessageRepository",
+    "DroppedMessageEventRepository",
     "GlobalProposalPunishmentRepository",
     "IntakeRepository",
     "OperationLogRepository",
+    "ProcessedMessageEventRepository",
     "ProposalRepository",
     "UserActivityRepository",
     "UserVoteRepository",
+    "VoteArchiveRepository",
     "VoteOptionRepository",
     "VoteSessionRepository",
 ]
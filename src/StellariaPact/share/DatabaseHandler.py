@@ -4,7 +4,7 @@ from typing import Optional
 
 from dotenv import load_dotenv
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -12,6 +12,32 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 load_dotenv()
 logger = logging.getLogger("stellaria_pact.database")
 
+_POSTGRES_SCHEMES = ("postgres://", "postgresql://", "postgresql+asyncpg://")
+
+
+def resolve_database_url() -> str:
+    """
+    解析数据库连接 URL。
+
+    设置了 DATABASE_URL 时优先使用（postgres:// 与 postgresql:// 会被规范化为
+    postgresql+asyncpg://），否则回退到 DATABASE_NAME 指定的 SQLite 文件。
+    """
+    database_url = os.getenv("DATABASE_URL", "").strip()
+    if not database_url:
+        db_name = os.getenv("DATABASE_NAME", "data/database.db")
+        return f"sqlite+aiosqlite:///{db_name}"
+    if database_url.startswith("sqlite:///"):
+        return "sqlite+aiosqlite:///" + database_url[len("sqlite:///") :]
+    for scheme in _POSTGRES_SCHEMES:
+        if database_url.startswith(scheme):
+            return "postgresql+asyncpg://" + database_url[len(scheme) :]
+    return database_url
+
+
+def is_sqlite_url(database_url: str) -> bool:
+    """判断连接 URL 是否指向 SQLite 数据库。"""
+    return database_url.startswith("sqlite")
+
 
 class DatabaseHandler:
     """
@@ -35,27 +61,56 @@ class DatabaseHandler:
 
         logger.info("正在初始化 DatabaseHandler...")
 
-        db_name = os.getenv("DATABASE_NAME", "data/database.db")
+        database_url = resolve_database_url()
+        if is_sqlite_url(database_url):
+            self._async_engine = self._create_sqlite_engine(database_url)
+        else:
+            self._async_engine = self._create_pooled_engine(database_url)
+
+        self._initialized = True
+        logger.info("DatabaseHandler 初始化完成。")
+
+    @staticmethod
+    def _create_sqlite_engine(database_url: str) -> AsyncEngine:
+        db_name = database_url.split(":///", 1)[1]
         db_dir = os.path.dirname(db_name)
         if db_dir and not os.path.exists(db_dir):
             logger.info(f"数据库目录 '{db_dir}' 不存在，正在创建...")
             os.makedirs(db_dir)
 
-        sqlite_url = f"sqlite+aiosqlite:///{db_name}"
         connect_args = {"timeout": 15}
+        engine = create_async_engine(database_url, echo=False, connect_args=connect_args)
 
-        self._async_engine = create_async_engine(sqlite_url, echo=False, connect_args=connect_args)
-
-        @event.listens_for(self._async_engine.sync_engine, "connect")
+        @event.listens_for(engine.sync_engine, "connect")
         def _enable_wal(dbapi_connection, connection_record):
             cursor = dbapi_connection.cursor()
             try:
+                # 仅对尚未建表的新库生效；已有数据库由 MaintenanceCog 首次维护时迁移
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL;")
                 cursor.execute("PRAGMA journal_mode=WAL;")
             finally:
                 cursor.close()
 
-        self._initialized = True
-        logger.info("DatabaseHandler 初始化完成。")
+        return engine
+
+    @staticmethod
+    def _create_pooled_engine(database_url: str) -> AsyncEngine:
+        """
+        创建带连接池的 PostgreSQL (asyncpg) 引擎，池参数可通过环境变量调整。
+        """
+        pool_size = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+        max_overflow = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+        logger.info(f"使用 PostgreSQL 数据库，连接池大小 {pool_size} (+{max_overflow})。")
+        return create_async_engine(
+            database_url,
+            echo=False,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=float(os.getenv("DATABASE_POOL_TIMEOUT", "30")),
+            # 定期回收连接，避免被数据库或中间代理静默断开
+            pool_recycle=int(os.getenv("DATABASE_POOL_RECYCLE", "1800")),
+            pool_pre_ping=True,
+        )
 
     async def init_db(self):
         """
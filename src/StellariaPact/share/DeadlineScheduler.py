@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from .KeyedLock import KeyedLock
+
+logger = logging.getLogger(__name__)
+
+DeadlineHandler = Callable[[list[Any]], Awaitable[None]]
+"""到期回调，接收同一类型下本次到期的全部键"""
+
+DeadlineLoader = Callable[[], Awaitable[Iterable[tuple[Any, datetime]]]]
+"""从持久化状态读取某一类型全部待到期的 (键, 到期时间)"""
+
+
+class DeadlineScheduler:
+    """
+    统一的截止时间调度器。
+
+    各模块以 `register` 登记一种任务类型的到期回调与加载函数，
+    之后通过 `schedule` 在创建、调整、重新开启等事件发生时更新截止时间。
+    全部截止时间保存在一个最小堆中，后台任务只在最近的截止时间到达时醒来，
+    空闲时不会访问数据库。
+
+    为防止遗漏（例如某条写入路径没有通知调度器），每隔 `sweep_interval_seconds`
+    会重新调用全部加载函数进行一次安全扫描；已过期的条目会被立即触发。
+    """
+
+    DEFAULT_SWEEP_INTERVAL_SECONDS = 30 * 60
+    DEFAULT_RETRY_DELAY_SECONDS = 60
+
+    def __init__(
+        self,
+        sweep_interval_seconds: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+        retry_delay_seconds: float = DEFAULT_RETRY_DELAY_SECONDS,
+    ):
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self._handlers: dict[str, DeadlineHandler] = {}
+        self._loaders: dict[str, DeadlineLoader] = {}
+        self._locks = KeyedLock()
+        # 堆中的条目: (到期时间戳, 序号, 类型, 键)。条目被改期后旧条目不会立即删除，
+        # 弹出时与 `_deadlines` 中的当前值比对，不一致即视为失效
+        self._heap: list[tuple[float, int, str, Hashable]] = []
+        self._deadlines: dict[tuple[str, Hashable], float] = {}
+        self._counter = count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._background: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "DeadlineScheduler":
+        """根据 `config.json` 中的 `deadline_scheduler` 配置创建调度器。"""
+        scheduler_config = config.get("deadline_scheduler", {})
+        return cls(
+            sweep_interval_seconds=float(
+                scheduler_config.get(
+                    "sweep_interval_minutes", cls.DEFAULT_SWEEP_INTERVAL_SECONDS / 60
+                )
+            )
+            * 60,
+            retry_delay_seconds=float(
+                scheduler_config.get("retry_delay_seconds", cls.DEFAULT_RETRY_DELAY_SECONDS)
+            ),
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(
+        self, kind: str, handler: DeadlineHandler, loader: DeadlineLoader | None = None
+    ) -> None:
+        """
+        登记一种任务类型。重复登记会替换原有回调。
+
+        调度器运行中登记时会立即调用一次加载函数，已过期的条目随即触发。
+        """
+        self._handlers[kind] = handler
+        if loader is not None:
+            self._loaders[kind] = loader
+        if self.is_running and loader is not None:
+            self._spawn(self.reload(kind))
+
+    def unregister(self, kind: str) -> None:
+        """注销一种任务类型；其尚未到期的条目会在到期时被丢弃。"""
+        self._handlers.pop(kind, None)
+        self._loaders.pop(kind, None)
+
+    def schedule(self, kind: str, key: Hashable, due_at: datetime) -> None:
+        """设置或更新一个条目的截止时间。"""
+        timestamp = self._timestamp(due_at)
+        if self._deadlines.get((kind, key)) == timestamp:
+            return
+        self._deadlines[(kind, key)] = timestamp
+        heapq.heappush(self._heap, (timestamp, next(self._counter), kind, key))
+        if self._heap[0][0] == timestamp:
+            # 新条目成为最近的截止时间，唤醒后台任务重新计算等待时长
+            self._wakeup.set()
+
+    def cancel(self, kind: str, key: Hashable) -> None:
+        """取消一个条目；不存在时忽略。"""
+        self._deadlines.pop((kind, key), None)
+
+    def get_deadline(self, kind: str, key: Hashable) -> datetime | None:
+        """返回条目当前的截止时间。"""
+        timestamp = self._deadlines.get((kind, key))
+        return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc)
+
+    async def reload(self, kind: str | None = None) -> None:
+        """
+        重新调用加载函数，合并其返回的截止时间。
+
+        只新增或更新条目而不删除：加载期间通过 `schedule` 写入的新条目不会因此丢失，
+        已失效的条目到期后由回调自行判定为无事可做。
+        """
+        kinds = [kind] if kind is not None else list(self._loaders)
+        for current_kind in kinds:
+            loader = self._loaders.get(current_kind)
+            if loader is None:
+                continue
+            try:
+                entries = list(await loader())
+            except Exception as e:
+                logger.error(f"加载 {current_kind} 的截止时间时出错: {e}", exc_info=True)
+                continue
+            for key, due_at in entries:
+                self.schedule(current_kind, key, due_at)
+            logger.debug(f"已加载 {len(entries)} 个 {current_kind} 截止时间。")
+
+    def start(self) -> None:
+        """启动调度器后台任务。"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止调度器，并取消正在执行的回调。"""
+        tasks = [task for task in (self._task, *self._background) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._background.clear()
+
+    async def _run(self) -> None:
+        logger.info("截止时间调度器已启动。")
+        await self.reload()
+        next_sweep = time.time() + self.sweep_interval_seconds
+        while True:
+            # 先清除唤醒标记再计算，避免计算期间写入的条目被遗漏
+            self._wakeup.clear()
+            now = time.time()
+            if now >= next_sweep:
+                next_sweep = now + self.sweep_interval_seconds
+                self._spawn(self.reload())
+
+            for kind, keys in self._pop_due(now).items():
+                self._spawn(self._fire(kind, keys))
+
+            next_wakeup = min(self._heap[0][0], next_sweep) if self._heap else next_sweep
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=max(0.0, next_wakeup - time.time())
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _pop_due(self, now: float) -> dict[str, list[Hashable]]:
+        """弹出全部已到期的有效条目，按类型分组。"""
+        due: dict[str, list[Hashable]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            timestamp, _, kind, key = heapq.heappop(self._heap)
+            if self._deadlines.get((kind, key)) != timestamp:
+                continue
+            del self._deadlines[(kind, key)]
+            if kind not in self._handlers:
+                logger.debug(f"{kind} 没有已登记的回调，丢弃到期条目 {key}。")
+                continue
+            due.setdefault(kind, []).append(key)
+        return due
+
+    async def _fire(self, kind: str, keys: list[Hashable]) -> None:
+        """执行到期回调；同一类型的回调依次执行，失败的条目稍后重试。"""
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return
+        async with self._locks(kind):
+            try:
+                await handler(keys)
+            except Exception as e:
+                logger.error(f"处理到期的 {kind} {keys} 时出错: {e}", exc_info=True)
+                retry_at = time.time() + self.retry_delay_seconds
+                for key in keys:
+                    if (kind, key) not in self._deadlines:
+                        self.schedule(kind, key, datetime.fromtimestamp(retry_at, timezone.utc))
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @staticmethod
+    def _timestamp(due_at: datetime) -> float:
+        # 数据库中的时间统一按 UTC 存储，缺少时区信息时按 UTC 解释
+        if due_at.tzinfo is None:
+            due_at = due_at.replace(tzinfo=timezone.utc)
+        return due_at.timestamp()
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Hashable
+
+
+class _LockEntry:
+    __slots__ = ("lock", "references")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.references = 0
+        """持有者与等待者的总数，归零时条目被回收"""
+
+
+class KeyedLock:
+    """
+    按键分配的 asyncio 互斥锁表。
+
+    每个键的锁在首次使用时创建，并对持有者与等待者计数；最后一个使用者释放后
+    条目立即被移除，锁表大小只与当前正在使用的键数有关，不会随历史键无限增长。
+
+    用法::
+
+        locks = KeyedLock()
+        async with locks((thread_id, user_id)):
+            ...
+    """
+
+    def __init__(self):
+        self._entries: dict[Hashable, _LockEntry] = {}
+        self.acquisitions_total = 0
+        self.contended_total = 0
+        """获取时锁已被占用、需要等待的次数"""
+
+    def __call__(self, key: Hashable) -> "_KeyedLockContext":
+        """返回指定键的锁上下文，进入时获取、退出时释放。"""
+        return _KeyedLockContext(self, key)
+
+    def __len__(self) -> int:
+        """当前存活（被持有或被等待）的锁数量。"""
+        return len(self._entries)
+
+    def locked(self, key: Hashable) -> bool:
+        """指定键的锁当前是否被持有。"""
+        entry = self._entries.get(key)
+        return entry is not None and entry.lock.locked()
+
+    def stats(self) -> dict[str, Any]:
+        """返回存活锁数量、等待者数量和累计的获取与争用次数。"""
+        return {
+            "live_locks": len(self._entries),
+            "waiters": sum(
+                entry.references - entry.lock.locked() for entry in self._entries.values()
+            ),
+            "acquisitions_total": self.acquisitions_total,
+            "contended_total": self.contended_total,
+        }
+
+    async def acquire(self, key: Hashable) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _LockEntry()
+        entry.references += 1
+        if entry.lock.locked():
+            self.contended_total += 1
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            # 等待期间被取消，撤回引用
+            self._release_reference(key, entry)
+            raise
+        self.acquisitions_total += 1
+
+    def release(self, key: Hashable) -> None:
+        entry = self._entries[key]
+        entry.lock.release()
+        self._release_reference(key, entry)
+
+    def _release_reference(self, key: Hashable, entry: _LockEntry) -> None:
+        entry.references -= 1
+        if entry.references == 0 and self._entries.get(key) is entry:
+            del self._entries[key]
+
+
+class _KeyedLockContext:
+    __slots__ = ("_locks", "_key")
+
+    def __init__(self, locks: KeyedLock, key: Hashable):
+        self._locks = locks
+        self._key = key
+
+    async def __aenter__(self) -> None:
+        await self._locks.acquire(self._key)
+
+    async def __aexit__(self, exc_type, exc_val, traceback) -> None:
+        self._locks.release(self._key)
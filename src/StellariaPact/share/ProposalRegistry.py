@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from StellariaPact.share.enums.ProposalStatus import ProposalStatus
+from StellariaPact.share.UnitOfWork import UnitOfWork
+
+if TYPE_CHECKING:
+    from StellariaPact.dto.ProposalDto import ProposalDto
+    from StellariaPact.share.StellariaPactBot import StellariaPactBot
+
+logger = logging.getLogger(__name__)
+
+
+class ProposalRegistry:
+    """
+    进程内的提案帖注册表: {讨论帖 ID: 提案快照}。
+
+    启动时一次性加载全部提案，之后由提案创建、状态变更和内容编辑的写入路径在
+    提交后同步，逐条消息的处罚拦截和投票面板刷新只需字典查找。
+    """
+
+    def __init__(self, bot: "StellariaPactBot"):
+        self.bot = bot
+        self._proposals: dict[int, "ProposalDto"] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._proposals)
+
+    async def load(self) -> None:
+        """从数据库重新加载全部提案。"""
+        async with self._load_lock:
+            await self._load()
+
+    async def ensure_loaded(self) -> None:
+        """尚未加载时加载一次；并发调用只会触发一次数据库读取。"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self._load()
+
+    async def _load(self) -> None:
+        # 运行时导入以避免 share 与 dto 包之间的循环导入
+        from StellariaPact.dto.ProposalDto import ProposalDto
+
+        async with UnitOfWork(self.bot.db_handler) as uow:
+            proposals = await uow.proposal.get_all_proposals()
+            snapshots = [ProposalDto.model_validate(proposal) for proposal in proposals]
+
+        self._proposals = {
+            snapshot.discussion_thread_id: snapshot
+            for snapshot in snapshots
+            if snapshot.discussion_thread_id is not None
+        }
+        self._loaded = True
+        logger.info("提案帖注册表已加载: %s 个提案帖。", len(self._proposals))
+
+    async def get(self, thread_id: int) -> "ProposalDto | None":
+        """返回讨论帖对应的提案快照；不是提案帖时返回 None。"""
+        await self.ensure_loaded()
+        return self._proposals.get(thread_id)
+
+    async def is_proposal_thread(self, thread_id: int) -> bool:
+        return await self.get(thread_id) is not None
+
+    def put(self, proposal: "ProposalDto") -> None:
+        """在提案写入提交后登记最新快照。"""
+        if proposal.discussion_thread_id is None:
+            return
+        self._proposals[proposal.discussion_thread_id] = proposal
+
+    def set_status(self, thread_id: int, status: ProposalStatus) -> None:
+        """只更新已登记提案的状态；未登记的提案帖会在下次加载时补上。"""
+        snapshot = self._proposals.get(thread_id)
+        if snapshot is not None:
+            self._proposals[thread_id] = snapshot.model_copy(update={"status": status})
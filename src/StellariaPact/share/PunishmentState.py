@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Hashable, Iterable
+
+from StellariaPact.share.enums import PunishmentType
+from StellariaPact.share.UnitOfWork import UnitOfWork
+
+if TYPE_CHECKING:
+    from StellariaPact.share.StellariaPactBot import StellariaPactBot
+
+logger = logging.getLogger(__name__)
+
+_THREAD_MUTE = "thread_mute"
+_GLOBAL = "global"
+
+
+class PunishmentState:
+    """
+    进程内的处罚状态，供投票、发言和拦截路径共同查询。
+
+    帖子禁言与全局提案处罚在首次使用（或 `load`）时一次性从数据库加载，之后由
+    `thread_mute_updated`、`proposal_violation_punishment_updated` 和
+    `permanent_punishment_updated` 事件保持同步，查询不再访问数据库。带截止时间的
+    条目同时登记在最小堆中，每次查询前弹出已到期的条目。
+
+    重新加载期间收到的事件照常作用于当前状态，同时被记录下来；数据库读取完成后，
+    先用读取结果构建新的状态、重放这些事件，再整体替换，读取期间的更新不会被覆盖。
+    """
+
+    DEFAULT_RESTRICTION_TYPES = (
+        PunishmentType.PERMANENT_VOTING,
+        PunishmentType.PROPOSAL_VIOLATION,
+    )
+    """不指定类型时 `is_restricted` 检查的处罚，与仓储的同名方法一致"""
+
+    def __init__(self, bot: "StellariaPactBot"):
+        self.bot = bot
+        # {(thread_id, user_id): mute_end_time}
+        self._thread_mutes: dict[tuple[int, int], datetime] = {}
+        # {(user_id, punishment_type): expires_at}，永久处罚的截止时间为 None
+        self._global: dict[tuple[int, str], datetime | None] = {}
+        # [(到期时间, 序号, 种类, 键)]；条目被覆盖或解除后堆中的旧记录在弹出时忽略
+        self._expiry_heap: list[tuple[datetime, int, str, Hashable]] = []
+        self._sequence = itertools.count()
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+        # 加载期间收到的事件 [(种类, 参数)]，读取完成后在新状态上重放；未在加载时为 None
+        self._events_during_load: list[tuple[str, tuple]] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def load(self) -> None:
+        """从数据库重新加载全部有效禁言和全局处罚。"""
+        async with self._load_lock:
+            await self._load()
+
+    async def ensure_loaded(self) -> None:
+        """尚未加载时加载一次；并发调用只会触发一次数据库读取。"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self._load()
+
+    async def _load(self) -> None:
+        now = datetime.now(timezone.utc)
+        self._events_during_load = events = []
+        try:
+            async with UnitOfWork(self.bot.db_handler) as uow:
+                mutes = await uow.user_activity.get_active_mutes(now)
+                punishments = await uow.global_proposal_punishment.get_all_active(now=now)
+        finally:
+            self._events_during_load = None
+
+        # 以下不再让出事件循环，构建新状态、重放事件与替换对查询方是原子的
+        self._thread_mutes = {}
+        self._global = {}
+        self._expiry_heap = []
+        for thread_id, user_id, mute_end_time in mutes:
+            self.set_thread_mute(thread_id, user_id, mute_end_time)
+        for user_id, punishment_type, expires_at in punishments:
+            self.set_global_punishment(user_id, punishment_type, True, expires_at)
+        for kind, args in events:
+            if kind == _THREAD_MUTE:
+                self.set_thread_mute(*args)
+            else:
+                self.set_global_punishment(*args)
+        self._loaded = True
+        logger.info(
+            "处罚状态已加载: %s 条帖子禁言，%s 条全局提案处罚。",
+            len(self._thread_mutes),
+            len(self._global),
+        )
+
+    # -------------------------
+    # 事件同步
+    # -------------------------
+
+    def set_thread_mute(
+        self, thread_id: int, user_id: int, mute_end_time: datetime | None
+    ) -> None:
+        """设置或解除用户在帖子中的禁言；已过去的截止时间视为解除。"""
+        if self._events_during_load is not None:
+            self._events_during_load.append((_THREAD_MUTE, (thread_id, user_id, mute_end_time)))
+        key = (thread_id, user_id)
+        if mute_end_time is None or mute_end_time <= datetime.now(timezone.utc):
+            self._thread_mutes.pop(key, None)
+            return
+        self._thread_mutes[key] = mute_end_time
+        self._push(mute_end_time, _THREAD_MUTE, key)
+
+    def set_global_punishment(
+        self,
+        user_id: int,
+        punishment_type: PunishmentType | str,
+        active: bool,
+        expires_at: datetime | None = None,
+    ) -> None:
+        """设置或解除一项全局提案处罚；`expires_at` 为 None 表示永久。"""
+        if self._events_during_load is not None:
+            self._events_during_load.append(
+                (_GLOBAL, (user_id, punishment_type, active, expires_at))
+            )
+        key = (user_id, str(punishment_type))
+        if not active or (expires_at is not None and expires_at <= datetime.now(timezone.utc)):
+            self._global.pop(key, None)
+            return
+        self._global[key] = expires_at
+        if expires_at is not None:
+            self._push(expires_at, _GLOBAL, key)
+
+    # -------------------------
+    # 查询
+    # -------------------------
+
+    def get_thread_mute_end(self, thread_id: int, user_id: int) -> datetime | None:
+        """返回用户在帖子中尚未到期的禁言截止时间。"""
+        self.prune()
+        return self._thread_mutes.get((thread_id, user_id))
+
+    def get_global_expiry(
+        self, user_id: int, punishment_type: PunishmentType | str
+    ) -> datetime | None:
+        """返回尚未到期的限时全局处罚的截止时间；永久处罚或无处罚时返回 None。"""
+        self.prune()
+        return self._global.get((user_id, str(punishment_type)))
+
+    def thread_mutes(self) -> list[tuple[tuple[int, int], datetime]]:
+        """返回全部有效禁言 [((thread_id, user_id), mute_end_time)]。"""
+        self.prune()
+        return list(self._thread_mutes.items())
+
+    def global_punishments(
+        self, punishment_type: PunishmentType | str
+    ) -> list[tuple[int, datetime | None]]:
+        """返回指定类型的全部有效全局处罚 [(user_id, expires_at)]。"""
+        self.prune()
+        type_value = str(punishment_type)
+        return [
+            (user_id, expires_at)
+            for (user_id, stored_type), expires_at in self._global.items()
+            if stored_type == type_value
+        ]
+
+    async def is_thread_muted(self, thread_id: int, user_id: int) -> bool:
+        await self.ensure_loaded()
+        return self.get_thread_mute_end(thread_id, user_id) is not None
+
+    async def is_restricted(
+        self,
+        user_id: int,
+        punishment_types: Iterable[PunishmentType | str] | PunishmentType | str | None = None,
+    ) -> bool:
+        """用户是否受到任一指定类型的有效全局处罚。"""
+        await self.ensure_loaded()
+        if punishment_types is None:
+            types: Iterable[PunishmentType | str] = self.DEFAULT_RESTRICTION_TYPES
+        elif isinstance(punishment_types, str):
+            types = (punishment_types,)
+        else:
+            types = punishment_types
+        self.prune()
+        return any((user_id, str(punishment_type)) in self._global for punishment_type in types)
+
+    async def is_proposal_violation_restricted(self, user_id: int) -> bool:
+        return await self.is_restricted(user_id, PunishmentType.PROPOSAL_VIOLATION)
+
+    async def is_objection_creation_restricted(self, user_id: int) -> bool:
+        """异议创建受永久专项限制或限时提案违规处罚约束。"""
+        return await self.is_restricted(
+            user_id,
+            (
+                PunishmentType.PERMANENT_OBJECTION_CREATION,
+                PunishmentType.PROPOSAL_VIOLATION,
+            ),
+        )
+
+    async def is_objection_support_restricted(self, user_id: int) -> bool:
+        """新增异议附议还受现有永久投票资格限制约束。"""
+        return await self.is_restricted(
+            user_id,
+            (
+                PunishmentType.PERMANENT_VOTING,
+                PunishmentType.PERMANENT_OBJECTION_CREATION,
+                PunishmentType.PROPOSAL_VIOLATION,
+            ),
+        )
+
+    # -------------------------
+    # 到期
+    # -------------------------
+
+    def prune(self, now: datetime | None = None) -> int:
+        """弹出全部已到期的条目，返回实际移除的数量。"""
+        current_time = now or datetime.now(timezone.utc)
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+            expires_at, _, kind, key = heapq.heappop(self._expiry_heap)
+            entries: dict = self._thread_mutes if kind == _THREAD_MUTE else self._global
+            # 只移除与堆记录一致的条目；已被延长或解除的条目保持不变
+            if entries.get(key) == expires_at:
+                del entries[key]
+                removed += 1
+        return removed
+
+    def _push(self, expires_at: datetime, kind: str, key: Hashable) -> None:
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), kind, key))
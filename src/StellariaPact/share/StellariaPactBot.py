@@ -4,6 +4,9 @@ from discord.ext import commands
 
 from StellariaPact.share.ApiScheduler import APIScheduler
 from StellariaPact.share.DatabaseHandler import DatabaseHandler
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
+from StellariaPact.share.ProposalRegistry import ProposalRegistry
+from StellariaPact.share.PunishmentState import PunishmentState
 from StellariaPact.share.RemoteMessageEventsConfig import RemoteMessageEventsConfig
 from StellariaPact.share.TimeUtils import TimeUtils
 
@@ -17,6 +20,9 @@ class StellariaPactBot(commands.Bot):
 
     api_scheduler: APIScheduler
     db_handler: Optional[DatabaseHandler]
+    deadline_scheduler: DeadlineScheduler
+    proposal_registry: ProposalRegistry
+    punishment_state: PunishmentState
     config: Dict[str, Any]
     remote_message_events: RemoteMessageEventsConfig
     time_utils: TimeUtils
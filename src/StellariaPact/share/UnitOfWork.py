@@ -8,6 +8,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from StellariaPact.share.BusinessRuleError import BusinessRuleError
 
 if TYPE_CHECKING:
+    from StellariaPact.repository.ActivityBackfillRepository import ActivityBackfillRepository
     from StellariaPact.repository.AnnouncementMonitorRepository import (
         AnnouncementMonitorRepository,
     )
@@ -15,11 +16,18 @@ if TYPE_CHECKING:
     from StellariaPact.repository.ConfirmationSessionRepository import (
         ConfirmationSessionRepository,
     )
+    from StellariaPact.repository.CountedMessageRepository import CountedMessageRepository
+    from StellariaPact.repository.DroppedMessageEventRepository import (
+        DroppedMessageEventRepository,
+    )
     from StellariaPact.repository.GlobalProposalPunishmentRepository import (
         GlobalProposalPunishmentRepository,
     )
     from StellariaPact.repository.IntakeRepository import IntakeRepository
     from StellariaPact.repository.OperationLogRepository import OperationLogRepository
+    from StellariaPact.repository.ProcessedMessageEventRepository import (
+        ProcessedMessageEventRepository,
+    )
     from StellariaPact.repository.ProposalRepository import ProposalRepository
     from StellariaPact.repository.PunishmentRecordRepository import PunishmentRecordRepository
     from StellariaPact.repository.StructuredSpeechMessageRepository import (
@@ -28,8 +36,12 @@ if TYPE_CHECKING:
     from StellariaPact.repository.StructuredSpeechModeRepository import (
         StructuredSpeechModeRepository,
     )
+    from StellariaPact.repository.StructuredSpeechWebhookRepository import (
+        StructuredSpeechWebhookRepository,
+    )
     from StellariaPact.repository.UserActivityRepository import UserActivityRepository
     from StellariaPact.repository.UserVoteRepository import UserVoteRepository
+    from StellariaPact.repository.VoteArchiveRepository import VoteArchiveRepository
     from StellariaPact.repository.VoteOptionRepository import VoteOptionRepository
     from StellariaPact.repository.VoteSessionRepository import VoteSessionRepository
     from StellariaPact.share.DatabaseHandler import DatabaseHandler
@@ -265,3 +277,71 @@ class UnitOfWork:
                 self.session
             )
         return self._structured_speech_message_repository
+
+    @property
+    def structured_speech_webhook(self) -> "StructuredSpeechWebhookRepository":
+        """取得绑定当前事务的论坛结构化发言 Webhook 仓储。"""
+        if not hasattr(self, "_structured_speech_webhook_repository"):
+            from StellariaPact.repository.StructuredSpeechWebhookRepository import (
+                StructuredSpeechWebhookRepository,
+            )
+
+            self._structured_speech_webhook_repository = StructuredSpeechWebhookRepository(
+                self.session
+            )
+        return self._structured_speech_webhook_repository
+
+    @property
+    def vote_archive(self) -> "VoteArchiveRepository":
+        """取得绑定当前事务的投票归档仓储。"""
+        if not hasattr(self, "_vote_archive_repository"):
+            from StellariaPact.repository.VoteArchiveRepository import VoteArchiveRepository
+
+            self._vote_archive_repository = VoteArchiveRepository(self.session)
+        return self._vote_archive_repository
+
+    @property
+    def processed_message_event(self) -> "ProcessedMessageEventRepository":
+        """取得绑定当前事务的已处理消息事件仓储。"""
+        if not hasattr(self, "_processed_message_event_repository"):
+            from StellariaPact.repository.ProcessedMessageEventRepository import (
+                ProcessedMessageEventRepository,
+            )
+
+            self._processed_message_event_repository = ProcessedMessageEventRepository(
+                self.session
+            )
+        return self._processed_message_event_repository
+
+    @property
+    def dropped_message_event(self) -> "DroppedMessageEventRepository":
+        """取得绑定当前事务的被丢弃消息事件仓储。"""
+        if not hasattr(self, "_dropped_message_event_repository"):
+            from StellariaPact.repository.DroppedMessageEventRepository import (
+                DroppedMessageEventRepository,
+            )
+
+            self._dropped_message_event_repository = DroppedMessageEventRepository(self.session)
+        return self._dropped_message_event_repository
+
+    @property
+    def counted_message(self) -> "CountedMessageRepository":
+        """取得绑定当前事务的已计数消息索引仓储。"""
+        if not hasattr(self, "_counted_message_repository"):
+            from StellariaPact.repository.CountedMessageRepository import (
+                CountedMessageRepository,
+            )
+
+            self._counted_message_repository = CountedMessageRepository(self.session)
+        return self._counted_message_repository
+
+    @property
+    def activity_backfill(self) -> "ActivityBackfillRepository":
+        """取得绑定当前事务的发言计数回填断点仓储。"""
+        if not hasattr(self, "_activity_backfill_repository"):
+            from StellariaPact.repository.ActivityBackfillRepository import (
+                ActivityBackfillRepository,
+            )
+
+            self._activity_backfill_repository = ActivityBackfillRepository(self.session)
+        return self._activity_backfill_repository
@@ -3,9 +3,13 @@ from .auth import MissingRole, PermissionGuard, RoleGuard
 from .BaseDto import BaseDto
 from .BusinessRuleError import BusinessRuleError
 from .DatabaseHandler import DatabaseHandler
+from .DeadlineScheduler import DeadlineScheduler
 from .DiscordUtils import DiscordUtils
 from .HttpClient import HttpClient
+from .KeyedLock import KeyedLock
 from .LoggingConfigurator import LoggingConfigurator
+from .ProposalRegistry import ProposalRegistry
+from .PunishmentState import PunishmentState
 from .SafeDefer import safeDefer
 from .StellariaPactBot import StellariaPactBot
 from .StringUtils import StringUtils
@@ -17,9 +21,13 @@ __all__ = [
     "BaseDto",
     "BusinessRuleError",
     "DatabaseHandler",
+    "DeadlineScheduler",
     "DiscordUtils",
     "HttpClient",
+    "KeyedLock",
     "LoggingConfigurator",
+    "ProposalRegistry",
+    "PunishmentState",
     "safeDefer",
     "StellariaPactBot",
     "StringUtils",
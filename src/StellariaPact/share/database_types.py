@@ -2,8 +2,11 @@ import json
 from datetime import timezone
 from typing import Any
 
-from sqlalchemy import TEXT, DateTime, TypeDecorator
+from sqlalchemy import TEXT, BigInteger, DateTime, Integer, TypeDecorator
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 
 class JsonEncoded(TypeDecorator):
@@ -28,8 +31,9 @@ class JsonEncoded(TypeDecorator):
 
 class UTCDateTime(TypeDecorator):
     """
-    用于 SQLite 的自定义时间类型。
-    存入数据库前：确保是 UTC 时间，并剥离 tzinfo (因为 SQLite 不支持时区存储)。
+    统一以 Naive UTC 存储的时间类型。
+    存入数据库前：确保是 UTC 时间，并剥离 tzinfo (SQLite 不支持时区存储，
+    PostgreSQL 中对应 timestamp without time zone 列)。
     从数据库读取后：强制附加 timezone.utc 时区信息。
     """
     impl = DateTime
@@ -49,10 +53,87 @@ class UTCDateTime(TypeDecorator):
 
     def process_result_value(self, value, dialect):
         if value is not None:
-            # SQLite 取出的数据是 Naive 的，强制为其赋予 UTC 时区
+            # 取出的数据是 Naive 的，强制为其赋予 UTC 时区
             return value.replace(tzinfo=timezone.utc)
         return value
 
 
 # 优先使用 PostgreSQL 的 JSONB 类型，如果不是 PG，则回退到自定义的 JsonEncoded 类型
 JSON_TYPE = JSONB().with_variant(JsonEncoded, "sqlite", "mysql")
+
+
+DiscordId = BigInteger().with_variant(Integer(), "sqlite")
+"""
+Discord ID（雪花 ID）列的类型。ID 均为 64 位整数，PostgreSQL 上建为 BIGINT；
+SQLite 的 INTEGER 天然是 64 位，保持原有的 INTEGER 列定义不变。
+"""
+
+
+class greatest(FunctionElement):
+    """
+    取参数中的最大值。SQLite 使用多参数 max()，PostgreSQL 使用 greatest()。
+    """
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(greatest)
+def _compile_greatest(element, compiler, **kw) -> str:
+    return f"greatest({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(greatest, "sqlite")
+def _compile_greatest_sqlite(element, compiler, **kw) -> str:
+    return f"max({compiler.process(element.clauses, **kw)})"
+
+
+class utc_now(FunctionElement):
+    """
+    当前的 Naive UTC 时间，用于写入 UTCDateTime 列的服务端默认值和更新。
+    PostgreSQL 的 CURRENT_TIMESTAMP 是带时区的时间，写入 timestamp without time zone
+    列时会按会话时区转换，因此先用 timezone('UTC', ...) 转为 UTC；
+    SQLite 的 CURRENT_TIMESTAMP 本身就是 UTC。
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _compile_utc_now(element, compiler, **kw) -> str:
+    return "timezone('UTC', CURRENT_TIMESTAMP)"
+
+
+@compiles(utc_now, "sqlite")
+def _compile_utc_now_sqlite(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+class epoch_seconds(FunctionElement):
+    """
+    将 UTCDateTime 列转换为 Unix 时间戳（整数秒），用于与列参与的时间间隔比较。
+    """
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _compile_epoch_seconds(element, compiler, **kw) -> str:
+    return f"CAST(EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)}) AS BIGINT)"
+
+
+@compiles(epoch_seconds, "sqlite")
+def _compile_epoch_seconds_sqlite(element, compiler, **kw) -> str:
+    return f"CAST(strftime('%s', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
+def upsert_insert(session: Any, entity: Any) -> Any:
+    """
+    按会话所连接数据库的方言构造支持 on_conflict_do_update 的 INSERT 语句。
+    SQLite 与 PostgreSQL 的 ON CONFLICT 语法一致，调用方无需区分方言。
+    """
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert(entity)
+    return sqlite.insert(entity)
@@ -0,0 +1,23 @@
+from enum import StrEnum
+
+
+class DeadlineKind(StrEnum):
+    """截止时间调度器中的任务类型。"""
+
+    VOTE_SESSION = "vote_session"
+    """投票会话到期结算，键为投票会话 ID"""
+
+    ANNOUNCEMENT = "announcement"
+    """公示到期，键为公示 ID"""
+
+    ANNOUNCEMENT_REPOST = "announcement_repost"
+    """公示重复播报，键为频道监控器 ID"""
+
+    INTAKE_SUPPORT = "intake_support"
+    """草案支持票收集到期，键为草案 ID"""
+
+    THREAD_MUTE = "thread_mute"
+    """帖子内禁言到期，键为 (帖子 ID, 用户 ID)"""
+
+    PROPOSAL_VIOLATION = "proposal_violation"
+    """全局限时提案处罚到期，键为用户 ID"""
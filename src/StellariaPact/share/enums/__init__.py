@@ -1,4 +1,5 @@
 from .ConfirmationStatus import ConfirmationStatus
+from .DeadlineKind import DeadlineKind
 from .IntakeStatus import IntakeStatus
 from .LogOperationType import LogOperationType
 from .ObjectionResolutionType import ObjectionResolutionType
@@ -11,6 +12,7 @@ from .VoteSessionType import VoteSessionType
 
 __all__ = [
     "ConfirmationStatus",
+    "DeadlineKind",
     "IntakeStatus",
     "LogOperationType",
     "ObjectionResolutionType",
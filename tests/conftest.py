@@ -0,0 +1,10 @@
+import pytest_asyncio
+from db_support import backend_params, create_test_engine, dispose_test_engine
+
+
+@pytest_asyncio.fixture(params=backend_params())
+async def backend_engine(request):
+    """在 SQLite 与（配置了 TEST_DATABASE_URL 时的）PostgreSQL 上分别运行的数据库引擎。"""
+    engine = await create_test_engine(request.param)
+    yield engine
+    await dispose_test_engine(engine)
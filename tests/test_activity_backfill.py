@@ -0,0 +1,281 @@
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.ActivityBackfill import ActivityBackfill
+from StellariaPact.cogs.Voting.Cog import Voting
+from StellariaPact.models.ActivityBackfillCheckpoint import ActivityBackfillCheckpoint
+from StellariaPact.models.CountedMessage import CountedMessage
+from StellariaPact.models.UserActivity import UserActivity
+
+THREAD_ID = 1000
+
+
+class FakeThread:
+    """按 after/before/limit 返回历史消息的最小帖子替身。"""
+
+    def __init__(
+        self,
+        messages: list[SimpleNamespace],
+        fail_after_calls: int | None = None,
+        before_call: Callable[[int], Awaitable[None]] | None = None,
+    ):
+        self.id = THREAD_ID
+        self.messages = messages
+        self.calls = 0
+        self.fail_after_calls = fail_after_calls
+        self.before_call = before_call
+
+    async def history(self, *, limit, after, before, oldest_first):
+        assert oldest_first
+        self.calls += 1
+        if self.before_call is not None:
+            await self.before_call(self.calls)
+        if self.fail_after_calls is not None and self.calls > self.fail_after_calls:
+            raise RuntimeError("网络中断")
+        selected = [m for m in self.messages if after.id < m.id < before.id]
+        for message in sorted(selected, key=lambda m: m.id)[:limit]:
+            yield message
+
+
+def _message(message_id: int, user_id: int, content: str = "这是有效发言") -> SimpleNamespace:
+    return SimpleNamespace(id=message_id, author=SimpleNamespace(id=user_id), content=content)
+
+
+def _create_bot(engine: AsyncEngine) -> MagicMock:
+    """创建使用测试数据库、直接执行 API 请求的测试 Bot。"""
+    database_handler = MagicMock()
+    database_handler.get_session.side_effect = lambda: AsyncSession(engine)
+    bot = MagicMock()
+    bot.db_handler = database_handler
+    bot.config = {}
+
+    async def submit(coro, priority):
+        return await coro
+
+    bot.api_scheduler.submit.side_effect = submit
+    return bot
+
+
+def _backfill(bot: MagicMock, **kwargs) -> ActivityBackfill:
+    return ActivityBackfill(
+        bot,
+        is_valid_message=lambda message: len(message.content) > 5,
+        page_size=2,
+        checkpoint_every_pages=1,
+        page_delay_seconds=0,
+        **kwargs,
+    )
+
+
+@pytest_asyncio.fixture
+async def backfill_engine():
+    """提供包含完整 SQLModel 元数据的测试数据库。"""
+    engine = await create_test_engine()
+    try:
+        yield engine
+    finally:
+        await dispose_test_engine(engine)
+
+
+async def _set_counts(engine: AsyncEngine, counts: dict[int, int]) -> None:
+    async with AsyncSession(engine) as session:
+        for user_id, count in counts.items():
+            session.add(
+                UserActivity(user_id=user_id, context_thread_id=THREAD_ID, message_count=count)
+            )
+        await session.commit()
+
+
+async def _counts(engine: AsyncEngine) -> dict[int, int]:
+    async with AsyncSession(engine) as session:
+        rows = await session.exec(
+            select(UserActivity.user_id, UserActivity.message_count).where(
+                UserActivity.context_thread_id == THREAD_ID
+            )
+        )
+        return dict(rows.all())
+
+
+def _history() -> list[SimpleNamespace]:
+    """用户 1 有 3 条有效发言，用户 2 有 1 条有效发言和 1 条无效发言。"""
+    return [
+        _message(THREAD_ID, 1),
+        _message(THREAD_ID + 1, 2),
+        _message(THREAD_ID + 2, 1),
+        _message(THREAD_ID + 3, 2, content="短"),
+        _message(THREAD_ID + 4, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_backfill_applies_history_counts_and_reports_diff(
+    backfill_engine: AsyncEngine,
+) -> None:
+    """回填按历史统计修正计数，报告变化的用户，并补写消息索引。"""
+    await _set_counts(backfill_engine, {1: 1, 3: 4})
+    backfill = _backfill(_create_bot(backfill_engine))
+
+    report = await backfill.run(FakeThread(_history()))  # type: ignore[arg-type]
+
+    assert (report.scanned_messages, report.valid_messages) == (5, 4)
+    assert report.changes == [(1, 1, 3), (2, 0, 1), (3, 4, 0)]
+    assert report.eligibility_changes == [(1, 1, 3), (3, 4, 0)]
+    assert await _counts(backfill_engine) == {1: 3, 2: 1, 3: 0}
+    async with AsyncSession(backfill_engine) as session:
+        indexed = (await session.exec(select(CountedMessage.message_id))).all()
+        checkpoint = await session.get(ActivityBackfillCheckpoint, THREAD_ID)
+    assert sorted(indexed) == [THREAD_ID, THREAD_ID + 1, THREAD_ID + 2, THREAD_ID + 4]
+    assert checkpoint is not None and checkpoint.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_dry_run_keeps_counts_and_live_changes_survive_apply(
+    backfill_engine: AsyncEngine,
+) -> None:
+    """预览不修改计数；正式写入只应用相对快照的差值，保留期间的实时计数。"""
+    await _set_counts(backfill_engine, {1: 1})
+    bot = _create_bot(backfill_engine)
+    thread = FakeThread(_history())
+
+    preview = await _backfill(bot).run(thread, apply=False)  # type: ignore[arg-type]
+    assert not preview.applied
+    assert preview.changes == [(1, 1, 3), (2, 0, 1)]
+    assert await _counts(backfill_engine) == {1: 1}
+
+    # 预览之后用户 1 又发了一条实时计数的消息
+    async with AsyncSession(backfill_engine) as session:
+        activity = (await session.exec(select(UserActivity))).one()
+        activity.message_count = 2
+        session.add(activity)
+        await session.commit()
+
+    calls = thread.calls
+    report = await _backfill(bot).run(thread)  # type: ignore[arg-type]
+    assert report.resumed and report.applied
+    assert thread.calls == calls + 1
+    assert await _counts(backfill_engine) == {1: 4, 2: 1}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_backfill_resumes_from_checkpoint(backfill_engine: AsyncEngine) -> None:
+    """扫描中断后再次执行从断点继续，已扫描的页面不会重复计数。"""
+    bot = _create_bot(backfill_engine)
+    failing = FakeThread(_history(), fail_after_calls=1)
+    with pytest.raises(RuntimeError):
+        await _backfill(bot).run(failing)  # type: ignore[arg-type]
+    assert await _counts(backfill_engine) == {}
+
+    thread = FakeThread(_history())
+    report = await _backfill(bot).run(thread)  # type: ignore[arg-type]
+    assert report.resumed
+    assert thread.calls == 2
+    assert (report.scanned_messages, report.valid_messages) == (5, 4)
+    assert await _counts(backfill_engine) == {1: 3, 2: 1}
+
+    # 已完成的回填再次执行时重新记录快照并从头扫描，结果不变
+    report = await _backfill(bot).run(FakeThread(_history()))  # type: ignore[arg-type]
+    assert not report.resumed and report.changes == []
+
+
+@pytest.mark.asyncio
+async def test_deletions_during_scan_are_applied_at_completion(
+    backfill_engine: AsyncEngine,
+) -> None:
+    """扫描期间被删除的截止前消息：未扫描的不再统计，已统计未入索引的从结果中移除。"""
+    await _set_counts(backfill_engine, {1: 3, 2: 1})
+    bot = _create_bot(backfill_engine)
+    backfill = _backfill(bot)
+    backfill.checkpoint_every_pages = 3
+
+    async def delete_during_scan(call: int) -> None:
+        if call != 2:
+            return
+        # 首页已统计但尚未写入索引的消息被删除，实时监听无法扣减；
+        # 尚未扫描到的消息由缓存扣减了用户 1 的计数
+        async with AsyncSession(backfill_engine) as session:
+            activity = (
+                await session.exec(select(UserActivity).where(UserActivity.user_id == 1))
+            ).one()
+            activity.message_count -= 1
+            session.add(activity)
+            await session.commit()
+        backfill.record_deletions([THREAD_ID, THREAD_ID + 4], {THREAD_ID + 4: (1, THREAD_ID)})
+
+    thread = FakeThread(_history(), before_call=delete_during_scan)
+    report = await backfill.run(thread)  # type: ignore[arg-type]
+
+    assert report.valid_messages == 2
+    assert await _counts(backfill_engine) == {1: 1, 2: 1}
+    async with AsyncSession(backfill_engine) as session:
+        indexed = (await session.exec(select(CountedMessage.message_id))).all()
+    assert sorted(indexed) == [THREAD_ID + 1, THREAD_ID + 2]
+    assert not backfill.scans
+
+
+@pytest.mark.asyncio
+async def test_report_falls_back_to_channel_when_followup_expires() -> None:
+    """交互令牌过期后 followup 发送失败，报告改发到频道，不向回填循环抛出异常。"""
+    cog = object.__new__(Voting)
+    cog.bot = _create_bot(MagicMock())  # type: ignore[assignment]
+    interaction = MagicMock()
+    interaction.followup.send = AsyncMock(
+        side_effect=discord.NotFound(
+            MagicMock(status=404, reason="Not Found"),
+            {"code": 10015, "message": "Unknown Webhook"},
+        )
+    )
+    interaction.channel = MagicMock(spec=discord.TextChannel)
+    interaction.channel.send = AsyncMock()
+
+    await cog._send_backfill_report(interaction, "报告")
+    interaction.channel.send.assert_awaited_once_with("报告")
+
+    # 频道同样发送失败时只记录日志
+    interaction.channel.send.side_effect = RuntimeError("频道不可用")
+    await cog._send_backfill_report(interaction, "报告")
+
+
+def test_activity_backfill_checkpoint_migration_round_trip() -> None:
+    """验证回填断点表能够升级创建并完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        # 不加载 alembic.ini，避免其日志配置禁用其他用例依赖的 logger
+        config = Config()
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            SQLModel.metadata.tables["activity_backfill_checkpoint"].drop(connection)
+        engine.dispose()
+        command.stamp(config, "c4f6a8b0d2e3")
+
+        command.upgrade(config, "d5b7c9e1f3a5")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        assert inspector.get_pk_constraint("activity_backfill_checkpoint")[
+            "constrained_columns"
+        ] == ["thread_id"]
+        engine.dispose()
+
+        command.downgrade(config, "c4f6a8b0d2e3")
+        engine = create_engine(database_url)
+        assert "activity_backfill_checkpoint" not in inspect(engine).get_table_names()
+        engine.dispose()
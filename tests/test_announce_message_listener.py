@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Notification.listeners.AnnounceMessageListener import (
+    AnnounceMessageListener,
+)
+from StellariaPact.models.Announcement import Announcement
+from StellariaPact.models.AnnouncementChannelMonitor import AnnouncementChannelMonitor
+from StellariaPact.share.enums import DeadlineKind
+
+
+class _TestDatabaseHandler:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def get_session(self) -> AsyncSession:
+        return AsyncSession(self.engine)
+
+
+@pytest_asyncio.fixture
+async def monitor_engine():
+    engine = await create_test_engine()
+    yield engine
+    await dispose_test_engine(engine)
+
+
+async def _add_announcement(
+    engine: AsyncEngine, announcement_id: int, channel_ids: list[int], status: int = 1
+) -> None:
+    async with AsyncSession(engine) as session:
+        session.add(
+            Announcement(
+                id=announcement_id,
+                discussion_thread_id=announcement_id,
+                announcer_id=1,
+                title="公示",
+                content="内容",
+                status=status,
+                end_time=datetime.now(timezone.utc) + timedelta(days=1),
+            )
+        )
+        for channel_id in channel_ids:
+            session.add(
+                AnnouncementChannelMonitor(
+                    announcement_id=announcement_id,
+                    channel_id=channel_id,
+                    message_threshold=10,
+                    time_interval_minutes=60,
+                )
+            )
+        await session.commit()
+
+
+async def _counts(engine: AsyncEngine) -> dict[tuple[int, int], int]:
+    async with AsyncSession(engine) as session:
+        result = await session.exec(select(AnnouncementChannelMonitor))
+        return {
+            (m.announcement_id, m.channel_id): m.message_count_since_last for m in result.all()
+        }
+
+
+def _create_listener(engine: AsyncEngine) -> AnnounceMessageListener:
+    bot = SimpleNamespace(
+        db_handler=_TestDatabaseHandler(engine),
+        deadline_scheduler=SimpleNamespace(reload=AsyncMock(), schedule=MagicMock()),
+    )
+    return AnnounceMessageListener(bot)  # type: ignore[arg-type]
+
+
+def _message(channel_id: int, bot: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(author=SimpleNamespace(bot=bot), channel=SimpleNamespace(id=channel_id))
+
+
+@pytest.mark.asyncio
+async def test_flush_updates_all_monitors_in_one_statement(monitor_engine) -> None:
+    """写库时无论涉及多少频道都只执行一条 UPDATE，已结束公示的监控器不计数。"""
+    await _add_announcement(monitor_engine, 1, [10, 20])
+    await _add_announcement(monitor_engine, 2, [10])
+    await _add_announcement(monitor_engine, 3, [30], status=0)
+    listener = _create_listener(monitor_engine)
+    await listener.load_monitor_index()
+    assert set(listener.monitor_index or {}) == {10, 20}
+
+    for message in [_message(10), _message(10), _message(20), _message(30), _message(10, True)]:
+        await listener.on_message(message)  # type: ignore[arg-type]
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(monitor_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await listener.flush_message_cache()
+    finally:
+        event.remove(monitor_engine.sync_engine, "before_cursor_execute", record)
+
+    assert [s for s in statements if s.lstrip().upper().startswith("UPDATE")] == [statements[0]]
+    assert not any(s.lstrip().upper().startswith("SELECT") for s in statements)
+    assert await _counts(monitor_engine) == {(1, 10): 2, (1, 20): 1, (2, 10): 2, (3, 30): 0}
+    # 没有监控器达到阈值，既不登记也不全量重新加载
+    listener.bot.deadline_scheduler.schedule.assert_not_called()
+    listener.bot.deadline_scheduler.reload.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_flush_schedules_only_monitors_that_cross_threshold(monitor_engine) -> None:
+    """写库后只为本次新达到阈值的监控器登记重复播报时间，已达到阈值的不再登记。"""
+    await _add_announcement(monitor_engine, 1, [10, 20])
+    listener = _create_listener(monitor_engine)
+    await listener.load_monitor_index()
+    schedule = listener.bot.deadline_scheduler.schedule
+
+    for _ in range(9):
+        await listener.on_message(_message(10))  # type: ignore[arg-type]
+    await listener.on_message(_message(20))  # type: ignore[arg-type]
+    await listener.flush_message_cache()
+    schedule.assert_not_called()
+
+    await listener.on_message(_message(10))  # type: ignore[arg-type]
+    await listener.on_message(_message(20))  # type: ignore[arg-type]
+    await listener.flush_message_cache()
+    async with AsyncSession(monitor_engine) as session:
+        monitor = (
+            await session.exec(
+                select(AnnouncementChannelMonitor).where(
+                    AnnouncementChannelMonitor.channel_id == 10
+                )
+            )
+        ).one()
+    schedule.assert_called_once_with(
+        DeadlineKind.ANNOUNCEMENT_REPOST, monitor.id, monitor.next_repost_at
+    )
+
+    await listener.on_message(_message(10))  # type: ignore[arg-type]
+    await listener.flush_message_cache()
+    schedule.assert_called_once()
+    listener.bot.deadline_scheduler.reload.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_index_is_refreshed_by_announcement_events(monitor_engine) -> None:
+    """新公示创建、旧公示结束后，事件刷新频道索引，计数随之落到正确的监控器。"""
+    await _add_announcement(monitor_engine, 1, [10])
+    listener = _create_listener(monitor_engine)
+    await listener.load_monitor_index()
+
+    await _add_announcement(monitor_engine, 2, [40])
+    await listener.on_announcement_monitors_changed(2)
+    await listener.on_message(_message(40))  # type: ignore[arg-type]
+    await listener.flush_message_cache()
+    assert (await _counts(monitor_engine))[(2, 40)] == 1
+
+    async with AsyncSession(monitor_engine) as session:
+        announcement = await session.get(Announcement, 1)
+        assert announcement is not None
+        announcement.status = 0
+        await session.commit()
+    await listener.on_announcement_monitors_changed(1)
+    assert set(listener.monitor_index or {}) == {40}
@@ -0,0 +1,113 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.Announcement import Announcement
+from StellariaPact.models.AnnouncementChannelMonitor import AnnouncementChannelMonitor
+from StellariaPact.repository.AnnouncementMonitorRepository import (
+    AnnouncementMonitorRepository,
+)
+
+
+@pytest.mark.asyncio
+async def test_pending_reposts_use_stored_next_repost_at() -> None:
+    """新建监控器按时间间隔写入下次播报时间，待播报查询只返回已到时间且达到阈值的监控器。"""
+    engine = await create_test_engine()
+    now = datetime.now(timezone.utc)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add(
+                Announcement(
+                    id=1,
+                    discussion_thread_id=1,
+                    announcer_id=1,
+                    title="公示",
+                    content="内容",
+                    end_time=now + timedelta(days=1),
+                )
+            )
+            repository = AnnouncementMonitorRepository(session)
+            await repository.create_monitors_for_announcement(1, [10, 20, 30], 2, 60)
+            await session.commit()
+
+            assert await repository.get_pending_reposts() == []
+            created = await session.get(AnnouncementChannelMonitor, 1)
+            assert created is not None
+            assert created.next_repost_at - created.last_repost_at == timedelta(minutes=60)
+
+            # 频道 10: 到时间且达到阈值；频道 20: 到时间但未达阈值；频道 30: 达到阈值但未到时间
+            for monitor_id, due, count in ((1, True, 2), (2, True, 1), (3, False, 5)):
+                monitor = await session.get(AnnouncementChannelMonitor, monitor_id)
+                assert monitor is not None
+                monitor.message_count_since_last = count
+                if due:
+                    monitor.next_repost_at = now - timedelta(minutes=1)
+            await session.commit()
+
+            pending = await repository.get_pending_reposts()
+            assert [m.channel_id for m in pending] == [10]
+            deadlines = dict(await repository.get_repost_deadlines())
+            assert set(deadlines) == {1, 3}
+    finally:
+        await dispose_test_engine(engine)
+
+
+def test_next_repost_at_migration_backfills_existing_monitors() -> None:
+    """迁移为已有监控器回填下次播报时间，并能完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        # 不加载 alembic.ini，避免其日志配置禁用其他用例依赖的 logger
+        config = Config()
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_announcement_channel_monitor_next_repost_at"))
+            connection.execute(
+                text("ALTER TABLE announcement_channel_monitor DROP COLUMN next_repost_at")
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO announcement_channel_monitor "
+                    "(id, announcement_id, channel_id, message_threshold, "
+                    "time_interval_minutes, message_count_since_last, last_repost_at) "
+                    "VALUES (1, 1, 10, 5, 90, 0, '2026-10-01 08:00:00.000000')"
+                )
+            )
+        engine.dispose()
+        command.stamp(config, "d5b7c9e1f3a5")
+
+        command.upgrade(config, "e8f0a2c4b6d8")
+        engine = create_engine(database_url)
+        columns = {
+            column["name"]: column
+            for column in inspect(engine).get_columns("announcement_channel_monitor")
+        }
+        assert columns["next_repost_at"]["nullable"] is False
+        with engine.connect() as connection:
+            next_repost_at = connection.execute(
+                text("SELECT next_repost_at FROM announcement_channel_monitor WHERE id = 1")
+            ).scalar_one()
+        assert next_repost_at.startswith("2026-10-01 09:30:00")
+        engine.dispose()
+
+        command.downgrade(config, "d5b7c9e1f3a5")
+        engine = create_engine(database_url)
+        columns = {
+            column["name"]
+            for column in inspect(engine).get_columns("announcement_channel_monitor")
+        }
+        assert "next_repost_at" not in columns
+        engine.dispose()
@@ -0,0 +1,264 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.tasks.VoteArchiver import VoteArchiver
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
+from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
+from StellariaPact.models.CountedMessage import CountedMessage
+from StellariaPact.models.Proposal import Proposal
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.share.enums import ProposalStatus
+
+
+def _create_bot(engine: AsyncEngine) -> MagicMock:
+    """创建使用测试数据库的测试 Bot。"""
+    database_handler = MagicMock()
+    database_handler.get_session.side_effect = lambda: AsyncSession(engine)
+    bot = MagicMock()
+    bot.db_handler = database_handler
+    bot.config = {}
+    return bot
+
+
+@pytest_asyncio.fixture
+async def index_engine():
+    """提供包含完整 SQLModel 元数据的测试数据库。"""
+    engine = await create_test_engine()
+    try:
+        yield engine
+    finally:
+        await dispose_test_engine(engine)
+
+
+async def _stored_count(engine: AsyncEngine, user_id: int = 50, thread_id: int = 30) -> int:
+    """读取数据库中已持久化的发言计数。"""
+    async with AsyncSession(engine) as session:
+        activity = (
+            await session.exec(
+                select(UserActivity).where(
+                    UserActivity.user_id == user_id,
+                    UserActivity.context_thread_id == thread_id,
+                )
+            )
+        ).one_or_none()
+    return activity.message_count if activity else 0
+
+
+async def _index_rows(engine: AsyncEngine) -> dict[int, bool]:
+    """读取消息索引: {message_id: counted}。"""
+    async with AsyncSession(engine) as session:
+        rows = await session.exec(select(CountedMessage.message_id, CountedMessage.counted))
+        return dict(rows.all())
+
+
+class _FailingCommitSession(AsyncSession):
+    """提交时失败的测试会话。"""
+
+    async def commit(self) -> None:
+        raise RuntimeError("提交失败")
+
+
+def _qo(change: int, thread_id: int = 30) -> UpdateUserActivityQo:
+    return UpdateUserActivityQo(user_id=50, thread_id=thread_id, change=change)
+
+
+@pytest.mark.asyncio
+async def test_indexed_deletion_decrements_once_and_revokes(index_engine: AsyncEngine) -> None:
+    """不在缓存中的已计数消息被删除时按索引扣减一次，跌破阈值后撤销投票。"""
+    bot = _create_bot(index_engine)
+    logic = VotingLogic(bot)
+    remove_votes = AsyncMock(return_value=["detail"])
+    logic.remove_active_user_votes_in_thread = remove_votes  # type: ignore[method-assign]
+
+    for message_id in (1, 2):
+        await logic.handle_message_creation(_qo(1), message_id=message_id)
+    assert await _index_rows(index_engine) == {1: True, 2: True}
+
+    assert await logic.handle_indexed_message_deletions([1]) == {30: ["detail"]}
+    assert await _stored_count(index_engine) == 1
+    assert await _index_rows(index_engine) == {1: False, 2: True}
+
+    # 重复事件和从未计数的消息都不会再扣减。
+    assert await logic.handle_indexed_message_deletions([1, 99]) == {}
+    assert await _stored_count(index_engine) == 1
+    remove_votes.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_buffered_messages_are_indexed_on_flush(index_engine: AsyncEngine) -> None:
+    """缓冲中的消息在写库前被删除时直接抵消缓冲量，其余消息随刷新写入索引。"""
+    bot = _create_bot(index_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+
+    for message_id in (1, 2, 3, 4):
+        await logic.handle_message_creation(_qo(1), message_id=message_id)
+    assert buffer.pending_messages == {3: (50, 30), 4: (50, 30)}
+    assert await _index_rows(index_engine) == {1: True, 2: True}
+
+    assert await logic.handle_indexed_message_deletions([3]) == {}
+    assert buffer.pending == {(50, 30): 1}
+    assert buffer.pending_messages == {4: (50, 30)}
+
+    await buffer.flush()
+    assert await _stored_count(index_engine) == 3
+    assert await _index_rows(index_engine) == {1: True, 2: True, 4: True}
+
+    # 写库后的删除改由索引处理，仍达标时扣减量进入缓冲区。
+    assert await logic.handle_indexed_message_deletions([4]) == {}
+    assert await _index_rows(index_engine) == {1: True, 2: True, 4: False}
+    await buffer.flush()
+    assert await _stored_count(index_engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_message_counted_before_index_decrements_once(
+    index_engine: AsyncEngine,
+) -> None:
+    """索引上线前计数的消息按缓存扣减一次，已在索引中的消息仍以索引为准。"""
+    bot = _create_bot(index_engine)
+    logic = VotingLogic(bot, activity_buffer=UserActivityBuffer(bot, enabled=False))
+    async with AsyncSession(index_engine) as session:
+        session.add(UserActivity(user_id=50, context_thread_id=30, message_count=3))
+        await session.commit()
+    await logic.handle_message_creation(_qo(1), message_id=10)
+    cached = {1: (50, 30), 10: (50, 30)}
+
+    assert await logic.handle_indexed_message_deletions([1, 10], cached) == {}
+    assert await _stored_count(index_engine) == 2
+    assert await _index_rows(index_engine) == {1: False, 10: False}
+
+    # 重复的删除事件不会再次扣减。
+    assert await logic.handle_indexed_message_deletions([1, 10], cached) == {}
+    assert await _stored_count(index_engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_deletion_restores_buffered_messages(index_engine: AsyncEngine) -> None:
+    """删除事务失败时，缓冲区中的消息和扣减量恢复原状，重试后只扣减一次。"""
+    bot = _create_bot(index_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+
+    for message_id in (1, 2, 3, 4, 5):
+        await logic.handle_message_creation(_qo(1), message_id=message_id)
+    await buffer.flush()
+    await logic.handle_message_creation(_qo(1), message_id=6)
+    assert buffer.pending == {(50, 30): 1}
+    assert buffer.pending_messages == {6: (50, 30)}
+
+    # 两条删除后仍达标，扣减量均进入缓冲区，随后事务提交失败。
+    bot.db_handler.get_session.side_effect = lambda: _FailingCommitSession(index_engine)
+    with pytest.raises(RuntimeError):
+        await logic.handle_indexed_message_deletions([5, 6])
+    assert buffer.pending == {(50, 30): 1}
+    assert buffer.pending_messages == {6: (50, 30)}
+
+    bot.db_handler.get_session.side_effect = lambda: AsyncSession(index_engine)
+    assert await logic.handle_indexed_message_deletions([5, 6]) == {}
+    assert not buffer.pending_messages
+    await buffer.flush()
+    assert await _stored_count(index_engine) == 4
+    assert await _index_rows(index_engine) == {1: True, 2: True, 3: True, 4: True, 5: False}
+
+
+@pytest.mark.asyncio
+async def test_bulk_deletion_revokes_once_per_user(index_engine: AsyncEngine) -> None:
+    """批量删除按 (用户, 帖子) 聚合扣减，每个跌破阈值的用户只撤票一次。"""
+    bot = _create_bot(index_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+    remove_votes = AsyncMock(side_effect=lambda uow, user_id, thread_id: [f"detail-{user_id}"])
+    logic.remove_active_user_votes_in_thread = remove_votes  # type: ignore[method-assign]
+
+    # 用户 50 有 4 条消息（其中 2 条仍在缓冲区），用户 51 有 3 条。
+    for message_id in (1, 2, 3, 4):
+        await logic.handle_message_creation(_qo(1), message_id=message_id)
+    for message_id in (11, 12, 13):
+        await logic.handle_message_creation(
+            UpdateUserActivityQo(user_id=51, thread_id=30, change=1), message_id=message_id
+        )
+
+    details = await logic.handle_indexed_message_deletions([1, 2, 3, 4, 11, 99])
+    assert await _stored_count(index_engine) == 0
+    assert buffer.pending == {(51, 30): 0}
+    assert sorted(call.kwargs["user_id"] for call in remove_votes.await_args_list) == [50]
+    assert details == {30: ["detail-50"]}
+
+    # 用户 51 扣减后仍达标，只进入缓冲区。
+    await buffer.flush()
+    assert await _stored_count(index_engine, user_id=51) == 2
+
+
+@pytest.mark.asyncio
+async def test_index_is_pruned_for_closed_proposal_threads(index_engine: AsyncEngine) -> None:
+    """提案结束且帖子内没有未归档投票时，清理该帖子的消息索引。"""
+    bot = _create_bot(index_engine)
+    logic = VotingLogic(bot)
+    async with AsyncSession(index_engine) as session:
+        session.add(
+            Proposal(
+                discussion_thread_id=30,
+                proposer_id=50,
+                title="已结束",
+                status=ProposalStatus.FINISHED,
+            )
+        )
+        session.add(Proposal(discussion_thread_id=31, proposer_id=50, title="讨论中"))
+        await session.commit()
+    await logic.handle_message_creation(_qo(1, thread_id=30), message_id=1)
+    await logic.handle_message_creation(_qo(1, thread_id=31), message_id=2)
+
+    archiver = VoteArchiver.__new__(VoteArchiver)
+    archiver.bot = bot
+    archiver.batch_size = 1
+    assert await archiver.prune_message_index() == 1
+    assert await _index_rows(index_engine) == {2: True}
+
+
+def test_counted_message_migration_round_trip() -> None:
+    """验证消息索引表能够升级创建并完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        # 不加载 alembic.ini，避免其日志配置禁用其他用例依赖的 logger
+        config = Config()
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        # 以当前模型建表，再移除索引表，模拟上一个版本的数据库
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            SQLModel.metadata.tables["counted_message"].drop(connection)
+        engine.dispose()
+        command.stamp(config, "b3e5f7a9c1d4")
+
+        command.upgrade(config, "c4f6a8b0d2e3")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        assert inspector.get_pk_constraint("counted_message")["constrained_columns"] == [
+            "message_id"
+        ]
+        assert "ix_counted_message_thread_id" in {
+            index["name"] for index in inspector.get_indexes("counted_message")
+        }
+        engine.dispose()
+
+        command.downgrade(config, "b3e5f7a9c1d4")
+        engine = create_engine(database_url)
+        assert "counted_message" not in inspect(engine).get_table_names()
+        engine.dispose()
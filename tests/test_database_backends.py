@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.Announcement import Announcement
+from StellariaPact.models.AnnouncementChannelMonitor import AnnouncementChannelMonitor
+from StellariaPact.models.GlobalProposalPunishment import GlobalProposalPunishment
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.models.UserVote import UserVote
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.repository.AnnouncementMonitorRepository import (
+    AnnouncementMonitorRepository,
+)
+from StellariaPact.repository.UserActivityRepository import UserActivityRepository
+from StellariaPact.share.database_types import epoch_seconds, greatest
+from StellariaPact.share.DatabaseHandler import resolve_database_url
+
+SNOWFLAKE_ID = 1134557553011998840
+
+
+def test_resolve_database_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    """DATABASE_URL 优先于 DATABASE_NAME，并规范化为异步驱动。"""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("DATABASE_NAME", "data/test.db")
+    assert resolve_database_url() == "sqlite+aiosqlite:///data/test.db"
+
+    monkeypatch.setenv("DATABASE_URL", "postgres://bot:secret@db:5432/pact")
+    assert resolve_database_url() == "postgresql+asyncpg://bot:secret@db:5432/pact"
+
+    monkeypatch.setenv("DATABASE_URL", "postgresql://bot@db/pact")
+    assert resolve_database_url() == "postgresql+asyncpg://bot@db/pact"
+
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///data/other.db")
+    assert resolve_database_url() == "sqlite+aiosqlite:///data/other.db"
+
+
+def test_postgresql_ddl_uses_bigint_ids_and_partial_indexes() -> None:
+    """PostgreSQL 上 Discord ID 列建为 BIGINT，部分唯一索引保留 WHERE 条件。"""
+    dialect = postgresql.dialect()
+    user_vote_ddl = str(CreateTable(UserVote.__table__).compile(dialect=dialect))  # type: ignore
+    assert "id SERIAL NOT NULL" in user_vote_ddl
+    assert "user_id BIGINT NOT NULL" in user_vote_ddl
+    assert "choice INTEGER NOT NULL" in user_vote_ddl
+    assert "DEFAULT timezone('UTC', CURRENT_TIMESTAMP)" in user_vote_ddl
+
+    # SQLite 上的列定义保持不变：ID 仍为 INTEGER，默认值仍为 CURRENT_TIMESTAMP
+    sqlite_ddl = str(CreateTable(UserVote.__table__).compile(dialect=sqlite.dialect()))  # type: ignore
+    assert "user_id INTEGER NOT NULL" in sqlite_ddl
+    assert "DEFAULT CURRENT_TIMESTAMP" in sqlite_ddl
+
+    # BIGINT 只作用于声明为 DiscordId 的列，不影响其他元数据中的 INTEGER
+    other = Table("other", MetaData(), Column("value", Integer))
+    assert "value INTEGER" in str(CreateTable(other).compile(dialect=dialect))
+
+    active_index = next(
+        index
+        for index in GlobalProposalPunishment.__table__.indexes  # type: ignore
+        if index.name == "uq_global_proposal_punishment_active_user_type"
+    )
+    assert "WHERE lifted_at IS NULL" in str(CreateIndex(active_index).compile(dialect=dialect))
+
+
+def test_portable_functions_render_per_dialect() -> None:
+    """greatest / epoch_seconds 按方言渲染为各自支持的 SQL。"""
+    statement = select(greatest(0, UserVote.choice), epoch_seconds(UserVote.voted_at))
+    sqlite_sql = str(statement.compile(dialect=sqlite.dialect()))
+    postgresql_sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "max(" in sqlite_sql and "strftime('%s'" in sqlite_sql
+    assert "greatest(" in postgresql_sql and "EXTRACT(EPOCH FROM" in postgresql_sql
+
+
+@pytest.mark.asyncio
+async def test_user_activity_upserts_with_snowflake_ids(backend_engine: AsyncEngine) -> None:
+    """UPSERT 与计数下限在各后端行为一致，且能存储 64 位 Discord ID。"""
+    async with AsyncSession(backend_engine) as session:
+        repository = UserActivityRepository(session)
+        activity = await repository.update_user_activity(
+            UpdateUserActivityQo(user_id=SNOWFLAKE_ID, thread_id=SNOWFLAKE_ID + 1, change=2)
+        )
+        assert activity.message_count == 2
+        activity = await repository.update_user_activity(
+            UpdateUserActivityQo(user_id=SNOWFLAKE_ID, thread_id=SNOWFLAKE_ID + 1, change=-5)
+        )
+        assert activity.message_count == 0
+
+        counts = await repository.batch_apply_activity_changes(
+            {(SNOWFLAKE_ID, SNOWFLAKE_ID + 1): 3, (SNOWFLAKE_ID, SNOWFLAKE_ID + 2): 1}
+        )
+        assert counts == {(SNOWFLAKE_ID, SNOWFLAKE_ID + 1): 3, (SNOWFLAKE_ID, SNOWFLAKE_ID + 2): 1}
+
+        mute_end_time = datetime.now(timezone.utc) + timedelta(hours=1)
+        activity = await repository.update_user_validation_status(
+            SNOWFLAKE_ID, SNOWFLAKE_ID + 1, False, mute_end_time
+        )
+        assert activity.validation == 0
+        assert activity.mute_end_time == mute_end_time
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_batch_clear_expired_mutes_uses_one_update(backend_engine: AsyncEngine) -> None:
+    """批量清理只发出一条 UPDATE，且不会清除已被延长或未在列表中的禁言。"""
+    now = datetime.now(timezone.utc)
+    rows = {
+        (SNOWFLAKE_ID, 30): now - timedelta(minutes=1),
+        (SNOWFLAKE_ID + 1, 30): now + timedelta(hours=1),
+        (SNOWFLAKE_ID, 31): now - timedelta(minutes=1),
+    }
+    async with AsyncSession(backend_engine) as session:
+        for (user_id, thread_id), mute_end_time in rows.items():
+            session.add(
+                UserActivity(
+                    user_id=user_id, context_thread_id=thread_id, mute_end_time=mute_end_time
+                )
+            )
+        await session.commit()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(backend_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with AsyncSession(backend_engine) as session:
+            await UserActivityRepository(session).batch_clear_expired_mutes(
+                [(SNOWFLAKE_ID, 30), (SNOWFLAKE_ID + 1, 30)], now=now
+            )
+            await session.commit()
+    finally:
+        event.remove(backend_engine.sync_engine, "before_cursor_execute", record)
+
+    assert sum(statement.lstrip().upper().startswith("UPDATE") for statement in statements) == 1
+    async with AsyncSession(backend_engine) as session:
+        remaining = {
+            (activity.user_id, activity.context_thread_id): activity.mute_end_time
+            for activity in (await session.exec(select(UserActivity))).scalars().all()
+        }
+    assert remaining[(SNOWFLAKE_ID, 30)] is None
+    assert remaining[(SNOWFLAKE_ID + 1, 30)] is not None
+    assert remaining[(SNOWFLAKE_ID, 31)] is not None
+
+
+@pytest.mark.asyncio
+async def test_pending_reposts_compare_elapsed_seconds(backend_engine: AsyncEngine) -> None:
+    """仅返回消息数与时间间隔均达标的监控器。"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(backend_engine) as session:
+        announcement = Announcement(
+            discussion_thread_id=SNOWFLAKE_ID,
+            announcer_id=SNOWFLAKE_ID,
+            title="公示",
+            content="内容",
+            end_time=now + timedelta(days=1),
+        )
+        session.add(announcement)
+        await session.flush()
+        for channel_id, minutes_ago in ((SNOWFLAKE_ID + 1, 90), (SNOWFLAKE_ID + 2, 10)):
+            session.add(
+                AnnouncementChannelMonitor(
+                    announcement_id=announcement.id,  # type: ignore[arg-type]
+                    channel_id=channel_id,
+                    message_threshold=5,
+                    time_interval_minutes=60,
+                    message_count_since_last=5,
+                    last_repost_at=now - timedelta(minutes=minutes_ago),
+                )
+            )
+        await session.commit()
+
+        monitors = await AnnouncementMonitorRepository(session).get_pending_reposts()
+
+    assert [monitor.channel_id for monitor in monitors] == [SNOWFLAKE_ID + 1]
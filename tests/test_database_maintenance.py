@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from types import SimpleNamespace
+
+from StellariaPact.cogs.Maintenance.Cog import AUTO_VACUUM_INCREMENTAL, MaintenanceCog
+
+
+def _create_bloated_database(database_path: Path) -> sqlite3.Connection:
+    """
+    创建一个 WAL 模式、未启用增量回收且含大量空闲页的数据库。
+
+    返回的连接需保持打开，模拟运行中的 Bot；最后一个连接关闭时 SQLite 会自行删除 WAL。
+    """
+    connection = sqlite3.connect(database_path, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE payload (id INTEGER PRIMARY KEY, body TEXT NOT NULL)")
+    connection.executemany(
+        "INSERT INTO payload (body) VALUES (?)", [("x" * 1000,) for _ in range(500)]
+    )
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.execute("DELETE FROM payload WHERE id > 50")
+    return connection
+
+
+def _create_cog(database_path: Path) -> MaintenanceCog:
+    return MaintenanceCog(
+        SimpleNamespace(),  # type: ignore[arg-type]
+        {"maintenance": {"enabled": False}},
+        db_path=str(database_path),
+    )
+
+
+def test_maintenance_reclaims_free_pages_and_truncates_wal() -> None:
+    """首次维护切换为增量回收，收集统计信息，回收空闲页并截断 WAL。"""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "maintenance.db"
+        with closing(_create_bloated_database(database_path)):
+            before, after = _create_cog(database_path).run_maintenance_sync()
+
+        assert before.wal_size > 0
+        assert before.freelist_pages > 0
+        assert after.freelist_pages == 0
+        assert after.wal_size == 0
+        assert after.file_size < before.file_size
+        with closing(sqlite3.connect(database_path)) as connection:
+            assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == (
+                AUTO_VACUUM_INCREMENTAL
+            )
+            assert connection.execute("SELECT count(*) FROM payload").fetchone()[0] == 50
+            assert connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+
+
+def test_checkpoint_truncates_wal_file() -> None:
+    """定期检查点把 WAL 内容写回主库并将 WAL 文件截断为 0。"""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "checkpoint.db"
+        wal_path = f"{database_path}-wal"
+        with closing(_create_bloated_database(database_path)):
+            assert os.path.getsize(wal_path) > 0
+
+            busy, log_frames, checkpointed = _create_cog(database_path).checkpoint_sync()
+
+            assert busy == 0
+            assert log_frames == checkpointed
+            assert os.path.getsize(wal_path) == 0
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+import pytest
+
+from StellariaPact.cogs.Punishment.listeners.PunishmentListener import PunishmentListener
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
+from StellariaPact.share.enums import DeadlineKind
+from StellariaPact.share.PunishmentState import PunishmentState
+
+
+def _in(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+class _Recorder:
+    """记录每次到期回调收到的键。"""
+
+    def __init__(self):
+        self.calls: list[list] = []
+        self.fired = asyncio.Event()
+
+    async def __call__(self, keys: list) -> None:
+        self.calls.append(sorted(keys))
+        self.fired.set()
+
+
+@pytest.mark.asyncio
+async def test_deadlines_fire_at_due_time_without_idle_loads() -> None:
+    """条目在截止时间到达时按类型成批触发，期间不会重复调用加载函数。"""
+    scheduler = DeadlineScheduler(sweep_interval_seconds=3600)
+    recorder = _Recorder()
+    loader = AsyncMock(return_value=[(1, _in(0.1)), (2, _in(0.1))])
+    scheduler.register("vote", recorder, loader)
+    scheduler.start()
+    try:
+        await asyncio.sleep(0.03)
+        assert recorder.calls == []
+        await asyncio.wait_for(recorder.fired.wait(), timeout=1)
+        assert recorder.calls == [[1, 2]]
+        await asyncio.sleep(0.1)
+        loader.assert_awaited_once()
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_rescheduled_and_cancelled_entries_do_not_fire_early() -> None:
+    """调整截止时间后旧的到期时间失效，取消的条目不会触发，新的更早条目会立即唤醒调度器。"""
+    scheduler = DeadlineScheduler(sweep_interval_seconds=3600)
+    recorder = _Recorder()
+    scheduler.register("vote", recorder)
+    scheduler.start()
+    try:
+        scheduler.schedule("vote", 1, _in(0.05))
+        scheduler.schedule("vote", 1, _in(10))
+        scheduler.schedule("vote", 2, _in(0.05))
+        scheduler.cancel("vote", 2)
+        scheduler.schedule("vote", 3, _in(0.1))
+        await asyncio.wait_for(recorder.fired.wait(), timeout=1)
+        assert recorder.calls == [[3]]
+        assert scheduler.get_deadline("vote", 1) is not None
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_is_retried_and_sweep_reloads() -> None:
+    """回调失败的条目稍后重试；安全扫描会重新调用加载函数补上遗漏的条目。"""
+    scheduler = DeadlineScheduler(sweep_interval_seconds=0.2, retry_delay_seconds=0.05)
+    attempts: list[list] = []
+    succeeded = asyncio.Event()
+
+    async def handler(keys: list) -> None:
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("暂时失败")
+        succeeded.set()
+
+    missed: list[tuple[int, datetime]] = []
+
+    async def loader() -> list[tuple[int, datetime]]:
+        return list(missed)
+
+    scheduler.register("intake", handler, loader)
+    scheduler.start()
+    try:
+        scheduler.schedule("intake", 1, _in(0))
+        await asyncio.wait_for(succeeded.wait(), timeout=1)
+        assert attempts == [[1], [1]]
+
+        # 某条写入路径没有通知调度器，由安全扫描补上
+        succeeded.clear()
+        missed.append((2, _in(-1)))
+        await asyncio.wait_for(succeeded.wait(), timeout=1)
+        assert attempts[-1] == [2]
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_mute_updates_are_scheduled_and_cleared_in_batch() -> None:
+    """禁言更新登记到调度器，到期回调只清理确实到期的禁言并批量写库。"""
+    scheduler = DeadlineScheduler(sweep_interval_seconds=3600)
+    listener = object.__new__(PunishmentListener)
+    listener.bot = SimpleNamespace(db_handler=object(), deadline_scheduler=scheduler)
+    listener.state = PunishmentState(listener.bot)
+
+    await listener.on_thread_mute_updated(30, 1, _in(60))
+    await listener.on_thread_mute_updated(30, 2, _in(60))
+    assert scheduler.get_deadline(DeadlineKind.THREAD_MUTE, (30, 1)) is not None
+    await listener.on_thread_mute_updated(30, 2, None)
+    assert scheduler.get_deadline(DeadlineKind.THREAD_MUTE, (30, 2)) is None
+
+    # 用户 1 的禁言已到期，用户 3 的禁言被延长
+    listener.state.set_thread_mute(30, 3, _in(60))
+    listener.state._thread_mutes[(30, 1)] = _in(-1)
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    uow.user_activity.batch_clear_expired_mutes = AsyncMock()
+    uow.commit = AsyncMock()
+    with patch(
+        "StellariaPact.cogs.Punishment.listeners.PunishmentListener.UnitOfWork",
+        return_value=uow,
+    ):
+        await listener.clear_expired_mutes([(30, 1), (30, 3)])
+
+    uow.user_activity.batch_clear_expired_mutes.assert_awaited_once_with([(1, 30)], now=ANY)
+    assert [key for key, _ in listener.state.thread_mutes()] == [(30, 3)]
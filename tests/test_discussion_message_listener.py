@@ -10,12 +10,13 @@ from StellariaPact.cogs.Voting.listeners.DiscussionMessageListener import (
 
 @pytest.mark.asyncio
 async def test_created_then_deleted_message_returns_activity_to_original_count() -> None:
-    """验证禁言消息先新增后删除会向服务层提交相反的计数变化。"""
+    """验证禁言消息先新增后删除会以消息 ID 提交计数和按索引扣减。"""
     # 构造目标论坛内的一条有效用户消息。
     thread = MagicMock(spec=discord.Thread)
     thread.id = 400
     thread.parent_id = 200
     message = MagicMock(spec=discord.Message)
+    message.id = 900
     message.content = "这是有效发言"
     message.author = MagicMock(id=500, bot=False)
     message.channel = thread
@@ -23,20 +24,119 @@ async def test_created_then_deleted_message_returns_activity_to_original_count()
     # 使用同一个业务逻辑接收创建和删除事件。
     bot = MagicMock()
     bot.config = {"channels": {"discussion": 200}}
+    bot.get_channel.return_value = thread
     voting_cog = MagicMock()
     voting_cog.logic.handle_message_creation = AsyncMock()
-    voting_cog.logic.handle_message_deletion = AsyncMock(return_value=None)
+    voting_cog.logic.handle_indexed_message_deletions = AsyncMock(return_value={})
     listener = DiscussionMessageListener(bot, voting_cog)
 
-    # 模拟禁言监听器删除消息后 Discord 产生的缓存内删除事件。
+    # 模拟禁言监听器删除消息后 Discord 产生的原始删除事件，消息不必在缓存中。
+    payload = MagicMock(spec=discord.RawMessageDeleteEvent)
+    payload.message_id = 900
+    payload.channel_id = 400
+    payload.cached_message = None
     with patch(
         "StellariaPact.cogs.Voting.listeners.DiscussionMessageListener.discord.Thread",
         type(thread),
     ):
         await listener.on_message(message)
-        await listener.on_message_delete(message)
+        await listener.on_raw_message_delete(payload)
 
-    created_qo = voting_cog.logic.handle_message_creation.await_args.args[0]
-    deleted_qo = voting_cog.logic.handle_message_deletion.await_args.args[0]
+    created_call = voting_cog.logic.handle_message_creation.await_args
+    created_qo = created_call.args[0]
     assert (created_qo.user_id, created_qo.thread_id, created_qo.change) == (500, 400, 1)
-    assert (deleted_qo.user_id, deleted_qo.thread_id, deleted_qo.change) == (500, 400, -1)
+    assert created_call.kwargs["message_id"] == 900
+    voting_cog.logic.handle_indexed_message_deletions.assert_awaited_once_with([900], {})
+
+
+@pytest.mark.asyncio
+async def test_raw_deletes_outside_discussion_forum_are_ignored() -> None:
+    """缓存中能确定不属于讨论论坛的帖子，其删除事件不会查询消息索引。"""
+    thread = MagicMock(spec=discord.Thread)
+    thread.parent_id = 999
+    bot = MagicMock()
+    bot.config = {"channels": {"discussion": 200}}
+    bot.get_channel.return_value = thread
+    voting_cog = MagicMock()
+    voting_cog.logic.handle_indexed_message_deletions = AsyncMock(return_value={})
+    listener = DiscussionMessageListener(bot, voting_cog)
+
+    payload = MagicMock(spec=discord.RawBulkMessageDeleteEvent)
+    payload.message_ids = {1, 2}
+    payload.channel_id = 401
+    with patch(
+        "StellariaPact.cogs.Voting.listeners.DiscussionMessageListener.discord.Thread",
+        type(thread),
+    ):
+        await listener.on_raw_bulk_message_delete(payload)
+
+    voting_cog.logic.handle_indexed_message_deletions.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_is_one_operation_and_refreshes_each_panel_once() -> None:
+    """批量删除只调用一次服务层，每个受影响的面板只刷新一次。"""
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = 400
+    thread.parent_id = 200
+    bot = MagicMock()
+    bot.config = {"channels": {"discussion": 200}}
+    bot.get_channel.return_value = thread
+    voting_cog = MagicMock()
+    panels = [MagicMock(context_message_id=1), MagicMock(context_message_id=2)]
+    voting_cog.logic.handle_indexed_message_deletions = AsyncMock(return_value={400: panels})
+    listener = DiscussionMessageListener(bot, voting_cog)
+    listener._refresh_vote_panel = AsyncMock()  # type: ignore[method-assign]
+
+    payload = MagicMock(spec=discord.RawBulkMessageDeleteEvent)
+    payload.message_ids = {1, 2, 3}
+    payload.channel_id = 400
+    payload.cached_messages = []
+    with patch(
+        "StellariaPact.cogs.Voting.listeners.DiscussionMessageListener.discord.Thread",
+        type(thread),
+    ):
+        await listener.on_raw_bulk_message_delete(payload)
+
+    voting_cog.logic.handle_indexed_message_deletions.assert_awaited_once_with({1, 2, 3}, {})
+    assert [call.args[1] for call in listener._refresh_vote_panel.await_args_list] == panels
+
+
+@pytest.mark.asyncio
+async def test_cached_valid_messages_are_passed_for_pre_index_deletions() -> None:
+    """缓存中的有效发言随删除事件传给服务层，供索引上线前计数的消息扣减。"""
+    thread = MagicMock(spec=discord.Thread)
+    thread.id = 400
+    thread.parent_id = 200
+    bot = MagicMock()
+    bot.config = {"channels": {"discussion": 200}}
+    bot.get_channel.return_value = thread
+    voting_cog = MagicMock()
+    voting_cog.logic.handle_indexed_message_deletions = AsyncMock(return_value={})
+    listener = DiscussionMessageListener(bot, voting_cog)
+
+    def cached(message_id: int, content: str, is_bot: bool = False) -> MagicMock:
+        message = MagicMock(spec=discord.Message)
+        message.id = message_id
+        message.content = content
+        message.author = MagicMock(id=500, bot=is_bot)
+        message.channel = thread
+        return message
+
+    payload = MagicMock(spec=discord.RawBulkMessageDeleteEvent)
+    payload.message_ids = {1, 2, 3}
+    payload.channel_id = 400
+    payload.cached_messages = [
+        cached(1, "这是有效发言"),
+        cached(2, "短"),
+        cached(3, "机器人的发言", True),
+    ]
+    with patch(
+        "StellariaPact.cogs.Voting.listeners.DiscussionMessageListener.discord.Thread",
+        type(thread),
+    ):
+        await listener.on_raw_bulk_message_delete(payload)
+
+    voting_cog.logic.handle_indexed_message_deletions.assert_awaited_once_with(
+        {1, 2, 3}, {1: (500, 400)}
+    )
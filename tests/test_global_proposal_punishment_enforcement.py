@@ -10,7 +10,8 @@ from StellariaPact.cogs.Intake.services.IntakeVoteService import IntakeVoteServi
 from StellariaPact.cogs.Punishment.listeners.PunishmentListener import PunishmentListener
 from StellariaPact.cogs.Punishment.logic.PunishmentLogic import PunishmentLogic
 from StellariaPact.cogs.Voting.listeners.InnerEventListener import InnerEventListener
-from StellariaPact.share.enums import IntakeStatus
+from StellariaPact.share.enums import IntakeStatus, PunishmentType
+from StellariaPact.share.PunishmentState import PunishmentState
 
 
 class _FakeUnitOfWork:
@@ -24,6 +25,13 @@ class _FakeUnitOfWork:
         return False
 
 
+def _loaded_state() -> PunishmentState:
+    """创建已完成启动加载的空处罚状态。"""
+    state = PunishmentState(SimpleNamespace(db_handler=object()))  # type: ignore[arg-type]
+    state._loaded = True
+    return state
+
+
 class _ScalarResult:
     def __init__(self, value):
         self.value = value
@@ -115,41 +123,32 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
         uow.commit.assert_awaited_once()
         uow.operation_log.log_operation.assert_awaited_once()
 
-    async def test_cache_loader_converts_orm_records_inside_unit_of_work(self) -> None:
-        """启动缓存加载应在会话关闭前把 ORM 记录转换成普通元组。"""
-        expires_at = datetime.now(timezone.utc) + timedelta(days=2)
-
-        class SessionBoundPunishment:
-            """模拟会话关闭后无法读取字段的 ORM 实体。"""
-
-            def __init__(self, owner):
-                self.owner = owner
-
-            @property
-            def target_user_id(self):
-                """仅允许在工作单元有效期间读取目标用户。"""
-                if self.owner.closed:
-                    raise RuntimeError("会话关闭后不应读取 ORM 属性")
-                return 10
-
-            @property
-            def expires_at(self):
-                """仅允许在工作单元有效期间读取截止时间。"""
-                if self.owner.closed:
-                    raise RuntimeError("会话关闭后不应读取 ORM 属性")
-                return expires_at
+    async def test_state_loader_reads_all_punishments_in_one_unit_of_work(self) -> None:
+        """启动加载应在一个工作单元内读取禁言和全部类型的处罚，并忽略已过期的行。"""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(days=2)
 
         class ClosingUnitOfWork:
             """退出上下文时标记会话已经关闭。"""
 
             def __init__(self):
                 self.closed = False
+                self.user_activity = SimpleNamespace(
+                    get_active_mutes=AsyncMock(
+                        return_value=[(30, 10, now + timedelta(minutes=5)), (30, 11, now)]
+                    )
+                )
                 self.global_proposal_punishment = SimpleNamespace(
-                    get_active_by_type=AsyncMock(return_value=[SessionBoundPunishment(self)])
+                    get_all_active=AsyncMock(
+                        return_value=[
+                            (10, PunishmentType.PROPOSAL_VIOLATION.value, expires_at),
+                            (11, PunishmentType.PERMANENT_VOTING.value, None),
+                        ]
+                    )
                 )
 
             async def __aenter__(self):
-                """进入工作单元并提供处罚仓储。"""
+                """进入工作单元并提供仓储。"""
                 return self
 
             async def __aexit__(self, exc_type, exc_value, traceback):
@@ -158,34 +157,35 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
                 return False
 
         uow = ClosingUnitOfWork()
-        listener = object.__new__(PunishmentListener)
-        listener.bot = SimpleNamespace(db_handler=object())
-        listener.active_proposal_violations = {}
+        state = PunishmentState(SimpleNamespace(db_handler=object()))  # type: ignore[arg-type]
 
-        with patch(
-            "StellariaPact.cogs.Punishment.listeners.PunishmentListener.UnitOfWork",
-            return_value=uow,
-        ):
-            await listener._load_active_proposal_violations_into_cache()
+        with patch("StellariaPact.share.PunishmentState.UnitOfWork", return_value=uow):
+            await state.ensure_loaded()
+            await state.ensure_loaded()
 
         self.assertTrue(uow.closed)
-        self.assertEqual(listener.active_proposal_violations, {10: expires_at})
+        uow.global_proposal_punishment.get_all_active.assert_awaited_once()
+        self.assertTrue(await state.is_thread_muted(30, 10))
+        self.assertFalse(await state.is_thread_muted(30, 11))
+        self.assertEqual(
+            state.get_global_expiry(10, PunishmentType.PROPOSAL_VIOLATION), expires_at
+        )
+        self.assertTrue(await state.is_restricted(11))
+        self.assertFalse(await state.is_objection_creation_restricted(11))
 
     async def test_final_draft_submission_is_blocked(self) -> None:
         """即使用户已打开表单，最终提交草案时仍必须再次检查处罚。"""
-        punishment_repository = SimpleNamespace(
+        punishment_state = SimpleNamespace(
             is_proposal_violation_restricted=AsyncMock(return_value=True)
         )
-        uow = _FakeUnitOfWork(global_proposal_punishment=punishment_repository)
-        service = IntakeDraftService(SimpleNamespace(db_handler=object()))  # type: ignore
+        service = IntakeDraftService(
+            SimpleNamespace(db_handler=object(), punishment_state=punishment_state)  # type: ignore
+        )
         dto = SimpleNamespace(author_id=10, guild_id=20, title="合法提案标题")
 
-        with patch(
-            "StellariaPact.cogs.Intake.services.IntakeDraftService.UnitOfWork",
-            return_value=uow,
-        ):
-            with self.assertRaisesRegex(PermissionError, "无法创建或提交"):
-                await service.process_submit_intake(dto, SimpleNamespace())  # type: ignore
+        with self.assertRaisesRegex(PermissionError, "无法创建或提交"):
+            await service.process_submit_intake(dto, SimpleNamespace())  # type: ignore
+        punishment_state.is_proposal_violation_restricted.assert_awaited_once_with(10)
 
     async def test_new_intake_support_is_blocked_before_insert(self) -> None:
         """受罚用户不能新增草案支持票，且拦截必须发生在数据库写入前。"""
@@ -199,13 +199,16 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
             ),
             add=Mock(),
         )
-        punishment_repository = SimpleNamespace(is_restricted=AsyncMock(return_value=True))
+        punishment_state = SimpleNamespace(is_restricted=AsyncMock(return_value=True))
         uow = SimpleNamespace(
             intake=SimpleNamespace(get_intake_by_voting_message_id=AsyncMock(return_value=intake)),
             session=session,
-            global_proposal_punishment=punishment_repository,
         )
-        service = IntakeVoteService(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())  # type: ignore
+        service = IntakeVoteService(
+            SimpleNamespace(punishment_state=punishment_state),  # type: ignore[arg-type]
+            SimpleNamespace(),  # type: ignore[arg-type]
+            SimpleNamespace(),  # type: ignore[arg-type]
+        )
 
         with self.assertRaisesRegex(PermissionError, "无法新增草案支持票"):
             await service.handle_support_toggle(uow, user_id=10, message_id=20)  # type: ignore
@@ -213,55 +216,49 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_final_objection_creation_is_blocked(self) -> None:
         """处罚期间，即使通过旧异议表单提交，也不能创建异议附议面板。"""
-        punishment_repository = SimpleNamespace(
+        punishment_state = SimpleNamespace(
             is_objection_creation_restricted=AsyncMock(return_value=True)
         )
-        uow = _FakeUnitOfWork(global_proposal_punishment=punishment_repository)
         interaction = SimpleNamespace(
             user=SimpleNamespace(id=10, display_name="user"),
             followup=SimpleNamespace(send=AsyncMock()),
         )
-        listener = InnerEventListener(SimpleNamespace(db_handler=object()))  # type: ignore
+        listener = InnerEventListener(
+            SimpleNamespace(db_handler=object(), punishment_state=punishment_state)  # type: ignore
+        )
 
-        with patch(
-            "StellariaPact.cogs.Voting.listeners.InnerEventListener.UnitOfWork",
-            return_value=uow,
-        ):
-            await listener.on_new_option_submitted(
-                interaction=interaction,  # type: ignore[arg-type]
-                message_id=20,
-                thread_id=30,
-                option_type=1,
-                option_text="异议内容",
-            )
+        await listener.on_new_option_submitted(
+            interaction=interaction,  # type: ignore[arg-type]
+            message_id=20,
+            thread_id=30,
+            option_type=1,
+            option_text="异议内容",
+        )
 
         interaction.followup.send.assert_awaited_once()
         self.assertIn("无法创建异议", interaction.followup.send.await_args.args[0])
 
     async def test_opening_objection_modal_is_blocked(self) -> None:
         """在打开异议表单前即检查永久异议权限限制。"""
-        punishment_repository = SimpleNamespace(
+        punishment_state = SimpleNamespace(
             is_objection_creation_restricted=AsyncMock(return_value=True)
         )
-        uow = _FakeUnitOfWork(global_proposal_punishment=punishment_repository)
         response = SimpleNamespace(is_done=lambda: False, send_message=AsyncMock())
         interaction = SimpleNamespace(
             user=SimpleNamespace(id=10),
             response=response,
             followup=SimpleNamespace(send=AsyncMock()),
         )
-        listener = InnerEventListener(SimpleNamespace(db_handler=object()))  # type: ignore
+        listener = InnerEventListener(
+            SimpleNamespace(db_handler=object(), punishment_state=punishment_state)  # type: ignore
+        )
 
-        with patch(
-            "StellariaPact.cogs.Voting.listeners.InnerEventListener.UnitOfWork",
-            return_value=uow,
-        ):
-            await listener._internal_handle_create_option(  # type: ignore[arg-type]
-                interaction,
-                thread_id=30,
-                message_id=20,
-                option_type=1,
-            )
+        await listener._internal_handle_create_option(  # type: ignore[arg-type]
+            interaction,
+            thread_id=30,
+            message_id=20,
+            option_type=1,
+        )
 
         response.send_message.assert_awaited_once()
         self.assertIn("无法创建异议", response.send_message.await_args.args[0])
@@ -273,10 +270,16 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
             def __init__(self, thread_id: int):
                 self.id = thread_id
 
+        proposal_registry = SimpleNamespace(is_proposal_thread=AsyncMock(return_value=True))
         listener = object.__new__(PunishmentListener)
-        listener.bot = SimpleNamespace(db_handler=object())
-        listener.active_mutes = {}
-        listener.active_proposal_violations = {10: datetime.now(timezone.utc) + timedelta(days=1)}
+        listener.bot = SimpleNamespace(db_handler=object(), proposal_registry=proposal_registry)
+        listener.state = _loaded_state()
+        listener.state.set_global_punishment(
+            10,
+            PunishmentType.PROPOSAL_VIOLATION,
+            True,
+            datetime.now(timezone.utc) + timedelta(days=1),
+        )
         message = SimpleNamespace(
             author=SimpleNamespace(id=10, bot=False),
             channel=FakeThread(30),
@@ -284,38 +287,17 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
             content="",
             delete=AsyncMock(),
         )
-        uow = _FakeUnitOfWork(
-            proposal=SimpleNamespace(
-                get_proposal_by_thread_id=AsyncMock(return_value=SimpleNamespace(id=1))
-            )
-        )
 
-        with (
-            patch(
-                "StellariaPact.cogs.Punishment.listeners.PunishmentListener.discord.Thread",
-                FakeThread,
-            ),
-            patch(
-                "StellariaPact.cogs.Punishment.listeners.PunishmentListener.UnitOfWork",
-                return_value=uow,
-            ),
+        with patch(
+            "StellariaPact.cogs.Punishment.listeners.PunishmentListener.discord.Thread",
+            FakeThread,
         ):
             await listener.on_message(message)  # type: ignore[arg-type]
+            message.delete.assert_awaited_once()
+            proposal_registry.is_proposal_thread.assert_awaited_once_with(30)
 
-        message.delete.assert_awaited_once()
-
-        message.delete.reset_mock()
-        uow.proposal.get_proposal_by_thread_id.return_value = None
-        with (
-            patch(
-                "StellariaPact.cogs.Punishment.listeners.PunishmentListener.discord.Thread",
-                FakeThread,
-            ),
-            patch(
-                "StellariaPact.cogs.Punishment.listeners.PunishmentListener.UnitOfWork",
-                return_value=uow,
-            ),
-        ):
+            message.delete.reset_mock()
+            proposal_registry.is_proposal_thread.return_value = False
             await listener.on_message(message)  # type: ignore[arg-type]
 
         message.delete.assert_not_awaited()
@@ -337,8 +319,8 @@ class ProposalPunishmentEnforcementTests(unittest.IsolatedAsyncioTestCase):
         )
         listener = object.__new__(PunishmentListener)
         listener.bot = SimpleNamespace(db_handler=object())
-        listener.active_mutes = {30: {10: datetime.now(timezone.utc) + timedelta(minutes=5)}}
-        listener.active_proposal_violations = {}
+        listener.state = _loaded_state()
+        listener.state.set_thread_mute(30, 10, datetime.now(timezone.utc) + timedelta(minutes=5))
 
         # 删除权限不足只记录警告，不应中断其他消息监听器。
         with (
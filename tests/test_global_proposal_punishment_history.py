@@ -4,8 +4,7 @@ from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import discord
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel
+from db_support import create_test_engine, dispose_test_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Punishment.Cog import PunishmentCog
@@ -23,14 +22,12 @@ class GlobalProposalPunishmentSummaryRepositoryTests(unittest.IsolatedAsyncioTes
     """验证全局处罚历史摘要查询的计数、隔离和排序规则。"""
 
     async def asyncSetUp(self) -> None:
-        """为每个测试创建独立的内存数据库。"""
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        """为每个测试创建独立的测试数据库。"""
+        self.engine = await create_test_engine()
 
     async def asyncTearDown(self) -> None:
         """测试完成后释放数据库连接。"""
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def test_summary_counts_all_history_and_returns_latest_four(self) -> None:
         """摘要应统计目标用户全部历史，并按时间和编号倒序返回最近四条。"""
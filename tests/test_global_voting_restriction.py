@@ -3,8 +3,8 @@ from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel, select
+from db_support import create_test_engine, dispose_test_engine
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Punishment.Cog import PunishmentCog
@@ -40,12 +40,10 @@ class _FakeUnitOfWork:
 
 class GlobalProposalPunishmentRepositoryTests(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        self.engine = await create_test_engine()
 
     async def asyncTearDown(self) -> None:
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def test_restriction_lifecycle_preserves_history(self) -> None:
         async with AsyncSession(self.engine) as session:
@@ -329,7 +327,13 @@ class GlobalProposalPunishmentRepositoryTests(unittest.IsolatedAsyncioTestCase):
 
 class GlobalVotingRestrictionVotingLogicTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.logic = VotingLogic(SimpleNamespace(db_handler=object()))  # type: ignore[arg-type]
+        self.punishment_state = SimpleNamespace(
+            is_restricted=AsyncMock(return_value=False),
+            is_objection_support_restricted=AsyncMock(return_value=False),
+        )
+        self.logic = VotingLogic(
+            SimpleNamespace(db_handler=object(), punishment_state=self.punishment_state)  # type: ignore[arg-type]
+        )
 
     async def test_active_restriction_blocks_normal_and_objection_votes(self) -> None:
         for option_type in (0, 1):
@@ -338,13 +342,10 @@ class GlobalVotingRestrictionVotingLogicTests(unittest.IsolatedAsyncioTestCase):
                 vote_session_repository = SimpleNamespace(
                     get_vote_session_with_details=AsyncMock(return_value=vote_session)
                 )
-                restriction_repository = SimpleNamespace(
-                    is_restricted=AsyncMock(return_value=True)
-                )
+                self.punishment_state.is_restricted.return_value = True
                 user_vote_repository = SimpleNamespace(record_vote=AsyncMock())
                 uow = _FakeUnitOfWork(
                     vote_session=vote_session_repository,
-                    global_proposal_punishment=restriction_repository,
                     user_vote=user_vote_repository,
                 )
 
@@ -419,13 +420,8 @@ class GlobalVotingRestrictionVotingLogicTests(unittest.IsolatedAsyncioTestCase):
             get_confirmation_session_by_message_id=AsyncMock(return_value=session),
             add_objection_supporter=AsyncMock(),
         )
-        restriction_repository = SimpleNamespace(
-            is_objection_support_restricted=AsyncMock(return_value=True)
-        )
-        uow = _FakeUnitOfWork(
-            confirmation_session=confirmation_repository,
-            global_proposal_punishment=restriction_repository,
-        )
+        self.punishment_state.is_objection_support_restricted.return_value = True
+        uow = _FakeUnitOfWork(confirmation_session=confirmation_repository)
         interaction = SimpleNamespace(
             message=SimpleNamespace(id=30),
             user=SimpleNamespace(id=10),
@@ -468,13 +464,8 @@ class GlobalVotingRestrictionVotingLogicTests(unittest.IsolatedAsyncioTestCase):
             get_confirmation_session_by_message_id=AsyncMock(return_value=session),
             remove_objection_supporter=AsyncMock(side_effect=remove_supporter),
         )
-        restriction_repository = SimpleNamespace(
-            is_objection_support_restricted=AsyncMock(return_value=True)
-        )
-        uow = _FakeUnitOfWork(
-            confirmation_session=confirmation_repository,
-            global_proposal_punishment=restriction_repository,
-        )
+        self.punishment_state.is_objection_support_restricted.return_value = True
+        uow = _FakeUnitOfWork(confirmation_session=confirmation_repository)
         interaction = SimpleNamespace(
             message=SimpleNamespace(id=30),
             user=SimpleNamespace(id=10),
@@ -496,7 +487,7 @@ class GlobalVotingRestrictionVotingLogicTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertFalse(completed)
         self.assertEqual(result.confirmed_parties, {"发起人": 1})
-        restriction_repository.is_objection_support_restricted.assert_not_awaited()
+        self.punishment_state.is_objection_support_restricted.assert_not_awaited()
 
 
 class GlobalVotingRestrictionCommandTests(unittest.IsolatedAsyncioTestCase):
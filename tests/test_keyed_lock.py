@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from StellariaPact.share import KeyedLock
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_exclusive_and_entries_are_evicted() -> None:
+    """同一键互斥、不同键互不影响；全部使用者释放后条目被回收，并统计争用次数。"""
+    locks = KeyedLock()
+    order: list[str] = []
+    first_entered = asyncio.Event()
+    release_first = asyncio.Event()
+
+    async def first():
+        async with locks("a"):
+            order.append("first")
+            first_entered.set()
+            await release_first.wait()
+
+    async def second():
+        async with locks("a"):
+            order.append("second")
+
+    async def other():
+        async with locks("b"):
+            order.append("other")
+
+    first_task = asyncio.create_task(first())
+    await first_entered.wait()
+    second_task = asyncio.create_task(second())
+    await other()
+    await asyncio.sleep(0)
+
+    assert order == ["first", "other"]
+    assert locks.locked("a")
+    assert locks.stats()["live_locks"] == 1
+    assert locks.stats()["waiters"] == 1
+
+    release_first.set()
+    await asyncio.gather(first_task, second_task)
+
+    assert order == ["first", "other", "second"]
+    assert len(locks) == 0
+    stats = locks.stats()
+    assert stats["acquisitions_total"] == 3
+    assert stats["contended_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_and_failed_holder_do_not_leak_entries() -> None:
+    """等待中被取消的任务和抛出异常的持有者都不会留下锁表条目。"""
+    locks = KeyedLock()
+    entered = asyncio.Event()
+
+    async def holder():
+        async with locks(1):
+            entered.set()
+            await asyncio.sleep(10)
+
+    holder_task = asyncio.create_task(holder())
+    await entered.wait()
+    waiter_task = asyncio.create_task(locks.acquire(1))
+    await asyncio.sleep(0)
+    waiter_task.cancel()
+    holder_task.cancel()
+    await asyncio.gather(holder_task, waiter_task, return_exceptions=True)
+    assert len(locks) == 0
+
+    with pytest.raises(RuntimeError):
+        async with locks(2):
+            raise RuntimeError("失败")
+    assert len(locks) == 0
+
+    # 大量不同的键在使用后不会滞留
+    for key in range(1000):
+        async with locks(key):
+            pass
+    assert len(locks) == 0
@@ -4,6 +4,7 @@ import pytest
 from aiohttp.test_utils import TestClient, TestServer
 
 from StellariaPact.cogs.Voting.listeners.MessageEventApiCog import MessageEventApiCog
+from StellariaPact.models.DroppedMessageEvent import DroppedMessageEvent
 from StellariaPact.share.RemoteMessageEventsConfig import (
     RemoteMessageEventsConfig,
 )
@@ -18,20 +19,30 @@ REMOTE_CONFIG = RemoteMessageEventsConfig(
 
 def make_cog() -> tuple[MessageEventApiCog, MagicMock]:
     bot = MagicMock()
-    bot.config = {"guild_id": 100, "channels": {"discussion": 200}}
+    bot.config = {
+        "guild_id": 100,
+        "channels": {"discussion": 200},
+        "message_event_queue": {"retry_delay_seconds": 0},
+    }
     bot.get_cog.return_value = None
     voting_cog = MagicMock()
     voting_cog.logic.handle_message_creation = AsyncMock()
     voting_cog.logic.handle_message_deletion = AsyncMock(return_value=None)
+    voting_cog.logic.handle_message_event_batch = AsyncMock(return_value={})
+    voting_cog.logic.save_dropped_message_events = AsyncMock()
+    voting_cog.logic.get_dropped_message_events = AsyncMock(return_value=[])
+    voting_cog.logic.delete_dropped_message_events = AsyncMock()
     cog = MessageEventApiCog(bot, voting_cog, REMOTE_CONFIG)
     return cog, voting_cog
 
 
-def event_payload(event_type: str = "message_created") -> dict[str, object]:
+def event_payload(
+    event_type: str = "message_created", message_id: str = "300"
+) -> dict[str, object]:
     return {
         "schema_version": 1,
         "event_type": event_type,
-        "message_id": "300",
+        "message_id": message_id,
         "guild_id": "100",
         "forum_id": "200",
         "thread_id": "400",
@@ -50,7 +61,7 @@ async def test_health_and_authentication():
     assert health.status == 200
     assert health_payload == {"status": "ok"}
     assert unauthorized.status == 401
-    voting_cog.logic.handle_message_creation.assert_not_awaited()
+    voting_cog.logic.handle_message_event_batch.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -64,9 +75,11 @@ async def test_creation_event_routes_to_existing_voting_logic():
             headers=headers,
         )
 
-    assert response.status == 200
-    qo = voting_cog.logic.handle_message_creation.await_args.args[0]
+    # 入口只入队并返回 202，测试服务关闭时队列已处理完毕。
+    assert response.status == 202
+    (qo,), event_keys = voting_cog.logic.handle_message_event_batch.await_args.args
     assert (qo.user_id, qo.thread_id, qo.change) == (500, 400, 1)
+    assert event_keys == [(300, "message_created")]
 
 
 @pytest.mark.asyncio
@@ -88,12 +101,13 @@ async def test_structured_webhook_event_is_not_counted_twice():
 
     assert response.status == 200
     assert response_payload == {"status": "ignored_structured_webhook"}
-    voting_cog.logic.handle_message_creation.assert_not_awaited()
+    voting_cog.logic.handle_message_event_batch.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_deletion_refresh_failure_does_not_fail_processed_event():
     cog, voting_cog = make_cog()
+    voting_cog.logic.handle_message_event_batch.return_value = {400: ["detail"]}
     cog._refresh_vote_panels = AsyncMock(side_effect=RuntimeError("Discord unavailable"))
     headers = {"Authorization": "Bearer shared-secret"}
     async with TestClient(TestServer(cog.application)) as client:
@@ -103,9 +117,12 @@ async def test_deletion_refresh_failure_does_not_fail_processed_event():
             headers=headers,
         )
 
-    assert response.status == 200
-    qo = voting_cog.logic.handle_message_deletion.await_args.args[0]
+    # 面板刷新失败不会让已写库的事件被重试。
+    assert response.status == 202
+    (qo,), _ = voting_cog.logic.handle_message_event_batch.await_args.args
     assert (qo.user_id, qo.thread_id, qo.change) == (500, 400, -1)
+    voting_cog.logic.handle_message_event_batch.assert_awaited_once()
+    assert cog.ingest_queue.processed_total == 1
 
 
 @pytest.mark.asyncio
@@ -139,4 +156,232 @@ async def test_rejects_unknown_fields_and_wrong_origin():
     assert invalid.status == 400
     assert wrong_origin.status == 422
     assert wrong_version.status == 400
-    voting_cog.logic.handle_message_creation.assert_not_awaited()
+    voting_cog.logic.handle_message_event_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_processes_valid_events_in_one_call_with_per_event_status():
+    """验证批量入口整体入队有效事件，并逐条返回接收状态。"""
+    cog, voting_cog = make_cog()
+    voting_cog.logic.handle_message_event_batch.return_value = {400: ["detail"]}
+    cog._refresh_vote_panels = AsyncMock()
+    wrong_origin_payload = event_payload(message_id="303")
+    wrong_origin_payload["forum_id"] = "999"
+    batch = [
+        event_payload(message_id="301"),
+        event_payload("message_deleted", message_id="302"),
+        wrong_origin_payload,
+        {"schema_version": 1},
+    ]
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    async with TestClient(TestServer(cog.application)) as client:
+        response = await client.post(
+            "/api/v1/message-events:batch",
+            json=batch,
+            headers=headers,
+        )
+        response_payload = await response.json()
+
+    assert response.status == 202
+    assert [result["status"] for result in response_payload["results"]] == [
+        "accepted",
+        "accepted",
+        "rejected",
+        "invalid",
+    ]
+    assert response_payload["results"][1]["message_id"] == "302"
+    qos = voting_cog.logic.handle_message_event_batch.await_args.args[0]
+    assert [(qo.user_id, qo.thread_id, qo.change) for qo in qos] == [
+        (500, 400, 1),
+        (500, 400, -1),
+    ]
+    cog._refresh_vote_panels.assert_awaited_once_with(400, ["detail"])
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_oversized_batches_and_non_arrays():
+    """验证超出上限的批次和非数组请求体被拒绝。"""
+    cog, voting_cog = make_cog()
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    async with TestClient(TestServer(cog.application)) as client:
+        oversized = await client.post(
+            "/api/v1/message-events:batch",
+            json=[event_payload()] * 501,
+            headers=headers,
+        )
+        not_array = await client.post(
+            "/api/v1/message-events:batch",
+            json=event_payload(),
+            headers=headers,
+        )
+
+    assert oversized.status == 413
+    assert not_array.status == 400
+    voting_cog.logic.handle_message_event_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_retried_events_are_acknowledged_as_duplicate():
+    """验证重试的单条事件和批量事件均被确认为重复，且不会再次计数。"""
+    cog, voting_cog = make_cog()
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    async with TestClient(TestServer(cog.application)) as client:
+        first = await client.post("/api/v1/message-events", json=event_payload(), headers=headers)
+        await cog.ingest_queue.join()
+        retried = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        retried_payload = await retried.json()
+        batch = await client.post(
+            "/api/v1/message-events:batch",
+            json=[
+                event_payload(),
+                event_payload(message_id="301"),
+                event_payload(message_id="301"),
+                event_payload("message_deleted"),
+            ],
+            headers=headers,
+        )
+        batch_payload = await batch.json()
+
+    assert first.status == 202
+    assert retried_payload == {"status": "duplicate"}
+    assert [result["status"] for result in batch_payload["results"]] == [
+        "duplicate",
+        "accepted",
+        "duplicate",
+        "accepted",
+    ]
+    assert voting_cog.logic.handle_message_event_batch.await_count == 2
+    qos, event_keys = voting_cog.logic.handle_message_event_batch.await_args.args
+    assert [qo.change for qo in qos] == [1, -1]
+    assert event_keys == [(301, "message_created"), (300, "message_deleted")]
+
+
+@pytest.mark.asyncio
+async def test_dropped_event_is_saved_for_replay():
+    """验证重试耗尽后被丢弃的事件会保存待重放，转发端重发时仍按重复处理。"""
+    cog, voting_cog = make_cog()
+    voting_cog.logic.handle_message_event_batch.side_effect = RuntimeError("database down")
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    async with TestClient(TestServer(cog.application)) as client:
+        accepted = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        await cog.ingest_queue.join()
+        resubmitted = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        resubmitted_payload = await resubmitted.json()
+
+    assert accepted.status == 202
+    assert resubmitted_payload == {"status": "duplicate"}
+    assert cog.ingest_queue.dropped_total == 1
+    (saved,) = voting_cog.logic.save_dropped_message_events.await_args.args
+    assert [(row.message_id, row.event_type, row.thread_id, row.user_id) for row in saved] == [
+        (300, "message_created", 400, 500)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dropped_event_can_be_resubmitted_when_saving_fails():
+    """验证被丢弃的事件无法保存时撤销去重预留，转发端重发时重新处理。"""
+    cog, voting_cog = make_cog()
+    voting_cog.logic.handle_message_event_batch.side_effect = RuntimeError("database down")
+    voting_cog.logic.save_dropped_message_events.side_effect = RuntimeError("database down")
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    async with TestClient(TestServer(cog.application)) as client:
+        accepted = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        await cog.ingest_queue.join()
+        voting_cog.logic.handle_message_event_batch.side_effect = None
+        resubmitted = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        resubmitted_payload = await resubmitted.json()
+
+    assert accepted.status == 202
+    assert resubmitted_payload == {"status": "accepted"}
+    assert cog.ingest_queue.dropped_total == 1
+    assert cog.ingest_queue.processed_total == 1
+    assert voting_cog.logic.handle_message_event_batch.await_count == (
+        cog.ingest_queue.max_attempts + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_saved_events_are_replayed_and_deleted():
+    """验证启动时重放保存的事件：已处理过的只删除，其余计数后删除。"""
+    cog, voting_cog = make_cog()
+    rows = [
+        DroppedMessageEvent(
+            message_id=message_id,
+            event_type="message_created",
+            guild_id=100,
+            forum_id=200,
+            thread_id=400,
+            user_id=500,
+        )
+        for message_id in (300, 301)
+    ]
+    voting_cog.logic.get_dropped_message_events.side_effect = [rows, []]
+    # 消息 300 在停止前已提交，去重表中有记录。
+    await cog.deduplicator.reserve([(300, "message_created")])
+
+    await cog._replay_dropped_events()
+
+    voting_cog.logic.handle_message_event_batch.assert_awaited_once()
+    qos, event_keys = voting_cog.logic.handle_message_event_batch.await_args.args
+    assert [(qo.user_id, qo.thread_id, qo.change) for qo in qos] == [(500, 400, 1)]
+    assert event_keys == [(301, "message_created")]
+    voting_cog.logic.delete_dropped_message_events.assert_awaited_once_with(
+        [(300, "message_created"), (301, "message_created")]
+    )
+
+
+@pytest.mark.asyncio
+async def test_saturated_queue_returns_retry_after_and_exposes_stats():
+    """验证队列饱和时返回 429 与 Retry-After，且队列状态可通过接口查询。"""
+    cog, _ = make_cog()
+    cog.ingest_queue.max_depth = 1
+    headers = {"Authorization": "Bearer shared-secret"}
+
+    # 不启动工作协程，使事件停留在队列中。
+    cog.ingest_queue.start = MagicMock()
+    async with TestClient(TestServer(cog.application)) as client:
+        accepted = await client.post(
+            "/api/v1/message-events", json=event_payload(), headers=headers
+        )
+        saturated = await client.post(
+            "/api/v1/message-events",
+            json=event_payload(message_id="301"),
+            headers=headers,
+        )
+        saturated_batch = await client.post(
+            "/api/v1/message-events:batch",
+            json=[event_payload(message_id="302")],
+            headers=headers,
+        )
+        saturated_batch_payload = await saturated_batch.json()
+        stats = await client.get("/api/v1/message-events/queue", headers=headers)
+        stats_payload = await stats.json()
+        unauthorized_stats = await client.get("/api/v1/message-events/queue")
+
+    assert accepted.status == 202
+    assert saturated.status == 429
+    assert int(saturated.headers["Retry-After"]) >= 1
+    assert saturated_batch.status == 429
+    assert saturated_batch_payload["results"][0]["status"] == "queue_full"
+    assert stats_payload["depth"] == 1
+    assert stats_payload["rejected_total"] == 2
+    assert stats_payload["lag_seconds"] >= 0
+    assert unauthorized_stats.status == 401
+
+    # 被拒绝的事件撤销了去重预留，之后仍可重新提交。
+    assert await cog.deduplicator.reserve([(301, "message_created")]) == [True]
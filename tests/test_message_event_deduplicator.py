@@ -0,0 +1,168 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.MessageEventDeduplicator import MessageEventDeduplicator
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
+from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
+from StellariaPact.models.ProcessedMessageEvent import ProcessedMessageEvent
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.repository.ProcessedMessageEventRepository import (
+    ProcessedMessageEventRepository,
+)
+
+
+class _TestDatabaseHandler:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def get_session(self) -> AsyncSession:
+        return AsyncSession(self.engine)
+
+
+@pytest_asyncio.fixture
+async def dedupe_engine():
+    engine = await create_test_engine()
+    yield engine
+    await dispose_test_engine(engine)
+
+
+def _create_bot(engine: AsyncEngine) -> SimpleNamespace:
+    return SimpleNamespace(db_handler=_TestDatabaseHandler(engine), config={})
+
+
+async def _stored_count(engine: AsyncEngine) -> int:
+    async with AsyncSession(engine) as session:
+        activity = (await session.exec(select(UserActivity))).one()
+        return activity.message_count
+
+
+async def _stored_keys(engine: AsyncEngine) -> set[tuple[int, str]]:
+    async with AsyncSession(engine) as session:
+        rows = await session.exec(
+            select(ProcessedMessageEvent.message_id, ProcessedMessageEvent.event_type)
+        )
+        return set(rows.all())
+
+
+@pytest.mark.asyncio
+async def test_processed_events_survive_restart(dedupe_engine: AsyncEngine) -> None:
+    """事件键总是随各自的计数在同一事务中落库，重启后预热的去重器仍能识别重复事件。"""
+    bot = _create_bot(dedupe_engine)
+    await VotingLogic(bot).handle_message_creation(  # type: ignore[arg-type]
+        UpdateUserActivityQo(user_id=50, thread_id=30, change=1), [(1, "message_created")]
+    )
+    deduplicator = MessageEventDeduplicator(bot)  # type: ignore[arg-type]
+    assert await deduplicator.reserve([(2, "message_created")]) == [True]
+
+    # 进入缓冲区的事件键只随缓冲计数在同一刷新事务中写库。
+    buffer = UserActivityBuffer(bot)  # type: ignore[arg-type]
+    buffer.remember(50, 30, 5)
+    await VotingLogic(bot, activity_buffer=buffer).handle_message_event_batch(  # type: ignore[arg-type]
+        [UpdateUserActivityQo(user_id=50, thread_id=30, change=1)], [(2, "message_created")]
+    )
+    assert await _stored_keys(dedupe_engine) == {(1, "message_created")}
+    await buffer.flush()
+    assert await _stored_keys(dedupe_engine) == {(1, "message_created"), (2, "message_created")}
+    assert await _stored_count(dedupe_engine) == 2
+
+    restarted = MessageEventDeduplicator(bot)  # type: ignore[arg-type]
+    await restarted.load()
+    assert await restarted.reserve(
+        [(1, "message_created"), (2, "message_created"), (1, "message_deleted")]
+    ) == [False, False, True]
+
+
+@pytest.mark.asyncio
+async def test_evicted_keys_fall_back_to_database(dedupe_engine: AsyncEngine) -> None:
+    """内存容量不足以覆盖保留期时，未命中的事件键回退到数据库核对。"""
+    bot = _create_bot(dedupe_engine)
+    deduplicator = MessageEventDeduplicator(bot, max_memory_keys=2)  # type: ignore[arg-type]
+    keys = [(message_id, "message_created") for message_id in (1, 2, 3)]
+    assert await deduplicator.reserve(keys) == [True, True, True]
+    async with AsyncSession(dedupe_engine) as session:
+        await ProcessedMessageEventRepository(session).record_events(
+            keys, datetime.now(timezone.utc)
+        )
+        await session.commit()
+
+    # 键 1 已被淘汰出内存，仍能通过数据库识别为重复。
+    assert (1, "message_created") not in deduplicator.seen
+    assert await deduplicator.reserve([(1, "message_created"), (4, "message_created")]) == [
+        False,
+        True,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_expired_records(dedupe_engine: AsyncEngine) -> None:
+    """超过保留期的去重记录会从数据库和内存中清除。"""
+    bot = _create_bot(dedupe_engine)
+    deduplicator = MessageEventDeduplicator(bot, ttl_hours=1)  # type: ignore[arg-type]
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(dedupe_engine) as session:
+        session.add(
+            ProcessedMessageEvent(
+                message_id=1, event_type="message_created", processed_at=now - timedelta(hours=2)
+            )
+        )
+        session.add(ProcessedMessageEvent(message_id=2, event_type="message_created"))
+        await session.commit()
+    deduplicator.seen[(1, "message_created")] = now - timedelta(hours=2)
+
+    assert await deduplicator.purge_expired() == 1
+    assert await _stored_keys(dedupe_engine) == {(2, "message_created")}
+    assert (1, "message_created") not in deduplicator.seen
+
+
+def test_processed_message_event_migration_round_trip() -> None:
+    """验证去重表能够升级创建并完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        config = Config(str(project_root / "alembic.ini"))
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        # 以当前模型建表，再移除去重表，模拟上一个版本的数据库
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            SQLModel.metadata.tables["processed_message_event"].drop(connection)
+        engine.dispose()
+        command.stamp(config, "a2d4f6b8c0e1")
+
+        command.upgrade(config, "b3e5f7a9c1d4")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        assert inspector.get_pk_constraint("processed_message_event")["constrained_columns"] == [
+            "message_id",
+            "event_type",
+        ]
+        assert "ix_processed_message_event_processed_at" in {
+            index["name"] for index in inspector.get_indexes("processed_message_event")
+        }
+        with engine.connect() as connection:
+            table_sql = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE name = 'processed_message_event'"
+            ).scalar_one()
+        assert "WITHOUT ROWID" in table_sql
+        engine.dispose()
+
+        command.downgrade(config, "a2d4f6b8c0e1")
+        engine = create_engine(database_url)
+        assert "processed_message_event" not in inspect(engine).get_table_names()
+        engine.dispose()
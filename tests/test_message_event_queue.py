@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from StellariaPact.cogs.Voting.listeners.MessageEvent import MessageEvent
+from StellariaPact.cogs.Voting.MessageEventQueue import MessageEventQueue
+
+
+def _event(message_id: int, thread_id: int) -> MessageEvent:
+    return MessageEvent(
+        event_type="message_created",
+        message_id=message_id,
+        guild_id=1,
+        forum_id=2,
+        thread_id=thread_id,
+        user_id=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_keep_order_per_thread_and_run_in_parallel_across_threads() -> None:
+    """同一帖子的事件按到达顺序处理，不同帖子的事件由不同协程并行处理。"""
+    processed: list[int] = []
+    active = 0
+    max_active = 0
+
+    async def process_batch(events: list[MessageEvent]) -> None:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        processed.extend(event.message_id for event in events)
+        active -= 1
+
+    queue = MessageEventQueue(process_batch, AsyncMock(), worker_count=2, max_batch_size=2)
+    queue.start()
+    for message_id in range(1, 7):
+        # 奇数消息属于帖子 10，偶数消息属于帖子 11，两帖分属不同分片
+        assert queue.offer([_event(message_id, 10 if message_id % 2 else 11)])
+    assert queue.depth == 6
+    await queue.join()
+    await queue.stop()
+
+    assert [message_id for message_id in processed if message_id % 2] == [1, 3, 5]
+    assert [message_id for message_id in processed if not message_id % 2] == [2, 4, 6]
+    assert max_active == 2
+    assert queue.stats()["processed_total"] == 6
+    assert queue.lag_seconds == 0
+
+
+@pytest.mark.asyncio
+async def test_offer_is_all_or_nothing_when_saturated() -> None:
+    """剩余容量不足时整批拒绝入队。"""
+    queue = MessageEventQueue(
+        lambda events: asyncio.sleep(0), AsyncMock(), worker_count=1, max_depth=3
+    )
+    assert queue.offer([_event(1, 10), _event(2, 10)])
+    assert not queue.offer([_event(3, 10), _event(4, 10)])
+    assert queue.depth == 2
+    assert queue.rejected_total == 2
+    assert queue.retry_after_seconds() >= 1
+
+
+@pytest.mark.asyncio
+async def test_stop_hands_cancelled_and_queued_events_to_dropped_handler() -> None:
+    """停止超时时，被取消的批次与仍在排队的事件都交给丢弃回调，不会静默丢失。"""
+    started = asyncio.Event()
+
+    async def process_batch(events: list[MessageEvent]) -> None:
+        started.set()
+        await asyncio.sleep(60)
+
+    on_dropped = AsyncMock()
+    queue = MessageEventQueue(
+        process_batch, on_dropped, worker_count=1, max_batch_size=1, drain_timeout_seconds=0
+    )
+    queue.start()
+    assert queue.offer([_event(1, 10), _event(2, 10)])
+    await started.wait()
+    await queue.stop()
+
+    (dropped,) = on_dropped.await_args.args
+    assert [event.message_id for event in dropped] == [1, 2]
+    assert queue.dropped_total == 2
+    assert queue.depth == 0
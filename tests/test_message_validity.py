@@ -0,0 +1,68 @@
+import json
+import random
+from types import SimpleNamespace
+
+import regex
+
+from StellariaPact.cogs.Voting.listeners.DiscussionMessageListener import (
+    DiscussionMessageListener,
+)
+from StellariaPact.cogs.Voting.MessageValidity import (
+    MESSAGE_VALIDITY_SPEC,
+    MessageValidity,
+)
+from StellariaPact.devtools.MessageValidityBenchmark import (
+    GOLDEN_CORPUS,
+    legacy_is_valid_content,
+    verify_corpus,
+)
+
+
+def test_golden_corpus_matches_expected_and_legacy_rules() -> None:
+    """黄金语料的期望结果与新旧实现均一致。"""
+    assert verify_corpus() == []
+    for samples in GOLDEN_CORPUS.values():
+        for content, expected in samples:
+            assert legacy_is_valid_content(content) == expected, content
+
+
+def test_single_pass_validator_is_equivalent_to_legacy_rules() -> None:
+    """随机拼接表情、CJK、空白与自定义表情片段，新实现与旧实现的判定完全一致。"""
+    alphabet = [
+        *"ab中文1#*<>:_ \t\n　\x1c​⃣",
+        "😀",
+        "👍🏻",
+        "❤️",
+        "<:ok:123>",
+        "<a:x y:1 2>",
+        "< : a b : 9 >",
+    ]
+    rng = random.Random(38)
+    for _ in range(20000):
+        content = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+        expected = legacy_is_valid_content(content)
+        assert MessageValidity.is_valid_content(content) == expected, repr(content)
+
+
+def test_batch_api_and_listener_share_the_rules() -> None:
+    """批量接口与逐条判定一致，机器人消息一律无效。"""
+    messages = [
+        SimpleNamespace(content="支持这个提案", author=SimpleNamespace(bot=False)),
+        SimpleNamespace(content="支持这个提案", author=SimpleNamespace(bot=True)),
+        SimpleNamespace(content="😀😀😀😀😀", author=SimpleNamespace(bot=False)),
+    ]
+    assert MessageValidity.validate_messages(messages) == [True, False, False]
+    assert [DiscussionMessageListener.is_valid_message(m) for m in messages] == [
+        True,
+        False,
+        False,
+    ]
+
+
+def test_spec_is_serializable_and_reproduces_the_validator() -> None:
+    """转发器读取的规则描述可以序列化，且按描述重建的正则与本地判定一致。"""
+    spec = json.loads(json.dumps(MESSAGE_VALIDITY_SPEC, ensure_ascii=False))
+    pattern = regex.compile(spec["valid_content_pattern"])
+    for samples in GOLDEN_CORPUS.values():
+        for content, expected in samples:
+            assert (pattern.match(content.strip()) is not None) == expected, content
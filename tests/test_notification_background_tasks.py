@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Notification.BackgroundTasks import BackgroundTasks
+from StellariaPact.models.Announcement import Announcement
+from StellariaPact.models.AnnouncementChannelMonitor import AnnouncementChannelMonitor
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
+from StellariaPact.share.enums import DeadlineKind
+
+
+class _TestDatabaseHandler:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def get_session(self) -> AsyncSession:
+        return AsyncSession(self.engine)
+
+
+@pytest_asyncio.fixture
+async def notification_engine():
+    engine = await create_test_engine()
+    yield engine
+    await dispose_test_engine(engine)
+
+
+def _create_tasks(engine: AsyncEngine, **tasks_config) -> BackgroundTasks:
+    bot = SimpleNamespace(
+        db_handler=_TestDatabaseHandler(engine),
+        config={
+            "channels": {"discussion": 1},
+            "tags": {"discussion": 2, "executing": 3},
+            "roles": {"stewards": 4},
+            "notification_tasks": tasks_config,
+        },
+        deadline_scheduler=DeadlineScheduler(),
+        wait_until_ready=AsyncMock(),
+        dispatch=MagicMock(),
+    )
+    return BackgroundTasks(bot)  # type: ignore[arg-type]
+
+
+async def _add_announcement(
+    engine: AsyncEngine, announcement_id: int, end_offset_hours: int, channel_ids: list[int]
+) -> None:
+    async with AsyncSession(engine) as session:
+        session.add(
+            Announcement(
+                id=announcement_id,
+                discussion_thread_id=100 + announcement_id,
+                announcer_id=1,
+                title=f"公示 {announcement_id}",
+                content="内容",
+                end_time=datetime.now(timezone.utc) + timedelta(hours=end_offset_hours),
+            )
+        )
+        for channel_id in channel_ids:
+            session.add(
+                AnnouncementChannelMonitor(
+                    announcement_id=announcement_id,
+                    channel_id=channel_id,
+                    message_threshold=1,
+                    time_interval_minutes=60,
+                    message_count_since_last=5,
+                    last_repost_at=datetime.now(timezone.utc) - timedelta(hours=2),
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_expired_announcements_finish_in_one_transaction(notification_engine) -> None:
+    """到期公示在同一事务中结束并删除监控器；慢讨论帖不阻塞其他通知，重复触发不重复通知。"""
+    await _add_announcement(notification_engine, 1, -1, [10])
+    await _add_announcement(notification_engine, 2, -1, [10, 20])
+    await _add_announcement(notification_engine, 3, 5, [10])
+    tasks = _create_tasks(notification_engine)
+
+    release_slow = asyncio.Event()
+    notified: list[int] = []
+
+    async def notify(announcement_dto):
+        if announcement_dto.id == 1:
+            await release_slow.wait()
+        notified.append(announcement_dto.id)
+        if announcement_dto.id == 2:
+            release_slow.set()
+
+    tasks._notify_announcement_finished = notify  # type: ignore[method-assign]
+    await asyncio.wait_for(tasks.check_announcements([1]), timeout=1)
+    await tasks.check_announcements()
+
+    assert notified == [2, 1]
+    async with AsyncSession(notification_engine) as session:
+        statuses = {a.id: a.status for a in (await session.exec(select(Announcement))).all()}
+        monitors = (await session.exec(select(AnnouncementChannelMonitor))).all()
+    assert statuses == {1: 0, 2: 0, 3: 1}
+    assert [m.announcement_id for m in monitors] == [3]
+    changed = [
+        call.args[1]
+        for call in tasks.bot.dispatch.call_args_list
+        if call.args[0] == "announcement_monitors_changed"
+    ]
+    assert sorted(changed) == [1, 2]
+    assert tasks.stats()[DeadlineKind.ANNOUNCEMENT]["ticks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reposts_run_per_channel_and_record_overruns(notification_engine) -> None:
+    """重复播报按频道并行、频道内按顺序执行，并记录每轮耗时与超时次数。"""
+    await _add_announcement(notification_engine, 1, 5, [10, 20])
+    await _add_announcement(notification_engine, 2, 5, [10])
+    tasks = _create_tasks(notification_engine, tick_budget_seconds=0)
+
+    # 监控器 1、3 位于频道 10，监控器 2 位于频道 20
+    release_channel = asyncio.Event()
+    order: list[int] = []
+
+    async def repost(monitor_id: int):
+        if monitor_id == 1:
+            await release_channel.wait()
+        order.append(monitor_id)
+        if monitor_id == 2:
+            release_channel.set()
+
+    tasks.notification_logic.process_single_repost = repost  # type: ignore[method-assign]
+    await asyncio.wait_for(tasks.check_reposts(), timeout=1)
+
+    assert order == [2, 1, 3]
+    stats = tasks.stats()[DeadlineKind.ANNOUNCEMENT_REPOST]
+    assert stats["ticks"] == 1
+    assert stats["last_items"] == 3
+    assert stats["overruns"] == 1
@@ -4,8 +4,9 @@ from types import SimpleNamespace
 from unittest.mock import Mock
 
 import discord
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlmodel import SQLModel, select
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Moderation.ModerationLogic import ModerationLogic
@@ -31,6 +32,7 @@ from StellariaPact.share.enums import (
     ProposalStatus,
     VoteOptionStatus,
 )
+from StellariaPact.share.ProposalRegistry import ProposalRegistry
 
 
 class _TestDatabaseHandler:
@@ -43,9 +45,7 @@ class _TestDatabaseHandler:
 
 class ObjectionResolutionTests(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        self.engine = await create_test_engine()
         self.bot = SimpleNamespace(
             db_handler=_TestDatabaseHandler(self.engine),
             config={
@@ -56,9 +56,10 @@ class ObjectionResolutionTests(unittest.IsolatedAsyncioTestCase):
             },
             dispatch=Mock(),
         )
+        self.bot.proposal_registry = ProposalRegistry(self.bot)  # type: ignore[arg-type]
 
     async def asyncTearDown(self) -> None:
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def _seed_proposal(
         self,
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from db_support import create_test_engine, dispose_test_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Moderation.ModerationLogic import ModerationLogic
+from StellariaPact.cogs.Voting.listeners.InnerEventListener import InnerEventListener
+from StellariaPact.dto.vote_session import VoteDetailDto
+from StellariaPact.models.Proposal import Proposal
+from StellariaPact.share.enums import ProposalStatus
+from StellariaPact.share.ProposalRegistry import ProposalRegistry
+
+
+class _DatabaseHandler:
+    def __init__(self, engine):
+        self.engine = engine
+        self.sessions = 0
+
+    def get_session(self) -> AsyncSession:
+        self.sessions += 1
+        return AsyncSession(self.engine)
+
+
+@pytest.mark.asyncio
+async def test_registry_loads_once_and_follows_status_changes() -> None:
+    """注册表只在首次使用时读取数据库，之后的状态变更在提交后同步到快照。"""
+    engine = await create_test_engine()
+    try:
+        async with AsyncSession(engine) as session:
+            proposal = Proposal(
+                discussion_thread_id=100,
+                title="测试提案",
+                content="测试内容",
+                proposer_id=10,
+                status=ProposalStatus.UNDER_OBJECTION,
+            )
+            session.add(proposal)
+            await session.flush()
+            proposal_id = proposal.id
+            await session.commit()
+        assert proposal_id is not None
+
+        handler = _DatabaseHandler(engine)
+        bot = SimpleNamespace(db_handler=handler, config={}, dispatch=Mock())
+        bot.proposal_registry = ProposalRegistry(bot)  # type: ignore[arg-type]
+
+        assert await bot.proposal_registry.is_proposal_thread(100)
+        assert not await bot.proposal_registry.is_proposal_thread(101)
+        assert handler.sessions == 1
+
+        await ModerationLogic(bot).proposal_status_change(  # type: ignore[arg-type]
+            proposal_id, ProposalStatus.DISCUSSION
+        )
+        sessions_after_change = handler.sessions
+        snapshot = await bot.proposal_registry.get(100)
+        assert snapshot is not None
+        assert snapshot.status == ProposalStatus.DISCUSSION
+        assert handler.sessions == sessions_after_change
+
+        bot.proposal_registry.set_status(100, ProposalStatus.EXECUTING)
+        bot.proposal_registry.set_status(101, ProposalStatus.EXECUTING)
+        snapshot = await bot.proposal_registry.get(100)
+        assert snapshot is not None
+        assert snapshot.status == ProposalStatus.EXECUTING
+        assert len(bot.proposal_registry) == 1
+    finally:
+        await dispose_test_engine(engine)
+
+
+@pytest.mark.asyncio
+async def test_voting_channel_panel_renders_from_registry() -> None:
+    """投票频道面板刷新直接使用注册表中的快照，不打开数据库会话。"""
+    snapshot = SimpleNamespace(title="测试提案", content="测试内容")
+    bot = MagicMock()
+    bot.proposal_registry.get = AsyncMock(return_value=snapshot)
+    bot.api_scheduler.submit = AsyncMock()
+    listener = InnerEventListener(bot)
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=MagicMock())
+    vote_details = VoteDetailDto.model_construct(
+        voting_channel_message_id=300, context_thread_id=100
+    )
+
+    built = []
+
+    def build(proposal, details, jump_url):
+        built.append((proposal, details, jump_url))
+        return [MagicMock()]
+
+    with (
+        patch(
+            "StellariaPact.cogs.Voting.listeners.InnerEventListener."
+            "VoteEmbedBuilder.build_voting_channel_embed",
+            side_effect=build,
+        ),
+        patch("StellariaPact.cogs.Voting.listeners.InnerEventListener.VotingChannelView"),
+    ):
+        thread = MagicMock(jump_url="https://discord.invalid/100")
+        await listener._update_voting_channel_panel(channel, thread, vote_details)
+
+    bot.proposal_registry.get.assert_awaited_once_with(100)
+    assert built == [(snapshot, vote_details, "https://discord.invalid/100")]
+    bot.api_scheduler.submit.assert_awaited_once()
+    bot.db_handler.get_session.assert_not_called()
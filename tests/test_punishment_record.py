@@ -4,8 +4,7 @@ from types import SimpleNamespace
 from typing import cast
 
 import discord
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel
+from db_support import create_test_engine, dispose_test_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Punishment.views.PunishmentHistoryModal import (
@@ -19,14 +18,12 @@ class PunishmentRecordTests(unittest.IsolatedAsyncioTestCase):
     """PunishmentRecordRepository 与 PunishmentHistoryModal 的单元测试。"""
 
     async def asyncSetUp(self) -> None:
-        """每个用例前创建内存数据库并建表，隔离测试数据。"""
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        """每个用例前创建测试数据库并建表，隔离测试数据。"""
+        self.engine = await create_test_engine()
 
     async def asyncTearDown(self) -> None:
         """每个用例后释放数据库引擎。"""
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def test_summary_is_scoped_counted_and_limited(self) -> None:
         """验证 get_summary 按帖子隔离计数、正确统计总数并限制返回条数。"""
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from db_support import create_test_engine, dispose_test_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Punishment.listeners.PunishmentListener import PunishmentListener
+from StellariaPact.models.GlobalProposalPunishment import GlobalProposalPunishment
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
+from StellariaPact.share.enums import DeadlineKind, PunishmentType
+from StellariaPact.share.PunishmentState import PunishmentState
+
+
+def _in(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+class _DatabaseHandler:
+    def __init__(self, engine):
+        self.engine = engine
+        self.sessions = 0
+
+    def get_session(self) -> AsyncSession:
+        self.sessions += 1
+        return AsyncSession(self.engine)
+
+
+@pytest.mark.asyncio
+async def test_load_reads_active_rows_once_and_answers_without_database() -> None:
+    """启动加载只读取有效的禁言和处罚，之后的全部判断都不再访问数据库。"""
+    engine = await create_test_engine()
+    try:
+        async with AsyncSession(engine) as session:
+            session.add_all(
+                [
+                    UserActivity(user_id=1, context_thread_id=30, mute_end_time=_in(300)),
+                    UserActivity(user_id=2, context_thread_id=30, mute_end_time=_in(-300)),
+                    UserActivity(user_id=3, context_thread_id=30),
+                ]
+            )
+            for user_id, punishment_type, expires_at, lifted_at in (
+                (1, PunishmentType.PERMANENT_VOTING, None, None),
+                (2, PunishmentType.PROPOSAL_VIOLATION, _in(3600), None),
+                (3, PunishmentType.PERMANENT_OBJECTION_CREATION, None, _in(-60)),
+                (4, PunishmentType.PROPOSAL_VIOLATION, _in(-60), None),
+            ):
+                session.add(
+                    GlobalProposalPunishment(
+                        target_user_id=user_id,
+                        moderator_id=99,
+                        origin_guild_id=10,
+                        origin_channel_id=20,
+                        punishment_type=punishment_type.value,
+                        reason="测试",
+                        expires_at=expires_at,
+                        lifted_at=lifted_at,
+                    )
+                )
+            await session.commit()
+
+        handler = _DatabaseHandler(engine)
+        state = PunishmentState(SimpleNamespace(db_handler=handler))  # type: ignore[arg-type]
+
+        assert await state.is_thread_muted(30, 1)
+        assert not await state.is_thread_muted(30, 2)
+        assert not await state.is_thread_muted(30, 3)
+        assert await state.is_restricted(1)
+        assert not await state.is_objection_creation_restricted(1)
+        assert await state.is_objection_support_restricted(1)
+        assert await state.is_proposal_violation_restricted(2)
+        assert await state.is_objection_creation_restricted(2)
+        assert not await state.is_restricted(3)
+        assert not await state.is_restricted(4)
+        assert handler.sessions == 1
+    finally:
+        await dispose_test_engine(engine)
+
+
+@pytest.mark.asyncio
+async def test_expiry_heap_ignores_superseded_entries() -> None:
+    """到期的条目在查询时移除；被延长或解除的旧堆记录不会误删新状态。"""
+    state = PunishmentState(SimpleNamespace(db_handler=object()))  # type: ignore[arg-type]
+    state._loaded = True
+    now = datetime.now(timezone.utc)
+
+    state.set_thread_mute(30, 1, _in(60))
+    state.set_thread_mute(30, 1, _in(600))
+    state.set_global_punishment(2, PunishmentType.PROPOSAL_VIOLATION, True, _in(60))
+    state.set_global_punishment(3, PunishmentType.PERMANENT_VOTING, True)
+
+    assert state.prune(now + timedelta(seconds=120)) == 1
+    assert state.get_thread_mute_end(30, 1) is not None
+    assert not await state.is_proposal_violation_restricted(2)
+    assert await state.is_restricted(3)
+
+    # 过去的截止时间等同于解除
+    state.set_thread_mute(30, 1, _in(-1))
+    assert not await state.is_thread_muted(30, 1)
+
+
+@pytest.mark.asyncio
+async def test_listener_events_update_shared_state() -> None:
+    """处罚事件更新共享状态，并只为限时处罚登记截止时间。"""
+    scheduler = DeadlineScheduler(sweep_interval_seconds=3600)
+    bot = SimpleNamespace(db_handler=object(), deadline_scheduler=scheduler)
+    bot.punishment_state = PunishmentState(bot)  # type: ignore[arg-type]
+    bot.punishment_state._loaded = True
+    listener = object.__new__(PunishmentListener)
+    listener.bot = bot  # type: ignore[assignment]
+    listener.state = bot.punishment_state
+
+    await listener.on_permanent_punishment_updated(
+        10, PunishmentType.PERMANENT_OBJECTION_CREATION, True
+    )
+    await listener.on_proposal_violation_punishment_updated(11, _in(3600))
+    assert await bot.punishment_state.is_objection_creation_restricted(10)
+    assert await bot.punishment_state.is_proposal_violation_restricted(11)
+    assert scheduler.get_deadline(DeadlineKind.PROPOSAL_VIOLATION, 11) is not None
+    assert scheduler.get_deadline(DeadlineKind.PROPOSAL_VIOLATION, 10) is None
+    assert await listener._load_proposal_violation_deadlines() == [
+        (11, bot.punishment_state.get_global_expiry(11, PunishmentType.PROPOSAL_VIOLATION))
+    ]
+
+    await listener.on_permanent_punishment_updated(
+        10, PunishmentType.PERMANENT_OBJECTION_CREATION, False
+    )
+    await listener.on_proposal_violation_punishment_updated(11, None)
+    assert not await bot.punishment_state.is_objection_creation_restricted(10)
+    assert not await bot.punishment_state.is_proposal_violation_restricted(11)
+    assert scheduler.get_deadline(DeadlineKind.PROPOSAL_VIOLATION, 11) is None
+    assert await listener._load_proposal_violation_deadlines() == []
+
+
+@pytest.mark.asyncio
+async def test_events_received_during_reload_are_not_overwritten() -> None:
+    """重新加载期间收到的事件在读取结果之上重放，不会被数据库中的旧状态覆盖。"""
+    engine = await create_test_engine()
+    try:
+        async with AsyncSession(engine) as session:
+            session.add(UserActivity(user_id=1, context_thread_id=30, mute_end_time=_in(300)))
+            await session.commit()
+
+        state: PunishmentState
+
+        class _EventDuringReadHandler(_DatabaseHandler):
+            def get_session(self) -> AsyncSession:
+                # 读取开始后、结果返回前：解除用户 1 的禁言，并新增两项处罚
+                state.set_thread_mute(30, 1, None)
+                state.set_thread_mute(30, 5, _in(300))
+                state.set_global_punishment(6, PunishmentType.PERMANENT_VOTING, True)
+                return super().get_session()
+
+        handler = _EventDuringReadHandler(engine)
+        state = PunishmentState(SimpleNamespace(db_handler=handler))  # type: ignore[arg-type]
+        await state.load()
+
+        assert not await state.is_thread_muted(30, 1)
+        assert await state.is_thread_muted(30, 5)
+        assert await state.is_restricted(6)
+        assert handler.sessions == 1
+    finally:
+        await dispose_test_engine(engine)
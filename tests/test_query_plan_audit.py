@@ -0,0 +1,77 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from StellariaPact.devtools.QueryPlanAuditor import QueryPlanAuditor
+
+MIGRATION_INDEXES = {
+    "vote_session": "ix_vote_session_status_type_end_time",
+    "global_proposal_punishment": "ix_global_proposal_punishment_type_lifted",
+    "announcement": "ix_announcement_discussion_thread_id",
+    "proposal_intake": "ix_proposal_intake_voting_message_id",
+}
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_do_not_scan_tables() -> None:
+    """验证所有仓储方法都有审计场景，且没有未登记的全表扫描。"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        auditor = QueryPlanAuditor(engine)
+        await auditor.seed()
+        report = await auditor.run()
+    finally:
+        await engine.dispose()
+
+    assert not report.uncovered_methods, f"以下仓储方法缺少审计场景: {report.uncovered_methods}"
+    assert not report.errors, f"审计场景执行失败: {report.errors}"
+    assert not report.unexpected_findings, "\n".join(
+        f"{finding.method}: {finding.detail}" for finding in report.unexpected_findings
+    )
+
+
+def test_query_plan_index_migration_round_trip() -> None:
+    """验证审计建议的索引能够升级创建并完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        config = Config(str(project_root / "alembic.ini"))
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        # 以当前模型建表，再移除新索引，模拟上一个版本的数据库
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for index_name in (
+                "ix_vote_session_status_type_end_time",
+                "ix_global_proposal_punishment_type_lifted",
+                "ix_announcement_discussion_thread_id",
+                "ix_proposal_intake_review_thread_id",
+                "ix_proposal_intake_discussion_thread_id",
+                "ix_proposal_intake_voting_message_id",
+            ):
+                connection.execute(text(f"DROP INDEX {index_name}"))
+        engine.dispose()
+        command.stamp(config, "e6b8c1d4f2a0")
+
+        command.upgrade(config, "f1c3e5a7b9d2")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        for table, index_name in MIGRATION_INDEXES.items():
+            assert index_name in {index["name"] for index in inspector.get_indexes(table)}
+        engine.dispose()
+
+        command.downgrade(config, "e6b8c1d4f2a0")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        for table, index_name in MIGRATION_INDEXES.items():
+            assert index_name not in {index["name"] for index in inspector.get_indexes(table)}
+        engine.dispose()
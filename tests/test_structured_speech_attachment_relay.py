@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+
+from StellariaPact.cogs.StructuredSpeech.StructuredSpeechAttachmentRelay import (
+    StructuredSpeechAttachmentRelay,
+)
+from StellariaPact.cogs.StructuredSpeech.StructuredSpeechUserError import (
+    StructuredSpeechUserError,
+)
+
+
+class _FakeResponse:
+    """按块返回固定内容的 aiohttp 响应替身。"""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.body = body
+        self.status = status
+        self.content = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(MagicMock(), (), status=self.status, message="error")
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self.body), size):
+            yield self.body[start : start + size]
+
+
+def _attachment(attachment_id: int, size: int) -> MagicMock:
+    attachment = MagicMock(
+        id=attachment_id,
+        size=size,
+        url=f"https://example.invalid/{attachment_id}",
+        filename=f"file{attachment_id}.bin",
+        description=None,
+    )
+    attachment.is_spoiler.return_value = False
+    return attachment
+
+
+@pytest.mark.asyncio
+async def test_download_spools_files_and_retries_server_errors() -> None:
+    """附件写入可回收的临时文件；服务端错误会重试，客户端错误直接失败且不泄漏预算。"""
+    relay = StructuredSpeechAttachmentRelay(spool_bytes=16, retry_delay_seconds=0)
+    large = bytes(range(256)) * 4
+    responses = {
+        "https://example.invalid/1": [_FakeResponse(b"", status=503), _FakeResponse(large)],
+        "https://example.invalid/2": [_FakeResponse(b"small")],
+        "https://example.invalid/3": [_FakeResponse(b"", status=404)],
+    }
+
+    async def get(url: str, **kwargs):
+        return responses[url].pop(0)
+
+    with patch(
+        "StellariaPact.cogs.StructuredSpeech.StructuredSpeechAttachmentRelay.HttpClient.get",
+        AsyncMock(side_effect=get),
+    ):
+        async with relay.download([_attachment(1, len(large)), _attachment(2, 5)]) as files:
+            assert [file.filename for file in files] == ["file1.bin", "file2.bin"]
+            assert files[0].fp.read() == large
+            assert files[1].fp.read() == b"small"
+            assert relay.stats()["reserved_bytes"] == len(large) + 5
+        assert all(file.fp.closed for file in files)
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            async with relay.download([_attachment(3, 10)]):
+                pass
+
+    stats = relay.stats()
+    assert stats["retries_total"] == 1
+    assert stats["reserved_bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_budgets_reject_oversized_messages_and_queue_concurrent_ones() -> None:
+    """单条消息超出预算时拒绝；全局预算不足时后到的转发等待前一条完成。"""
+    relay = StructuredSpeechAttachmentRelay(max_message_bytes=100, max_total_bytes=150)
+    with pytest.raises(StructuredSpeechUserError):
+        async with relay.download([_attachment(1, 60), _attachment(2, 60)]):
+            pass
+
+    relay.fetch_file = AsyncMock(return_value=MagicMock())  # type: ignore[method-assign]
+    with patch(
+        "StellariaPact.cogs.StructuredSpeech.StructuredSpeechAttachmentRelay.discord.File",
+        MagicMock,
+    ):
+        first_entered = asyncio.Event()
+        release_first = asyncio.Event()
+        entered: list[int] = []
+
+        async def relay_message(message_id: int) -> None:
+            async with relay.download([_attachment(message_id, 100)]):
+                entered.append(message_id)
+                if message_id == 1:
+                    first_entered.set()
+                    await release_first.wait()
+
+        first = asyncio.create_task(relay_message(1))
+        await first_entered.wait()
+        second = asyncio.create_task(relay_message(2))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert entered == [1]
+
+        release_first.set()
+        await asyncio.gather(first, second)
+
+    assert entered == [1, 2]
+    assert relay.stats()["peak_reserved_bytes"] == 100
+    assert relay.stats()["reserved_bytes"] == 0
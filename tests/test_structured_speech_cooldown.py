@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from db_support import create_test_engine, dispose_test_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.StructuredSpeech.StructuredSpeechCooldownTracker import (
+    StructuredSpeechCooldownTracker,
+)
+from StellariaPact.cogs.StructuredSpeech.StructuredSpeechService import (
+    StructuredSpeechService,
+)
+from StellariaPact.dto.structured_speech import StructuredSpeechModeDto
+from StellariaPact.models.StructuredSpeechMessage import StructuredSpeechMessage
+
+
+@pytest.mark.asyncio
+async def test_tracker_loads_once_and_keeps_newer_time() -> None:
+    """缓存命中时不再读取数据库；过期后重新读取，并以较新的发言时间为准。"""
+    now = datetime.now(timezone.utc)
+    loader = AsyncMock(return_value=None)
+    tracker = StructuredSpeechCooldownTracker(loader, ttl_seconds=60)
+
+    assert await tracker.get_last_sent_at(1, 2) is None
+    assert await tracker.get_last_sent_at(1, 2) is None
+    assert loader.await_count == 1
+
+    tracker.record(1, 2, now)
+    assert await tracker.get_last_sent_at(1, 2) == now
+    assert loader.await_count == 1
+
+    # 过期后重新读取；数据库中的旧记录不会覆盖缓存中较新的时间
+    loader.return_value = now - timedelta(minutes=5)
+    with patch("time.monotonic", return_value=10**9):
+        assert await tracker.get_last_sent_at(1, 2) == now
+    assert loader.await_count == 2
+
+    tracker.record(3, 2, now)
+    tracker.forget_thread(1)
+    assert len(tracker) == 1
+
+
+@pytest.mark.asyncio
+async def test_service_cooldown_reads_database_once_per_user() -> None:
+    """服务首次判断冷却时读取数据库，之后的判断和成功发言均只使用进程内缓存。"""
+    engine = await create_test_engine()
+    try:
+        async with AsyncSession(engine) as session:
+            session.add(
+                StructuredSpeechMessage(
+                    message_id=1001,
+                    webhook_id=900,
+                    guild_id=10,
+                    thread_id=30,
+                    user_id=50,
+                    created_at=datetime.now(timezone.utc) - timedelta(seconds=30),
+                )
+            )
+            await session.commit()
+
+        bot = MagicMock()
+        bot.db_handler.get_session.side_effect = lambda: AsyncSession(engine)
+        service = StructuredSpeechService(bot)
+        service.active_modes[30] = StructuredSpeechModeDto(
+            thread_id=30,
+            forum_id=20,
+            interval_seconds=120,
+            previous_slowmode_delay=0,
+        )
+
+        assert 85 <= await service.get_cooldown_remaining(thread_id=30, user_id=50) <= 90
+        assert await service.get_cooldown_remaining(thread_id=30, user_id=50) > 0
+        assert await service.get_cooldown_remaining(thread_id=30, user_id=60) == 0
+        assert bot.db_handler.get_session.call_count == 2
+
+        service.cooldowns.record(30, 60, datetime.now(timezone.utc))
+        assert await service.get_cooldown_remaining(thread_id=30, user_id=60) >= 119
+        assert bot.db_handler.get_session.call_count == 2
+    finally:
+        await dispose_test_engine(engine)
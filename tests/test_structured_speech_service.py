@@ -4,8 +4,9 @@ from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlmodel import SQLModel, select
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.StructuredSpeech.StructuredSpeechService import (
@@ -27,7 +28,7 @@ from StellariaPact.qo.structured_speech import (
 
 
 def _create_bot(engine: AsyncEngine) -> MagicMock:
-    """创建使用内存数据库和即时 API 调度器的测试 Bot。"""
+    """创建使用测试数据库和即时 API 调度器的测试 Bot。"""
     database_handler = MagicMock()
     database_handler.get_session.side_effect = lambda: AsyncSession(engine)
 
@@ -44,14 +45,12 @@ def _create_bot(engine: AsyncEngine) -> MagicMock:
 
 @pytest_asyncio.fixture
 async def structured_engine():
-    """提供包含完整 SQLModel 元数据的内存数据库。"""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async with engine.begin() as connection:
-        await connection.run_sync(SQLModel.metadata.create_all)
+    """提供包含完整 SQLModel 元数据的测试数据库。"""
+    engine = await create_test_engine()
     try:
         yield engine
     finally:
-        await engine.dispose()
+        await dispose_test_engine(engine)
 
 
 @pytest.mark.asyncio
@@ -196,38 +195,18 @@ async def test_reference_user_resolution_rejects_bots_and_unknown_webhooks(
 
 @pytest.mark.asyncio
 async def test_global_punishment_does_not_require_proposal_record() -> None:
-    """验证无提案记录的模板帖子仍会执行全局提案违规处罚检查。"""
-    activity_repository = SimpleNamespace(
-        get_user_activity=AsyncMock(return_value=None),
-    )
-    global_punishment_repository = SimpleNamespace(
-        is_proposal_violation_restricted=AsyncMock(return_value=True),
-    )
-    fake_uow = SimpleNamespace(
-        user_activity=activity_repository,
-        global_proposal_punishment=global_punishment_repository,
-    )
-
-    class UnitOfWorkContext:
-        """为处罚检查提供不包含提案仓储的工作单元。"""
-
-        async def __aenter__(self):
-            """返回测试工作单元。"""
-            return fake_uow
-
-        async def __aexit__(self, exc_type, exc_value, traceback):
-            """结束测试工作单元上下文。"""
-            return False
+    """验证无提案记录的模板帖子仍会执行全局提案违规处罚检查，且不读取数据库。"""
+    bot = MagicMock()
+    bot.punishment_state.is_thread_muted = AsyncMock(return_value=False)
+    bot.punishment_state.is_proposal_violation_restricted = AsyncMock(return_value=True)
+    service = StructuredSpeechService(bot)
 
-    service = StructuredSpeechService(MagicMock())
-    with patch(
-        "StellariaPact.cogs.StructuredSpeech.StructuredSpeechService.UnitOfWork",
-        return_value=UnitOfWorkContext(),
-    ):
-        punished = await service.is_user_punished(thread_id=30, user_id=50)
+    punished = await service.is_user_punished(thread_id=30, user_id=50)
 
     assert punished is True
-    global_punishment_repository.is_proposal_violation_restricted.assert_awaited_once_with(50)
+    bot.punishment_state.is_thread_muted.assert_awaited_once_with(30, 50)
+    bot.punishment_state.is_proposal_violation_restricted.assert_awaited_once_with(50)
+    bot.db_handler.get_session.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -290,11 +269,8 @@ async def test_publish_forwards_allowed_attachment_counts_and_records_activity(
     service.is_user_punished = AsyncMock(return_value=False)
 
     files = [MagicMock() for _ in range(attachment_count)]
-    attachments = []
-    for file in files:
-        attachment = MagicMock()
-        attachment.to_file = AsyncMock(return_value=file)
-        attachments.append(attachment)
+    attachments = [MagicMock(size=1024) for _ in files]
+    service.attachment_relay.fetch_file = AsyncMock(side_effect=files)
 
     with (
         patch(
@@ -302,7 +278,7 @@ async def test_publish_forwards_allowed_attachment_counts_and_records_activity(
             type(parent),
         ),
         patch(
-            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechService.discord.File",
+            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechAttachmentRelay.discord.File",
             MagicMock,
         ),
         patch(
@@ -374,10 +350,11 @@ async def test_attachment_read_failure_sends_nothing_and_consumes_no_cooldown(
     service.is_user_punished = AsyncMock(return_value=False)
 
     downloaded_file = MagicMock()
-    successful_attachment = MagicMock()
-    successful_attachment.to_file = AsyncMock(return_value=downloaded_file)
-    failed_attachment = MagicMock()
-    failed_attachment.to_file = AsyncMock(side_effect=RuntimeError("附件读取失败"))
+    successful_attachment = MagicMock(size=1024)
+    failed_attachment = MagicMock(size=1024)
+    service.attachment_relay.fetch_file = AsyncMock(
+        side_effect=[downloaded_file, RuntimeError("附件读取失败")]
+    )
 
     with (
         patch(
@@ -385,7 +362,7 @@ async def test_attachment_read_failure_sends_nothing_and_consumes_no_cooldown(
             type(parent),
         ),
         patch(
-            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechService.discord.File",
+            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechAttachmentRelay.discord.File",
             MagicMock,
         ),
         pytest.raises(RuntimeError, match="附件读取失败"),
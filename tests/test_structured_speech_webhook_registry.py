@@ -0,0 +1,203 @@
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.StructuredSpeech.StructuredSpeechService import (
+    StructuredSpeechService,
+)
+from StellariaPact.dto.structured_speech import StructuredSpeechModeDto
+from StellariaPact.models.StructuredSpeechWebhook import StructuredSpeechWebhook
+from StellariaPact.qo.structured_speech import PublishStructuredSpeechQo
+
+
+def _create_bot(engine: AsyncEngine) -> MagicMock:
+    """创建使用测试数据库和即时 API 调度器的测试 Bot。"""
+    database_handler = MagicMock()
+    database_handler.get_session.side_effect = lambda: AsyncSession(engine)
+
+    async def submit(coroutine, priority):
+        """直接等待测试中的 Discord 协程。"""
+        del priority
+        return await coroutine
+
+    bot = MagicMock()
+    bot.db_handler = database_handler
+    bot.api_scheduler.submit.side_effect = submit
+    bot.user.id = 1
+    return bot
+
+
+def _create_forum(created_webhook: MagicMock) -> MagicMock:
+    forum = MagicMock(id=20)
+    forum.webhooks = AsyncMock(return_value=[])
+    forum.create_webhook = AsyncMock(return_value=created_webhook)
+    return forum
+
+
+def _not_found() -> discord.NotFound:
+    return discord.NotFound(
+        MagicMock(status=404, reason="Not Found"),
+        {"code": 10015, "message": "Unknown Webhook"},
+    )
+
+
+async def _stored_webhooks(engine: AsyncEngine) -> list[tuple[int, int]]:
+    async with AsyncSession(engine) as session:
+        rows = (await session.exec(select(StructuredSpeechWebhook))).all()
+    return [(row.forum_id, row.webhook_id) for row in rows]
+
+
+@pytest_asyncio.fixture
+async def structured_engine():
+    """提供包含完整 SQLModel 元数据的测试数据库。"""
+    engine = await create_test_engine()
+    try:
+        yield engine
+    finally:
+        await dispose_test_engine(engine)
+
+
+@pytest.mark.asyncio
+async def test_persisted_webhook_is_fetched_by_id_after_restart(
+    structured_engine: AsyncEngine,
+) -> None:
+    """首次创建的 Webhook 只持久化 ID，重启后按 ID 取回令牌，不再列出论坛 Webhook。"""
+    forum = _create_forum(MagicMock(id=900, token="token-900"))
+    service = StructuredSpeechService(_create_bot(structured_engine))
+    webhook = await service.ensure_webhook(forum)
+
+    assert webhook.id == 900
+    forum.webhooks.assert_awaited_once()
+    assert await _stored_webhooks(structured_engine) == [(20, 900)]
+
+    restarted_forum = _create_forum(MagicMock(id=901, token="token-901"))
+    bot = _create_bot(structured_engine)
+    bot.fetch_webhook = AsyncMock(return_value=MagicMock(id=900, token="token-900"))
+    restarted = StructuredSpeechService(bot)
+    await restarted.load_and_recover()
+    reused = await restarted.ensure_webhook(restarted_forum)
+    assert await restarted.ensure_webhook(restarted_forum) is reused
+
+    assert (reused.id, reused.token) == (900, "token-900")
+    assert restarted.is_structured_webhook_id(900)
+    bot.fetch_webhook.assert_awaited_once_with(900)
+    restarted_forum.webhooks.assert_not_awaited()
+    restarted_forum.create_webhook.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deleted_persisted_webhook_is_replaced(structured_engine: AsyncEngine) -> None:
+    """按 ID 取回时 Webhook 已被删除，丢弃记录并重新查找或创建。"""
+    async with AsyncSession(structured_engine) as session:
+        session.add(StructuredSpeechWebhook(forum_id=20, webhook_id=900))
+        await session.commit()
+
+    forum = _create_forum(MagicMock(id=901, token="fresh"))
+    bot = _create_bot(structured_engine)
+    bot.fetch_webhook = AsyncMock(side_effect=_not_found())
+    service = StructuredSpeechService(bot)
+    await service.load_and_recover()
+    webhook = await service.ensure_webhook(forum)
+
+    assert webhook.id == 901
+    forum.create_webhook.assert_awaited_once()
+    assert await _stored_webhooks(structured_engine) == [(20, 901)]
+
+
+@pytest.mark.asyncio
+async def test_invalid_persisted_webhook_is_replaced_and_send_retried(
+    structured_engine: AsyncEngine,
+) -> None:
+    """持久化的 Webhook 已被删除时，替换凭据并重试一次发送。"""
+    async with AsyncSession(structured_engine) as session:
+        session.add(StructuredSpeechWebhook(forum_id=20, webhook_id=900))
+        await session.commit()
+
+    sent = MagicMock(id=1001, created_at=datetime.now(timezone.utc))
+    stale_webhook = MagicMock(id=900, token="stale")
+    stale_webhook.send = AsyncMock(side_effect=_not_found())
+    fresh_webhook = MagicMock(id=901, token="fresh")
+    fresh_webhook.send = AsyncMock(return_value=sent)
+    forum = _create_forum(fresh_webhook)
+    thread = MagicMock(id=30)
+    thread.parent = forum
+
+    bot = _create_bot(structured_engine)
+    bot.fetch_webhook = AsyncMock(return_value=stale_webhook)
+    service = StructuredSpeechService(bot)
+    await service.load_and_recover()
+    service.active_modes[30] = StructuredSpeechModeDto(
+        thread_id=30,
+        forum_id=20,
+        interval_seconds=120,
+        previous_slowmode_delay=0,
+    )
+    service.is_user_punished = AsyncMock(return_value=False)
+
+    with (
+        patch(
+            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechService.discord.ForumChannel",
+            type(forum),
+        ),
+        patch(
+            "StellariaPact.cogs.StructuredSpeech.StructuredSpeechService.discord.WebhookMessage",
+            type(sent),
+        ),
+    ):
+        result = await service.publish(
+            thread=thread,
+            member=MagicMock(id=50),
+            qo=PublishStructuredSpeechQo(
+                guild_id=10,
+                thread_id=30,
+                user_id=50,
+                content="## 正文\n正文\n\n## 理由\n理由",
+                cooldown_exempt=True,
+            ),
+            attachments=[],
+        )
+
+    assert result is sent
+    stale_webhook.send.assert_awaited_once()
+    fresh_webhook.send.assert_awaited_once()
+    assert await _stored_webhooks(structured_engine) == [(20, 901)]
+
+
+def test_structured_speech_webhook_migration_round_trip() -> None:
+    """验证 Webhook 表和论坛唯一索引能够升级并完整降级，且表中不保存令牌。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_url = f"sqlite:///{(Path(temporary_directory) / 'migration.db').as_posix()}"
+        # 不加载 alembic.ini，避免其日志配置禁用其他用例依赖的 logger
+        config = Config()
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        command.stamp(config, "e8f0a2c4b6d8")
+        command.upgrade(config, "f4a6c8e0b2d4")
+        engine = create_engine(database_url)
+        assert {
+            index["name"] for index in inspect(engine).get_indexes("structured_speech_webhook")
+        } == {"uq_structured_speech_webhook_forum"}
+        columns = {
+            column["name"] for column in inspect(engine).get_columns("structured_speech_webhook")
+        }
+        assert "webhook_token" not in columns
+        engine.dispose()
+
+        command.downgrade(config, "e8f0a2c4b6d8")
+        engine = create_engine(database_url)
+        assert "structured_speech_webhook" not in inspect(engine).get_table_names()
+        engine.dispose()
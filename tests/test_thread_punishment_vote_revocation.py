@@ -1,7 +1,8 @@
 import unittest
 
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlmodel import SQLModel, select
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Punishment.logic.PunishmentLogic import PunishmentLogic
@@ -33,14 +34,12 @@ class ThreadPunishmentVoteRevocationTests(unittest.IsolatedAsyncioTestCase):
     other_user_id = 51
 
     async def asyncSetUp(self) -> None:
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        self.engine = await create_test_engine()
         self.logic = PunishmentLogic(_TestBot(self.engine))  # type: ignore[arg-type]
         await self._seed_votes()
 
     async def asyncTearDown(self) -> None:
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def _seed_votes(self) -> None:
         async with AsyncSession(self.engine) as session:
@@ -0,0 +1,242 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.listeners.MessageEvent import MessageEvent
+from StellariaPact.cogs.Voting.MessageEventQueue import MessageEventQueue
+from StellariaPact.cogs.Voting.UserActivityBuffer import UserActivityBuffer
+from StellariaPact.cogs.Voting.VotingLogic import VotingLogic
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+
+
+def _create_bot(engine: AsyncEngine) -> MagicMock:
+    """创建使用测试数据库的测试 Bot。"""
+    database_handler = MagicMock()
+    database_handler.get_session.side_effect = lambda: AsyncSession(engine)
+    bot = MagicMock()
+    bot.db_handler = database_handler
+    return bot
+
+
+@pytest_asyncio.fixture
+async def activity_engine():
+    """提供包含完整 SQLModel 元数据的测试数据库。"""
+    engine = await create_test_engine()
+    try:
+        yield engine
+    finally:
+        await dispose_test_engine(engine)
+
+
+async def _stored_count(engine: AsyncEngine, user_id: int = 50, thread_id: int = 30) -> int:
+    """读取数据库中已持久化的发言计数。"""
+    async with AsyncSession(engine) as session:
+        activity = (
+            await session.exec(
+                select(UserActivity).where(
+                    UserActivity.user_id == user_id,
+                    UserActivity.context_thread_id == thread_id,
+                )
+            )
+        ).one_or_none()
+    return activity.message_count if activity else 0
+
+
+def _qo(change: int, user_id: int = 50) -> UpdateUserActivityQo:
+    return UpdateUserActivityQo(user_id=user_id, thread_id=30, change=change)
+
+
+@pytest.mark.asyncio
+async def test_increments_below_threshold_are_written_synchronously(
+    activity_engine: AsyncEngine,
+) -> None:
+    """验证未达标用户的发言立即写库，达标后的增量在刷新时批量写入。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+
+    await logic.handle_message_creation(_qo(1))
+    assert await _stored_count(activity_engine) == 1
+    await logic.handle_message_creation(_qo(1))
+    assert await _stored_count(activity_engine) == 2
+
+    # 已达标后新增的发言只进入缓冲区。
+    await logic.handle_message_creation(_qo(1))
+    await logic.handle_message_creation(_qo(1))
+    assert await _stored_count(activity_engine) == 2
+    assert buffer.pending == {(50, 30): 2}
+
+    await buffer.flush()
+    assert await _stored_count(activity_engine) == 4
+    assert not buffer.pending
+    assert buffer.known_counts[(50, 30)] == 4
+
+
+@pytest.mark.asyncio
+async def test_deletion_that_may_drop_below_threshold_merges_pending_and_writes(
+    activity_engine: AsyncEngine,
+) -> None:
+    """验证可能跌破阈值的删除会与缓冲量合并后同步写库并检查资格。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+    remove_votes = AsyncMock(return_value=["detail"])
+    logic.remove_active_user_votes_in_thread = remove_votes  # type: ignore[method-assign]
+
+    for _ in range(3):
+        await logic.handle_message_creation(_qo(1))
+    assert buffer.pending == {(50, 30): 1}
+
+    # 3 - 1 仍达标，删除同样只进入缓冲区。
+    assert await logic.handle_message_deletion(_qo(-1)) is None
+    assert buffer.pending == {(50, 30): 0}
+    assert await _stored_count(activity_engine) == 2
+
+    # 再删除一条将跌破阈值，必须同步写库并撤销投票。
+    assert await logic.handle_message_deletion(_qo(-1)) == ["detail"]
+    assert await _stored_count(activity_engine) == 1
+    assert not buffer.pending
+    assert (50, 30) not in buffer.known_counts
+    remove_votes.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_disabled_buffer_writes_every_message(activity_engine: AsyncEngine) -> None:
+    """验证关闭缓冲后每条发言都直接写库。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot, enabled=False)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+
+    for _ in range(4):
+        await logic.handle_message_creation(_qo(1))
+
+    assert await _stored_count(activity_engine) == 4
+    assert not buffer.pending
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending_changes(activity_engine: AsyncEngine) -> None:
+    """验证批量写库失败时缓冲量被放回，等待下个周期重试。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot)
+    buffer.remember(50, 30, 5)
+    buffer.remember(51, 30, 5)
+    await buffer.try_buffer(_qo(2))
+    await buffer.try_buffer(_qo(1, user_id=51))
+
+    bot.db_handler.get_session.side_effect = RuntimeError("数据库不可用")
+    await buffer.flush()
+    assert buffer.pending == {(50, 30): 2, (51, 30): 1}
+
+    bot.db_handler.get_session.side_effect = lambda: AsyncSession(activity_engine)
+    await buffer.flush()
+    assert await _stored_count(activity_engine) == 2
+    assert await _stored_count(activity_engine, user_id=51) == 1
+
+
+@pytest.mark.asyncio
+async def test_event_batch_groups_changes_and_revokes_once_per_user(
+    activity_engine: AsyncEngine,
+) -> None:
+    """验证批量事件按 (用户, 帖子) 合并写库，只对最终未达标的用户撤票。"""
+    bot = _create_bot(activity_engine)
+    logic = VotingLogic(bot, activity_buffer=UserActivityBuffer(bot, enabled=False))
+    remove_votes = AsyncMock(return_value=["detail"])
+    logic.remove_active_user_votes_in_thread = remove_votes  # type: ignore[method-assign]
+
+    await logic.handle_message_event_batch(
+        [_qo(1), _qo(1), _qo(1), _qo(1, user_id=60), _qo(1, user_id=60)]
+    )
+    assert await _stored_count(activity_engine) == 3
+    assert await _stored_count(activity_engine, user_id=60) == 2
+    remove_votes.assert_not_awaited()
+
+    # 用户 50 删除后再发言仍达标；用户 60 净减少后跌破阈值。
+    details = await logic.handle_message_event_batch(
+        [_qo(-1), _qo(1), _qo(-1), _qo(-1, user_id=60)]
+    )
+    assert await _stored_count(activity_engine) == 2
+    assert await _stored_count(activity_engine, user_id=60) == 1
+    assert details == {30: ["detail"]}
+    remove_votes.assert_awaited_once()
+    assert remove_votes.await_args.kwargs["user_id"] == 60
+
+
+@pytest.mark.asyncio
+async def test_failed_event_batch_withdraws_buffered_changes(
+    activity_engine: AsyncEngine,
+) -> None:
+    """验证批量事件的事务失败时撤销已缓冲的部分，整批重试不会重复计数。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+    buffer.remember(50, 30, 5)
+    batch = [_qo(1), _qo(1, user_id=60)]
+
+    bot.db_handler.get_session.side_effect = RuntimeError("数据库不可用")
+    with pytest.raises(RuntimeError):
+        await logic.handle_message_event_batch(batch)
+    assert buffer.pending == {}
+
+    bot.db_handler.get_session.side_effect = lambda: AsyncSession(activity_engine)
+    await logic.handle_message_event_batch(batch)
+    assert buffer.pending == {(50, 30): 1}
+    await buffer.flush()
+    assert await _stored_count(activity_engine) == 1
+    assert await _stored_count(activity_engine, user_id=60) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_retry_after_failed_attempt_counts_each_event_once(
+    activity_engine: AsyncEngine,
+) -> None:
+    """验证队列重试首次失败的批次后，已缓冲和同步写库的计数都只增加一次。"""
+    bot = _create_bot(activity_engine)
+    buffer = UserActivityBuffer(bot)
+    logic = VotingLogic(bot, activity_buffer=buffer)
+    buffer.remember(50, 30, 5)
+    attempts = 0
+
+    def get_session() -> AsyncSession:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("数据库不可用")
+        return AsyncSession(activity_engine)
+
+    bot.db_handler.get_session.side_effect = get_session
+
+    async def process_batch(events: list[MessageEvent]) -> None:
+        await logic.handle_message_event_batch(
+            [
+                UpdateUserActivityQo(user_id=event.user_id, thread_id=event.thread_id, change=1)
+                for event in events
+            ],
+            [(event.message_id, event.event_type) for event in events],
+        )
+
+    on_dropped = AsyncMock()
+    queue = MessageEventQueue(process_batch, on_dropped, worker_count=1, retry_delay_seconds=0)
+    queue.start()
+    assert queue.offer(
+        [
+            MessageEvent("message_created", 1000 + user_id, 1, 2, 30, user_id)
+            for user_id in (50, 60)
+        ]
+    )
+    await queue.join()
+    await queue.stop()
+
+    assert attempts > 1
+    assert queue.processed_total == 2
+    on_dropped.assert_not_awaited()
+    # 用户 50 的已知计数只存在于内存中，数据库里只会出现缓冲的这一次增量。
+    await buffer.flush()
+    assert await _stored_count(activity_engine) == 1
+    assert await _stored_count(activity_engine, user_id=60) == 1
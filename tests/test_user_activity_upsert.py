@@ -0,0 +1,103 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.models.UserActivity import UserActivity
+from StellariaPact.qo.user_activity import UpdateUserActivityQo
+from StellariaPact.repository.UserActivityRepository import UserActivityRepository
+
+
+class UserActivityUpsertTests(unittest.IsolatedAsyncioTestCase):
+    """验证用户活动计数与处罚状态均以单条语句原子写入。"""
+
+    async def asyncSetUp(self) -> None:
+        """每个用例前创建测试数据库，并记录实际执行的 SQL 语句。"""
+        self.engine = await create_test_engine()
+
+        self.statements: list[str] = []
+
+        @event.listens_for(self.engine.sync_engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+    async def asyncTearDown(self) -> None:
+        """每个用例后释放数据库引擎。"""
+        await dispose_test_engine(self.engine)
+
+    async def _update(self, session: AsyncSession, change: int) -> UserActivity:
+        repository = UserActivityRepository(session)
+        return await repository.update_user_activity(
+            UpdateUserActivityQo(user_id=50, thread_id=30, change=change)
+        )
+
+    async def test_increment_creates_then_accumulates_with_one_statement(self) -> None:
+        """首次增加会创建记录，之后的增加在同一条 UPSERT 中累加。"""
+        async with AsyncSession(self.engine) as session:
+            self.statements.clear()
+            created = await self._update(session, 1)
+            self.assertEqual(created.message_count, 1)
+            self.assertEqual(len(self.statements), 1)
+            self.assertIn("ON CONFLICT", self.statements[0])
+
+            self.statements.clear()
+            updated = await self._update(session, 3)
+            self.assertEqual(updated.message_count, 4)
+            self.assertEqual(len(self.statements), 1)
+            await session.commit()
+
+        async with AsyncSession(self.engine) as session:
+            rows = list((await session.exec(select(UserActivity))).all())
+        self.assertEqual([(row.user_id, row.message_count) for row in rows], [(50, 4)])
+
+    async def test_decrement_is_floored_and_never_creates_records(self) -> None:
+        """减少计数不会低于 0，且不会为不存在的用户创建记录。"""
+        async with AsyncSession(self.engine) as session:
+            missing = await self._update(session, -1)
+            self.assertEqual(missing.id, -1)
+            self.assertEqual(missing.message_count, 0)
+
+            await self._update(session, 1)
+            floored = await self._update(session, -5)
+            self.assertEqual(floored.message_count, 0)
+            await session.commit()
+
+        async with AsyncSession(self.engine) as session:
+            rows = list((await session.exec(select(UserActivity))).all())
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].message_count, 0)
+
+    async def test_validation_upsert_and_clear_keep_message_count(self) -> None:
+        """处罚写入与解除只修改处罚字段，并保留已有发言计数。"""
+        mute_end_time = datetime.now(timezone.utc) + timedelta(hours=1)
+        async with AsyncSession(self.engine) as session:
+            repository = UserActivityRepository(session)
+            self.assertIsNone(await repository.clear_punishment(50, 30))
+
+            punished = await repository.update_user_validation_status(
+                50, 30, is_valid=False, mute_end_time=mute_end_time
+            )
+            self.assertEqual(punished.validation, 0)
+            self.assertEqual(punished.message_count, 0)
+
+            await self._update(session, 2)
+            self.statements.clear()
+            punished = await repository.update_user_validation_status(
+                50, 30, is_valid=False, mute_end_time=mute_end_time
+            )
+            self.assertEqual(len(self.statements), 1)
+            self.assertEqual(punished.message_count, 2)
+            self.assertEqual(punished.mute_end_time, mute_end_time)
+
+            cleared = await repository.clear_punishment(50, 30)
+            assert cleared is not None
+            self.assertEqual(cleared.validation, 1)
+            self.assertIsNone(cleared.mute_end_time)
+            self.assertEqual(cleared.message_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
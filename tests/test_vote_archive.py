@@ -0,0 +1,205 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.config import Config
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy import create_engine, func, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.tasks.VoteArchiver import VoteArchiver
+from StellariaPact.models.UserVote import UserVote
+from StellariaPact.models.VoteArchive import (
+    user_vote_archive,
+    vote_message_mirror_archive,
+    vote_option_archive,
+    vote_session_archive,
+)
+from StellariaPact.models.VoteMessageMirror import VoteMessageMirror
+from StellariaPact.models.VoteOption import VoteOption
+from StellariaPact.models.VoteSession import VoteSession
+from StellariaPact.repository.VoteOptionRepository import VoteOptionRepository
+from StellariaPact.share.enums import ObjectionResolutionType, VoteOptionStatus
+
+ARCHIVE_TABLES = (
+    "vote_session_archive",
+    "user_vote_archive",
+    "vote_option_archive",
+    "vote_message_mirror_archive",
+)
+
+
+class _TestDatabaseHandler:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def get_session(self) -> AsyncSession:
+        return AsyncSession(self.engine)
+
+
+@pytest_asyncio.fixture
+async def archive_engine():
+    engine = await create_test_engine()
+    yield engine
+    await dispose_test_engine(engine)
+
+
+def _create_archiver(engine: AsyncEngine, **archive_config) -> VoteArchiver:
+    bot = SimpleNamespace(
+        db_handler=_TestDatabaseHandler(engine),
+        config={"vote_archive": {"enabled": False, **archive_config}},
+    )
+    return VoteArchiver(bot)  # type: ignore[arg-type]
+
+
+async def _seed_session(
+    session: AsyncSession,
+    *,
+    status: int,
+    end_time: datetime,
+    thread_id: int,
+) -> int:
+    """创建一个带投票记录、恶意异议选项和镜像消息的投票会话。"""
+    vote_session = VoteSession(
+        guild_id=1,
+        context_thread_id=thread_id,
+        context_message_id=thread_id + 1,
+        total_choices=1,
+        status=status,
+        end_time=end_time,
+    )
+    session.add(vote_session)
+    await session.flush()
+    session_id: int = vote_session.id  # type: ignore[assignment]
+    session.add(
+        VoteOption(
+            session_id=session_id,
+            option_type=1,
+            choice_index=1,
+            choice_text=f"异议 {thread_id}",
+            creator_id=20,
+            voting_status=VoteOptionStatus.CLOSED,
+            resolution_type=ObjectionResolutionType.MALICIOUS,
+            closed_at=end_time,
+        )
+    )
+    session.add(
+        UserVote(session_id=session_id, user_id=30, choice=1, option_type=1, choice_index=1)
+    )
+    session.add(
+        VoteMessageMirror(
+            session_id=session_id, guild_id=1, channel_id=40, message_id=thread_id + 2
+        )
+    )
+    return session_id
+
+
+async def _count(engine: AsyncEngine, table) -> int:
+    async with AsyncSession(engine) as session:
+        return (await session.exec(select(func.count()).select_from(table))).one()
+
+
+@pytest.mark.asyncio
+async def test_archiver_moves_only_closed_sessions_past_grace_period(archive_engine) -> None:
+    """结束超过宽限期的会话连同子记录移入归档表，进行中和宽限期内的会话保持不变。"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(archive_engine) as session:
+        old_ids = [
+            await _seed_session(
+                session, status=0, end_time=now - timedelta(days=40), thread_id=100 + index * 10
+            )
+            for index in range(3)
+        ]
+        recent_id = await _seed_session(
+            session, status=0, end_time=now - timedelta(days=5), thread_id=200
+        )
+        active_id = await _seed_session(
+            session, status=1, end_time=now - timedelta(days=40), thread_id=300
+        )
+        await session.commit()
+
+    archiver = _create_archiver(archive_engine, grace_period_days=30, batch_size=2)
+    assert await archiver.run_once() == 3
+
+    async with AsyncSession(archive_engine) as session:
+        remaining = (await session.exec(select(VoteSession.id))).all()
+        archived = (await session.exec(select(vote_session_archive.c.id))).all()
+    assert sorted(remaining) == [recent_id, active_id]
+    assert sorted(archived) == old_ids
+
+    assert await _count(archive_engine, user_vote_archive) == 3
+    assert await _count(archive_engine, vote_option_archive) == 3
+    assert await _count(archive_engine, vote_message_mirror_archive) == 3
+    assert await _count(archive_engine, UserVote.__table__) == 2
+    assert await _count(archive_engine, VoteOption.__table__) == 2
+    assert await _count(archive_engine, VoteMessageMirror.__table__) == 2
+
+    # 再次运行时没有可归档的会话
+    assert await archiver.run_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_malicious_objection_summary_includes_archived_options(archive_engine) -> None:
+    """违规异议历史同时统计热表与归档表，并按关闭时间统一排序。"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(archive_engine) as session:
+        await _seed_session(session, status=0, end_time=now - timedelta(days=60), thread_id=100)
+        await _seed_session(session, status=0, end_time=now - timedelta(days=50), thread_id=110)
+        await _seed_session(session, status=0, end_time=now - timedelta(days=1), thread_id=200)
+        await session.commit()
+
+    await _create_archiver(archive_engine, grace_period_days=30).run_once()
+
+    async with AsyncSession(archive_engine) as session:
+        total, records = await VoteOptionRepository(session).get_malicious_objection_summary(
+            guild_id=1, creator_id=20, limit=2
+        )
+
+    assert total == 3
+    assert [record.choice_text for record in records] == ["异议 200", "异议 110"]
+    assert records[1].thread_id == 110
+    assert records[1].closed_at.tzinfo is not None
+
+
+def test_vote_archive_migration_round_trip() -> None:
+    """验证归档表能够升级创建并完整降级。"""
+    project_root = Path(__file__).resolve().parents[1]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        database_path = Path(temporary_directory) / "migration.db"
+        database_url = f"sqlite:///{database_path.as_posix()}"
+        config = Config(str(project_root / "alembic.ini"))
+        config.set_main_option("script_location", str(project_root / "alembic"))
+        config.set_main_option("sqlalchemy.url", database_url)
+
+        # 以当前模型建表，再移除归档表，模拟上一个版本的数据库
+        engine = create_engine(database_url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for table_name in ARCHIVE_TABLES:
+                SQLModel.metadata.tables[table_name].drop(connection)
+        engine.dispose()
+        command.stamp(config, "f1c3e5a7b9d2")
+
+        command.upgrade(config, "a2d4f6b8c0e1")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        for table_name in ARCHIVE_TABLES:
+            table = SQLModel.metadata.tables[table_name]
+            columns = {column["name"] for column in inspector.get_columns(table_name)}
+            assert columns == {column.name for column in table.columns}
+        assert "ix_vote_option_archive_creator_id" in {
+            index["name"] for index in inspector.get_indexes("vote_option_archive")
+        }
+        engine.dispose()
+
+        command.downgrade(config, "f1c3e5a7b9d2")
+        engine = create_engine(database_url)
+        table_names = set(inspect(engine).get_table_names())
+        assert table_names.isdisjoint(ARCHIVE_TABLES)
+        engine.dispose()
@@ -0,0 +1,190 @@
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from db_support import create_test_engine, dispose_test_engine, postgresql_test_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from StellariaPact.cogs.Voting.tasks.VoteCloser import VoteCloser
+from StellariaPact.models.UserVote import UserVote
+from StellariaPact.models.VoteSession import VoteSession
+from StellariaPact.qo.vote_session import AdjustVoteTimeQo
+from StellariaPact.repository.VoteSessionRepository import VoteSessionRepository
+from StellariaPact.share.DeadlineScheduler import DeadlineScheduler
+
+
+class _TestDatabaseHandler:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def get_session(self) -> AsyncSession:
+        return AsyncSession(self.engine)
+
+
+@pytest_asyncio.fixture
+async def closer_engine():
+    if postgresql_test_url():
+        engine = await create_test_engine()
+        yield engine
+        await dispose_test_engine(engine)
+        return
+    # 计票并发使用多个连接，内存数据库无法在连接间共享，改用临时文件
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await create_test_engine(f"sqlite+aiosqlite:///{Path(directory) / 'closer.db'}")
+        yield engine
+        await dispose_test_engine(engine)
+
+
+def _create_closer(engine: AsyncEngine, max_concurrency: int = 8) -> VoteCloser:
+    bot = SimpleNamespace(
+        db_handler=_TestDatabaseHandler(engine),
+        config={"vote_closer": {"max_concurrency": max_concurrency}},
+        deadline_scheduler=DeadlineScheduler(),
+        wait_until_ready=AsyncMock(),
+        dispatch=MagicMock(),
+    )
+    return VoteCloser(bot)  # type: ignore[arg-type]
+
+
+async def _seed_sessions(engine: AsyncEngine, statuses: dict[int, tuple[int, int]]) -> None:
+    """按 {会话ID: (状态, 结束时间相对现在的小时数)} 写入普通投票，每个会话带一张赞成票。"""
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(engine) as session:
+        for session_id, (status, end_offset_hours) in statuses.items():
+            session.add(
+                VoteSession(
+                    id=session_id,
+                    guild_id=1,
+                    context_thread_id=100 + session_id,
+                    context_message_id=1000 + session_id,
+                    status=status,
+                    end_time=now + timedelta(hours=end_offset_hours),
+                )
+            )
+            session.add(UserVote(session_id=session_id, user_id=7, choice=1))
+        await session.commit()
+
+
+async def _statuses(engine: AsyncEngine) -> dict[int, int]:
+    async with AsyncSession(engine) as session:
+        result = await session.exec(select(VoteSession))
+        return {s.id: s.status for s in result.all()}  # type: ignore[misc]
+
+
+def _finished_ids(closer: VoteCloser) -> list[int]:
+    return sorted(
+        call.args[1].id
+        for call in closer.bot.dispatch.call_args_list
+        if call.args[0] == "vote_finished"
+    )
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_claimed_in_bulk_and_finished_once(closer_engine) -> None:
+    """到期会话被一次认领并结算，重复触发或并发触发都不会再次分派结果。"""
+    await _seed_sessions(closer_engine, {1: (1, -2), 2: (1, -1), 3: (1, 5), 4: (0, -3)})
+    closer = _create_closer(closer_engine)
+
+    await asyncio.gather(closer.close_expired_votes([1]), closer.close_expired_votes([2]))
+    await closer.close_expired_votes()
+
+    assert _finished_ids(closer) == [1, 2]
+    assert await _statuses(closer_engine) == {1: 0, 2: 0, 3: 1, 4: 0}
+    finished = [
+        call.args for call in closer.bot.dispatch.call_args_list if call.args[0] == "vote_finished"
+    ]
+    for _, session_dto, result_dto in finished:
+        assert session_dto.status == 0
+        assert result_dto.status == 0
+        assert result_dto.total_approve_votes == 1
+
+
+@pytest.mark.asyncio
+async def test_interrupted_sessions_are_resumed_and_failures_released(closer_engine) -> None:
+    """重启前停在结算中的会话会被重新结算；计票失败的会话恢复为进行中。"""
+    await _seed_sessions(closer_engine, {1: (2, -2), 2: (1, -1), 3: (1, -1)})
+    closer = _create_closer(closer_engine)
+    original_tally = closer.logic.tally_closing_session
+
+    async def tally(session_dto):
+        if session_dto.id == 3:
+            raise RuntimeError("计票失败")
+        return await original_tally(session_dto)
+
+    closer.logic.tally_closing_session = tally  # type: ignore[method-assign]
+    await closer.close_expired_votes()
+
+    assert _finished_ids(closer) == [1, 2]
+    assert await _statuses(closer_engine) == {1: 0, 2: 0, 3: 1}
+    pending = dict(await closer.load_deadlines())
+    assert list(pending) == [3]
+
+
+@pytest.mark.asyncio
+async def test_tallies_run_with_bounded_concurrency(closer_engine) -> None:
+    """计票并发数不超过配置的上限。"""
+    await _seed_sessions(closer_engine, {i: (1, -1) for i in range(1, 7)})
+    closer = _create_closer(closer_engine, max_concurrency=2)
+    original_tally = closer.logic.tally_closing_session
+    running = 0
+    peak = 0
+
+    async def tally(session_dto):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.01)
+            return await original_tally(session_dto)
+        finally:
+            running -= 1
+
+    closer.logic.tally_closing_session = tally  # type: ignore[method-assign]
+    await closer.close_expired_votes()
+
+    assert peak == 2
+    assert _finished_ids(closer) == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_only_sessions_finished_by_this_round_dispatch_events(closer_engine) -> None:
+    """计票期间被其他途径改变状态的会话不会被标记为已结束，也不会分派结束事件。"""
+    await _seed_sessions(closer_engine, {1: (1, -1), 2: (1, -1)})
+    closer = _create_closer(closer_engine)
+    original_tally = closer.logic.tally_closing_session
+
+    async def tally(session_dto):
+        result = await original_tally(session_dto)
+        if session_dto.id == 2:
+            async with AsyncSession(closer_engine) as session:
+                vote_session = await session.get(VoteSession, 2)
+                assert vote_session is not None
+                vote_session.status = 1
+                await session.commit()
+        return result
+
+    closer.logic.tally_closing_session = tally  # type: ignore[method-assign]
+    await closer.close_expired_votes()
+
+    assert _finished_ids(closer) == [1]
+    assert await _statuses(closer_engine) == {1: 0, 2: 1}
+
+
+@pytest.mark.asyncio
+async def test_closing_sessions_cannot_be_adjusted_or_reopened(closer_engine) -> None:
+    """结算中的会话既不能调整时间也不能重新开启，避免与结算并发修改状态。"""
+    await _seed_sessions(closer_engine, {1: (2, -1)})
+    async with AsyncSession(closer_engine) as session:
+        repository = VoteSessionRepository(session)
+        with pytest.raises(ValueError, match="结算中"):
+            await repository.adjust_vote_time(AdjustVoteTimeQo(message_id=1001, hours_to_adjust=1))
+        with pytest.raises(ValueError, match="结算中"):
+            await repository.reopen_vote_session(1001, datetime.now(timezone.utc))
+    assert await _statuses(closer_engine) == {1: 2}
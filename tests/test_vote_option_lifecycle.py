@@ -4,8 +4,9 @@ from types import SimpleNamespace
 from unittest.mock import Mock
 
 import discord
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlmodel import SQLModel, select
+from db_support import create_test_engine, dispose_test_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from StellariaPact.cogs.Moderation.ModerationLogic import ModerationLogic
@@ -22,6 +23,8 @@ from StellariaPact.qo.user_vote import RecordVoteQo
 from StellariaPact.repository.UserVoteRepository import UserVoteRepository
 from StellariaPact.repository.VoteOptionRepository import VoteOptionRepository
 from StellariaPact.share.enums import ProposalStatus, VoteOptionStatus
+from StellariaPact.share.ProposalRegistry import ProposalRegistry
+from StellariaPact.share.PunishmentState import PunishmentState
 
 
 class _TestDatabaseHandler:
@@ -33,13 +36,21 @@ class _TestDatabaseHandler:
 
 
 class VoteOptionLifecycleTests(unittest.IsolatedAsyncioTestCase):
+    def _create_bot(self) -> SimpleNamespace:
+        bot = SimpleNamespace(
+            db_handler=_TestDatabaseHandler(self.engine),
+            config={},
+            dispatch=Mock(),
+        )
+        bot.punishment_state = PunishmentState(bot)  # type: ignore[arg-type]
+        bot.proposal_registry = ProposalRegistry(bot)  # type: ignore[arg-type]
+        return bot
+
     async def asyncSetUp(self) -> None:
-        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-        async with self.engine.begin() as connection:
-            await connection.run_sync(SQLModel.metadata.create_all)
+        self.engine = await create_test_engine()
 
     async def asyncTearDown(self) -> None:
-        await self.engine.dispose()
+        await dispose_test_engine(self.engine)
 
     async def _seed_proposal_vote(self) -> tuple[int, int]:
         async with AsyncSession(self.engine) as session:
@@ -103,11 +114,7 @@ class VoteOptionLifecycleTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_rediscuss_closes_only_active_objections(self) -> None:
         proposal_id, vote_session_id = await self._seed_proposal_vote()
-        bot = SimpleNamespace(
-            db_handler=_TestDatabaseHandler(self.engine),
-            config={},
-            dispatch=Mock(),
-        )
+        bot = self._create_bot()
 
         result = await ModerationLogic(bot).proposal_status_change(  # type: ignore[arg-type]
             proposal_id, ProposalStatus.DISCUSSION
@@ -178,11 +185,7 @@ class VoteOptionLifecycleTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_new_objection_uses_new_index_and_closed_votes_are_immutable(self) -> None:
         proposal_id, vote_session_id = await self._seed_proposal_vote()
-        bot = SimpleNamespace(
-            db_handler=_TestDatabaseHandler(self.engine),
-            config={},
-            dispatch=Mock(),
-        )
+        bot = self._create_bot()
         await ModerationLogic(bot).proposal_status_change(  # type: ignore[arg-type]
             proposal_id, ProposalStatus.DISCUSSION
         )
@@ -265,11 +268,7 @@ class VoteOptionLifecycleTests(unittest.IsolatedAsyncioTestCase):
             )
             await session.commit()
 
-        bot = SimpleNamespace(
-            db_handler=_TestDatabaseHandler(self.engine),
-            config={},
-            dispatch=Mock(),
-        )
+        bot = self._create_bot()
         logic = ModerationLogic(bot)  # type: ignore[arg-type]
         await logic.proposal_status_change(proposal_id, ProposalStatus.DISCUSSION)
 